@@ -317,6 +317,14 @@ app.register_blueprint(xhs_note_info.bp, url_prefix=API_PREFIX + '/xhs-note-info
 app.register_blueprint(version.bp, url_prefix='/api/v1/version')
 app.register_blueprint(weekly_reports.bp)  # weekly_reports has url_prefix in blueprint
 
+# 导入任务队列（工作线程在服务器启动时启动，首次上传时也会按需启动）
+from backend.services.import_queue import import_queue
+import_queue.init_app(app, upload.run_import_job)
+
+# 质量评分抽样行数（处理器类属性，批量上传的解析子进程中同样生效）
+from backend.processors.base_processor import DataProcessor
+DataProcessor.QUALITY_SAMPLE_ROWS = app.config['QUALITY_SAMPLE_ROWS']
+
 # Debug: Log all registered routes
 logger.info("已注册的路由:")
 for rule in app.url_map.iter_rules():
@@ -336,6 +344,7 @@ def internal_error(error):
 
 def run_flask_server():
     """在后台线程运行Flask服务器"""
+    import_queue.start()
     app.run(
         host=HOST,
         port=PORT,
@@ -409,6 +418,10 @@ def start_with_webview():
     webview.start()
 
 if __name__ == '__main__':
+    # 批量上传使用进程池并行解析（打包后的 exe 需要 freeze_support）
+    import multiprocessing
+    multiprocessing.freeze_support()
+
     # 根据是否安装pywebview选择启动模式
     if USE_WEBVIEW:
         # 打包后的exe使用嵌入式浏览器
@@ -421,6 +434,10 @@ if __name__ == '__main__':
         logger.info(f"访问地址: http://{HOST}:{PORT}")
         logger.info("=" * 60)
 
+        # debug 模式下 reloader 会启动子进程，只在实际提供服务的子进程中启动队列
+        if not DEBUG or os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+            import_queue.start()
+
         app.run(
             host=HOST,
             port=PORT,
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+"""
+数据库迁移脚本：后端转化增量导入
+日期: 2026-10-17
+
+变更说明：
+1. backend_conversions 新增 row_key（自然键哈希：平台来源 + 资金账号/平台用户ID + 线索日期 + 同键序号）
+   和 content_hash（40个业务字段的内容哈希）
+2. 新增 row_key 索引，增量导入按 row_key 比对已有线索
+3. 为已有数据补充 row_key / content_hash（按 id 顺序编号，与按原导出顺序导入一致）
+
+运行方式:
+    python backend/migrations/add_backend_conversion_row_keys.py
+"""
+
+import sys
+import os
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from backend.database import db
+from backend.processors import BackendConversionProcessor
+from sqlalchemy import text
+from app import app
+
+
+def column_exists(table_name, column_name):
+    """检查字段是否存在"""
+    columns = db.session.execute(text(f'PRAGMA table_info("{table_name}")')).fetchall()
+    return any(col[1] == column_name for col in columns)
+
+
+def upgrade():
+    """添加增量导入字段、索引并补充已有数据"""
+    with app.app_context():
+        print("=" * 60)
+        print("后端转化增量导入")
+        print("=" * 60)
+
+        try:
+            print("\n1. backend_conversions.row_key / content_hash")
+            for column_name, column_type in [('row_key', 'VARCHAR(40)'), ('content_hash', 'VARCHAR(32)')]:
+                if column_exists('backend_conversions', column_name):
+                    print(f"   [OK] {column_name} 字段已存在")
+                else:
+                    db.session.execute(text(f"""
+                        ALTER TABLE backend_conversions
+                        ADD COLUMN {column_name} {column_type}
+                    """))
+                    db.session.commit()
+                    print(f"   [OK] {column_name} 字段已添加")
+
+            print("\n2. ix_backend_conversions_row_key (row_key)")
+            db.session.execute(text("""
+                CREATE INDEX IF NOT EXISTS ix_backend_conversions_row_key
+                ON backend_conversions(row_key)
+            """))
+            db.session.commit()
+            print("   [OK] 索引已创建")
+
+            print("\n3. 补充已有数据的 row_key / content_hash")
+            backfilled = BackendConversionProcessor(db.session).backfill_row_keys()
+            db.session.commit()
+            print(f"   [OK] 已补充 {backfilled} 条")
+        except Exception as e:
+            db.session.rollback()
+            print(f"   [ERROR] 迁移失败: {str(e)}")
+            raise
+
+        print("\n[SUCCESS] 迁移完成")
+
+
+if __name__ == '__main__':
+    upgrade()
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+"""
+数据库迁移脚本：为 daily_metrics_unified 创建维度唯一索引
+日期: 2026-10-17
+
+变更说明：
+1. 聚合改为每个平台一条 INSERT … SELECT … ON CONFLICT DO UPDATE，要求
+   (date, platform, COALESCE(agency, ''), COALESCE(business_model, '')) 上存在唯一索引
+   idx_unique_metrics_v3（v3.0 重建脚本中创建失败或未运行时缺失）
+2. 创建索引前先去重：相同维度只保留 id 最大的一条
+3. 去重后建议运行一次全量聚合（/api/v1/aggregation/update）重新计算指标
+"""
+
+import sys
+import os
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from backend.database import db
+from sqlalchemy import text
+from app import app
+
+
+INDEX_NAME = 'idx_unique_metrics_v3'
+KEYS = "date, platform, COALESCE(agency, ''), COALESCE(business_model, '')"
+
+
+def index_exists():
+    """检查索引是否存在"""
+    result = db.session.execute(
+        text("SELECT name FROM sqlite_master WHERE type='index' AND name=:name"),
+        {'name': INDEX_NAME}
+    ).fetchone()
+    return result is not None
+
+
+def dedupe():
+    """删除重复的维度记录（保留 id 最大的一条）"""
+    result = db.session.execute(text(f"""
+        DELETE FROM daily_metrics_unified
+        WHERE id NOT IN (
+            SELECT MAX(id) FROM daily_metrics_unified
+            GROUP BY {KEYS}
+        )
+    """))
+    return result.rowcount
+
+
+def upgrade():
+    """去重并创建唯一索引"""
+    with app.app_context():
+        print("=" * 60)
+        print("为 daily_metrics_unified 创建维度唯一索引")
+        print("=" * 60)
+
+        if index_exists():
+            print(f"[OK] {INDEX_NAME} 已存在")
+            print("\n[SUCCESS] 迁移完成")
+            return
+
+        try:
+            deleted = dedupe()
+            print(f"[OK] 去重完成，删除 {deleted} 条重复记录")
+
+            db.session.execute(text(f"CREATE UNIQUE INDEX IF NOT EXISTS {INDEX_NAME} ON daily_metrics_unified({KEYS})"))
+            db.session.commit()
+            print(f"[OK] {INDEX_NAME} 已创建")
+            if deleted:
+                print("[INFO] 存在重复记录，建议运行一次全量聚合重新计算指标")
+        except Exception as e:
+            db.session.rollback()
+            print(f"[ERROR] 创建 {INDEX_NAME} 失败: {str(e)}")
+            raise
+
+        print("\n[SUCCESS] 迁移完成")
+
+
+if __name__ == '__main__':
+    upgrade()
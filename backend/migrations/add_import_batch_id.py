@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+"""
+数据库迁移脚本：批量上传批次字段
+日期: 2026-10-17
+
+变更说明：
+1. 新增批量上传接口（POST /api/upload/batch），支持一次上传多个文件或一个 ZIP 包
+2. data_import_log 新增 batch_id 字段：同一批次的文件由导入队列一起领取，
+   并行解析后串行写入，聚合表只更新一次
+3. 新增 batch_id 索引，用于领取批次任务和查询批次状态
+
+运行方式:
+    python backend/migrations/add_import_batch_id.py
+"""
+
+import sys
+import os
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from backend.database import db
+from sqlalchemy import text
+from app import app
+
+
+def column_exists(table_name, column_name):
+    """检查字段是否存在"""
+    columns = db.session.execute(text(f'PRAGMA table_info("{table_name}")')).fetchall()
+    return any(col[1] == column_name for col in columns)
+
+
+def upgrade():
+    """添加批次字段和索引"""
+    with app.app_context():
+        print("=" * 60)
+        print("批量上传批次字段")
+        print("=" * 60)
+
+        try:
+            print("\n1. data_import_log.batch_id")
+            if column_exists('data_import_log', 'batch_id'):
+                print("   [OK] 字段已存在")
+            else:
+                db.session.execute(text("""
+                    ALTER TABLE data_import_log
+                    ADD COLUMN batch_id VARCHAR(100)
+                """))
+                db.session.commit()
+                print("   [OK] batch_id 字段已添加")
+
+            print("\n2. ix_data_import_log_batch_id (batch_id)")
+            db.session.execute(text("""
+                CREATE INDEX IF NOT EXISTS ix_data_import_log_batch_id
+                ON data_import_log(batch_id)
+            """))
+            db.session.commit()
+            print("   [OK] 索引已创建")
+        except Exception as e:
+            db.session.rollback()
+            print(f"   [ERROR] 迁移失败: {str(e)}")
+            raise
+
+        print("\n[SUCCESS] 迁移完成")
+
+
+if __name__ == '__main__':
+    upgrade()
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+"""
+数据库迁移脚本：导入断点续传
+日期: 2026-10-17
+
+变更说明：
+1. data_import_log 新增断点字段，每次批量提交后记录：
+   - checkpoint_offset: 已提交的记录数
+   - checkpoint_hash: 断点对应的文件 SHA-256
+   - checkpoint_at: 断点记录时间
+2. 相同文件重新上传（之前失败/取消）或服务重启后，从断点继续写入
+
+运行方式:
+    python backend/migrations/add_import_checkpoint.py
+"""
+
+import sys
+import os
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from backend.database import db
+from sqlalchemy import text
+from app import app
+
+
+COLUMNS = [
+    ('checkpoint_offset', 'INTEGER DEFAULT 0'),
+    ('checkpoint_hash', 'VARCHAR(64)'),
+    ('checkpoint_at', 'DATETIME'),
+]
+
+
+def column_exists(table_name, column_name):
+    """检查字段是否存在"""
+    columns = db.session.execute(text(f'PRAGMA table_info("{table_name}")')).fetchall()
+    return any(col[1] == column_name for col in columns)
+
+
+def upgrade():
+    """添加断点字段"""
+    with app.app_context():
+        print("=" * 60)
+        print("导入断点续传")
+        print("=" * 60)
+
+        try:
+            for i, (column_name, column_type) in enumerate(COLUMNS, 1):
+                print(f"\n{i}. data_import_log.{column_name}")
+                if column_exists('data_import_log', column_name):
+                    print("   [OK] 字段已存在")
+                    continue
+
+                db.session.execute(text(f"""
+                    ALTER TABLE data_import_log
+                    ADD COLUMN {column_name} {column_type}
+                """))
+                db.session.commit()
+                print(f"   [OK] {column_name} 字段已添加")
+        except Exception as e:
+            db.session.rollback()
+            print(f"   [ERROR] 迁移失败: {str(e)}")
+            raise
+
+        print("\n[SUCCESS] 迁移完成")
+
+
+if __name__ == '__main__':
+    upgrade()
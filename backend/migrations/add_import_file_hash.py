@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+"""
+数据库迁移脚本：上传文件内容哈希
+日期: 2026-10-17
+
+变更说明：
+1. 上传时在写入磁盘的同时计算文件 SHA-256，保存到 data_import_log.file_hash
+2. 相同数据类型的相同文件已导入成功时，/upload 直接返回之前的任务（force=true 强制重新导入）
+3. 新增 (import_type, file_hash, status) 索引，用于查找重复文件
+
+运行方式:
+    python backend/migrations/add_import_file_hash.py
+"""
+
+import sys
+import os
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from backend.database import db
+from sqlalchemy import text
+from app import app
+
+
+def column_exists(table_name, column_name):
+    """检查字段是否存在"""
+    columns = db.session.execute(text(f'PRAGMA table_info("{table_name}")')).fetchall()
+    return any(col[1] == column_name for col in columns)
+
+
+def upgrade():
+    """添加文件哈希字段和索引"""
+    with app.app_context():
+        print("=" * 60)
+        print("上传文件内容哈希")
+        print("=" * 60)
+
+        try:
+            print("\n1. data_import_log.file_hash")
+            if column_exists('data_import_log', 'file_hash'):
+                print("   [OK] 字段已存在")
+            else:
+                db.session.execute(text("""
+                    ALTER TABLE data_import_log
+                    ADD COLUMN file_hash VARCHAR(64)
+                """))
+                db.session.commit()
+                print("   [OK] file_hash 字段已添加")
+
+            print("\n2. idx_import_log_file_hash (import_type, file_hash, status)")
+            db.session.execute(text("""
+                CREATE INDEX IF NOT EXISTS idx_import_log_file_hash
+                ON data_import_log(import_type, file_hash, status)
+            """))
+            db.session.commit()
+            print("   [OK] 索引已创建")
+        except Exception as e:
+            db.session.rollback()
+            print(f"   [ERROR] 迁移失败: {str(e)}")
+            raise
+
+        print("\n[SUCCESS] 迁移完成")
+
+
+if __name__ == '__main__':
+    upgrade()
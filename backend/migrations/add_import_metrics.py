@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""
+数据库迁移脚本：导入性能指标
+日期: 2026-10-17
+
+变更说明：
+1. data_import_log 新增性能指标字段，每次导入记录：
+   - stage_timings: 分阶段耗时（JSON：读取/验证列/清洗/去重/质量评分/验证转换/等待写入/写入/账号映射）
+   - rows_per_second: 每秒处理行数
+   - peak_memory_mb: 导入期间进程内存峰值（MB，RSS 采样）
+   - db_statements: 执行的数据库语句数
+2. 导入历史（/history）返回上述字段，导入变慢时可以事后定位到具体阶段
+
+运行方式:
+    python backend/migrations/add_import_metrics.py
+"""
+
+import sys
+import os
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from backend.database import db
+from sqlalchemy import text
+from app import app
+
+
+COLUMNS = [
+    ('stage_timings', 'TEXT'),
+    ('rows_per_second', 'NUMERIC(12, 2)'),
+    ('peak_memory_mb', 'NUMERIC(10, 2)'),
+    ('db_statements', 'INTEGER'),
+]
+
+
+def column_exists(table_name, column_name):
+    """检查字段是否存在"""
+    columns = db.session.execute(text(f'PRAGMA table_info("{table_name}")')).fetchall()
+    return any(col[1] == column_name for col in columns)
+
+
+def upgrade():
+    """添加性能指标字段"""
+    with app.app_context():
+        print("=" * 60)
+        print("导入性能指标")
+        print("=" * 60)
+
+        try:
+            for i, (column_name, column_type) in enumerate(COLUMNS, 1):
+                print(f"\n{i}. data_import_log.{column_name}")
+                if column_exists('data_import_log', column_name):
+                    print("   [OK] 字段已存在")
+                    continue
+
+                db.session.execute(text(f"""
+                    ALTER TABLE data_import_log
+                    ADD COLUMN {column_name} {column_type}
+                """))
+                db.session.commit()
+                print(f"   [OK] {column_name} 字段已添加")
+        except Exception as e:
+            db.session.rollback()
+            print(f"   [ERROR] 迁移失败: {str(e)}")
+            raise
+
+        print("\n[SUCCESS] 迁移完成")
+
+
+if __name__ == '__main__':
+    upgrade()
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+"""
+数据库迁移脚本：质量评分明细
+日期: 2026-10-17
+
+变更说明：
+1. data_import_log 新增 quality_details 字段（JSON 文本），保存各维度得分、
+   按列完整性和评分行数/抽样行数，导入历史可直接绘图，不需要重新计算
+
+运行方式:
+    python backend/migrations/add_import_quality_details.py
+"""
+
+import sys
+import os
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from backend.database import db
+from sqlalchemy import text
+from app import app
+
+
+def column_exists(table_name, column_name):
+    """检查字段是否存在"""
+    columns = db.session.execute(text(f'PRAGMA table_info("{table_name}")')).fetchall()
+    return any(col[1] == column_name for col in columns)
+
+
+def upgrade():
+    """添加质量评分明细字段"""
+    with app.app_context():
+        print("=" * 60)
+        print("质量评分明细")
+        print("=" * 60)
+
+        try:
+            print("\n1. data_import_log.quality_details")
+            if column_exists('data_import_log', 'quality_details'):
+                print("   [OK] 字段已存在")
+            else:
+                db.session.execute(text("""
+                    ALTER TABLE data_import_log
+                    ADD COLUMN quality_details TEXT
+                """))
+                db.session.commit()
+                print("   [OK] quality_details 字段已添加")
+        except Exception as e:
+            db.session.rollback()
+            print(f"   [ERROR] 迁移失败: {str(e)}")
+            raise
+
+        print("\n[SUCCESS] 迁移完成")
+
+
+if __name__ == '__main__':
+    upgrade()
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+"""
+数据库迁移脚本：导入任务队列字段
+日期: 2026-10-17
+
+变更说明：
+1. 上传接口不再为每个文件启动独立线程，改为写入 data_import_log（status='queued'），
+   由导入队列（backend/services/import_queue.py）按优先级 + 提交顺序处理
+2. data_import_log 新增 priority 字段（越大越先处理）
+3. 新增 (status, priority, id) 索引，用于领取下一个任务和计算排队位置
+
+运行方式:
+    python backend/migrations/add_import_queue_fields.py
+"""
+
+import sys
+import os
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from backend.database import db
+from sqlalchemy import text
+from app import app
+
+
+def column_exists(table_name, column_name):
+    """检查字段是否存在"""
+    columns = db.session.execute(text(f'PRAGMA table_info("{table_name}")')).fetchall()
+    return any(col[1] == column_name for col in columns)
+
+
+def upgrade():
+    """添加队列字段和索引"""
+    with app.app_context():
+        print("=" * 60)
+        print("导入任务队列字段")
+        print("=" * 60)
+
+        try:
+            print("\n1. data_import_log.priority")
+            if column_exists('data_import_log', 'priority'):
+                print("   [OK] 字段已存在")
+            else:
+                db.session.execute(text("""
+                    ALTER TABLE data_import_log
+                    ADD COLUMN priority INTEGER DEFAULT 0
+                """))
+                db.session.commit()
+                print("   [OK] priority 字段已添加")
+
+            print("\n2. idx_import_log_queue (status, priority, id)")
+            db.session.execute(text("""
+                CREATE INDEX IF NOT EXISTS idx_import_log_queue
+                ON data_import_log(status, priority, id)
+            """))
+            db.session.commit()
+            print("   [OK] 索引已创建")
+        except Exception as e:
+            db.session.rollback()
+            print(f"   [ERROR] 迁移失败: {str(e)}")
+            raise
+
+        print("\n[SUCCESS] 迁移完成")
+
+
+if __name__ == '__main__':
+    upgrade()
@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+"""
+数据库迁移脚本：按日期范围替换导入
+日期: 2026-10-17
+
+变更说明：
+1. 平台广告数据（腾讯/抖音/小红书）新增 replace_range 导入模式：
+   删除文件日期范围内该平台的旧数据后整批插入（单个事务）
+2. data_import_log 新增 replace_range 字段，记录任务的导入模式
+
+运行方式:
+    python backend/migrations/add_import_replace_range.py
+"""
+
+import sys
+import os
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from backend.database import db
+from sqlalchemy import text
+from app import app
+
+
+def column_exists(table_name, column_name):
+    """检查字段是否存在"""
+    columns = db.session.execute(text(f'PRAGMA table_info("{table_name}")')).fetchall()
+    return any(col[1] == column_name for col in columns)
+
+
+def upgrade():
+    """添加按日期范围替换字段"""
+    with app.app_context():
+        print("=" * 60)
+        print("按日期范围替换导入")
+        print("=" * 60)
+
+        try:
+            print("\n1. data_import_log.replace_range")
+            if column_exists('data_import_log', 'replace_range'):
+                print("   [OK] 字段已存在")
+            else:
+                db.session.execute(text("""
+                    ALTER TABLE data_import_log
+                    ADD COLUMN replace_range BOOLEAN DEFAULT 0
+                """))
+                db.session.commit()
+                print("   [OK] replace_range 字段已添加")
+        except Exception as e:
+            db.session.rollback()
+            print(f"   [ERROR] 迁移失败: {str(e)}")
+            raise
+
+        print("\n[SUCCESS] 迁移完成")
+
+
+if __name__ == '__main__':
+    upgrade()
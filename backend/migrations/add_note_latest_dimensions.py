@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+"""
+数据库迁移脚本：创建笔记最新维度表 note_latest_dimensions 并回填
+日期: 2026-10-17
+
+变更说明：
+1. 新增 note_latest_dimensions 表（每个笔记一条），记录该笔记最新一条
+   xhs_notes_content_daily 的维度字段（note_url, note_type）
+2. 内容笔记日级数据导入时维护该表，笔记日级聚合读取该表补充维度，
+   不再每次全表扫描 xhs_notes_content_daily
+3. 从 xhs_notes_content_daily 回填现有笔记（可重复执行，每次重建）
+"""
+
+import sys
+import os
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from backend.database import db
+from backend.models import NoteLatestDimensions
+from backend.utils.note_dimensions import rebuild_latest_dimensions
+from app import app
+
+
+def upgrade():
+    """创建表并从内容笔记日级数据回填"""
+    with app.app_context():
+        print("=" * 60)
+        print("创建笔记最新维度表 note_latest_dimensions")
+        print("=" * 60)
+
+        try:
+            NoteLatestDimensions.__table__.create(db.engine, checkfirst=True)
+            print("[OK] note_latest_dimensions 表已就绪")
+
+            count = rebuild_latest_dimensions(db.session)
+            db.session.commit()
+            print(f"[OK] 回填完成，共 {count} 个笔记")
+        except Exception as e:
+            db.session.rollback()
+            print(f"[ERROR] 迁移失败: {str(e)}")
+            raise
+
+        print("\n[SUCCESS] 迁移完成")
+
+
+if __name__ == '__main__':
+    upgrade()
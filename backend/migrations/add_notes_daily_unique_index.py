@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""
+数据库迁移脚本：为 daily_notes_metrics_unified 创建 (date, note_id) 唯一索引
+日期: 2026-10-17
+
+变更说明：
+1. 笔记日级聚合改为批量 INSERT … ON CONFLICT(date, note_id) DO UPDATE，要求
+   (date, note_id) 上存在唯一索引（新建的表由模型的 UniqueConstraint 创建，
+   早期版本创建的表可能缺失）
+2. 创建索引前先去重：相同 (date, note_id) 只保留 id 最大的一条
+3. 去重后建议重新运行笔记聚合（update_daily_notes_metrics.py）重新计算指标
+"""
+
+import sys
+import os
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from backend.database import db
+from sqlalchemy import text
+from app import app
+
+
+TABLE_NAME = 'daily_notes_metrics_unified'
+INDEX_NAME = 'idx_notes_daily_unique'
+
+
+def unique_key_exists():
+    """检查 (date, note_id) 上是否已有唯一索引（包括 UNIQUE 约束自动创建的索引）"""
+    for index in db.session.execute(text(f"PRAGMA index_list({TABLE_NAME})")):
+        if not index.unique:
+            continue
+        columns = [row.name for row in db.session.execute(text(f"PRAGMA index_info('{index.name}')"))]
+        if columns == ['date', 'note_id']:
+            return True
+    return False
+
+
+def dedupe():
+    """删除重复的 (date, note_id) 记录（保留 id 最大的一条）"""
+    result = db.session.execute(text(f"""
+        DELETE FROM {TABLE_NAME}
+        WHERE id NOT IN (
+            SELECT MAX(id) FROM {TABLE_NAME}
+            GROUP BY date, note_id
+        )
+    """))
+    return result.rowcount
+
+
+def upgrade():
+    """去重并创建唯一索引"""
+    with app.app_context():
+        print("=" * 60)
+        print(f"为 {TABLE_NAME} 创建 (date, note_id) 唯一索引")
+        print("=" * 60)
+
+        if unique_key_exists():
+            print("[OK] (date, note_id) 唯一索引已存在")
+            print("\n[SUCCESS] 迁移完成")
+            return
+
+        try:
+            deleted = dedupe()
+            print(f"[OK] 去重完成，删除 {deleted} 条重复记录")
+
+            db.session.execute(text(f"CREATE UNIQUE INDEX IF NOT EXISTS {INDEX_NAME} ON {TABLE_NAME}(date, note_id)"))
+            db.session.commit()
+            print(f"[OK] {INDEX_NAME} 已创建")
+            if deleted:
+                print("[INFO] 存在重复记录，建议重新运行笔记聚合重新计算指标")
+        except Exception as e:
+            db.session.rollback()
+            print(f"[ERROR] 创建 {INDEX_NAME} 失败: {str(e)}")
+            raise
+
+        print("\n[SUCCESS] 迁移完成")
+
+
+if __name__ == '__main__':
+    upgrade()
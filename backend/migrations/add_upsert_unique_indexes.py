@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+"""
+数据库迁移脚本：为原生 UPSERT 补齐唯一索引
+日期: 2026-10-17
+
+变更说明：
+1. 覆盖模式导入改用 INSERT … ON CONFLICT(<唯一字段>) DO UPDATE，
+   要求每张导入表上存在与处理器 get_unique_fields() 对应的唯一索引
+2. 创建索引前先去重：相同唯一键只保留 id 最大（最近导入）的一条
+3. 小红书广告表的 sub_account_id 可为 NULL，使用 COALESCE(sub_account_id, '') 表达式索引
+4. 已存在对应唯一索引（含表定义中的 UNIQUE 约束）的表直接跳过
+"""
+
+import sys
+import os
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from backend.database import db
+from sqlalchemy import text
+from app import app
+
+
+# (表名, 索引名, 普通列, 表达式列)
+UNIQUE_INDEXES = [
+    ('raw_ad_data_tencent', 'idx_tencent_unique', ['date', 'account_id'], []),
+    ('raw_ad_data_douyin', 'idx_douyin_unique', ['date', 'account_id'], []),
+    ('raw_ad_data_xiaohongshu', 'idx_xiaohongshu_upsert',
+     ['date', 'advertiser_account_id'], ["COALESCE(sub_account_id, '')"]),
+    ('xhs_notes_daily', 'idx_xhs_notes_daily_unique', ['date', 'note_id'], []),
+    ('xhs_notes_content_daily', 'idx_xhs_notes_content_daily_unique', ['data_date', 'note_id'], []),
+    ('xhs_note_info', 'idx_xhs_note_info_unique', ['note_id'], []),
+    ('account_agency_mapping', 'unique_platform_account', ['platform', 'account_id'], []),
+]
+
+
+def table_exists(table_name):
+    """检查表是否存在"""
+    result = db.session.execute(
+        text("SELECT name FROM sqlite_master WHERE type='table' AND name=:name"),
+        {'name': table_name}
+    ).fetchone()
+    return result is not None
+
+
+def has_unique_index(table_name, columns, expressions):
+    """检查是否已有对应的唯一索引（普通列按列名匹配，表达式列按数量匹配）"""
+    for index in db.session.execute(text(f'PRAGMA index_list("{table_name}")')).fetchall():
+        index_name, unique, partial = index[1], index[2], index[4]
+        if not unique or partial:
+            continue
+
+        key_columns = [
+            col for col in db.session.execute(text(f'PRAGMA index_xinfo("{index_name}")')).fetchall()
+            if col[5]
+        ]
+        names = sorted(col[2] for col in key_columns if col[2] is not None)
+        if names == sorted(columns) and len(key_columns) - len(names) == len(expressions):
+            return True
+
+    return False
+
+
+def dedupe(table_name, columns, expressions):
+    """删除重复记录（保留 id 最大的一条）"""
+    keys = ', '.join(columns + expressions)
+    # 普通列为 NULL 的记录在唯一索引中互不冲突，不参与去重
+    not_null = ' AND '.join(f'{col} IS NOT NULL' for col in columns)
+
+    result = db.session.execute(text(f"""
+        DELETE FROM {table_name}
+        WHERE {not_null}
+          AND id NOT IN (
+              SELECT MAX(id) FROM {table_name}
+              WHERE {not_null}
+              GROUP BY {keys}
+          )
+    """))
+    return result.rowcount
+
+
+def upgrade():
+    """去重并创建唯一索引"""
+    with app.app_context():
+        print("=" * 60)
+        print("为原生 UPSERT 补齐唯一索引")
+        print("=" * 60)
+
+        for i, (table_name, index_name, columns, expressions) in enumerate(UNIQUE_INDEXES, 1):
+            print(f"\n{i}. {table_name} ({', '.join(columns + expressions)})")
+
+            if not table_exists(table_name):
+                print("   [SKIP] 表不存在")
+                continue
+
+            if has_unique_index(table_name, columns, expressions):
+                print("   [OK] 唯一索引已存在")
+                continue
+
+            try:
+                deleted = dedupe(table_name, columns, expressions)
+                print(f"   [OK] 去重完成，删除 {deleted} 条重复记录")
+
+                db.session.execute(text(f"""
+                    CREATE UNIQUE INDEX IF NOT EXISTS {index_name}
+                    ON {table_name}({', '.join(columns + expressions)})
+                """))
+                db.session.commit()
+                print(f"   [OK] {index_name} 已创建")
+            except Exception as e:
+                db.session.rollback()
+                print(f"   [ERROR] 创建 {index_name} 失败: {str(e)}")
+                raise
+
+        print("\n[SUCCESS] 迁移完成")
+
+
+if __name__ == '__main__':
+    upgrade()
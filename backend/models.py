@@ -72,6 +72,9 @@ class RawAdDataXiaohongshu(db.Model):
         # 对于申万宏源直投：date + advertiser_account_id + NULL
         # 对于代理商投放：date + advertiser_account_id + sub_account_id
         db.UniqueConstraint('date', 'advertiser_account_id', 'sub_account_id', name='idx_xiaohongshu_unique'),
+        # UPSERT 冲突目标：NULL 在唯一约束中互不相等，直投数据需按 COALESCE(sub_account_id, '') 判重
+        db.Index('idx_xiaohongshu_upsert', 'date', 'advertiser_account_id',
+                 db.text("COALESCE(sub_account_id, '')"), unique=True),
     )
 
 
@@ -154,6 +157,11 @@ class XhsNotesDaily(db.Model):
     # 系统字段
     created_at = Column(DateTime, default=datetime.now, comment='创建时间')
 
+    __table_args__ = (
+        # 复合唯一键：日期 + 笔记ID（与处理器的 get_unique_fields 一致，UPSERT 冲突目标）
+        db.UniqueConstraint('date', 'note_id', name='idx_xhs_notes_daily_unique'),
+    )
+
 
 class XhsNoteInfo(db.Model):
     """小红书笔记信息表（基础属性表）
@@ -234,6 +242,27 @@ class XhsNotesContentDaily(db.Model):
     )
 
 
+class NoteLatestDimensions(db.Model):
+    """小红书笔记最新维度表（每个笔记一条）
+
+    作用：
+    - 记录每个笔记最新一条 xhs_notes_content_daily 的维度字段
+    - 笔记日级聚合补充维度时读取这张小表，不再每次全表扫描 xhs_notes_content_daily
+
+    维护方式：
+    - 内容笔记日级数据导入时 UPSERT，只有 data_date 不早于已记录日期时才更新
+    - 迁移脚本 add_note_latest_dimensions.py 从 xhs_notes_content_daily 回填
+    """
+    __tablename__ = 'note_latest_dimensions'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    note_id = Column(String(100), unique=True, nullable=False, comment='笔记ID')
+    data_date = Column(Date, nullable=False, comment='维度来源的数据日期')
+    note_url = Column(Text, comment='笔记链接')
+    note_type = Column(String(50), comment='笔记类型：图文笔记/视频笔记')
+    updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
+
+
 # ============================================
 # 后端转化相关表
 # ============================================
@@ -347,6 +376,10 @@ class BackendConversions(db.Model):
     producer = Column(String(100))  # 生产者
     enterprise_wechat_tags = Column(Text)  # 企微标签
 
+    # 增量导入字段
+    row_key = Column(String(40), index=True)  # 自然键哈希（平台来源 + 资金账号/平台用户ID + 线索日期 + 同键序号）
+    content_hash = Column(String(32))  # 40个业务字段的内容哈希（判断是否需要更新）
+
     # 元数据字段
     created_at = Column(DateTime, default=datetime.now)
 
@@ -460,8 +493,9 @@ class DailyMetricsUnified(db.Model):
     updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now, comment='更新时间')
 
     __table_args__ = (
-        # 复合唯一索引：确保同一维度只有一条记录（支持NULL值）
-        # Index('idx_unique_metrics_v3', 'date', 'platform', 'agency', 'business_model', unique=True),
+        # 复合唯一索引：确保同一维度只有一条记录（支持NULL值），聚合 UPSERT 的冲突目标
+        db.Index('idx_unique_metrics_v3', 'date', 'platform',
+                 db.text("COALESCE(agency, '')"), db.text("COALESCE(business_model, '')"), unique=True),
 
         # 复合索引：优化常见查询
         # Index('idx_date_platform_v3', 'date', 'platform'),
@@ -477,6 +511,10 @@ class DailyMetricsUnified(db.Model):
 class DataImportLog(db.Model):
     """数据导入日志表（PRD v1.1）"""
     __tablename__ = 'data_import_log'
+    __table_args__ = (
+        db.Index('idx_import_log_queue', 'status', 'priority', 'id'),
+        db.Index('idx_import_log_file_hash', 'import_type', 'file_hash', 'status'),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True, comment='主键ID')
     task_id = Column(String(100), unique=True, nullable=False, index=True, comment='任务ID（唯一标识）')
@@ -484,6 +522,7 @@ class DataImportLog(db.Model):
     file_name = Column(String(255), nullable=False, comment='原始文件名')
     file_path = Column(String(500), comment='文件存储路径')
     file_size = Column(Integer, comment='文件大小（字节）')
+    file_hash = Column(String(64), comment='文件内容 SHA-256（识别重复上传）')
 
     # 统计字段
     total_rows = Column(Integer, default=0, comment='总行数')
@@ -493,7 +532,7 @@ class DataImportLog(db.Model):
     failed_rows = Column(Integer, default=0, comment='失败行数')
 
     # 状态字段
-    status = Column(String(20), default='uploaded', index=True, comment='状态: uploaded/processing/completed/failed')
+    status = Column(String(20), default='uploaded', index=True, comment='状态: uploaded/queued/processing/completed/failed/cancelled')
     progress = Column(Integer, default=0, comment='处理进度（0-100）')
     message = Column(Text, comment='提示消息')
     error_code = Column(String(50), comment='错误代码')
@@ -503,9 +542,22 @@ class DataImportLog(db.Model):
     # 性能字段
     processing_time = Column(Integer, comment='处理耗时（秒）')
     quality_score = Column(Numeric(5, 2), comment='数据质量评分（0-100）')
+    quality_details = Column(Text, comment='质量评分明细 (JSON：各维度得分、按列完整性、评分行数/抽样行数)')
+    stage_timings = Column(Text, comment='分阶段耗时 (JSON：{阶段: 秒}，read/columns/clean/dedup/quality/transform/write_wait/write/accounts)')
+    rows_per_second = Column(Numeric(12, 2), comment='每秒处理行数（总行数 / 总耗时）')
+    peak_memory_mb = Column(Numeric(10, 2), comment='导入期间进程内存峰值（MB，RSS 采样）')
+    db_statements = Column(Integer, comment='导入过程执行的数据库语句数（executemany 计为 1 条）')
 
     # 控制字段
     overwrite = Column(Boolean, default=False, comment='是否覆盖模式')
+    replace_range = Column(Boolean, default=False, comment='是否按日期范围替换（删除文件日期范围内的旧数据后整批插入）')
+    priority = Column(Integer, default=0, comment='队列优先级（越大越先处理，相同优先级按提交顺序）')
+    batch_id = Column(String(100), index=True, comment='批量上传批次ID（同一批次的文件一起解析、写入，聚合表只更新一次）')
+
+    # 断点字段（每次批量提交后更新，相同文件重新排队或服务重启后从断点继续）
+    checkpoint_offset = Column(Integer, default=0, comment='已提交的记录数（断点位置）')
+    checkpoint_hash = Column(String(64), comment='断点对应的文件 SHA-256')
+    checkpoint_at = Column(DateTime, comment='断点记录时间')
 
     # 时间字段
     started_at = Column(DateTime, comment='开始处理时间')
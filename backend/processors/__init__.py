@@ -3,7 +3,7 @@
 数据处理器包
 """
 
-from .base_processor import DataProcessor
+from .base_processor import DataProcessor, ImportCancelled
 from .tencent_ads_processor import TencentAdsProcessor
 from .douyin_ads_processor import DouyinAdsProcessor
 from .xiaohongshu_ads_processor import XiaohongshuAdsProcessor
@@ -15,6 +15,7 @@ from .xhs_notes_content_daily_processor import XhsNotesContentDailyProcessor
 
 __all__ = [
     'DataProcessor',
+    'ImportCancelled',
     'TencentAdsProcessor',
     'DouyinAdsProcessor',
     'XiaohongshuAdsProcessor',
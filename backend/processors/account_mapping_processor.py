@@ -27,6 +27,31 @@ class AccountMappingProcessor(DataProcessor):
     # 支持的平台
     PLATFORMS = ['腾讯', '抖音', '小红书']
 
+    # 平台名称规范化映射（key 为小写）
+    PLATFORM_MAP = {
+        '腾讯': '腾讯',
+        '腾讯广告': '腾讯',
+        'tencent': '腾讯',
+        '抖音': '抖音',
+        '抖音广告': '抖音',
+        'douyin': '抖音',
+        '字节': '抖音',
+        '小红书': '小红书',
+        '小红书广告': '小红书',
+        'xiaohongshu': '小红书',
+        'xhs': '小红书'
+    }
+
+    # 业务模式规范化映射（key 为小写）
+    BUSINESS_MODEL_MAP = {
+        '直播': '直播',
+        '信息流': '信息流',
+        '搜索': '搜索',
+        'live': '直播',
+        'feed': '信息流',
+        'search': '搜索'
+    }
+
     def get_required_columns(self) -> List[str]:
         """获取必需列"""
         return [
@@ -38,7 +63,7 @@ class AccountMappingProcessor(DataProcessor):
     def validate_row(self, row: pd.Series) -> Tuple[bool, Optional[str]]:
         """验证单行数据"""
         # 验证平台
-        platform = self._get_column_value(row, ['平台', 'platform'])
+        platform = self.field_value(row, 'platform')
         if not platform:
             return False, "平台为空"
 
@@ -47,7 +72,7 @@ class AccountMappingProcessor(DataProcessor):
             return False, f"不支持的平台: {platform}（支持: {', '.join(self.PLATFORMS)}）"
 
         # 验证账号ID
-        account_id = self._get_column_value(row, ['账号ID', 'account_id'])
+        account_id = self.field_value(row, 'account_id')
         if not account_id:
             return False, "账号ID为空"
 
@@ -57,19 +82,55 @@ class AccountMappingProcessor(DataProcessor):
 
     def process_row(self, row: pd.Series) -> Dict[str, Any]:
         """处理单行数据"""
-        platform = self._get_column_value(row, ['平台', 'platform'])
-        account_id = self._get_column_value(row, ['账号ID', 'account_id'])
+        platform = self.field_value(row, 'platform')
+        account_id = self.field_value(row, 'account_id')
 
         return {
             'platform': self._normalize_platform(platform),
             'account_id': self.safe_str(account_id),
-            'account_name': self.safe_str(self._get_column_value(row, ['账号名称', 'account_name'])),
-            'agency': self.safe_str(self._get_column_value(row, ['代理商', 'agency'])),
+            'account_name': self.safe_str(self.field_value(row, 'account_name')),
+            'agency': self.safe_str(self.field_value(row, 'agency')),
             'business_model': self._normalize_business_model(
-                self._get_column_value(row, ['业务模式', 'business_model'])
+                self.field_value(row, 'business_model')
             )
         }
 
+    def validate_frame(self, df: pd.DataFrame) -> Tuple[pd.Series, pd.Series]:
+        """整表验证（规则与 validate_row 一致）"""
+        messages = self.frame_errors(df)
+
+        # 验证平台
+        platforms = self.field_column(df, 'platform')
+        self.frame_add_error(messages, self.frame_blank(platforms), "平台为空")
+
+        normalized = self._normalize_frame(platforms, self.PLATFORM_MAP)
+        self.frame_add_error(
+            messages,
+            ~normalized.isin(self.PLATFORMS),
+            "不支持的平台: " + platforms.astype(str) + f"（支持: {', '.join(self.PLATFORMS)}）"
+        )
+
+        # 验证账号ID
+        account_ids = self.field_column(df, 'account_id')
+        self.frame_add_error(messages, self.frame_blank(account_ids), "账号ID为空")
+
+        return messages.isna(), messages
+
+    def transform_frame(self, df: pd.DataFrame) -> pd.DataFrame:
+        """整表转换为模型字段（与 process_row 一致）"""
+        business_models = self.field_column(df, 'business_model')
+        return pd.DataFrame({
+            'platform': self._normalize_frame(self.field_column(df, 'platform'), self.PLATFORM_MAP),
+            'account_id': self.frame_str(self.field_column(df, 'account_id')),
+            'account_name': self.frame_str(self.field_column(df, 'account_name')),
+            'agency': self.frame_str(self.field_column(df, 'agency')),
+            # 空值和浮点数（NaN）不参与规范化
+            'business_model': self._normalize_frame(
+                business_models.where(~self.frame_blank(business_models) & ~business_models.map(lambda v: isinstance(v, float))),
+                self.BUSINESS_MODEL_MAP
+            )
+        }, index=df.index)
+
     def get_model_class(self):
         """获取模型类"""
         return AccountAgencyMapping
@@ -83,21 +144,7 @@ class AccountMappingProcessor(DataProcessor):
         if not platform:
             return None
 
-        platform_map = {
-            '腾讯': '腾讯',
-            '腾讯广告': '腾讯',
-            'tencent': '腾讯',
-            '抖音': '抖音',
-            '抖音广告': '抖音',
-            'douyin': '抖音',
-            '字节': '抖音',
-            '小红书': '小红书',
-            '小红书广告': '小红书',
-            'xiaohongshu': '小红书',
-            'xhs': '小红书'
-        }
-
-        return platform_map.get(platform.lower().strip(), platform.strip())
+        return self.PLATFORM_MAP.get(platform.lower().strip(), platform.strip())
 
     def _normalize_business_model(self, business_model: Optional[str]) -> Optional[str]:
         """规范化业务模式"""
@@ -108,34 +155,27 @@ class AccountMappingProcessor(DataProcessor):
         if isinstance(business_model, float):
             return None
 
-        business_model_map = {
-            '直播': '直播',
-            '信息流': '信息流',
-            '搜索': '搜索',
-            'live': '直播',
-            'feed': '信息流',
-            'search': '搜索'
-        }
-
         # 确保是字符串
         if not isinstance(business_model, str):
             business_model = str(business_model)
 
-        normalized = business_model_map.get(business_model.lower().strip())
+        normalized = self.BUSINESS_MODEL_MAP.get(business_model.lower().strip())
         return normalized if normalized else business_model.strip()
 
-    def _get_column_value(self, row: pd.Series, column_names: List[str]) -> Any:
-        """获取列值（支持多个候选列名）"""
-        for col_name in column_names:
-            if col_name in row.index:
-                return row[col_name]
-        return None
+    def _normalize_frame(self, series: pd.Series, mapping: Dict[str, str]) -> pd.Series:
+        """整列规范化：按小写查映射表，未命中保留去空格后的原值，空值为 None"""
+        text = series.astype(str).str.strip()
+        normalized = text.str.lower().map(mapping).fillna(text).astype(object)
+        return normalized.where(~self.frame_blank(series), None)
 
     def import_data(
         self,
         file_path: str,
         overwrite: bool = True,  # 默认开启覆盖模式
-        batch_size: int = 1000
+        batch_size: int = 1000,
+        chunksize: Optional[int] = None,
+        progress_callback=None,
+        replace_range: bool = False
     ) -> Dict[str, Any]:
         """
         导入数据（覆盖模式默认开启）
@@ -144,4 +184,11 @@ class AccountMappingProcessor(DataProcessor):
         - 默认开启覆盖模式（overwrite=True）
         - 存在则更新，不存在则插入
         """
-        return super().import_data(file_path, overwrite=overwrite, batch_size=batch_size)
+        return super().import_data(
+            file_path,
+            overwrite=overwrite,
+            batch_size=batch_size,
+            chunksize=chunksize,
+            progress_callback=progress_callback,
+            replace_range=replace_range
+        )
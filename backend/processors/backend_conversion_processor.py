@@ -4,21 +4,36 @@
 
 功能:
 1. 完整映射Excel的40个字段到backend_conversions表
-2. 支持全量覆盖导入模式 (每次导入前删除所有旧数据)
-3. 支持Excel (.xlsx, .xls) 和 CSV 格式
-4. 自动处理日期格式转换和布尔值转换
+2. 支持全量覆盖导入模式（先写入影子表，建好索引后在一个事务内替换正式表，
+   导入过程中查询始终看到完整的旧数据）
+3. 支持增量导入模式（按自然键和内容哈希比对：只插入新线索、只更新内容变化的线索，
+   按日期范围替换时删除线索日期窗口内文件中没有的线索）
+4. 支持Excel (.xlsx, .xls) 和 CSV 格式
+5. 自动处理日期格式转换和布尔值转换
 """
 
+import os
+import re
+import hashlib
+from collections import defaultdict
+from contextlib import ExitStack
+from decimal import Decimal
 import pandas as pd
-from datetime import datetime
-from backend.processors.base_processor import DataProcessor
+from datetime import date, datetime
+from sqlalchemy import MetaData, bindparam, delete, insert, select, text, update
+from backend.processors import coercion
+from backend.processors.base_processor import DataProcessor, ImportCancelled
 from backend.models import BackendConversions
+from backend.utils.aggregation_scope import touched_ranges
 from typing import Dict, List, Tuple, Any, Optional
 
 
 class BackendConversionProcessor(DataProcessor):
     """后端转化数据处理器（完整版）"""
 
+    # 全量覆盖时的影子表
+    STAGING_TABLE = 'backend_conversions_staging'
+
     # Excel列名到数据库字段的完整映射 (40个字段)
     COLUMN_MAPPING = {
         '微信昵称': 'wechat_nickname',
@@ -70,16 +85,14 @@ class BackendConversionProcessor(DataProcessor):
     def validate_row(self, row: pd.Series) -> Tuple[bool, Optional[str]]:
         """验证单行数据 - 只验证线索日期非空"""
         # 获取线索日期
-        lead_date_value = self._get_column_value(row, ['线索日期', 'lead_date'])
+        lead_date_value = self.field_value(row, 'lead_date')
 
         # 使用pd.isna()检查NaN
         if pd.isna(lead_date_value) or not lead_date_value:
             return False, "线索日期为空"
 
-        # 尝试解析日期
-        try:
-            self.safe_date(lead_date_value)
-        except Exception as e:
+        # 尝试解析日期（safe_date 解析失败时返回 None，不抛异常）
+        if self.safe_date(lead_date_value) is None:
             return False, f"线索日期格式错误: {lead_date_value}"
 
         return True, None
@@ -101,8 +114,8 @@ class BackendConversionProcessor(DataProcessor):
         data = {}
 
         # 遍历所有列映射
-        for excel_col, db_field in self.COLUMN_MAPPING.items():
-            value = self._get_column_value(row, [excel_col])
+        for db_field in self.COLUMN_MAPPING.values():
+            value = self.field_value(row, db_field)
 
             # 跳过NaN值
             if pd.isna(value):
@@ -145,59 +158,363 @@ class BackendConversionProcessor(DataProcessor):
 
         return data
 
+    # 日期字段 (Date类型)
+    DATE_FIELDS = ['lead_date', 'open_account_interrupted_date', 'ad_click_date']
+
+    # 时间戳字段 (DateTime类型)
+    DATETIME_FIELDS = ['first_contact_time', 'last_contact_time', 'account_opening_time',
+                       'wechat_verify_time', 'valid_customer_time']
+
+    # 整数字段
+    INT_FIELDS = ['interaction_count', 'sales_interaction_count']
+
+    # 数值字段 (保留2位小数)
+    NUMERIC_FIELDS = ['assets', 'customer_contribution']
+
+    def validate_frame(self, df: pd.DataFrame) -> Tuple[pd.Series, pd.Series]:
+        """整表验证 - 只验证线索日期非空且可解析"""
+        messages = self.frame_errors(df)
+
+        lead_dates = self.field_column(df, 'lead_date')
+        self.frame_add_error(messages, self.frame_blank(lead_dates), "线索日期为空")
+        self.frame_add_error(
+            messages,
+            self.frame_datetime(lead_dates).isna(),
+            "线索日期格式错误: " + lead_dates.astype(str)
+        )
+
+        return messages.isna(), messages
+
+    def transform_frame(self, df: pd.DataFrame) -> pd.DataFrame:
+        """整表转换 - 字段类型处理与 process_row 一致"""
+        data = {}
+
+        for db_field in self.COLUMN_MAPPING.values():
+            series = self.field_column(df, db_field)
+
+            if db_field in self.DATE_FIELDS:
+                data[db_field] = self.frame_date(series)
+            elif db_field in self.DATETIME_FIELDS:
+                data[db_field] = self.frame_datetime(series)
+            elif db_field.startswith('is_'):
+                data[db_field] = self._frame_bool(series)
+            elif db_field in self.INT_FIELDS:
+                data[db_field] = self.frame_int(series)
+            elif db_field in self.NUMERIC_FIELDS:
+                data[db_field] = self.frame_numeric(series).round(2)
+            else:
+                data[db_field] = self.frame_str(series)
+
+        return pd.DataFrame(data, index=df.index)
+
+    def _frame_bool(self, series: pd.Series) -> pd.Series:
+        """整列转换为布尔值（对应 safe_bool，空值为 False）"""
+        return coercion.to_bool(series).values
+
     def get_model_class(self):
         """获取模型类"""
         return BackendConversions
 
     def get_unique_fields(self) -> List[str]:
-        """获取唯一性字段 - 不使用唯一约束，每次全量覆盖"""
+        """获取唯一性字段 - 不使用唯一约束（全量覆盖或按 row_key 增量比对）"""
         return []
 
+    def get_date_field(self) -> str:
+        """按线索日期窗口替换（增量比对，并删除窗口内文件中没有的线索）"""
+        return 'lead_date'
+
+    # ========== 增量导入：自然键 + 内容哈希 ==========
+
+    # 自然键字段：平台来源 + 客户标识（资金账号，没有时用平台用户ID）+ 线索日期
+    KEY_FIELDS = ('platform_source', 'capital_account', 'platform_user_id', 'lead_date')
+
+    # 每次 IN / DELETE 的 id 数量
+    ID_CHUNK_SIZE = 500
+
+    @staticmethod
+    def _hash_text(value: Any) -> str:
+        """字段值的规范化文本（数据库读出的值与导入记录的值一致）"""
+        if value is None:
+            return ''
+        if isinstance(value, float) and value != value:
+            return ''
+        if isinstance(value, bool):
+            return '1' if value else '0'
+        if isinstance(value, (float, Decimal)):
+            return repr(float(value))
+        if isinstance(value, (datetime, date)):
+            return value.isoformat()
+        return str(value)
+
+    def _content_hash(self, data: Dict[str, Any]) -> str:
+        """40个业务字段的内容哈希"""
+        content = '\x1f'.join(self._hash_text(data.get(field)) for field in self.COLUMN_MAPPING.values())
+        return hashlib.md5(content.encode('utf-8')).hexdigest()
+
+    def _key_base(self, data: Dict[str, Any]) -> str:
+        """自然键（同一文件中可能重复，由 assign_row_keys 加上同键序号）"""
+        customer = data.get('capital_account') or data.get('platform_user_id') or ''
+        return '|'.join((
+            self._hash_text(data.get('platform_source')),
+            self._hash_text(customer),
+            self._hash_text(data.get('lead_date'))
+        ))
+
+    def assign_row_keys(self, rows: List[Dict[str, Any]], counts: Optional[Dict[str, int]] = None) -> None:
+        """
+        为记录计算 row_key 和 content_hash（原地写入字典）
+
+        同一自然键在文件中出现多次时按出现顺序编号（键#0、键#1 ...），
+        导出顺序不变时同一条线索得到相同的 row_key
+
+        Args:
+            rows: 记录字典列表
+            counts: 各自然键已出现的次数（流式导入跨块共用；None 时从 0 开始）
+        """
+        counts = defaultdict(int) if counts is None else counts
+        for data in rows:
+            base = self._key_base(data)
+            ordinal = counts[base]
+            counts[base] += 1
+            data['row_key'] = hashlib.sha1(f"{base}#{ordinal}".encode('utf-8')).hexdigest()
+            data['content_hash'] = self._content_hash(data)
+
+    def backfill_row_keys(self) -> int:
+        """
+        为没有 row_key 的旧数据补充 row_key 和 content_hash（按 id 顺序编号，不提交）
+
+        Returns:
+            补充的行数
+        """
+        table = BackendConversions.__table__
+        fields = list(dict.fromkeys(self.COLUMN_MAPPING.values()))
+        rows = [
+            dict(row._mapping) for row in self.db_session.execute(
+                select(table.c.id, *[table.c[field] for field in fields])
+                .where(table.c.row_key.is_(None))
+                .order_by(table.c.id)
+            )
+        ]
+        if not rows:
+            return 0
+
+        self.assign_row_keys(rows)
+        stmt = update(table).where(table.c.id == bindparam('_id')).values(
+            row_key=bindparam('_row_key'), content_hash=bindparam('_content_hash')
+        )
+        self.db_session.execute(stmt, [
+            {'_id': row['id'], '_row_key': row['row_key'], '_content_hash': row['content_hash']}
+            for row in rows
+        ])
+        return len(rows)
+
+    def _write_incremental(
+        self,
+        records: List[Tuple[Any, Dict[str, Any]]],
+        batch_size: int,
+        delete_missing: bool = False
+    ) -> Dict[str, Any]:
+        """
+        增量写入（单个事务）
+
+        1. 计算每条记录的 row_key / content_hash
+        2. 加载线索日期窗口 [文件最早日期, 最晚日期] 内已有的 (id, row_key, content_hash)
+        3. 新 row_key 批量插入；内容哈希变化的按 id 批量更新；其余不动
+        4. delete_missing 时删除窗口内文件中没有的 row_key
+
+        Returns:
+            {'inserted': 插入, 'updated': 更新, 'unchanged': 未变化, 'deleted': 删除,
+             'changed_dates': 发生变化的线索日期集合, 'window': (最早日期, 最晚日期),
+             'touched': {平台来源: (最早变化日期, 最晚变化日期)}}
+        """
+        from backend.utils.existing_keys import ExistingKeyIndex
+
+        rows = [data for _, data in records]
+        stats = {
+            'inserted': 0, 'updated': 0, 'unchanged': 0, 'deleted': 0,
+            'changed_dates': set(), 'window': None, 'touched': {}
+        }
+
+        def mark_changed(platform_source, lead_date):
+            """记录发生变化的线索日期（按平台来源累加日期范围）"""
+            stats['changed_dates'].add(lead_date)
+            start, end = stats['touched'].get(platform_source, (lead_date, lead_date))
+            stats['touched'][platform_source] = (min(start, lead_date), max(end, lead_date))
+
+        min_date, max_date = ExistingKeyIndex.date_bounds(data.get('lead_date') for data in rows)
+        if min_date is None:
+            return stats
+        stats['window'] = (min_date, max_date)
+
+        self.assign_row_keys(rows)
+        table = BackendConversions.__table__
+        columns = list(dict.fromkeys(self.COLUMN_MAPPING.values())) + ['row_key', 'content_hash']
+
+        with self.write_lane():
+            try:
+                backfilled = self.backfill_row_keys()
+                if backfilled:
+                    print(f"[BackendConversionProcessor] 为 {backfilled} 条旧数据补充 row_key")
+
+                # 窗口内已有的线索（同一 row_key 有多条时只匹配第一条，其余视为文件中没有）
+                existing = {}
+                extra_ids = []
+                for row_id, row_key, content_hash, lead_date, platform_source in self.db_session.execute(
+                    select(table.c.id, table.c.row_key, table.c.content_hash, table.c.lead_date, table.c.platform_source)
+                    .where(table.c.lead_date.between(min_date, max_date))
+                    .order_by(table.c.id)
+                ):
+                    if row_key in existing:
+                        extra_ids.append((row_id, lead_date, platform_source))
+                    else:
+                        existing[row_key] = (row_id, content_hash, lead_date, platform_source)
+
+                inserts, updates = [], []
+                for data in rows:
+                    match = existing.pop(data['row_key'], None)
+                    if match is None:
+                        inserts.append({key: data.get(key) for key in columns})
+                        mark_changed(data.get('platform_source'), data['lead_date'])
+                    elif match[1] != data['content_hash']:
+                        updates.append({'_id': match[0], **{f'_{key}': data.get(key) for key in columns}})
+                        mark_changed(data.get('platform_source'), data['lead_date'])
+                        mark_changed(match[3], match[2])
+                    else:
+                        stats['unchanged'] += 1
+
+                for batch_start in range(0, len(inserts), batch_size):
+                    self.db_session.execute(insert(table), inserts[batch_start:batch_start + batch_size])
+
+                if updates:
+                    stmt = update(table).where(table.c.id == bindparam('_id')).values(
+                        {key: bindparam(f'_{key}') for key in columns}
+                    )
+                    for batch_start in range(0, len(updates), batch_size):
+                        self.db_session.execute(stmt, updates[batch_start:batch_start + batch_size])
+
+                if delete_missing:
+                    missing = [
+                        (row_id, lead_date, platform_source)
+                        for row_id, _, lead_date, platform_source in existing.values()
+                    ] + extra_ids
+                    for chunk_start in range(0, len(missing), self.ID_CHUNK_SIZE):
+                        chunk = missing[chunk_start:chunk_start + self.ID_CHUNK_SIZE]
+                        self.db_session.execute(delete(table).where(table.c.id.in_([row_id for row_id, _, _ in chunk])))
+                    stats['deleted'] = len(missing)
+                    for _, lead_date, platform_source in missing:
+                        mark_changed(platform_source, lead_date)
+
+                self._check_cancelled()
+                self.db_session.commit()
+            except Exception:
+                self.db_session.rollback()
+                raise
+
+        stats['inserted'] = len(inserts)
+        stats['updated'] = len(updates)
+        print(
+            f"[BackendConversionProcessor] 增量导入 {min_date} ~ {max_date}: "
+            f"插入 {stats['inserted']}, 更新 {stats['updated']}, 未变化 {stats['unchanged']}, 删除 {stats['deleted']}"
+        )
+        return stats
+
+    def _incremental_result(self, stats: Dict[str, Any], delete_missing: bool) -> Dict[str, Any]:
+        """增量导入结果中的统计字段"""
+        changed_dates = sorted(stats['changed_dates'])
+        message = (
+            f"增量导入：新增 {stats['inserted']} 条，更新 {stats['updated']} 条，"
+            f"未变化 {stats['unchanged']} 条"
+        )
+        if delete_missing:
+            message += f"，删除 {stats['deleted']} 条"
+
+        return {
+            'message': message,
+            'processed_rows': stats['inserted'] + stats['updated'] + stats['unchanged'],
+            'inserted_rows': stats['inserted'],
+            'updated_rows': stats['updated'],
+            'unchanged_rows': stats['unchanged'],
+            'deleted_rows': stats['deleted'],
+            'date_range': {
+                'start': changed_dates[0].isoformat(),
+                'end': changed_dates[-1].isoformat()
+            } if changed_dates else None,
+            'changed_dates': [d.isoformat() for d in changed_dates],
+            'touched_ranges': touched_ranges(stats['touched']),
+        }
+
     def import_data(
         self,
         file_path: str,
         overwrite: bool = True,  # 默认全量覆盖
-        batch_size: int = 1000
+        batch_size: int = 1000,
+        chunksize: Optional[int] = None,
+        progress_callback=None,
+        replace_range: bool = False
     ) -> Dict[str, Any]:
         """
         导入数据（重写以支持全量覆盖模式）
 
         全量覆盖逻辑:
-        1. 删除 backend_conversions 表中的所有现有数据
-        2. 导入Excel/CSV中的所有数据
-        3. 不进行唯一性检查，直接批量插入
+        1. 创建影子表 backend_conversions_staging（与正式表结构相同，不建二级索引）
+        2. 导入Excel/CSV中的所有数据到影子表（不进行唯一性检查，直接批量插入）
+        3. 一个事务内：删除正式表 → 影子表改名为正式表 → 重建索引（索引只构建一次）
+
+        导入失败或取消时删除影子表，正式表保持不变；非 SQLite 数据库退回到先删除再插入
+
+        增量模式（overwrite=False 或 replace_range=True）：读完整个文件后按 row_key 与
+        线索日期窗口内的已有数据比对（见 _write_incremental），replace_range 时同时删除
+        窗口内文件中没有的线索
+
+        大 CSV（超过 STREAMING_THRESHOLD 或指定 chunksize）按块读取和插入，内存占用与文件大小无关
 
         Args:
             file_path: 文件路径
             overwrite: 是否覆盖模式（默认True，强制全量覆盖）
             batch_size: 批量插入大小
+            chunksize: 流式导入每块行数（None 时按文件大小自动决定）
+            progress_callback: 进度回调函数 progress_callback(进度百分比, 消息)
+            replace_range: 是否按线索日期窗口替换（增量比对 + 删除窗口内文件中没有的线索）
 
         Returns:
             导入结果字典
         """
         start_time = pd.Timestamp.now()
+        staging_table = None
+        incremental = replace_range or not overwrite
+        overwrite = overwrite and not incremental
+
+        # 影子表从创建到替换期间独占写入通道（同一时刻只能有一个全量覆盖导入使用影子表）
+        lane = ExitStack()
 
         try:
-            # 1. 读取文件
-            if file_path.endswith('.csv'):
-                df, encoding = self.read_csv_safe(file_path)
+            # 1. 读取文件（大 CSV 分块读取）
+            file_size = os.path.getsize(file_path)
+            if file_path.endswith('.csv') and self._use_streaming(file_path, chunksize):
+                encoding = self.detect_encoding(file_path)
+                chunks = self.metrics.timed('read', self.iter_csv_chunks(file_path, chunksize or self.CSV_CHUNK_SIZE, encoding))
+            elif file_path.endswith('.csv'):
+                with self.metrics.stage('read'):
+                    df, encoding = self.read_csv_safe(file_path)
+                chunks = [(df, file_size)]
             elif file_path.endswith(('.xlsx', '.xls')):
-                df, encoding = self.read_excel_safe(file_path)
+                with self.metrics.stage('read'):
+                    df, encoding = self.read_excel_safe(file_path)
+                chunks = [(df, file_size)]
             else:
                 return {
                     'success': False,
                     'error': '不支持的文件格式，仅支持 .xlsx, .xls, .csv'
                 }
 
-            total_rows = len(df)
-
-            # 2. 全量覆盖模式：删除所有现有数据
+            # 2. 全量覆盖模式：写入影子表（不支持时退回到删除所有现有数据）
             if overwrite:
                 try:
-                    deleted_count = self.db_session.query(BackendConversions).count()
-                    self.db_session.query(BackendConversions).delete()
-                    self.db_session.commit()
-                    print(f"[BackendConversionProcessor] 全量覆盖模式：已删除 {deleted_count} 条旧数据")
+                    if self._supports_staging():
+                        lane.enter_context(self.write_lane())
+                        staging_table = self._create_staging_table()
+                    else:
+                        self._delete_all()
                 except Exception as e:
                     self.db_session.rollback()
                     return {
@@ -205,57 +522,62 @@ class BackendConversionProcessor(DataProcessor):
                         'error': f'删除旧数据失败: {str(e)}'
                     }
 
-            # 3. 清洗数据
-            df = self.clean_data(df)
-
-            # 4. 计算质量评分
-            quality_score = self.calculate_quality_score(df)
-
-            # 5. 批量处理和插入数据
+            total_rows = 0
             inserted_count = 0
             failed_count = 0
-            batch_data = []
+            chunk_scores = []
+            pending = []
+            key_counts = defaultdict(int)
 
-            ModelClass = self.get_model_class()
+            for df, bytes_read in chunks:
+                total_rows += len(df)
 
-            for idx, row in df.iterrows():
-                try:
-                    # 验证行数据
-                    is_valid, error_msg = self.validate_row(row)
-                    if not is_valid:
-                        failed_count += 1
-                        if error_msg and len(self.errors) < 100:
-                            self.errors.append(f"第 {idx + 2} 行: {error_msg}")
-                        continue
-
-                    # 转换为模型字段
-                    data = self.process_row(row)
-                    batch_data.append(data)
-
-                    # 批量插入
-                    if len(batch_data) >= batch_size:
-                        self.db_session.bulk_insert_mappings(ModelClass, batch_data)
-                        self.db_session.commit()
-                        inserted_count += len(batch_data)
-                        print(f"[BackendConversionProcessor] 已插入 {inserted_count}/{total_rows} 条记录")
-                        batch_data = []
+                # 3. 清洗数据
+                with self.metrics.stage('clean'):
+                    df = self.clean_data(df)
 
-                except Exception as e:
-                    failed_count += 1
-                    if len(self.errors) < 100:
-                        self.errors.append(f"第 {idx + 2} 行: {str(e)}")
-                    continue
+                # 4. 计算质量评分
+                with self.metrics.stage('quality'):
+                    chunk_scores.append((len(df), self.calculate_quality_score(df)))
 
-            # 插入剩余数据
-            if batch_data:
-                self.db_session.bulk_insert_mappings(ModelClass, batch_data)
-                self.db_session.commit()
-                inserted_count += len(batch_data)
+                # 5. 验证 + 转换（整表契约优先，逐行回退）
+                with self.metrics.stage('transform'):
+                    records, chunk_failed = self.prepare_records(df)
+                failed_count += chunk_failed
+
+                # 6. 批量插入（增量模式读完整个文件后统一比对）
+                if incremental:
+                    pending.extend(records)
+                else:
+                    with self.metrics.stage('write'):
+                        inserted_count += self._bulk_insert(records, batch_size, staging_table, key_counts)
+
+                if progress_callback:
+                    progress = 10 + int(85 * min(bytes_read / file_size, 1.0)) if file_size else 95
+                    progress_callback(progress, f"已处理 {total_rows} 行（{inserted_count} 插入, {failed_count} 失败）")
+
+            # 7. 影子表替换正式表
+            if staging_table is not None:
+                if progress_callback:
+                    progress_callback(96, f"正在替换正式表（{inserted_count} 条记录）...")
+                # 替换之后正式表已变化，不再响应取消
+                self._check_cancelled()
+                with self.metrics.stage('write'):
+                    self._swap_staging_table()
+
+            # 8. 增量模式：与线索日期窗口内的已有数据比对
+            incremental_stats = None
+            if incremental:
+                if progress_callback:
+                    progress_callback(96, f"正在比对已有数据（{len(pending)} 条记录）...")
+                with self.metrics.stage('write'):
+                    incremental_stats = self._write_incremental(pending, batch_size, delete_missing=replace_range)
 
             # 计算耗时
             processing_time = (pd.Timestamp.now() - start_time).total_seconds()
+            quality_score = self._merge_quality_scores(chunk_scores)
 
-            return {
+            result = {
                 'success': True,
                 'total_rows': total_rows,
                 'processed_rows': inserted_count,
@@ -263,20 +585,236 @@ class BackendConversionProcessor(DataProcessor):
                 'updated_rows': 0,  # 全量覆盖模式不更新
                 'failed_rows': failed_count,
                 'quality_score': quality_score['overall'],
+                'quality_details': quality_score,
                 'encoding': encoding,
                 'processing_time': processing_time,
                 'overwrite_mode': overwrite,
+                # 全量覆盖替换整张表，涉及范围未知（聚合全量刷新）；增量模式由 _incremental_result 覆盖
+                'touched_ranges': None,
                 'errors': self.errors[:20],  # 最多返回20个错误
                 'warnings': self.warnings[:10]
             }
+            if incremental_stats is not None:
+                result.update(self._incremental_result(incremental_stats, replace_range))
+            return result
 
+        except ImportCancelled:
+            self.db_session.rollback()
+            if staging_table is not None:
+                self._drop_staging_table()
+            raise
         except Exception as e:
             self.db_session.rollback()
+            if staging_table is not None:
+                self._drop_staging_table()
             return {
                 'success': False,
                 'error': str(e),
                 'errors': self.errors
             }
+        finally:
+            lane.close()
+
+    def prepare_batch_write(self, overwrite: bool) -> None:
+        """批量上传的全量覆盖：整个批次写入同一张影子表，避免后一个文件删掉前一个文件的数据"""
+        if not overwrite:
+            return
+        if self._supports_staging():
+            self._create_staging_table()
+        else:
+            self._delete_all()
+
+    def finish_batch_write(self, overwrite: bool, committed: bool) -> None:
+        """批量上传写入结束：有文件写入成功时用影子表替换正式表，否则丢弃影子表"""
+        if not overwrite or not self._staging_exists():
+            return
+        if committed:
+            self._swap_staging_table()
+        else:
+            self._drop_staging_table()
+
+    def write_parsed(
+        self,
+        parsed: Dict[str, Any],
+        overwrite: bool = True,
+        batch_size: int = 1000,
+        replace_range: bool = False
+    ) -> Dict[str, Any]:
+        """写入解析结果（全量覆盖时写入 prepare_batch_write 创建的影子表；增量模式与 import_data 相同）"""
+        start_time = pd.Timestamp.now() - pd.Timedelta(seconds=parsed.get('parse_time', 0))
+        self.errors.extend(parsed.get('errors', []))
+        self.warnings.extend(parsed.get('warnings', []))
+        incremental = replace_range or not overwrite
+        incremental_stats = None
+
+        self.metrics.merge_stages(parsed.get('stages'))
+        try:
+            with self.metrics.stage('write'):
+                if incremental:
+                    incremental_stats = self._write_incremental(parsed['records'], batch_size, delete_missing=replace_range)
+                    inserted_count = incremental_stats['inserted']
+                else:
+                    staging_table = self._get_staging_table() if self._staging_exists() else None
+                    inserted_count = self._bulk_insert(parsed['records'], batch_size, staging_table)
+        except Exception as e:
+            self.db_session.rollback()
+            return {
+                'success': False,
+                'error': f'写入失败: {str(e)}',
+                'errors': self.errors
+            }
+
+        result = {
+            'success': True,
+            'total_rows': parsed['total_rows'],
+            'processed_rows': inserted_count,
+            'inserted_rows': inserted_count,
+            'updated_rows': 0,
+            'failed_rows': parsed['failed_rows'],
+            'quality_score': parsed['quality_score']['overall'],
+            'quality_details': parsed['quality_score'],
+            'encoding': parsed.get('encoding'),
+            'processing_time': (pd.Timestamp.now() - start_time).total_seconds(),
+            'overwrite_mode': not incremental,
+            'touched_ranges': None,
+            'errors': self.errors[:20],
+            'warnings': self.warnings[:10]
+        }
+        if incremental_stats is not None:
+            result.update(self._incremental_result(incremental_stats, replace_range))
+        return result
+
+    def _delete_all(self) -> int:
+        """删除所有现有数据（全量覆盖，非 SQLite 数据库使用）"""
+        with self.write_lane():
+            deleted_count = self.db_session.query(BackendConversions).count()
+            self.db_session.query(BackendConversions).delete()
+            self.db_session.commit()
+        print(f"[BackendConversionProcessor] 全量覆盖模式：已删除 {deleted_count} 条旧数据")
+        return deleted_count
+
+    def _bulk_insert(
+        self,
+        records: List[Tuple[Any, Dict[str, Any]]],
+        batch_size: int,
+        table=None,
+        key_counts: Optional[Dict[str, int]] = None
+    ) -> int:
+        """
+        批量插入记录，返回插入数量
+
+        Args:
+            records: [(行索引, 字段字典)]
+            batch_size: 每批插入数量
+            table: 目标表（影子表）；None 时写入正式表
+            key_counts: 自然键计数（流式导入跨块共用，见 assign_row_keys）
+        """
+        ModelClass = self.get_model_class()
+        inserted_count = 0
+
+        # 全量写入同样记录 row_key / content_hash，之后的增量导入可以直接比对
+        self.assign_row_keys([data for _, data in records], key_counts)
+
+        with self.write_lane():
+            for batch_start in range(0, len(records), batch_size):
+                batch_data = [data for _, data in records[batch_start:batch_start + batch_size]]
+                if table is not None:
+                    self.db_session.execute(insert(table), batch_data)
+                else:
+                    self.db_session.bulk_insert_mappings(ModelClass, batch_data)
+                self._check_cancelled()
+                self.db_session.commit()
+                inserted_count += len(batch_data)
+                if table is None:
+                    self.committed_rows += len(batch_data)
+                print(f"[BackendConversionProcessor] 已插入 {inserted_count}/{len(records)} 条记录")
+
+        return inserted_count
+
+    def _supports_staging(self) -> bool:
+        """影子表替换依赖 SQLite 的事务性 DDL"""
+        return self.db_session.get_bind().dialect.name == 'sqlite'
+
+    def _get_staging_table(self):
+        """影子表的 Core Table 对象（列定义与正式表相同）"""
+        return BackendConversions.__table__.to_metadata(MetaData(), name=self.STAGING_TABLE)
+
+    def _staging_exists(self) -> bool:
+        """影子表是否存在"""
+        return self.db_session.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+            {'name': self.STAGING_TABLE}
+        ).first() is not None
+
+    def _create_staging_table(self):
+        """
+        按正式表的建表语句创建影子表（只建表，不建二级索引）
+
+        Returns:
+            影子表的 Core Table 对象
+        """
+        table_name = BackendConversions.__tablename__
+
+        with self.write_lane():
+            create_sql = self.db_session.execute(
+                text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = :name"),
+                {'name': table_name}
+            ).scalar()
+            staging_sql = re.sub(
+                rf'^CREATE TABLE\s+["`\[]?{table_name}["`\]]?',
+                f'CREATE TABLE {self.STAGING_TABLE}',
+                create_sql,
+                count=1
+            )
+
+            self.db_session.execute(text(f'DROP TABLE IF EXISTS {self.STAGING_TABLE}'))
+            self.db_session.execute(text(staging_sql))
+            self.db_session.commit()
+
+        print(f"[BackendConversionProcessor] 全量覆盖模式：写入影子表 {self.STAGING_TABLE}")
+        return self._get_staging_table()
+
+    def _swap_staging_table(self) -> None:
+        """
+        一个事务内用影子表替换正式表：删除正式表 → 影子表改名 → 按原定义重建索引
+
+        WAL 模式下读请求在提交前看到完整的旧表，提交后看到完整的新表
+        """
+        table_name = BackendConversions.__tablename__
+
+        with self.write_lane():
+            self.db_session.commit()
+            connection = self.db_session.connection()
+            try:
+                # pysqlite 不会为 DDL 自动开启事务，需要显式 BEGIN
+                connection.exec_driver_sql('BEGIN IMMEDIATE')
+                index_sqls = [
+                    row[0] for row in connection.execute(
+                        text("SELECT sql FROM sqlite_master WHERE type = 'index' AND tbl_name = :name AND sql IS NOT NULL"),
+                        {'name': table_name}
+                    )
+                ]
+                connection.exec_driver_sql(f'DROP TABLE {table_name}')
+                connection.exec_driver_sql(f'ALTER TABLE {self.STAGING_TABLE} RENAME TO {table_name}')
+                for index_sql in index_sqls:
+                    connection.exec_driver_sql(index_sql)
+                self.db_session.commit()
+            except Exception:
+                self.db_session.rollback()
+                raise
+
+        print(f"[BackendConversionProcessor] 全量覆盖模式：影子表已替换正式表（重建 {len(index_sqls)} 个索引）")
+
+    def _drop_staging_table(self) -> None:
+        """删除影子表（导入失败或取消时调用，正式表不受影响）"""
+        try:
+            if self._supports_staging():
+                with self.write_lane():
+                    self.db_session.execute(text(f'DROP TABLE IF EXISTS {self.STAGING_TABLE}'))
+                    self.db_session.commit()
+        except Exception as e:
+            self.db_session.rollback()
+            print(f"[BackendConversionProcessor] 删除影子表失败: {str(e)}")
 
     def safe_datetime(self, value) -> Optional[datetime]:
         """
@@ -376,23 +914,7 @@ class BackendConversionProcessor(DataProcessor):
         except (ValueError, TypeError):
             return None
 
-    def _get_column_value(self, row: pd.Series, possible_names: List[str]) -> Any:
-        """
-        获取列值（支持多种可能的列名）
-
-        Args:
-            row: 数据行
-            possible_names: 可能的列名列表
-
-        Returns:
-            列值，找不到返回None
-        """
-        for name in possible_names:
-            if name in row.index:
-                return row[name]
-        return None
-
-    def calculate_quality_score(self, df: pd.DataFrame) -> Dict[str, float]:
+    def calculate_quality_score(self, df: pd.DataFrame) -> Dict[str, Any]:
         """
         计算数据质量评分
 
@@ -401,56 +923,43 @@ class BackendConversionProcessor(DataProcessor):
         2. 唯一性: 不适用（全量覆盖）
         3. 有效性: 日期格式正确率
         4. 一致性: 平台来源标准化程度
+
+        按列整表计算；超过 QUALITY_SAMPLE_ROWS 行时只对抽样行评分
         """
+        rows = len(df)
+        df = self.quality_sample(df)
+        total_rows = len(df)
+        plan = self.get_column_plan(df.columns)
         scores = {}
 
         # 1. 完整性评分 - 线索日期填充率
-        lead_date_col = self._find_column(df, ['线索日期', 'lead_date'])
-        if lead_date_col:
-            non_null_count = df[lead_date_col].notna().sum()
-            completeness_score = (non_null_count / len(df)) * 100
-            scores['completeness'] = completeness_score
+        lead_date_col = plan.source('lead_date')
+        if lead_date_col and total_rows:
+            scores['completeness'] = float(df[lead_date_col].notna().mean() * 100)
         else:
             scores['completeness'] = 0
 
-        # 2. 有效性评分 - 日期格式正确率
-        if lead_date_col:
-            valid_count = 0
-            for value in df[lead_date_col]:
-                if pd.notna(value):
-                    try:
-                        self.safe_date(value)
-                        valid_count += 1
-                    except:
-                        pass
-            validity_score = (valid_count / len(df)) * 100 if len(df) > 0 else 0
-            scores['validity'] = validity_score
+        # 2. 有效性评分 - 日期格式正确率（整列解析，无法解析的日期不计入）
+        if lead_date_col and total_rows:
+            scores['validity'] = float((~coercion.to_datetime(df[lead_date_col]).nulls).mean() * 100)
         else:
             scores['validity'] = 0
 
         # 3. 一致性评分 - 平台来源标准化
-        platform_col = self._find_column(df, ['平台来源', 'platform_source'])
+        platform_col = plan.source('platform_source')
         if platform_col:
-            normalized_count = 0
-            for value in df[platform_col]:
-                if pd.notna(value):
-                    platform = self.safe_str(value)
-                    if platform in ['腾讯', '抖音', '小红书']:
-                        normalized_count += 1
-            total_platform = df[platform_col].notna().sum()
-            consistency_score = (normalized_count / total_platform * 100) if total_platform > 0 else 0
-            scores['consistency'] = consistency_score
+            platforms = df[platform_col][df[platform_col].notna()]
+            normalized_count = int(platforms.astype(str).str.strip().isin(['腾讯', '抖音', '小红书']).sum())
+            scores['consistency'] = (normalized_count / len(platforms) * 100) if len(platforms) > 0 else 0
         else:
             scores['consistency'] = 0
 
         # 总分（平均）
         scores['overall'] = sum(scores.values()) / len(scores) if scores else 0
 
+        scores['rows'] = rows
+        scores['sampled_rows'] = total_rows
+        scores['details'] = {
+            'completeness_by_column': (df.notna().mean() * 100).round(2).to_dict() if total_rows else {}
+        }
         return scores
-
-    def _find_column(self, df: pd.DataFrame, possible_names: List[str]) -> Optional[str]:
-        """查找DataFrame中存在的列名"""
-        for name in possible_names:
-            if name in df.columns:
-                return name
-        return None
@@ -11,12 +11,22 @@
 """
 
 import os
+from contextlib import ExitStack, nullcontext
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 from typing import Dict, List, Tuple, Any, Optional
 from abc import ABC, abstractmethod
 
+from . import coercion
+from .column_plan import ColumnPlan, aliases_from_mapping
+from backend.utils.import_metrics import ImportMetrics
+
+
+class ImportCancelled(Exception):
+    """导入任务被取消（批量提交前由 cancel_callback 抛出，处理器回滚当前批次后向上传递）"""
+    pass
+
 
 class DataProcessor(ABC):
     """数据处理器基类"""
@@ -24,6 +34,57 @@ class DataProcessor(ABC):
     # 支持的编码列表
     ENCODINGS = ['utf-8-sig', 'utf-8', 'gb18030', 'gb2312', 'gbk', 'latin1']
 
+    # 编码检测读取的文件头字节数
+    ENCODING_SAMPLE_SIZE = 1024 * 1024
+
+    # CSV 超过该大小时自动使用流式导入（字节）
+    STREAMING_THRESHOLD = 100 * 1024 * 1024
+
+    # 流式导入每块行数
+    CSV_CHUNK_SIZE = 50000
+
+    # 试导入（dry_run）返回的问题行、未知账号/笔记样例数量
+    DRY_RUN_SAMPLE_SIZE = 20
+
+    # 质量评分抽样：数据超过该行数时只对随机抽取的该数量行评分（0 表示不抽样，
+    # 由 config.QUALITY_SAMPLE_ROWS 设置）
+    QUALITY_SAMPLE_ROWS = 0
+
+    # 质量评分中按行数累加（而非加权平均）的字段
+    QUALITY_COUNT_KEYS = ('rows', 'sampled_rows')
+
+    # 数据库写入锁（由导入队列设置，多个任务并行时保证同一时刻只有一个任务写入 SQLite）
+    write_lock = None
+
+    # 候选列名都不存在时按列位置取值的字段 {字段: 列位置}
+    COLUMN_POSITIONS: Dict[str, int] = {}
+
+    # 当前文件表头的列名解析计划（get_column_plan 按表头缓存）
+    _column_plan: Optional[ColumnPlan] = None
+
+    # 本次导入的账号映射登记表（_auto_create_account_mapping 首次调用时预加载）
+    _account_registry = None
+
+    # 按日期范围替换导入时替换的日期范围 (最早日期, 最晚日期) 和删除的旧数据行数
+    replaced_range: Optional[Tuple[Any, Any]] = None
+    deleted_rows = 0
+
+    # 本次导入写入记录的日期范围 (最早日期, 最晚日期)（聚合表按平台 + 日期范围增量刷新）
+    touched_range: Optional[Tuple[Any, Any]] = None
+
+    # 断点续传：从第 resume_offset 条记录继续写入（之前的记录已提交）；
+    # 每次批量提交后调用 checkpoint_callback(已提交的记录位置)（由导入任务设置）
+    resume_offset = 0
+    checkpoint_callback = None
+    resumed_rows = 0
+
+    # 取消：每次批量提交前调用 cancel_callback()，已请求取消时抛出 ImportCancelled（由导入任务设置）；
+    # committed_rows 为已提交的记录位置（取消时据此判断是否有批次已写入）
+    cancel_callback = None
+    committed_rows = 0
+    _records_position = 0
+    _checkpoint_base = 0
+
     def __init__(self, db_session):
         """
         初始化处理器
@@ -35,6 +96,9 @@ class DataProcessor(ABC):
         self.errors = []
         self.warnings = []
 
+        # 分阶段耗时等性能指标（导入任务用 metrics.track() 包住整个导入调用）
+        self.metrics = ImportMetrics()
+
     @abstractmethod
     def get_required_columns(self) -> List[str]:
         """
@@ -71,6 +135,35 @@ class DataProcessor(ABC):
         """
         pass
 
+    def validate_frame(self, df: pd.DataFrame) -> Optional[Tuple[pd.Series, pd.Series]]:
+        """
+        整表验证（可选，子类实现后导入走向量化路径）
+
+        与 validate_row 的规则和错误信息保持一致，但按列一次性完成
+
+        Args:
+            df: 清洗后的 DataFrame
+
+        Returns:
+            (有效行掩码, 错误信息) - 两者均与 df 同索引，有效行的错误信息为 None；
+            返回 None 表示未实现，导入时回退到逐行验证
+        """
+        return None
+
+    def transform_frame(self, df: pd.DataFrame) -> Optional[pd.DataFrame]:
+        """
+        整表转换为模型字段（可选，与 validate_frame 配套实现）
+
+        与 process_row 的转换结果保持一致
+
+        Args:
+            df: 已通过验证的行
+
+        Returns:
+            列为模型字段、索引与 df 一致的 DataFrame；返回 None 表示未实现
+        """
+        return None
+
     @abstractmethod
     def get_model_class(self):
         """获取 SQLAlchemy 模型类（子类必须实现）"""
@@ -86,6 +179,30 @@ class DataProcessor(ABC):
         """
         pass
 
+    def get_existing_key_fields(self) -> Optional[Tuple[str, str]]:
+        """
+        获取按日期范围预加载的唯一键字段 (日期字段, 键字段)
+
+        非覆盖模式逐条写入时，返回值不为 None 则按本次记录的日期范围一次性加载已有唯一键
+        （ExistingKeyIndex），代替每条记录查询一次数据库。子类可以重写
+
+        Returns:
+            (日期字段, 键字段)，如 ('date', 'note_id')；默认 None
+        """
+        return None
+
+    def get_date_field(self) -> Optional[str]:
+        """
+        获取数据日期字段（用于按日期范围替换导入）
+
+        平台导出的广告数据是某个日期窗口的完整快照，可以按文件日期范围
+        整段替换。子类可以重写
+
+        Returns:
+            日期字段名，如 'date'；默认 None（不支持按日期范围替换）
+        """
+        return None
+
     def get_platform_name(self) -> Optional[str]:
         """
         获取平台名称（用于自动创建账号映射）
@@ -96,50 +213,82 @@ class DataProcessor(ABC):
         """
         return None
 
+    def get_account_registry(self):
+        """
+        获取本次导入的账号映射登记表（首次调用时预加载平台的全部已有账号）
+
+        Returns:
+            AccountMappingRegistry，没有平台名称时返回 None
+        """
+        platform = self.get_platform_name()
+        if not platform:
+            return None
+
+        if self._account_registry is None:
+            from backend.utils.account_registry import AccountMappingRegistry
+            self._account_registry = AccountMappingRegistry.load(self.db_session, platform)
+        return self._account_registry
+
     def _auto_create_account_mapping(self, data: Dict[str, Any]) -> None:
         """
         自动创建账号映射（如果不存在）
 
+        只在预加载的登记表中登记，新账号在 flush_account_mappings 时批量创建
+
         Args:
             data: 处理后的数据字典
         """
-        from backend.models import AccountAgencyMapping
-
-        # 获取平台名称
-        platform = self.get_platform_name()
-        if not platform:
+        registry = self.get_account_registry()
+        if registry is None:
             return
 
         # 获取account_id（不同的数据模型字段名可能不同）
-        account_id = data.get('account_id')
-        if not account_id:
-            return
+        registry.register(account_id=data.get('account_id'))
 
-        # 检查是否已存在映射
-        existing = self.db_session.query(AccountAgencyMapping).filter_by(
-            platform=platform,
-            account_id=str(account_id)
-        ).first()
-
-        if existing:
-            return  # 已存在，无需创建
-
-        # 创建新的账号映射记录（使用默认值）
-        new_mapping = AccountAgencyMapping(
-            platform=platform,
-            account_id=str(account_id),
-            account_name=None,       # 用户需要补充
-            agency='未分配',          # 使用默认值，满足 NOT NULL 约束
-            business_model='信息流'   # 使用默认值
-        )
-        self.db_session.add(new_mapping)
+    def flush_account_mappings(self) -> int:
+        """
+        批量创建登记表中的新账号映射，并按新账号汇总生成提示（不提交事务）
 
-        # 记录警告信息
-        self.warnings.append(
-            f"发现新账号 {platform}:{account_id}，已自动创建账号映射记录。"
-            f"默认设置：代理商='未分配'，业务模式='信息流'。"
-            f"请在账号管理中补充完整信息"
-        )
+        Returns:
+            新建的映射数量
+        """
+        if self._account_registry is None:
+            return 0
+
+        from backend.utils.account_registry import format_new_account_warnings
+
+        created = self._account_registry.flush(self.db_session)
+        self.warnings.extend(format_new_account_warnings(created))
+        return len(created)
+
+    def sync_account_mappings(self, records: List[Tuple[Any, Dict[str, Any]]]) -> int:
+        """
+        为写入的记录补充账号映射（每条记录登记一次，结束时一次批量插入并提交）
+
+        映射创建失败不影响已写入的数据，只记录警告
+
+        Returns:
+            新建的映射数量
+        """
+        import logging
+        logger = logging.getLogger(__name__)
+
+        if not records or not self.get_platform_name():
+            return 0
+
+        try:
+            for _, data in records:
+                self._auto_create_account_mapping(data)
+            created = self.flush_account_mappings()
+            if created:
+                self.db_session.commit()
+            return created
+        except Exception as e:
+            self.db_session.rollback()
+            self._account_registry = None
+            logger.warning(f"自动创建账号映射失败: {e}")
+            self.warnings.append(f"自动创建账号映射失败: {e}")
+            return 0
 
     def read_csv_safe(self, file_path: str) -> Tuple[Optional[pd.DataFrame], Optional[str]]:
         """
@@ -161,10 +310,14 @@ class DataProcessor(ABC):
         file_size = os.path.getsize(file_path)
         logger.info(f"开始读取文件: {file_path}, 大小: {file_size / 1024 / 1024:.2f} MB")
 
+        # 先用文件头样本检测编码，检测结果优先尝试（避免解码失败时整文件重读）
+        detected = self.detect_encoding(file_path)
+        encodings = [detected] + [e for e in self.ENCODINGS if e != detected]
+
         # 尝试不同编码
-        for idx, encoding in enumerate(self.ENCODINGS, 1):
+        for idx, encoding in enumerate(encodings, 1):
             try:
-                logger.info(f"尝试编码 {idx}/{len(self.ENCODINGS)}: {encoding}")
+                logger.info(f"尝试编码 {idx}/{len(encodings)}: {encoding}")
                 df = pd.read_csv(
                     file_path,
                     encoding=encoding,
@@ -187,6 +340,97 @@ class DataProcessor(ABC):
         logger.error(error_msg)
         raise ValueError(error_msg)
 
+    def detect_encoding(self, file_path: str) -> str:
+        """
+        根据文件头字节样本检测编码
+
+        按 ENCODINGS 顺序尝试解码前 ENCODING_SAMPLE_SIZE 字节；
+        样本末尾可能截断多字节字符，因此允许舍去最后 1~3 个字节
+
+        Args:
+            file_path: 文件路径
+
+        Returns:
+            编码名称（都失败时返回 ENCODINGS 最后一项）
+        """
+        with open(file_path, 'rb') as f:
+            sample = f.read(self.ENCODING_SAMPLE_SIZE)
+
+        truncated = len(sample) == self.ENCODING_SAMPLE_SIZE
+        for encoding in self.ENCODINGS:
+            for trim in (range(4) if truncated else [0]):
+                try:
+                    sample[:len(sample) - trim].decode(encoding)
+                    return encoding
+                except (UnicodeDecodeError, UnicodeError):
+                    continue
+
+        return self.ENCODINGS[-1]
+
+    def iter_csv_chunks(self, file_path: str, chunksize: int, encoding: str):
+        """
+        分块读取 CSV
+
+        分块读取时各块独立推断类型，同一列可能一块是整数、另一块是浮点（如 123 与 123.0），
+        因此统一按字符串读取，由 transform_frame / process_row 负责类型转换
+
+        Args:
+            file_path: 文件路径
+            chunksize: 每块行数
+            encoding: 文件编码
+
+        Yields:
+            (DataFrame 块, 已读取字节数)
+        """
+        with open(file_path, 'rb') as f:
+            reader = pd.read_csv(f, encoding=encoding, chunksize=chunksize, dtype=str)
+            for chunk in reader:
+                yield chunk, f.tell()
+
+    def get_read_columns(self) -> Optional[set]:
+        """
+        获取读取 Excel 时需要保留的列名（列裁剪）
+
+        默认为 COLUMN_MAPPING 的中英文列名加必需列；返回 None 表示读取全部列。
+        按列位置取值的处理器需要重写此方法返回 None
+
+        Returns:
+            列名集合
+        """
+        mapping = getattr(self, 'COLUMN_MAPPING', None)
+        if not mapping:
+            return None
+
+        columns = set(mapping.keys()) | set(mapping.values())
+        for col_group in self.get_required_columns():
+            columns.update([col_group] if isinstance(col_group, str) else col_group)
+        return columns
+
+    def get_text_columns(self) -> Dict[str, Any]:
+        """
+        获取按文本读取的列（对应模型中的字符串字段）
+
+        避免账户ID、笔记ID 等列在含空值时被推断为浮点数（如 1001 变成 1001.0）
+
+        Returns:
+            {列名: str}，用作 read_excel 的 dtype 参数
+        """
+        from sqlalchemy import String
+
+        mapping = getattr(self, 'COLUMN_MAPPING', None)
+        if not mapping:
+            return {}
+
+        table = self.get_model_class().__table__
+        text_fields = {col.name for col in table.columns if isinstance(col.type, String)}
+
+        dtype = {}
+        for excel_col, field in mapping.items():
+            if field in text_fields:
+                dtype[excel_col] = str
+                dtype[field] = str
+        return dtype
+
     def read_excel_safe(self, file_path: str) -> Tuple[pd.DataFrame, str]:
         """
         安全读取 Excel 文件（简化版）
@@ -195,6 +439,11 @@ class DataProcessor(ABC):
         - 第一行必须是表头（数据字段名）
         - 不能有多级表头（不能有"基础信息"、"全部流量效果"等分类行）
 
+        读取优化：
+        - 使用快速读取引擎（calamine 或流式 XML 解析），失败时回退到 pd.read_excel
+        - 只读取 get_read_columns() 中的列；裁剪后缺少必需列时重新读取全部列，
+          以便位置映射和错误提示能看到完整表头
+
         Args:
             file_path: 文件路径
 
@@ -209,7 +458,18 @@ class DataProcessor(ABC):
 
         try:
             # 直接读取（第一行必须是表头）
-            df = pd.read_excel(file_path)
+            read_columns = self.get_read_columns()
+            dtype = self.get_text_columns()
+
+            df = None
+            if read_columns is not None:
+                df = self._read_excel_fast(file_path, lambda name: name in read_columns, dtype)
+                if df is not None and self._missing_required_columns(df.columns):
+                    df = None
+            if df is None:
+                df = self._read_excel_fast(file_path, None, dtype)
+            if df is None:
+                df = pd.read_excel(file_path, dtype=dtype)
 
             # 验证：检测是否有多级表头
             first_col = str(df.columns[0]).strip() if len(df.columns) > 0 else ''
@@ -230,6 +490,80 @@ class DataProcessor(ABC):
         except Exception as e:
             raise ValueError(f"读取 Excel 文件失败: {str(e)}")
 
+    def _read_excel_fast(self, file_path: str, usecols, dtype: Dict[str, Any]) -> Optional[pd.DataFrame]:
+        """
+        使用快速读取引擎读取 Excel
+
+        Returns:
+            DataFrame；文件不支持快速读取时返回 None
+        """
+        import logging
+        logger = logging.getLogger(__name__)
+
+        from backend.utils.excel_reader import read_excel_fast
+
+        try:
+            return read_excel_fast(file_path, usecols=usecols, dtype=dtype)
+        except Exception as e:
+            logger.warning(f"快速读取 Excel 失败，使用 pd.read_excel: {str(e)}")
+            return None
+
+    def get_column_aliases(self) -> Dict[str, List[str]]:
+        """
+        获取每个字段的候选列名（按优先级）
+
+        默认由 COLUMN_MAPPING 生成，字段名本身作为最后一个候选
+
+        Returns:
+            {字段: [候选列名, ...]}
+        """
+        return aliases_from_mapping(getattr(self, 'COLUMN_MAPPING', None) or {})
+
+    def get_column_plan(self, columns) -> ColumnPlan:
+        """
+        获取文件表头的列名解析计划（同一表头只解析一次）
+
+        Args:
+            columns: 文件列名
+
+        Returns:
+            ColumnPlan
+        """
+        columns = tuple(columns)
+        plan = self._column_plan
+        if plan is None or plan.columns != columns:
+            plan = self._column_plan = ColumnPlan.compile(
+                columns, self.get_column_aliases(), self.get_required_columns(), self.COLUMN_POSITIONS
+            )
+        return plan
+
+    def field_column(self, df: pd.DataFrame, field: str) -> pd.Series:
+        """整表路径：按列名解析计划取字段对应的列（文件中没有时为全空列）"""
+        return self.get_column_plan(df.columns).column(df, field)
+
+    def field_value(self, row: pd.Series, field: str) -> Any:
+        """
+        逐行路径：按列名解析计划取字段对应的值（文件中没有时为 None）
+
+        计划在进入逐行循环前已按表头解析（_prepare_records_rows），这里不再查找候选列名
+        """
+        plan = self._column_plan
+        if plan is None:
+            plan = self.get_column_plan(row.index)
+        return plan.value(row, field)
+
+    def _missing_required_columns(self, columns) -> List[str]:
+        """
+        检查缺少的必需列
+
+        Args:
+            columns: 文件列名
+
+        Returns:
+            缺少的必需列（每组取第一个名称）
+        """
+        return self.get_column_plan(columns).missing_required
+
     def validate_columns(self, df: pd.DataFrame) -> bool:
         """
         验证必需列是否存在
@@ -240,27 +574,21 @@ class DataProcessor(ABC):
         Returns:
             是否包含所有必需列
         """
-        required_cols = self.get_required_columns()
+        import logging
+        logger = logging.getLogger(__name__)
+
         df_cols = df.columns.tolist()
+        plan = self.get_column_plan(df_cols)
 
         # 检查必需列（支持中英文列名）
-        missing_cols = []
-        for col_group in required_cols:
-            # col_group 可能是字符串或列表
-            if isinstance(col_group, str):
-                col_options = [col_group]
-            else:
-                col_options = col_group
-
-            # 检查是否至少有一个列名存在
-            if not any(col in df_cols for col in col_options):
-                missing_cols.append(col_options[0])
-
-        if missing_cols:
-            self.errors.append(f"缺少必需列: {', '.join(missing_cols)}")
+        if plan.missing_required:
+            self.errors.append(f"缺少必需列: {', '.join(plan.missing_required)}")
             self.errors.append(f"文件列名: {', '.join(df_cols)}")
             return False
 
+        if plan.missing_optional:
+            logger.info(f"文件中没有以下可选字段，按空值导入: {', '.join(plan.missing_optional)}")
+
         return True
 
     def calculate_quality_score(self, df: pd.DataFrame) -> Dict[str, Any]:
@@ -273,21 +601,21 @@ class DataProcessor(ABC):
         3. 一致性（Consistency）: 逻辑一致性
         4. 时效性（Timeliness）: 数据新鲜度
 
+        按列整表计算；超过 QUALITY_SAMPLE_ROWS 行时只对抽样行评分
+
         Args:
             df: DataFrame
 
         Returns:
-            质量评分字典
+            质量评分字典（details.completeness_by_column 为按列完整性）
         """
+        rows = len(df)
+        df = self.quality_sample(df)
         total_rows = len(df)
 
         # 1. 完整性评分（非空值占比）
-        completeness_scores = {}
-        for col in df.columns:
-            non_null_count = df[col].notna().sum()
-            completeness_scores[col] = (non_null_count / total_rows) * 100
-
-        completeness = np.mean(list(completeness_scores.values()))
+        completeness_by_column = (df.notna().mean() * 100).round(2) if total_rows else pd.Series(0.0, index=df.columns)
+        completeness = float(completeness_by_column.mean()) if len(completeness_by_column) else 0.0
 
         # 2. 准确性评分（基于验证结果）
         # 这里简化处理，实际应基于 validate_row 的结果
@@ -295,14 +623,12 @@ class DataProcessor(ABC):
 
         # 3. 一致性评分（检查数值合理性）
         consistency = 100.0
-        # 示例：花费不能为负数
-        if 'cost' in df.columns or '花费' in df.columns:
-            cost_col = 'cost' if 'cost' in df.columns else '花费'
-            if cost_col in df.columns:
-                # 先转换为数值，然后再比较
-                cost_series = pd.to_numeric(df[cost_col], errors='coerce').fillna(0)
-                invalid_cost = (cost_series < 0).sum()
-                consistency = max(0, 100 - (invalid_cost / total_rows * 100))
+        # 示例：花费不能为负数（花费列按列名解析计划查找，整列转换为数值）
+        cost_col = self.get_column_plan(df.columns).source('cost')
+        if cost_col and total_rows:
+            cost_values = coercion.to_number(df[cost_col]).values
+            invalid_cost = int((cost_values < 0).sum())
+            consistency = max(0, 100 - (invalid_cost / total_rows * 100))
 
         # 4. 时效性评分（基于数据日期范围）
         timeliness = 100.0
@@ -322,11 +648,31 @@ class DataProcessor(ABC):
             'accuracy': round(accuracy, 2),
             'consistency': round(consistency, 2),
             'timeliness': round(timeliness, 2),
+            'rows': rows,
+            'sampled_rows': total_rows,
             'details': {
-                'completeness_by_column': completeness_scores
+                'completeness_by_column': completeness_by_column.to_dict()
             }
         }
 
+    def quality_sample(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        质量评分抽样：超过 QUALITY_SAMPLE_ROWS 行时不放回随机抽取该数量的行
+
+        整表已在内存中，等价于对文件行做一遍水塘抽样；流式导入时每块单独抽样，
+        合并时按块行数加权（_merge_quality_scores）
+
+        Args:
+            df: DataFrame
+
+        Returns:
+            抽样后的 DataFrame（不需要抽样时返回原 DataFrame）
+        """
+        limit = self.QUALITY_SAMPLE_ROWS
+        if not limit or len(df) <= limit:
+            return df
+        return df.sample(n=limit, random_state=0)
+
     def clean_data(self, df: pd.DataFrame) -> pd.DataFrame:
         """
         数据清洗
@@ -349,6 +695,18 @@ class DataProcessor(ABC):
 
         return df
 
+    def write_lane(self):
+        """
+        数据库写入通道
+
+        读取、清洗、验证转换可以多个任务并行；写入阶段在 write_lock 内串行执行，
+        避免多个导入同时写 SQLite 出现 database is locked
+
+        Returns:
+            上下文管理器
+        """
+        return self.write_lock if self.write_lock is not None else nullcontext()
+
     def after_insert_record(self, data: Dict[str, Any], record: Any) -> None:
         """
         插入记录后的钩子方法（子类可覆盖）
@@ -364,19 +722,116 @@ class DataProcessor(ABC):
         """
         pass
 
+    def prepare_records(self, df: pd.DataFrame) -> Tuple[List[Tuple[Any, Dict[str, Any]]], int]:
+        """
+        验证并转换数据为模型字段字典
+
+        优先使用整表契约（validate_frame / transform_frame），
+        子类未实现或整表处理异常时回退到逐行处理（validate_row / process_row）
+
+        Args:
+            df: 清洗、去重后的 DataFrame
+
+        Returns:
+            ([(行索引, 字段字典), ...], 失败行数)
+        """
+        import logging
+        logger = logging.getLogger(__name__)
+
+        try:
+            validation = self.validate_frame(df)
+            if validation is not None:
+                return self._prepare_records_frame(df, validation)
+        except Exception as e:
+            logger.warning(f"整表处理失败，回退逐行处理: {e}")
+
+        return self._prepare_records_rows(df)
+
+    def _prepare_records_frame(
+        self,
+        df: pd.DataFrame,
+        validation: Tuple[pd.Series, pd.Series]
+    ) -> Tuple[List[Tuple[Any, Dict[str, Any]]], int]:
+        """整表路径：一次验证、一次转换"""
+        valid_mask, messages = validation
+        valid_mask = valid_mask.reindex(df.index, fill_value=False).astype(bool)
+
+        frame = self.transform_frame(df[valid_mask])
+        if frame is None:
+            raise NotImplementedError(f"{type(self).__name__} 实现了 validate_frame 但未实现 transform_frame")
+
+        # 转换成功后再记录错误，避免回退逐行处理时重复记录
+        invalid_messages = messages.reindex(df.index)[~valid_mask]
+        for idx, error_msg in invalid_messages.items():
+            if error_msg:
+                self.errors.append(f"第 {idx + 2} 行: {error_msg}")
+
+        records = list(zip(frame.index, self.frame_to_records(frame)))
+        return records, int((~valid_mask).sum())
+
+    def _prepare_records_rows(
+        self,
+        df: pd.DataFrame,
+        messages: Optional[pd.Series] = None
+    ) -> Tuple[List[Tuple[Any, Dict[str, Any]]], int]:
+        """逐行路径（回退）；传入 messages 时按行索引记录失败原因（试导入用）"""
+        import logging
+        logger = logging.getLogger(__name__)
+
+        # 表头只解析一次，行内通过 field_value 取值
+        self.get_column_plan(df.columns)
+
+        records = []
+        failed_count = 0
+        for idx, row in df.iterrows():
+            try:
+                # 验证行数据
+                is_valid, error_msg = self.validate_row(row)
+                if not is_valid:
+                    failed_count += 1
+                    if error_msg:
+                        self.errors.append(f"第 {idx + 2} 行: {error_msg}")
+                    if messages is not None:
+                        messages[idx] = error_msg
+                    continue
+
+                # 转换为模型字段
+                records.append((idx, self.process_row(row)))
+            except Exception as e:
+                failed_count += 1
+                error_msg = f"第 {idx + 2} 行处理失败: {str(e)}"
+                self.errors.append(error_msg)
+                logger.error(error_msg)
+                if messages is not None:
+                    messages[idx] = f"处理失败: {str(e)}"
+
+        return records, failed_count
+
     def import_data(
         self,
         file_path: str,
         overwrite: bool = False,
-        batch_size: int = 1000
+        batch_size: int = 1000,
+        chunksize: Optional[int] = None,
+        progress_callback=None,
+        replace_range: bool = False
     ) -> Dict[str, Any]:
         """
         导入数据到数据库
 
+        CSV 文件超过 STREAMING_THRESHOLD 或指定 chunksize 时使用流式导入：
+        按块读取，每块依次清洗 → 去重 → 写入，内存占用与文件大小无关
+
+        按日期范围替换（replace_range）需要先知道整个文件的日期范围，
+        并在一个事务内完成删除和插入，因此不使用流式导入
+
         Args:
             file_path: 文件路径
             overwrite: 是否覆盖模式（遇到重复时更新而非跳过）
             batch_size: 批量插入大小
+            chunksize: 流式导入每块行数（None 时按文件大小自动决定）
+            progress_callback: 进度回调函数 progress_callback(进度百分比, 消息)
+            replace_range: 是否按日期范围替换（删除文件日期范围内的旧数据后整批插入）
 
         Returns:
             导入结果字典
@@ -386,20 +841,34 @@ class DataProcessor(ABC):
 
         start_time = datetime.now()
         logger.info(f"{'='*60}")
-        logger.info(f"开始数据导入: file_path={file_path}, overwrite={overwrite}, batch_size={batch_size}")
+        logger.info(f"开始数据导入: file_path={file_path}, overwrite={overwrite}, replace_range={replace_range}, batch_size={batch_size}")
+
+        if replace_range and not self.get_date_field():
+            return {
+                'success': False,
+                'error': '该数据类型不支持按日期范围替换导入'
+            }
 
         try:
+            # 流式导入（大 CSV 分块处理）
+            if not replace_range and file_path.endswith('.csv') and self._use_streaming(file_path, chunksize):
+                return self._import_csv_streaming(
+                    file_path, overwrite, batch_size,
+                    chunksize or self.CSV_CHUNK_SIZE, progress_callback, start_time
+                )
+
             # 1. 读取文件
             logger.info("步骤 1/6: 读取文件...")
-            if file_path.endswith('.csv'):
-                df, encoding = self.read_csv_safe(file_path)
-            elif file_path.endswith(('.xlsx', '.xls')):
-                df, encoding = self.read_excel_safe(file_path)
-            else:
+            if not file_path.endswith(('.csv', '.xlsx', '.xls')):
                 return {
                     'success': False,
                     'error': '不支持的文件格式，仅支持 .csv, .xlsx, .xls 格式'
                 }
+            with self.metrics.stage('read'):
+                if file_path.endswith('.csv'):
+                    df, encoding = self.read_csv_safe(file_path)
+                else:
+                    df, encoding = self.read_excel_safe(file_path)
 
             # 检查DataFrame是否为空
             if df is None or df.empty:
@@ -413,7 +882,9 @@ class DataProcessor(ABC):
 
             # 2. 验证列
             logger.info("步骤 2/6: 验证列...")
-            if not self.validate_columns(df):
+            with self.metrics.stage('columns'):
+                columns_valid = self.validate_columns(df)
+            if not columns_valid:
                 logger.error(f"✗ 列验证失败: {self.errors}")
                 return {
                     'success': False,
@@ -421,231 +892,29 @@ class DataProcessor(ABC):
                 }
             logger.info("✓ 列验证通过")
 
-            # 3. 清洗数据
-            logger.info("步骤 3/6: 清洗数据...")
-            df = self.clean_data(df)
-            logger.info("✓ 数据清洗完成")
-
-            # 3.5. 去除重复记录（基于唯一性字段）
-            logger.info("步骤 4/6: 去重处理...")
-            unique_fields = self.get_unique_fields()
-            if unique_fields:
-                # 获取DataFrame中对应的列名（可能有中英文映射）
-                df_columns = df.columns.tolist()
-                dedup_cols = []
-
-                for field in unique_fields:
-                    # 查找对应的DataFrame列名
-                    for col in df_columns:
-                        # 如果列名直接匹配
-                        if col == field:
-                            dedup_cols.append(col)
-                            break
-                        # 如果列名在COLUMN_MAPPING中对应
-                        if hasattr(self, 'COLUMN_MAPPING') and col in self.COLUMN_MAPPING:
-                            if self.COLUMN_MAPPING[col] == field:
-                                dedup_cols.append(col)
-                                break
-
-                if dedup_cols and len(dedup_cols) == len(unique_fields):
-                    before_dedup = len(df)
-                    df = df.drop_duplicates(subset=dedup_cols, keep='last')
-                    after_dedup = len(df)
-                    if before_dedup > after_dedup:
-                        dedup_count = before_dedup - after_dedup
-                        self.warnings.append(f"去除重复记录: {dedup_count} 条")
-                        logger.info(f"✓ 去除 {dedup_count} 条重复记录")
-                    else:
-                        logger.info("✓ 无重复记录")
-                else:
-                    logger.info("✓ 跳过去重（无法找到唯一性字段）")
-            else:
-                logger.info("✓ 跳过去重（无唯一性字段）")
-
-            # 4. 计算质量评分
-            logger.info("步骤 5/6: 计算质量评分...")
-            quality_score = self.calculate_quality_score(df)
-            logger.info(f"✓ 质量评分: {quality_score['overall']:.2f} 分")
-
-            # 5. 处理数据
-            logger.info(f"步骤 6/6: 导入数据库（共 {len(df)} 行，batch_size={batch_size}）...")
-            inserted_count = 0
-            updated_count = 0
-            failed_count = 0
-
-            ModelClass = self.get_model_class()
-            unique_fields = self.get_unique_fields()
-
-            # 优化：预先查询所有可能存在的记录（批量模式优化）
-            # 收集所有唯一性字段的值
-            if unique_fields and overwrite and len(df) > 100:
-                logger.info("  预加载现有记录以优化性能...")
-                from sqlalchemy import or_
-
-                # 构建批量查询条件
-                unique_values = set()
-                for _, row in df.iterrows():
-                    try:
-                        data = self.process_row(row)
-                        # 提取唯一性字段的值
-                        unique_tuple = tuple(data.get(k) for k in unique_fields)
-                        if all(v is not None for v in unique_tuple):
-                            unique_values.add(unique_tuple)
-                    except:
-                        pass
-
-                # 批量查询现有记录
-                existing_dict = None
-                if unique_values and len(unique_fields) == 2:
-                    # 针对 (data_date/date, note_id) 的优化查询
-                    # 兼容不同的日期字段名：data_date (content_daily) 或 date (daily)
-                    # 注意：只有当模型有 note_id 字段时才执行此优化
-                    data_dates = set(v[0] for v in unique_values)
-                    note_ids = set(v[1] for v in unique_values)
-
-                    # 检查模型使用的是哪个日期字段
-                    date_field = None
-                    if hasattr(ModelClass, 'data_date'):
-                        date_field = ModelClass.data_date
-                    elif hasattr(ModelClass, 'date'):
-                        date_field = ModelClass.date
-
-                    # 如果找到了日期字段且有 note_id 字段，进行优化查询
-                    # （只有小红书笔记数据有 note_id 字段，抖音/腾讯广告数据没有）
-                    if date_field is not None and hasattr(ModelClass, 'note_id'):
-                        existing_records = self.db_session.query(ModelClass).filter(
-                            date_field.in_(data_dates),
-                            ModelClass.note_id.in_(note_ids)
-                        ).all()
-
-                        # 构建查找字典
-                        existing_dict = {}
-                        for record in existing_records:
-                            key = (getattr(record, unique_fields[0]), getattr(record, unique_fields[1]))
-                            existing_dict[key] = record
-
-                        logger.info(f"  预加载 {len(existing_dict)} 条现有记录")
-            else:
-                existing_dict = None
-
-            # 批量处理
-            batch_count = 0
-            total_batches = (len(df) + batch_size - 1) // batch_size
-
-            for idx, row in df.iterrows():
-                try:
-                    # 验证行数据
-                    is_valid, error_msg = self.validate_row(row)
-                    if not is_valid:
-                        failed_count += 1
-                        if error_msg:
-                            self.errors.append(f"第 {idx + 2} 行: {error_msg}")
-                        continue
-
-                    # 转换为模型字段
-                    data = self.process_row(row)
-
-                    # 检查是否存在（优先使用预加载的记录）
-                    if existing_dict is not None and len(unique_fields) == 2:
-                        # 使用预加载的字典查找
-                        key = (data.get(unique_fields[0]), data.get(unique_fields[1]))
-                        existing = existing_dict.get(key)
-                    else:
-                        # 常规查询
-                        filters = {k: data.get(k) for k in unique_fields if k in data}
-                        with self.db_session.no_autoflush:
-                            existing = self.db_session.query(ModelClass).filter_by(**filters).first()
-
-                    if existing:
-                        if overwrite:
-                            # 更新现有记录（不立即 flush，避免事务问题）
-                            for key, value in data.items():
-                                if key != 'id':  # 不更新主键
-                                    setattr(existing, key, value)
-                            updated_count += 1
-                        else:
-                            # 跳过重复记录
-                            failed_count += 1
-                            self.warnings.append(f"第 {idx + 2} 行: 重复记录")
-                    else:
-                        # 新增记录
-                        new_record = ModelClass(**data)
-                        self.db_session.add(new_record)
-                        # 调用插入后钩子（子类可覆盖）
-                        self.after_insert_record(data, new_record)
-                        inserted_count += 1
-
-                    # 批量提交
-                    batch_count += 1
-                    if batch_count % batch_size == 0:
-                        try:
-                            self.db_session.commit()
-                            current_batch = batch_count // batch_size
-                            logger.info(f"  进度: {current_batch}/{total_batches} 批次 ({inserted_count} 插入, {updated_count} 更新, {failed_count} 失败)")
-                        except Exception as commit_error:
-                            # 批量提交失败，回滚并继续
-                            self.db_session.rollback()
-                            logger.error(f"  批量提交失败: {commit_error}")
-                            # 将本批次的所有记录标记为失败
-                            failed_count += batch_size
-                            self.errors.append(f"批次 {current_batch} 提交失败: {commit_error}")
-
-                except Exception as e:
-                    failed_count += 1
-                    error_msg = f"第 {idx + 2} 行处理失败: {str(e)}"
-                    self.errors.append(error_msg)
-                    logger.error(error_msg)
-
-            # 提交剩余数据
-            try:
-                if batch_count % batch_size != 0:
-                    self.db_session.commit()
-                    logger.info(f"  ✓ 最后批次完成 (总计: {inserted_count} 插入, {updated_count} 更新, {failed_count} 失败)")
-            except Exception as final_error:
-                self.db_session.rollback()
-                logger.error(f"  ✗ 最终提交失败: {final_error}")
-                self.errors.append(f"最终提交失败: {final_error}")
+            # 3-6. 清洗、去重、质量评分、写入
+            inserted_count, updated_count, failed_count, quality_score = self._import_frame(
+                df, overwrite, batch_size, replace_range
+            )
 
-            # 计算耗时
-            processing_time = (datetime.now() - start_time).total_seconds()
+            if progress_callback:
+                progress_callback(95, f"写入完成（{inserted_count} 插入, {updated_count} 更新, {failed_count} 失败）")
 
-            # 构建成功消息
-            success_msg = f"成功导入 {inserted_count} 条数据"
-            if updated_count > 0:
-                success_msg += f"，更新 {updated_count} 条数据"
-            if failed_count > 0:
-                success_msg += f"，{failed_count} 条数据失败"
+            return self._build_import_result(
+                total_rows, inserted_count, updated_count, failed_count,
+                quality_score, encoding, start_time
+            )
 
-            logger.info(f"{'='*60}")
-            logger.info(f"✓ 导入完成！耗时: {processing_time:.2f} 秒")
-            logger.info(f"  总行数: {total_rows}")
-            logger.info(f"  插入: {inserted_count}")
-            logger.info(f"  更新: {updated_count}")
-            logger.info(f"  失败: {failed_count}")
-            logger.info(f"  质量评分: {quality_score['overall']:.2f}")
-
-            return {
-                'success': True,
-                'message': success_msg,
-                'total_rows': total_rows,
-                'processed_rows': inserted_count + updated_count,
-                'inserted_rows': inserted_count,
-                'updated_rows': updated_count,
-                'failed_rows': failed_count,
-                'quality_score': quality_score['overall'],
-                'encoding': encoding,
-                'processing_time': processing_time,
-                'errors': self.errors[:10],  # 只返回前10个错误
-                'warnings': self.warnings[:10]
-            }
-
-        except ValueError as e:
-            self.db_session.rollback()
-            error_msg = str(e)
-            logger.error(f"✗ ValueError: {error_msg}")
-            # 提供更友好的错误信息
-            if '无法读取文件' in error_msg or '读取 Excel 文件失败' in error_msg:
-                error_msg = f'文件格式错误或文件已损坏。请确保文件是有效的 {file_path.split(".")[-1].upper()} 文件。'
+        except ImportCancelled:
+            self.db_session.rollback()
+            raise
+        except ValueError as e:
+            self.db_session.rollback()
+            error_msg = str(e)
+            logger.error(f"✗ ValueError: {error_msg}")
+            # 提供更友好的错误信息
+            if '无法读取文件' in error_msg or '读取 Excel 文件失败' in error_msg:
+                error_msg = f'文件格式错误或文件已损坏。请确保文件是有效的 {file_path.split(".")[-1].upper()} 文件。'
 
             return {
                 'success': False,
@@ -680,6 +949,1091 @@ class DataProcessor(ABC):
                 'errors': self.errors
             }
 
+    def parse_file(self, file_path: str) -> Dict[str, Any]:
+        """
+        解析文件：读取 → 验证列 → 清洗 → 去重 → 质量评分 → 验证转换（不访问数据库）
+
+        批量上传时在子进程中并行执行，结果由 write_parsed() 在写入阶段串行写入
+
+        Args:
+            file_path: 文件路径
+
+        Returns:
+            解析结果字典（records 为 [(行索引, 字段字典)]）
+        """
+        start_time = datetime.now()
+
+        try:
+            if not file_path.endswith(('.csv', '.xlsx', '.xls')):
+                return {
+                    'success': False,
+                    'error': '不支持的文件格式，仅支持 .csv, .xlsx, .xls 格式'
+                }
+            with self.metrics.stage('read'):
+                if file_path.endswith('.csv'):
+                    df, encoding = self.read_csv_safe(file_path)
+                else:
+                    df, encoding = self.read_excel_safe(file_path)
+
+            if df is None or df.empty:
+                return {
+                    'success': False,
+                    'error': '文件为空或无法读取，请检查文件内容'
+                }
+
+            with self.metrics.stage('columns'):
+                columns_valid = self.validate_columns(df)
+            if not columns_valid:
+                return {
+                    'success': False,
+                    'error': f"列验证失败: {self.errors}"
+                }
+
+            records, failed_count, quality_score = self._prepare_frame(df)
+
+            return {
+                'success': True,
+                'records': records,
+                'total_rows': len(df),
+                'failed_rows': failed_count,
+                'quality_score': quality_score,
+                'encoding': encoding,
+                'parse_time': (datetime.now() - start_time).total_seconds(),
+                'stages': self.metrics.stages,
+                'errors': self.errors,
+                'warnings': self.warnings
+            }
+
+        except Exception as e:
+            return {
+                'success': False,
+                'error': f"解析失败: {str(e)}",
+                'errors': self.errors
+            }
+
+    def dry_run(self, file_path: str) -> Dict[str, Any]:
+        """
+        试导入：只检查不写入
+
+        读取 → 验证列 → 清洗 → 去重 → 整表验证转换，并用预加载的已有账号/笔记集合
+        找出数据库中没有的账号和笔记。不写入任何数据（也不自动创建账号映射）
+
+        Args:
+            file_path: 文件路径
+
+        Returns:
+            检查结果字典：
+            - columns: 每个字段的来源列、空值数、无法解析的值数量
+            - bad_rows: 验证失败的样例行（行号、错误信息、原始值）
+            - unknown_accounts / unknown_notes: 数据库中没有的账号/笔记（数量和样例）
+        """
+        import logging
+        logger = logging.getLogger(__name__)
+
+        start_time = datetime.now()
+        sample_size = self.DRY_RUN_SAMPLE_SIZE
+
+        try:
+            if file_path.endswith('.csv'):
+                df, encoding = self.read_csv_safe(file_path)
+            elif file_path.endswith(('.xlsx', '.xls')):
+                df, encoding = self.read_excel_safe(file_path)
+            else:
+                return {
+                    'success': False,
+                    'error': '不支持的文件格式，仅支持 .csv, .xlsx, .xls 格式'
+                }
+
+            if df is None or df.empty:
+                return {
+                    'success': False,
+                    'error': '文件为空或无法读取，请检查文件内容'
+                }
+
+            total_rows = len(df)
+            if not self.validate_columns(df):
+                return {
+                    'success': False,
+                    'error': f"列验证失败: {self.errors}",
+                    'missing_columns': self._column_plan.missing_required,
+                    'total_rows': total_rows
+                }
+
+            df = self.clean_data(df)
+            df = self.drop_duplicate_rows(df)
+            plan = self.get_column_plan(df.columns)
+            columns = self.profile_columns(df)
+
+            # 验证转换（记录每行的错误信息），与 prepare_records 相同：整表契约优先，
+            # 子类未实现或整表验证/转换异常时回退逐行处理
+            records = None
+            try:
+                validation = self.validate_frame(df)
+                if validation is not None:
+                    valid_mask, messages = validation
+                    valid_mask = valid_mask.reindex(df.index, fill_value=False).astype(bool)
+                    messages = messages.reindex(df.index)
+                    records, _ = self._prepare_records_frame(df, (valid_mask, messages))
+            except Exception as e:
+                logger.warning(f"整表处理失败，回退逐行处理: {e}")
+                records = None
+
+            if records is None:
+                messages = pd.Series(None, index=df.index, dtype=object)
+                records, _ = self._prepare_records_rows(df, messages)
+                valid_mask = pd.Series(df.index.isin([idx for idx, _ in records]), index=df.index)
+
+            bad_index = df.index[~valid_mask.values]
+            bad_rows = [
+                {
+                    'row': int(idx) + 2,
+                    'error': messages.get(idx),
+                    'values': {
+                        column: None if pd.isna(value) else str(value)
+                        for column, value in df.loc[idx, list(plan.sources.values())].items()
+                    }
+                }
+                for idx in bad_index[:sample_size]
+            ]
+
+            result = {
+                'success': True,
+                'dry_run': True,
+                'total_rows': total_rows,
+                'duplicate_rows': total_rows - len(df),
+                'valid_rows': len(records),
+                'invalid_rows': len(bad_index),
+                'missing_optional_columns': plan.missing_optional,
+                'columns': columns,
+                'bad_rows': bad_rows,
+                'unknown_accounts': self._dry_run_unknown_accounts(records, sample_size),
+                'unknown_notes': self._dry_run_unknown_notes(records, sample_size),
+                'date_range': None,
+                'encoding': encoding,
+                'processing_time': round((datetime.now() - start_time).total_seconds(), 2),
+                'errors': self.errors[:10],
+                'warnings': self.warnings[:10]
+            }
+
+            date_field = self.get_date_field()
+            dates = [data.get(date_field) for _, data in records if data.get(date_field)] if date_field else []
+            if dates:
+                result['date_range'] = {'start': min(dates).isoformat(), 'end': max(dates).isoformat()}
+
+            message = f"试导入检查完成：共 {total_rows} 行，{len(records)} 行有效，{len(bad_index)} 行验证失败"
+            if result['duplicate_rows']:
+                message += f"，{result['duplicate_rows']} 条重复记录"
+            if result['unknown_accounts']['count']:
+                message += f"，{result['unknown_accounts']['count']} 个新账号"
+            if result['unknown_notes']['count']:
+                message += f"，{result['unknown_notes']['count']} 个未知笔记"
+            result['message'] = message + '（未写入数据）'
+
+            logger.info(result['message'])
+            return result
+
+        except Exception as e:
+            logger.error(f"试导入失败: {e}")
+            return {
+                'success': False,
+                'error': f"解析失败: {str(e)}",
+                'errors': self.errors
+            }
+        finally:
+            # 只读检查：丢弃会话中可能存在的任何改动
+            if self.db_session is not None:
+                self.db_session.rollback()
+
+    def profile_columns(self, df: pd.DataFrame) -> Dict[str, Dict[str, Any]]:
+        """
+        按列统计空值和无法解析的值（整列转换，不逐行）
+
+        日期、数值、布尔字段按模型字段类型整列转换，空值以外转换失败的值计为 invalid
+
+        Args:
+            df: 清洗后的 DataFrame
+
+        Returns:
+            {字段: {'column': 来源列名, 'nulls': 空值数, 'invalid': 无法解析的值数量}}
+        """
+        from sqlalchemy import Boolean, Date, DateTime, Float, Integer, Numeric
+
+        plan = self.get_column_plan(df.columns)
+        table = self.get_model_class().__table__
+
+        profile = {}
+        for field, source in plan.sources.items():
+            series = df[source]
+            blank = series.isna() | series.isin([''])
+            column_type = table.c[field].type if field in table.c else None
+
+            if isinstance(column_type, (Date, DateTime)):
+                coerced = coercion.to_datetime(series)
+            elif isinstance(column_type, Boolean):
+                coerced = coercion.to_bool(series)
+            elif isinstance(column_type, (Integer, Numeric, Float)):
+                coerced = coercion.to_number(series)
+            else:
+                coerced = None
+
+            invalid = int((coerced.nulls & ~blank.values).sum()) if coerced is not None else 0
+            profile[field] = {'column': source, 'nulls': int(blank.sum()), 'invalid': invalid}
+        return profile
+
+    def _dry_run_unknown_accounts(self, records: List[Tuple[Any, Dict[str, Any]]], sample_size: int) -> Dict[str, Any]:
+        """试导入：预加载已有账号，登记后未提交的即为新账号（不创建映射）"""
+        registry = self.get_account_registry() if records else None
+        if registry is None:
+            return {'count': 0, 'samples': []}
+
+        for _, data in records:
+            self._auto_create_account_mapping(data)
+        pending = registry.pending
+        return {
+            'count': len(pending),
+            'samples': [
+                {'account_id': item['account_id'], 'main_account_id': item['main_account_id']}
+                for item in pending[:sample_size]
+            ]
+        }
+
+    def _dry_run_unknown_notes(self, records: List[Tuple[Any, Dict[str, Any]]], sample_size: int) -> Dict[str, Any]:
+        """试导入：分块查询笔记维度表，找出不存在的笔记"""
+        from backend.models import XhsNoteInfo
+        from backend.utils.note_info_sync import load_note_info
+
+        if not records or 'note_id' not in records[0][1] or self.get_model_class() is XhsNoteInfo:
+            return {'count': 0, 'samples': []}
+
+        note_ids = list(dict.fromkeys(data['note_id'] for _, data in records if data.get('note_id')))
+        existing = load_note_info(self.db_session, note_ids, fields=())
+        unknown = [note_id for note_id in note_ids if note_id not in existing]
+        return {'count': len(unknown), 'samples': unknown[:sample_size]}
+
+    def prepare_batch_write(self, overwrite: bool) -> None:
+        """
+        批量写入前的准备（同一批次只调用一次，在写入锁内执行）
+
+        子类可以重写此方法，例如全量覆盖的表在这里清空旧数据
+        """
+        pass
+
+    def finish_batch_write(self, overwrite: bool, committed: bool) -> None:
+        """
+        批量写入结束（同一批次只调用一次，在写入锁内执行）
+
+        Args:
+            overwrite: 是否覆盖模式
+            committed: 批次中是否有文件写入成功（False 时子类应撤销 prepare_batch_write 的准备）
+        """
+        pass
+
+    def write_parsed(
+        self,
+        parsed: Dict[str, Any],
+        overwrite: bool = False,
+        batch_size: int = 1000,
+        replace_range: bool = False
+    ) -> Dict[str, Any]:
+        """
+        写入 parse_file() 的解析结果
+
+        Args:
+            parsed: parse_file() 返回的字典
+            overwrite: 是否覆盖模式
+            batch_size: 批量写入大小
+            replace_range: 是否按日期范围替换
+
+        Returns:
+            导入结果字典（与 import_data 相同）
+        """
+        start_time = datetime.now() - timedelta(seconds=parsed.get('parse_time', 0))
+        self.metrics.merge_stages(parsed.get('stages'))
+        self.errors.extend(parsed.get('errors', []))
+        self.warnings.extend(parsed.get('warnings', []))
+
+        if replace_range and not self.get_date_field():
+            return {
+                'success': False,
+                'error': '该数据类型不支持按日期范围替换导入'
+            }
+
+        try:
+            inserted_count, updated_count, write_failed = self._write_prepared(
+                parsed['records'], overwrite, batch_size, replace_range
+            )
+        except ImportCancelled:
+            self.db_session.rollback()
+            raise
+        except Exception as e:
+            self.db_session.rollback()
+            return {
+                'success': False,
+                'error': f"写入失败: {str(e)}",
+                'errors': self.errors
+            }
+
+        return self._build_import_result(
+            parsed['total_rows'], inserted_count, updated_count,
+            parsed['failed_rows'] + write_failed, parsed['quality_score'],
+            parsed.get('encoding'), start_time
+        )
+
+    def _import_frame(
+        self,
+        df: pd.DataFrame,
+        overwrite: bool,
+        batch_size: int,
+        replace_range: bool = False
+    ) -> Tuple[int, int, int, Dict[str, Any]]:
+        """
+        清洗 → 去重 → 质量评分 → 验证转换 → 写入（整表或流式导入的单块）
+
+        Returns:
+            (插入数量, 更新数量, 失败数量, 质量评分)
+        """
+        records, failed_count, quality_score = self._prepare_frame(df)
+        inserted_count, updated_count, write_failed = self._write_prepared(records, overwrite, batch_size, replace_range)
+        return inserted_count, updated_count, failed_count + write_failed, quality_score
+
+    def drop_duplicate_rows(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        去除重复记录（基于唯一性字段，保留最后一条）
+
+        Args:
+            df: 清洗后的 DataFrame
+
+        Returns:
+            去重后的 DataFrame
+        """
+        import logging
+        logger = logging.getLogger(__name__)
+
+        unique_fields = self.get_unique_fields()
+        if not unique_fields:
+            logger.info("✓ 跳过去重（无唯一性字段）")
+            return df
+
+        # 按列名解析计划找到唯一性字段对应的列
+        plan = self.get_column_plan(df.columns)
+        dedup_cols = [plan.source(field) for field in unique_fields]
+        if not all(dedup_cols):
+            logger.info("✓ 跳过去重（无法找到唯一性字段）")
+            return df
+
+        before_dedup = len(df)
+        df = df.drop_duplicates(subset=dedup_cols, keep='last')
+        after_dedup = len(df)
+        if before_dedup > after_dedup:
+            dedup_count = before_dedup - after_dedup
+            self.warnings.append(f"去除重复记录: {dedup_count} 条")
+            logger.info(f"✓ 去除 {dedup_count} 条重复记录")
+        else:
+            logger.info("✓ 无重复记录")
+        return df
+
+    def _prepare_frame(self, df: pd.DataFrame) -> Tuple[List[Tuple[Any, Dict[str, Any]]], int, Dict[str, Any]]:
+        """
+        清洗 → 去重 → 质量评分 → 验证转换（不访问数据库）
+
+        Returns:
+            (记录列表, 失败数量, 质量评分)
+        """
+        import logging
+        logger = logging.getLogger(__name__)
+
+        # 3. 清洗数据
+        logger.info("步骤 3/6: 清洗数据...")
+        with self.metrics.stage('clean'):
+            df = self.clean_data(df)
+        logger.info("✓ 数据清洗完成")
+
+        # 3.5. 去除重复记录（基于唯一性字段）
+        logger.info("步骤 4/6: 去重处理...")
+        with self.metrics.stage('dedup'):
+            df = self.drop_duplicate_rows(df)
+
+        # 4. 计算质量评分
+        logger.info("步骤 5/6: 计算质量评分...")
+        with self.metrics.stage('quality'):
+            quality_score = self.calculate_quality_score(df)
+        logger.info(f"✓ 质量评分: {quality_score['overall']:.2f} 分")
+
+        # 验证 + 转换（整表契约优先，逐行回退）
+        with self.metrics.stage('transform'):
+            records, failed_count = self.prepare_records(df)
+        logger.info(f"  验证转换完成: {len(records)} 行有效, {failed_count} 行失败")
+
+        return records, failed_count, quality_score
+
+    def _write_prepared(
+        self,
+        records: List[Tuple[Any, Dict[str, Any]]],
+        overwrite: bool,
+        batch_size: int,
+        replace_range: bool = False
+    ) -> Tuple[int, int, int]:
+        """
+        写入已验证转换的记录
+
+        Returns:
+            (插入数量, 更新数量, 失败数量)
+        """
+        import logging
+        logger = logging.getLogger(__name__)
+
+        # 断点续传：跳过之前已提交的记录（记录顺序由文件内容决定，同一文件每次相同）
+        all_records = records
+        position = self._records_position
+        skip = 0 if replace_range else min(len(records), max(0, self.resume_offset - position))
+        self._checkpoint_base = position + skip
+        self.committed_rows = self._checkpoint_base
+        self._records_position += len(records)
+        if skip:
+            logger.info(f"  从断点继续：跳过已提交的 {skip} 条记录")
+            self.resumed_rows += skip
+            records = records[skip:]
+
+        # 5. 处理数据
+        logger.info(f"步骤 6/6: 导入数据库（共 {len(records)} 行，batch_size={batch_size}）...")
+        ModelClass = self.get_model_class()
+        unique_fields = self.get_unique_fields()
+
+        # 写入数据库：按日期范围替换时删除 + 整批插入；覆盖模式优先使用 SQLite 原生 UPSERT，否则逐条 ORM 写入
+        with ExitStack() as lane:
+            with self.metrics.stage('write_wait'):
+                lane.enter_context(self.write_lane())
+
+            try:
+                with self.metrics.stage('write'):
+                    if replace_range:
+                        logger.info("  按日期范围替换（DELETE 日期范围 + 批量 INSERT，单个事务）")
+                        inserted_count, updated_count, failed_count = self._write_records_replace_range(
+                            ModelClass, records, batch_size
+                        )
+                    elif overwrite and unique_fields and self._supports_native_upsert(ModelClass):
+                        logger.info("  使用原生 UPSERT 批量写入（INSERT … ON CONFLICT DO UPDATE）")
+                        inserted_count, updated_count, failed_count = self._write_records_upsert(
+                            ModelClass, records, batch_size
+                        )
+                    else:
+                        inserted_count, updated_count, failed_count = self._write_records_orm(
+                            ModelClass, unique_fields, records, overwrite, batch_size
+                        )
+            except ImportCancelled:
+                # 取消：已提交的批次（含断点续传跳过的记录）保留，记录其日期范围供导入任务刷新聚合表
+                self._track_touched_range(all_records[:self.committed_rows - position])
+                raise
+
+            # 新账号自动创建占位映射（预加载已有账号，一次批量插入）
+            with self.metrics.stage('accounts'):
+                self.sync_account_mappings(all_records)
+
+        # 包含断点续传跳过的记录：它们在中断前已提交，但还没有刷新聚合表
+        self._track_touched_range(all_records)
+
+        return inserted_count, updated_count, failed_count
+
+    def _track_touched_range(self, records: List[Tuple[Any, Dict[str, Any]]]) -> None:
+        """累加本次导入写入记录的日期范围（流式导入每块调用一次）"""
+        from backend.utils.existing_keys import ExistingKeyIndex
+
+        date_field = self.get_date_field()
+        if not date_field or not records:
+            return
+
+        min_date, max_date = ExistingKeyIndex.date_bounds(data.get(date_field) for _, data in records)
+        if min_date is None:
+            return
+        if self.touched_range:
+            min_date = min(min_date, self.touched_range[0])
+            max_date = max(max_date, self.touched_range[1])
+        self.touched_range = (min_date, max_date)
+
+    def get_touched_ranges(self) -> Optional[List[Dict[str, Any]]]:
+        """
+        本次导入涉及的 (平台, 日期范围)，供导入后的聚合表增量刷新
+
+        Returns:
+            [{'platform', 'start', 'end'}]；没有平台或日期字段的数据类型返回 None（范围未知）
+        """
+        from backend.utils.aggregation_scope import touched_ranges
+
+        platform = self.get_platform_name()
+        if not platform or not self.get_date_field():
+            return None
+        if self.touched_range is None:
+            return []
+        return touched_ranges({platform: self.touched_range})
+
+    def _check_cancelled(self) -> None:
+        """
+        批量提交前检查取消请求
+
+        Raises:
+            ImportCancelled: 任务已请求取消（调用方回滚当前批次，已提交的批次保留）
+        """
+        if self.cancel_callback:
+            self.cancel_callback()
+
+    def _checkpoint(self, committed: int) -> None:
+        """
+        批量提交后记录断点
+
+        Args:
+            committed: 本次写入的记录中已提交（或已确认失败）的数量
+        """
+        self.committed_rows = self._checkpoint_base + committed
+        if self.checkpoint_callback:
+            self.checkpoint_callback(self._checkpoint_base + committed)
+
+    def _build_import_result(
+        self,
+        total_rows: int,
+        inserted_count: int,
+        updated_count: int,
+        failed_count: int,
+        quality_score: Dict[str, Any],
+        encoding: Optional[str],
+        start_time: datetime
+    ) -> Dict[str, Any]:
+        """构建导入结果字典"""
+        import logging
+        logger = logging.getLogger(__name__)
+
+        # 计算耗时
+        processing_time = (datetime.now() - start_time).total_seconds()
+
+        # 构建成功消息
+        success_msg = f"成功导入 {inserted_count} 条数据"
+        if self.replaced_range:
+            success_msg = (
+                f"已替换 {self.replaced_range[0]} ~ {self.replaced_range[1]} 的数据"
+                f"（删除 {self.deleted_rows} 条旧数据），" + success_msg
+            )
+        if updated_count > 0:
+            success_msg += f"，更新 {updated_count} 条数据"
+        if failed_count > 0:
+            success_msg += f"，{failed_count} 条数据失败"
+        if self.resumed_rows:
+            success_msg = f"从断点继续（跳过已提交的 {self.resumed_rows} 条），" + success_msg
+
+        logger.info(f"{'='*60}")
+        logger.info(f"✓ 导入完成！耗时: {processing_time:.2f} 秒")
+        logger.info(f"  总行数: {total_rows}")
+        logger.info(f"  插入: {inserted_count}")
+        logger.info(f"  更新: {updated_count}")
+        logger.info(f"  失败: {failed_count}")
+        logger.info(f"  质量评分: {quality_score['overall']:.2f}")
+
+        return {
+            'success': True,
+            'message': success_msg,
+            'total_rows': total_rows,
+            'processed_rows': inserted_count + updated_count,
+            'inserted_rows': inserted_count,
+            'updated_rows': updated_count,
+            'failed_rows': failed_count,
+            'quality_score': quality_score['overall'],
+            'quality_details': quality_score,
+            'encoding': encoding,
+            'processing_time': processing_time,
+            'date_range': {
+                'start': self.replaced_range[0].isoformat(),
+                'end': self.replaced_range[1].isoformat()
+            } if self.replaced_range else None,
+            'deleted_rows': self.deleted_rows,
+            'resumed_rows': self.resumed_rows,
+            'touched_ranges': self.get_touched_ranges(),
+            'errors': self.errors[:10],  # 只返回前10个错误
+            'warnings': self.warnings[:10]
+        }
+
+    def _use_streaming(self, file_path: str, chunksize: Optional[int]) -> bool:
+        """是否使用流式导入（指定了 chunksize，或文件超过 STREAMING_THRESHOLD）"""
+        if chunksize:
+            return True
+        return os.path.getsize(file_path) > self.STREAMING_THRESHOLD
+
+    def _import_csv_streaming(
+        self,
+        file_path: str,
+        overwrite: bool,
+        batch_size: int,
+        chunksize: int,
+        progress_callback,
+        start_time: datetime
+    ) -> Dict[str, Any]:
+        """
+        流式导入 CSV：每块依次清洗 → 去重 → 写入
+
+        - 列验证只在第一块执行，验证过程中的列重命名（如抖音按位置识别）同步到后续各块
+        - 去重在块内进行；跨块的重复由覆盖模式 UPSERT（后者覆盖前者）或重复检查处理
+        - 质量评分按行数加权合并
+        """
+        import logging
+        logger = logging.getLogger(__name__)
+
+        encoding = self.detect_encoding(file_path)
+        file_size = os.path.getsize(file_path)
+        logger.info(f"步骤 1/6: 流式读取文件（编码: {encoding}, 每块 {chunksize} 行, 大小: {file_size / 1024 / 1024:.2f} MB）")
+
+        total_rows = 0
+        inserted_count = 0
+        updated_count = 0
+        failed_count = 0
+        chunk_scores = []
+        original_columns = None
+        validated_columns = None
+
+        chunks = self.metrics.timed('read', self.iter_csv_chunks(file_path, chunksize, encoding))
+        for chunk_no, (chunk, bytes_read) in enumerate(chunks, 1):
+            total_rows += len(chunk)
+
+            # 2. 验证列（仅第一块）
+            if validated_columns is None:
+                original_columns = list(chunk.columns)
+                logger.info("步骤 2/6: 验证列...")
+                with self.metrics.stage('columns'):
+                    columns_valid = self.validate_columns(chunk)
+                if not columns_valid:
+                    logger.error(f"✗ 列验证失败: {self.errors}")
+                    return {
+                        'success': False,
+                        'error': f"列验证失败: {self.errors}"
+                    }
+                validated_columns = list(chunk.columns)
+            elif validated_columns != original_columns and list(chunk.columns) == original_columns:
+                chunk.columns = validated_columns
+
+            # 3-6. 清洗、去重、质量评分、写入
+            chunk_inserted, chunk_updated, chunk_failed, chunk_score = self._import_frame(
+                chunk, overwrite, batch_size
+            )
+            inserted_count += chunk_inserted
+            updated_count += chunk_updated
+            failed_count += chunk_failed
+            chunk_scores.append((len(chunk), chunk_score))
+
+            progress = 10 + int(85 * min(bytes_read / file_size, 1.0)) if file_size else 95
+            message = f"第 {chunk_no} 块完成: 已处理 {total_rows} 行（{inserted_count} 插入, {updated_count} 更新, {failed_count} 失败）"
+            logger.info(f"  {message}")
+            if progress_callback:
+                progress_callback(progress, message)
+
+        if total_rows == 0:
+            return {
+                'success': False,
+                'error': '文件为空或无法读取，请检查文件内容'
+            }
+
+        return self._build_import_result(
+            total_rows, inserted_count, updated_count, failed_count,
+            self._merge_quality_scores(chunk_scores), encoding, start_time
+        )
+
+    @classmethod
+    def _merge_quality_scores(cls, chunk_scores: List[Tuple[int, Dict[str, Any]]]) -> Dict[str, Any]:
+        """按行数加权合并各块的质量评分（行数字段累加，按列完整性按含该列的块加权）"""
+        total = sum(rows for rows, _ in chunk_scores) or 1
+        merged = {'overall': 0.0}
+        for _, score in chunk_scores:
+            for key, value in score.items():
+                if isinstance(value, (int, float, np.number)):
+                    merged.setdefault(key, 0.0)
+
+        for key in merged:
+            if key in cls.QUALITY_COUNT_KEYS:
+                merged[key] = sum(int(score.get(key, 0)) for _, score in chunk_scores)
+            else:
+                merged[key] = round(sum(rows * float(score.get(key, 0)) for rows, score in chunk_scores) / total, 2)
+
+        column_totals = {}
+        for rows, score in chunk_scores:
+            for column, value in score.get('details', {}).get('completeness_by_column', {}).items():
+                weighted, weight = column_totals.get(column, (0.0, 0))
+                column_totals[column] = (weighted + rows * float(value), weight + rows)
+        if column_totals:
+            merged['details'] = {
+                'completeness_by_column': {
+                    column: round(weighted / weight, 2) if weight else 0.0
+                    for column, (weighted, weight) in column_totals.items()
+                }
+            }
+        return merged
+
+    def _write_records_orm(
+        self,
+        ModelClass,
+        unique_fields: List[str],
+        records: List[Tuple[Any, Dict[str, Any]]],
+        overwrite: bool,
+        batch_size: int
+    ) -> Tuple[int, int, int]:
+        """
+        逐条 ORM 写入（查询是否存在 → 更新或插入）
+
+        Returns:
+            (插入数量, 更新数量, 失败数量)
+        """
+        import logging
+        logger = logging.getLogger(__name__)
+
+        inserted_count = 0
+        updated_count = 0
+        failed_count = 0
+
+        # 优化：预先查询所有可能存在的记录（批量模式优化）
+        # 收集所有唯一性字段的值
+        existing_dict = None
+        if unique_fields and overwrite and len(records) > 100:
+            logger.info("  预加载现有记录以优化性能...")
+
+            # 构建批量查询条件
+            unique_values = set()
+            for _, data in records:
+                # 提取唯一性字段的值
+                unique_tuple = tuple(data.get(k) for k in unique_fields)
+                if all(v is not None for v in unique_tuple):
+                    unique_values.add(unique_tuple)
+
+            # 批量查询现有记录
+            if unique_values and len(unique_fields) == 2:
+                # 针对 (data_date/date, note_id) 的优化查询
+                # 兼容不同的日期字段名：data_date (content_daily) 或 date (daily)
+                # 注意：只有当模型有 note_id 字段时才执行此优化
+                data_dates = set(v[0] for v in unique_values)
+                note_ids = set(v[1] for v in unique_values)
+
+                # 检查模型使用的是哪个日期字段
+                date_field = None
+                if hasattr(ModelClass, 'data_date'):
+                    date_field = ModelClass.data_date
+                elif hasattr(ModelClass, 'date'):
+                    date_field = ModelClass.date
+
+                # 如果找到了日期字段且有 note_id 字段，进行优化查询
+                # （只有小红书笔记数据有 note_id 字段，抖音/腾讯广告数据没有）
+                if date_field is not None and hasattr(ModelClass, 'note_id'):
+                    existing_records = self.db_session.query(ModelClass).filter(
+                        date_field.in_(data_dates),
+                        ModelClass.note_id.in_(note_ids)
+                    ).all()
+
+                    # 构建查找字典
+                    existing_dict = {}
+                    for record in existing_records:
+                        key = (getattr(record, unique_fields[0]), getattr(record, unique_fields[1]))
+                        existing_dict[key] = record
+
+                    logger.info(f"  预加载 {len(existing_dict)} 条现有记录")
+
+        # 非覆盖模式：按记录日期范围预加载已有唯一键（只判断是否存在，不加载 ORM 对象）
+        existing_keys = None
+        key_fields = self.get_existing_key_fields()
+        if not overwrite and key_fields:
+            from backend.utils.existing_keys import ExistingKeyIndex
+
+            date_field, key_field = key_fields
+            min_date, max_date = ExistingKeyIndex.date_bounds(data.get(date_field) for _, data in records)
+            existing_keys = ExistingKeyIndex.load(
+                self.db_session,
+                getattr(ModelClass, date_field),
+                getattr(ModelClass, key_field),
+                min_date,
+                max_date
+            )
+            logger.info(f"  预加载 {len(existing_keys)} 个已有唯一键（{min_date} ~ {max_date}）")
+
+        # 批量处理
+        batch_count = 0
+        total_batches = (len(records) + batch_size - 1) // batch_size
+
+        for position, (idx, data) in enumerate(records, 1):
+            try:
+                # 检查是否存在（优先使用预加载的记录）
+                if existing_dict is not None and len(unique_fields) == 2:
+                    # 使用预加载的字典查找
+                    key = (data.get(unique_fields[0]), data.get(unique_fields[1]))
+                    existing = existing_dict.get(key)
+                elif existing_keys is not None:
+                    # 使用预加载的唯一键索引（文件内重复的键同样识别为重复）
+                    existing = existing_keys.contains(data.get(date_field), data.get(key_field))
+                    if not existing:
+                        existing_keys.add(data.get(date_field), data.get(key_field))
+                else:
+                    # 常规查询
+                    filters = {k: data.get(k) for k in unique_fields if k in data}
+                    with self.db_session.no_autoflush:
+                        existing = self.db_session.query(ModelClass).filter_by(**filters).first()
+
+                if existing:
+                    if overwrite:
+                        # 更新现有记录（不立即 flush，避免事务问题）
+                        for key, value in data.items():
+                            if key != 'id':  # 不更新主键
+                                setattr(existing, key, value)
+                        updated_count += 1
+                    else:
+                        # 跳过重复记录
+                        failed_count += 1
+                        self.warnings.append(f"第 {idx + 2} 行: 重复记录")
+                else:
+                    # 新增记录
+                    new_record = ModelClass(**data)
+                    self.db_session.add(new_record)
+                    # 调用插入后钩子（子类可覆盖）
+                    self.after_insert_record(data, new_record)
+                    inserted_count += 1
+
+                # 批量提交
+                batch_count += 1
+                if batch_count % batch_size == 0:
+                    current_batch = batch_count // batch_size
+                    self._check_cancelled()
+                    try:
+                        self.db_session.commit()
+                        logger.info(f"  进度: {current_batch}/{total_batches} 批次 ({inserted_count} 插入, {updated_count} 更新, {failed_count} 失败)")
+                    except Exception as commit_error:
+                        # 批量提交失败，回滚并继续
+                        self.db_session.rollback()
+                        logger.error(f"  批量提交失败: {commit_error}")
+                        # 将本批次的所有记录标记为失败
+                        failed_count += batch_size
+                        self.errors.append(f"批次 {current_batch} 提交失败: {commit_error}")
+                    self._checkpoint(position)
+
+            except ImportCancelled:
+                raise
+            except Exception as e:
+                failed_count += 1
+                error_msg = f"第 {idx + 2} 行处理失败: {str(e)}"
+                self.errors.append(error_msg)
+                logger.error(error_msg)
+
+        # 提交剩余数据
+        if batch_count % batch_size != 0:
+            self._check_cancelled()
+            try:
+                self.db_session.commit()
+                logger.info(f"  ✓ 最后批次完成 (总计: {inserted_count} 插入, {updated_count} 更新, {failed_count} 失败)")
+                self._checkpoint(len(records))
+            except Exception as final_error:
+                self.db_session.rollback()
+                logger.error(f"  ✗ 最终提交失败: {final_error}")
+                self.errors.append(f"最终提交失败: {final_error}")
+
+        return inserted_count, updated_count, failed_count
+
+    def _write_records_replace_range(
+        self,
+        ModelClass,
+        records: List[Tuple[Any, Dict[str, Any]]],
+        batch_size: int
+    ) -> Tuple[int, int, int]:
+        """
+        按日期范围替换写入（单个事务）
+
+            DELETE FROM t WHERE <日期字段> BETWEEN <文件最早日期> AND <文件最晚日期>
+            INSERT INTO t (...) VALUES (...)   -- 每 batch_size 行一次 executemany
+
+        任一步失败或取消时整体回滚（旧数据保留）并抛出异常
+
+        Returns:
+            (插入数量, 更新数量, 失败数量)
+        """
+        import logging
+        from sqlalchemy import delete, insert
+        from backend.utils.existing_keys import ExistingKeyIndex
+        logger = logging.getLogger(__name__)
+
+        date_field = self.get_date_field()
+        min_date, max_date = ExistingKeyIndex.date_bounds(data.get(date_field) for _, data in records)
+        if min_date is None:
+            return 0, 0, 0
+
+        table = ModelClass.__table__
+        columns = [key for key in records[0][1].keys() if key in table.c and key != 'id']
+
+        try:
+            deleted = self.db_session.execute(
+                delete(table).where(table.c[date_field].between(min_date, max_date))
+            ).rowcount
+            logger.info(f"  删除 {min_date} ~ {max_date} 的旧数据 {deleted} 条")
+
+            total_batches = (len(records) + batch_size - 1) // batch_size
+            for batch_start in range(0, len(records), batch_size):
+                self._check_cancelled()
+                self.db_session.execute(insert(table), [
+                    {key: data.get(key) for key in columns}
+                    for _, data in records[batch_start:batch_start + batch_size]
+                ])
+                logger.info(f"  进度: {batch_start // batch_size + 1}/{total_batches} 批次")
+
+            self._check_cancelled()
+            self.db_session.commit()
+        except Exception:
+            self.db_session.rollback()
+            raise
+
+        self.replaced_range = (min_date, max_date)
+        self.deleted_rows = deleted
+        return len(records), 0, 0
+
+    def get_conflict_target(self, ModelClass) -> List[Any]:
+        """
+        获取 UPSERT 冲突目标（ON CONFLICT 子句中的列/表达式）
+
+        默认使用 get_unique_fields() 对应的列，子类可以重写
+        （例如可为空的唯一字段需要使用 COALESCE 表达式索引）
+
+        Returns:
+            列或 SQL 表达式列表，必须与表上的某个唯一索引完全对应
+        """
+        table = ModelClass.__table__
+        return [table.c[field] for field in self.get_unique_fields()]
+
+    def _supports_native_upsert(self, ModelClass) -> bool:
+        """
+        判断是否可以使用 SQLite 原生 UPSERT
+
+        条件：
+        1. 数据库为 SQLite
+        2. 表有自增主键 id（用于从批次推算插入/更新数量）
+        3. 子类没有重写 after_insert_record（原生写入不产生 ORM 对象）
+        4. 表上存在与 get_conflict_target() 完全对应的唯一索引
+        """
+        import logging
+        logger = logging.getLogger(__name__)
+
+        try:
+            if self.db_session.get_bind().dialect.name != 'sqlite':
+                return False
+            if 'id' not in ModelClass.__table__.c:
+                return False
+            if type(self).after_insert_record is not DataProcessor.after_insert_record:
+                return False
+
+            return self._find_unique_index(ModelClass.__tablename__, self.get_conflict_target(ModelClass)) is not None
+        except Exception as e:
+            logger.warning(f"检测 UPSERT 唯一索引失败，使用逐条写入: {e}")
+            return False
+
+    def _find_unique_index(self, table_name: str, target: List[Any]) -> Optional[str]:
+        """
+        查找与冲突目标对应的唯一索引
+
+        普通列按列名匹配，表达式列（PRAGMA index_xinfo 中 name 为空）按数量匹配
+
+        Returns:
+            索引名，找不到返回 None
+        """
+        from sqlalchemy import text
+        from sqlalchemy.sql.schema import Column
+
+        target_columns = sorted(item.name for item in target if isinstance(item, Column))
+        target_expressions = len(target) - len(target_columns)
+
+        indexes = self.db_session.execute(text(f'PRAGMA index_list("{table_name}")')).fetchall()
+        for index in indexes:
+            # index_list: (seq, name, unique, origin, partial)
+            index_name, unique, partial = index[1], index[2], index[4]
+            if not unique or partial:
+                continue
+
+            # index_xinfo: (seqno, cid, name, desc, coll, key)
+            key_columns = [
+                col for col in self.db_session.execute(text(f'PRAGMA index_xinfo("{index_name}")')).fetchall()
+                if col[5]
+            ]
+            columns = sorted(col[2] for col in key_columns if col[2] is not None)
+            expressions = len(key_columns) - len(columns)
+
+            if columns == target_columns and expressions == target_expressions:
+                return index_name
+
+        return None
+
+    def _write_records_upsert(
+        self,
+        ModelClass,
+        records: List[Tuple[Any, Dict[str, Any]]],
+        batch_size: int
+    ) -> Tuple[int, int, int]:
+        """
+        SQLite 原生 UPSERT 批量写入
+
+        每批执行一次 executemany：
+            INSERT INTO t (...) VALUES (...)
+            ON CONFLICT(<唯一索引>) DO UPDATE SET col = excluded.col
+
+        插入/更新数量按批次推算：批次前的最大 id 之后新增的行即为插入，其余为更新
+
+        Returns:
+            (插入数量, 更新数量, 失败数量)
+        """
+        import logging
+        from sqlalchemy import func, select
+        from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+        logger = logging.getLogger(__name__)
+
+        inserted_count = 0
+        updated_count = 0
+        failed_count = 0
+
+        if not records:
+            return inserted_count, updated_count, failed_count
+
+        table = ModelClass.__table__
+        unique_fields = set(self.get_unique_fields())
+        columns = [key for key in records[0][1].keys() if key in table.c]
+
+        stmt = sqlite_insert(table)
+        update_values = {
+            key: stmt.excluded[key]
+            for key in columns
+            if key not in unique_fields and key != 'id'
+        }
+        if update_values and 'updated_at' in table.c and 'updated_at' not in columns:
+            # 原生 UPSERT 不会触发 ORM 的 onupdate，需要显式更新时间
+            update_values['updated_at'] = datetime.now()
+
+        if update_values:
+            stmt = stmt.on_conflict_do_update(index_elements=self.get_conflict_target(ModelClass), set_=update_values)
+        else:
+            stmt = stmt.on_conflict_do_nothing(index_elements=self.get_conflict_target(ModelClass))
+
+        total_batches = (len(records) + batch_size - 1) // batch_size
+
+        for batch_start in range(0, len(records), batch_size):
+            current_batch = batch_start // batch_size + 1
+            batch = [
+                {key: data.get(key) for key in columns}
+                for _, data in records[batch_start:batch_start + batch_size]
+            ]
+
+            self._check_cancelled()
+            try:
+                max_id_before = self.db_session.execute(select(func.max(table.c.id))).scalar() or 0
+                self.db_session.execute(stmt, batch)
+                batch_inserted = self.db_session.execute(
+                    select(func.count()).select_from(table).where(table.c.id > max_id_before)
+                ).scalar()
+                self.db_session.commit()
+
+                inserted_count += batch_inserted
+                updated_count += len(batch) - batch_inserted
+                logger.info(f"  进度: {current_batch}/{total_batches} 批次 ({inserted_count} 插入, {updated_count} 更新, {failed_count} 失败)")
+            except Exception as e:
+                # 批次失败，回滚并继续
+                self.db_session.rollback()
+                logger.error(f"  批量写入失败: {e}")
+                failed_count += len(batch)
+                self.errors.append(f"批次 {current_batch} 提交失败: {e}")
+            self._checkpoint(batch_start + len(batch))
+
+        return inserted_count, updated_count, failed_count
+
     @staticmethod
     def safe_float(value) -> Optional[float]:
         """安全转换为浮点数"""
@@ -788,3 +2142,87 @@ class DataProcessor(ABC):
             return value.lower() in ['true', '1', 'yes', '是', 'y']
 
         return bool(value)
+
+    # ============================================
+    # 整表（向量化）转换工具
+    # 与上方 safe_* 逐值工具的语义保持一致，类型转换委托 coercion 模块
+    # ============================================
+
+    @staticmethod
+    def frame_errors(df: pd.DataFrame) -> pd.Series:
+        """创建与 df 同索引的空错误信息列（validate_frame 使用）"""
+        return pd.Series(None, index=df.index, dtype=object)
+
+    @staticmethod
+    def frame_add_error(messages: pd.Series, mask: pd.Series, message: Any) -> None:
+        """
+        为尚无错误的行写入错误信息
+
+        只写入还没有错误的行，保持逐行验证“遇到第一个错误即返回”的语义
+
+        Args:
+            messages: 错误信息列（原地修改）
+            mask: 出错行掩码
+            message: 错误信息（字符串，或与 messages 同索引的 Series）
+        """
+        target = mask & messages.isna()
+        if target.any():
+            messages[target] = message[target] if isinstance(message, pd.Series) else message
+
+    @staticmethod
+    def frame_blank(series: pd.Series) -> pd.Series:
+        """空值掩码（等价于逐行的 pd.isna(value) or not value）"""
+        if pd.api.types.is_datetime64_any_dtype(series):
+            return series.isna()
+        if pd.api.types.is_bool_dtype(series) or pd.api.types.is_numeric_dtype(series):
+            return series.isna() | (series == 0)
+        return series.isna() | series.isin(['', 0])
+
+    @staticmethod
+    def frame_numeric(series: pd.Series) -> pd.Series:
+        """数值解析（去除千分位逗号），无法解析为 NaN"""
+        return coercion.to_number(series).values
+
+    @staticmethod
+    def frame_float(series: pd.Series) -> pd.Series:
+        """整列转换为浮点数（对应 safe_float，空值和无法解析为 0.0）"""
+        return coercion.to_float(series).values
+
+    @staticmethod
+    def frame_int(series: pd.Series) -> pd.Series:
+        """整列转换为整数（对应 safe_int，小数截断，空值和无法解析为 0）"""
+        return coercion.to_int(series).values
+
+    @staticmethod
+    def frame_str(series: pd.Series) -> pd.Series:
+        """整列转换为字符串（对应 safe_str，空值为 None）"""
+        return coercion.to_str(series).values
+
+    @staticmethod
+    def frame_datetime(series: pd.Series) -> pd.Series:
+        """整列解析为 Timestamp（无法解析为 NaT，规则见 coercion.to_datetime）"""
+        return coercion.to_datetime(series).values
+
+    @staticmethod
+    def frame_date(series: pd.Series) -> pd.Series:
+        """整列转换为 datetime.date（对应 safe_date，无法解析为 None）"""
+        return coercion.to_date(series).values
+
+    @staticmethod
+    def frame_to_records(frame: pd.DataFrame) -> List[Dict[str, Any]]:
+        """
+        转换为字段字典列表（NaN/NaT 转为 None，numpy 标量转为 Python 原生类型）
+        """
+        converted = {}
+        for col in frame.columns:
+            series = frame[col]
+            if pd.api.types.is_datetime64_any_dtype(series):
+                # datetime64[us] 转 object 时 numpy 直接生成 datetime.datetime
+                values = pd.Series(
+                    series.to_numpy(dtype='datetime64[us]').astype(object), index=frame.index, dtype=object
+                )
+            else:
+                values = series.astype(object)
+            converted[col] = values.where(series.notna(), None)
+
+        return pd.DataFrame(converted, index=frame.index).to_dict('records')
@@ -0,0 +1,258 @@
+# -*- coding: utf-8 -*-
+"""
+整列类型转换工具（各处理器 transform_frame / validate_frame 共用）
+
+对应各处理器中的逐值 safe_* 工具，按列一次完成转换：
+1. 日期：每列只推断一次格式（DATE_FORMATS），整列按该格式解析，
+   不匹配的值再逐值推断；数值按 YYYYMMDD 或 Excel 日期序列号解析
+2. 布尔：是/否/Y/N/1/0 等通过查找表映射
+3. 数值：千分位逗号、空格、百分号由 numpy 字符串函数整列去除后解析
+
+每个转换函数返回 Coerced(values, nulls)：
+- values: 转换结果（与输入同索引的 Series）
+- nulls: 布尔数组，True 表示原值为空或无法解析（填充默认值之前）
+"""
+
+from typing import NamedTuple, Optional
+
+import numpy as np
+import pandas as pd
+
+# 字符串日期候选格式（与 BackendConversionProcessor.safe_datetime 一致，按顺序尝试）
+DATE_FORMATS = [
+    '%Y-%m-%d %H:%M:%S',
+    '%Y-%m-%d %H:%M:%S.%f',
+    '%Y/%m/%d %H:%M:%S',
+    '%Y-%m-%d',
+    '%Y/%m/%d',
+    '%Y%m%d',
+]
+
+# 推断日期格式时的采样行数
+FORMAT_SAMPLE_SIZE = 200
+
+# Excel 日期序列号的起点和有效范围（1900-01-01 ~ 9999-12-31）
+EXCEL_EPOCH = pd.Timestamp('1899-12-30')
+EXCEL_SERIAL_RANGE = (1, 2958465)
+
+# YYYYMMDD 整数的有效范围（小红书周期格式）
+YMD_RANGE = (19000101, 21001231)
+
+# 布尔查找表（键为去除空格并转小写后的字符串）
+BOOL_LOOKUP = {
+    '1': True, '是': True, 'y': True, 'yes': True, 'true': True,
+    '0': False, '否': False, 'n': False, 'no': False, 'false': False, '': False,
+}
+
+# 数值解析时默认去除的字符（千分位逗号）
+THOUSANDS_SEPARATORS = ',，'
+
+
+class Coerced(NamedTuple):
+    """整列转换结果"""
+    values: pd.Series
+    nulls: np.ndarray
+
+
+def _is_text(series: pd.Series) -> pd.Series:
+    """字符串值掩码（全为字符串的列不逐值判断）"""
+    if pd.api.types.infer_dtype(series, skipna=True) == 'string':
+        return series.notna()
+    return series.map(lambda v: isinstance(v, str))
+
+
+def infer_date_format(texts: pd.Series, sample_size: int = FORMAT_SAMPLE_SIZE) -> Optional[str]:
+    """
+    推断字符串日期列的格式
+
+    取前 sample_size 个非空值，返回 DATE_FORMATS 中匹配最多的格式
+    （全部匹配时直接返回），都不匹配时返回 None
+    """
+    sample = texts[texts != ''].head(sample_size)
+    if sample.empty:
+        return None
+
+    best_format, best_hits = None, 0
+    for fmt in DATE_FORMATS:
+        hits = int(pd.to_datetime(sample, format=fmt, errors='coerce').notna().sum())
+        if hits == len(sample):
+            return fmt
+        if hits > best_hits:
+            best_format, best_hits = fmt, hits
+    return best_format
+
+
+def _parse_texts(texts: pd.Series) -> pd.Series:
+    """按推断的格式整列解析，不匹配的值逐值推断（与 pd.to_datetime 单值解析一致）"""
+    fmt = infer_date_format(texts)
+    if fmt is None:
+        return pd.to_datetime(texts, errors='coerce', format='mixed')
+
+    parsed = pd.to_datetime(texts, errors='coerce', format=fmt)
+    retry = parsed.isna() & (texts != '')
+    if retry.any():
+        parsed[retry] = pd.to_datetime(texts[retry], errors='coerce', format='mixed')
+    return parsed
+
+
+def to_datetime(series: pd.Series) -> Coerced:
+    """
+    整列解析为 Timestamp（无法解析为 NaT）
+
+    - datetime 列：直接使用
+    - 8 位整数（YYYYMMDD）：按 %Y%m%d 解析
+    - 其他数值：按 Excel 日期序列号解析
+    - 字符串：每列推断一次格式后整列解析
+    - 其他对象（datetime / Timestamp）：逐值转换
+    """
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return Coerced(series, series.isna().to_numpy())
+
+    result = pd.Series(pd.NaT, index=series.index, dtype='datetime64[ns]')
+    present = series.notna()
+    if not present.any():
+        return Coerced(result, np.ones(len(series), dtype=bool))
+
+    if pd.api.types.is_bool_dtype(series):
+        numbers = pd.Series(np.nan, index=series.index)
+    else:
+        numbers = to_number(series, strip_chars='').values
+    is_number = numbers.notna()
+
+    if is_number.any():
+        # YYYYMMDD 整数
+        is_ymd = is_number & (numbers % 1 == 0) & numbers.between(*YMD_RANGE)
+        if is_ymd.any():
+            result[is_ymd] = pd.to_datetime(
+                numbers[is_ymd].astype('int64').astype(str), format='%Y%m%d', errors='coerce'
+            )
+
+        # Excel 日期序列号
+        is_serial = is_number & ~is_ymd & numbers.between(*EXCEL_SERIAL_RANGE)
+        if is_serial.any():
+            result[is_serial] = EXCEL_EPOCH + pd.to_timedelta(numbers[is_serial], unit='D')
+
+    rest = present & ~is_number
+    if rest.any():
+        values = series[rest]
+        is_text = _is_text(values)
+        if is_text.any():
+            texts = values[is_text]
+            result[texts.index] = _parse_texts(pd.Series(np.char.strip(texts.to_numpy(dtype=str)), index=texts.index))
+        if not is_text.all():
+            result[is_text[~is_text].index] = pd.to_datetime(values[~is_text], errors='coerce', format='mixed')
+
+    return Coerced(result, result.isna().to_numpy())
+
+
+def to_date(series: pd.Series) -> Coerced:
+    """整列转换为 datetime.date（无法解析为 None）"""
+    parsed, nulls = to_datetime(series)
+    return Coerced(parsed.dt.date.astype(object).where(~nulls, None), nulls)
+
+
+def _parse_number_texts(texts: pd.Series, strip_chars: str) -> pd.Series:
+    """
+    字符串列解析为浮点数
+
+    去除 strip_chars 后整列转换；有无法解析的值时，只对形如数字的值
+    调用 pd.to_numeric（它对每个非法值抛出并捕获异常，日期等非数字列很慢）
+    """
+    chars = texts.to_numpy(dtype=str)
+    for char in strip_chars:
+        if (np.char.find(chars, char) >= 0).any():
+            chars = np.char.replace(chars, char, '')
+    chars = np.char.strip(chars)
+
+    try:
+        return pd.Series(chars.astype(float), index=texts.index)
+    except ValueError:
+        digits = np.char.replace(np.char.lstrip(chars, '+-'), '.', '', count=1)
+        candidate = np.char.isdigit(digits) | (np.char.find(chars, 'e') >= 0) | (np.char.find(chars, 'E') >= 0)
+
+        numbers = np.full(len(chars), np.nan)
+        if candidate.any():
+            numbers[candidate] = pd.to_numeric(pd.Series(chars[candidate]), errors='coerce').to_numpy(dtype=float)
+        return pd.Series(numbers, index=texts.index)
+
+
+def to_number(series: pd.Series, strip_chars: str = THOUSANDS_SEPARATORS) -> Coerced:
+    """
+    整列解析为浮点数（无法解析为 NaN）
+
+    Args:
+        series: 原始列
+        strip_chars: 解析前从字符串中去除的字符（默认千分位逗号）
+    """
+    if pd.api.types.is_bool_dtype(series):
+        numbers = series.astype(float)
+        return Coerced(numbers, numbers.isna().to_numpy())
+    if pd.api.types.is_numeric_dtype(series):
+        numbers = series.astype(float).replace([np.inf, -np.inf], np.nan)
+        return Coerced(numbers, numbers.isna().to_numpy())
+
+    is_text = _is_text(series)
+    numbers = pd.Series(np.nan, index=series.index)
+    if not is_text.all():
+        numbers[~is_text] = pd.to_numeric(series[~is_text], errors='coerce')
+    if is_text.any():
+        numbers[is_text] = _parse_number_texts(series[is_text], strip_chars)
+
+    numbers = numbers.astype(float).replace([np.inf, -np.inf], np.nan)
+    return Coerced(numbers, numbers.isna().to_numpy())
+
+
+def to_float(series: pd.Series, default: float = 0.0, strip_chars: str = THOUSANDS_SEPARATORS) -> Coerced:
+    """整列转换为浮点数（空值和无法解析为 default）"""
+    numbers, nulls = to_number(series, strip_chars)
+    return Coerced(numbers.fillna(default), nulls)
+
+
+def to_int(series: pd.Series, default: int = 0, strip_chars: str = THOUSANDS_SEPARATORS) -> Coerced:
+    """整列转换为整数（小数截断，空值和无法解析为 default）"""
+    numbers, nulls = to_number(series, strip_chars)
+    return Coerced(pd.Series(np.trunc(numbers), index=series.index).fillna(default).astype('int64'), nulls)
+
+
+def to_percent(series: pd.Series) -> Coerced:
+    """
+    整列解析百分比（去除千分位和百分号；大于 1 的值视为百分数，如 12.34% -> 0.1234）
+
+    无法解析为 NaN
+    """
+    numbers, nulls = to_number(series, THOUSANDS_SEPARATORS + ' %')
+    return Coerced(numbers.where(~(numbers > 1), numbers / 100), nulls)
+
+
+def to_bool(series: pd.Series, lookup: Optional[dict] = None) -> Coerced:
+    """
+    整列转换为布尔值（空值和未识别的取值为 False）
+
+    数值按非零判断，字符串去除空格、转小写后通过查找表映射
+
+    Args:
+        series: 原始列
+        lookup: 查找表（默认 BOOL_LOOKUP）
+    """
+    lookup = BOOL_LOOKUP if lookup is None else lookup
+
+    if pd.api.types.is_bool_dtype(series):
+        return Coerced(series.astype(bool), np.zeros(len(series), dtype=bool))
+    if pd.api.types.is_numeric_dtype(series):
+        return Coerced(series.fillna(0) != 0, series.isna().to_numpy())
+
+    is_text = _is_text(series)
+    mapped = series.where(is_text, '').astype(str).str.strip().str.lower().map(lookup)
+    numbers = pd.to_numeric(series.where(~is_text), errors='coerce')
+
+    values = (is_text & mapped.eq(True)) | (~is_text & numbers.fillna(0).ne(0))
+    nulls = (is_text & mapped.isna()) | (~is_text & numbers.isna())
+    return Coerced(values, nulls.to_numpy())
+
+
+def to_str(series: pd.Series) -> Coerced:
+    """整列转换为去除首尾空格的字符串（空值为 None）"""
+    nulls = series.isna()
+    text = series.astype(str).str.strip().astype(object)
+    return Coerced(text.where(~nulls, None), nulls.to_numpy())
+
@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+"""
+列名解析计划（每个文件的表头只解析一次）
+
+处理器为每个字段声明若干候选列名（中英文、新旧导出格式），原先在每一行、
+每个单元格取值时都要依次查找候选列名。ColumnPlan 按文件表头一次性解析：
+
+1. sources: 字段 -> 文件中实际使用的列名（按候选顺序取第一个存在的列，
+   都不存在时按 positions 中的列位置回退）
+2. missing_required: 缺少的必需列（每组取第一个名称，用于列验证错误信息）
+3. missing_optional: 文件中没有的可选字段（取值时按空列处理）
+
+验证列、去重、整表/逐行转换都通过同一个计划取列
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import pandas as pd
+
+
+def aliases_from_mapping(mapping: Dict[str, str]) -> Dict[str, List[str]]:
+    """
+    由 COLUMN_MAPPING（列名 -> 字段）生成每个字段的候选列名
+
+    候选顺序与 COLUMN_MAPPING 中的顺序一致，字段名本身作为最后一个候选
+    """
+    aliases = {}
+    for column, field in mapping.items():
+        names = aliases.setdefault(field, [])
+        if column not in names:
+            names.append(column)
+    for field, names in aliases.items():
+        if field not in names:
+            names.append(field)
+    return aliases
+
+
+class ColumnPlan:
+    """文件表头的列名解析结果"""
+
+    def __init__(
+        self,
+        columns: Tuple[str, ...],
+        sources: Dict[str, str],
+        missing_required: List[str],
+        missing_optional: List[str]
+    ):
+        self.columns = columns
+        self.sources = sources
+        self.missing_required = missing_required
+        self.missing_optional = missing_optional
+
+    @classmethod
+    def compile(
+        cls,
+        columns: Iterable[str],
+        aliases: Dict[str, Sequence[str]],
+        required: Sequence[Union[str, Sequence[str]]] = (),
+        positions: Optional[Dict[str, int]] = None
+    ) -> 'ColumnPlan':
+        """
+        按文件表头解析列名
+
+        Args:
+            columns: 文件列名（顺序即列位置）
+            aliases: {字段: [候选列名, ...]}（按优先级）
+            required: 必需列（get_required_columns 的返回值：列名或候选列名列表）
+            positions: {字段: 列位置}，候选列名都不存在时按位置取列
+
+        Returns:
+            ColumnPlan
+        """
+        columns = tuple(columns)
+        present = set(columns)
+        positions = positions or {}
+
+        sources = {}
+        missing_optional = []
+        for field, names in aliases.items():
+            source = next((name for name in names if name in present), None)
+            if source is None and field in positions and positions[field] < len(columns):
+                source = columns[positions[field]]
+            if source is None:
+                missing_optional.append(field)
+            else:
+                sources[field] = source
+
+        missing_required = []
+        for group in required:
+            options = [group] if isinstance(group, str) else list(group)
+            if not any(name in present for name in options):
+                missing_required.append(options[0])
+
+        # 必需列对应的字段不算作缺少的可选字段
+        required_names = {name for group in required for name in ([group] if isinstance(group, str) else group)}
+        missing_optional = [
+            field for field in missing_optional
+            if not required_names.intersection(aliases[field])
+        ]
+
+        return cls(columns, sources, missing_required, missing_optional)
+
+    def source(self, field: str) -> Optional[str]:
+        """字段对应的文件列名（文件中没有时为 None）"""
+        return self.sources.get(field)
+
+    def column(self, df: pd.DataFrame, field: str) -> pd.Series:
+        """取字段对应的列，文件中没有时返回与 df 同索引的全空列"""
+        source = self.sources.get(field)
+        if source is None:
+            return pd.Series(None, index=df.index, dtype=object)
+        return df[source]
+
+    def value(self, row: pd.Series, field: str) -> Any:
+        """取单行中字段对应的值，文件中没有时返回 None"""
+        source = self.sources.get(field)
+        if source is None:
+            return None
+        return row[source]
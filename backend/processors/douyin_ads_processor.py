@@ -47,17 +47,7 @@ class DouyinAdsProcessor(DataProcessor):
         df_cols = df.columns.tolist()
 
         # 首先尝试通过列名匹配
-        missing_cols = []
-        for col_group in required_cols:
-            # col_group 可能是字符串或列表
-            if isinstance(col_group, str):
-                col_options = [col_group]
-            else:
-                col_options = col_group
-
-            # 检查是否至少有一个列名存在
-            if not any(col in df_cols for col in col_options):
-                missing_cols.append(col_options[0])
+        missing_cols = self._missing_required_columns(df_cols)
 
         # 如果所有列都缺失（列名损坏），尝试通过位置识别
         if len(missing_cols) == len(required_cols) and len(df.columns) >= 6:
@@ -92,17 +82,9 @@ class DouyinAdsProcessor(DataProcessor):
                 df.rename(columns=new_columns, inplace=True)
                 print(f"[抖音广告] 列已重命名: {list(df.columns[:7])}")
 
-                # 重新验证
+                # 重新验证（表头已变化，列名解析计划重新生成）
                 df_cols = df.columns.tolist()
-                missing_cols = []
-                for col_group in required_cols:
-                    if isinstance(col_group, str):
-                        col_options = [col_group]
-                    else:
-                        col_options = col_group
-
-                    if not any(col in df_cols for col in col_options):
-                        missing_cols.append(col_options[0])
+                missing_cols = self._missing_required_columns(df_cols)
 
         if missing_cols:
             self.errors.append(f"缺少必需列: {', '.join(missing_cols)}")
@@ -123,22 +105,21 @@ class DouyinAdsProcessor(DataProcessor):
     def validate_row(self, row: pd.Series) -> Tuple[bool, Optional[str]]:
         """验证单行数据"""
         # 验证日期
-        date_value = self._get_column_value(row, ['时间-天', '时间', '日期', 'date'])
+        date_value = self.field_value(row, 'date')
         if pd.isna(date_value) or not date_value:
             return False, "日期为空"
 
-        try:
-            self.safe_date(date_value)
-        except:
+        # safe_date 解析失败时返回 None（不抛异常）
+        if self.safe_date(date_value) is None:
             return False, f"日期格式错误: {date_value}"
 
         # 验证账号ID
-        account_id = self._get_column_value(row, ['账户ID', 'account_id'])
+        account_id = self.field_value(row, 'account_id')
         if pd.isna(account_id) or not account_id:
             return False, "账户ID为空"
 
         # 验证花费（优先使用'消耗'列）
-        cost_value = self._get_column_value(row, ['消耗', '花费', 'cost'])
+        cost_value = self.field_value(row, 'cost')
         if cost_value is not None and not pd.isna(cost_value):
             cost = self.safe_float(cost_value)
             if cost < 0:
@@ -157,18 +138,56 @@ class DouyinAdsProcessor(DataProcessor):
             字段字典
         """
         return {
-            'date': self.safe_date(self._get_column_value(row, ['时间-天', '时间', '日期', 'date'])),
-            'account_id': self.safe_str(self._get_column_value(row, ['账户ID', 'account_id'])),
-            'cost': self.safe_float(self._get_column_value(row, ['消耗', '花费', 'cost'])),
-            'impressions': self.safe_int(self._get_column_value(row, ['展示数', '展现数', '展现', '展现量', 'impressions'])),
-            'clicks': self.safe_int(self._get_column_value(row, ['点击数', '点击', '点击量', 'clicks'])),
-            'conversions': self.safe_int(self._get_column_value(row, ['转化数', '转化', 'conversions']))
+            'date': self.safe_date(self.field_value(row, 'date')),
+            'account_id': self.safe_str(self.field_value(row, 'account_id')),
+            'cost': self.safe_float(self.field_value(row, 'cost')),
+            'impressions': self.safe_int(self.field_value(row, 'impressions')),
+            'clicks': self.safe_int(self.field_value(row, 'clicks')),
+            'conversions': self.safe_int(self.field_value(row, 'conversions'))
         }
 
+    def validate_frame(self, df: pd.DataFrame) -> Tuple[pd.Series, pd.Series]:
+        """整表验证（规则与 validate_row 一致）"""
+        messages = self.frame_errors(df)
+
+        # 验证日期
+        date_values = self.field_column(df, 'date')
+        self.frame_add_error(messages, self.frame_blank(date_values), "日期为空")
+        self.frame_add_error(
+            messages,
+            self.frame_datetime(date_values).isna(),
+            "日期格式错误: " + date_values.astype(str)
+        )
+
+        # 验证账号ID
+        account_ids = self.field_column(df, 'account_id')
+        self.frame_add_error(messages, self.frame_blank(account_ids), "账户ID为空")
+
+        # 验证花费（优先使用'消耗'列）
+        cost = self.frame_float(self.field_column(df, 'cost'))
+        self.frame_add_error(messages, cost < 0, "花费不能为负数: " + cost.astype(str))
+
+        return messages.isna(), messages
+
+    def transform_frame(self, df: pd.DataFrame) -> pd.DataFrame:
+        """整表转换为模型字段（与 process_row 一致）"""
+        return pd.DataFrame({
+            'date': self.frame_date(self.field_column(df, 'date')),
+            'account_id': self.frame_str(self.field_column(df, 'account_id')),
+            'cost': self.frame_float(self.field_column(df, 'cost')),
+            'impressions': self.frame_int(self.field_column(df, 'impressions')),
+            'clicks': self.frame_int(self.field_column(df, 'clicks')),
+            'conversions': self.frame_int(self.field_column(df, 'conversions'))
+        }, index=df.index)
+
     def get_model_class(self):
         """获取模型类"""
         return RawAdDataDouyin
 
+    def get_date_field(self) -> str:
+        """平台导出为日期窗口快照，支持按日期范围替换导入"""
+        return 'date'
+
     def get_platform_name(self) -> str:
         """获取平台名称"""
         return '抖音'
@@ -176,10 +195,3 @@ class DouyinAdsProcessor(DataProcessor):
     def get_unique_fields(self) -> List[str]:
         """获取唯一性字段"""
         return ['date', 'account_id']
-
-    def _get_column_value(self, row: pd.Series, column_names: List[str]) -> Any:
-        """获取列值（支持多个候选列名）"""
-        for col_name in column_names:
-            if col_name in row.index:
-                return row[col_name]
-        return None
@@ -50,22 +50,21 @@ class TencentAdsProcessor(DataProcessor):
             (是否有效, 错误信息)
         """
         # 验证日期
-        date_value = self._get_column_value(row, ['日期', 'date'])
+        date_value = self.field_value(row, 'date')
         if pd.isna(date_value) or not date_value:
             return False, "日期为空"
 
-        try:
-            self.safe_date(date_value)
-        except:
+        # safe_date 解析失败时返回 None（不抛异常）
+        if self.safe_date(date_value) is None:
             return False, f"日期格式错误: {date_value}"
 
         # 验证账号ID
-        account_id = self._get_column_value(row, ['账户ID', 'account_id'])
+        account_id = self.field_value(row, 'account_id')
         if pd.isna(account_id) or not account_id:
             return False, "账户ID为空"
 
         # 验证花费（必须为非负数）
-        cost_value = self._get_column_value(row, ['花费', 'cost'])
+        cost_value = self.field_value(row, 'cost')
         if cost_value is not None and not pd.isna(cost_value):
             cost = self.safe_float(cost_value)
             # 确保cost是数值类型
@@ -87,18 +86,73 @@ class TencentAdsProcessor(DataProcessor):
             字段字典
         """
         return {
-            'date': self.safe_date(self._get_column_value(row, ['日期', 'date'])),
-            'account_id': self.safe_str(self._get_column_value(row, ['账户ID', 'account_id'])),
-            'cost': self.safe_float(self._get_column_value(row, ['花费', 'cost'])),
-            'impressions': self.safe_int(self._get_column_value(row, ['曝光量', '曝光次数', 'impressions'])),
-            'clicks': self.safe_int(self._get_column_value(row, ['点击量', '点击次数', 'clicks'])),
-            'click_users': self.safe_int(self._get_column_value(row, ['点击用户', '点击人数', 'click_users']))
+            'date': self.safe_date(self.field_value(row, 'date')),
+            'account_id': self.safe_str(self.field_value(row, 'account_id')),
+            'cost': self.safe_float(self.field_value(row, 'cost')),
+            'impressions': self.safe_int(self.field_value(row, 'impressions')),
+            'clicks': self.safe_int(self.field_value(row, 'clicks')),
+            'click_users': self.safe_int(self.field_value(row, 'click_users'))
         }
 
+    def validate_frame(self, df: pd.DataFrame) -> Tuple[pd.Series, pd.Series]:
+        """
+        整表验证（规则与 validate_row 一致）
+
+        Args:
+            df: DataFrame
+
+        Returns:
+            (有效行掩码, 错误信息)
+        """
+        messages = self.frame_errors(df)
+
+        # 验证日期
+        date_values = self.field_column(df, 'date')
+        date_blank = self.frame_blank(date_values)
+        self.frame_add_error(messages, date_blank, "日期为空")
+        self.frame_add_error(
+            messages,
+            self.frame_datetime(date_values).isna(),
+            "日期格式错误: " + date_values.astype(str)
+        )
+
+        # 验证账号ID
+        account_ids = self.field_column(df, 'account_id')
+        self.frame_add_error(messages, self.frame_blank(account_ids), "账户ID为空")
+
+        # 验证花费（必须为非负数）
+        cost = self.frame_float(self.field_column(df, 'cost'))
+        self.frame_add_error(messages, cost < 0, "花费不能为负数: " + cost.astype(str))
+
+        return messages.isna(), messages
+
+    def transform_frame(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        整表转换为模型字段（与 process_row 一致）
+
+        Args:
+            df: DataFrame
+
+        Returns:
+            模型字段 DataFrame
+        """
+        return pd.DataFrame({
+            'date': self.frame_date(self.field_column(df, 'date')),
+            'account_id': self.frame_str(self.field_column(df, 'account_id')),
+            'cost': self.frame_float(self.field_column(df, 'cost')),
+            'impressions': self.frame_int(self.field_column(df, 'impressions')),
+            'clicks': self.frame_int(self.field_column(df, 'clicks')),
+            'click_users': self.frame_int(self.field_column(df, 'click_users'))
+        }, index=df.index)
+
     def get_model_class(self):
         """获取 SQLAlchemy 模型类"""
         return RawAdDataTencent
 
+    def get_date_field(self) -> str:
+        """平台导出为日期窗口快照，支持按日期范围替换导入"""
+        return 'date'
+
     def get_platform_name(self) -> str:
         """获取平台名称"""
         return '腾讯'
@@ -111,19 +165,3 @@ class TencentAdsProcessor(DataProcessor):
             ['date', 'account_id']
         """
         return ['date', 'account_id']
-
-    def _get_column_value(self, row: pd.Series, column_names: List[str]) -> Any:
-        """
-        获取列值（支持多个候选列名）
-
-        Args:
-            row: pandas Series
-            column_names: 候选列名列表
-
-        Returns:
-            列值
-        """
-        for col_name in column_names:
-            if col_name in row.index:
-                return row[col_name]
-        return None
@@ -3,6 +3,7 @@
 小红书内容笔记日级数据处理器
 """
 
+from backend.processors import coercion
 from backend.processors.base_processor import DataProcessor
 from backend.models import XhsNotesContentDaily, XhsNoteInfo
 from typing import Dict, List, Tuple, Any, Optional
@@ -135,12 +136,12 @@ class XhsNotesContentDailyProcessor(DataProcessor):
     def validate_row(self, row: pd.Series) -> Tuple[bool, Optional[str]]:
         """验证单行数据"""
         # 验证数据日期
-        data_date_value = self._get_column_value(row, ['数据日期', 'data_date'])
+        data_date_value = self.field_value(row, 'data_date')
         if not data_date_value:
             return False, "数据日期为空"
 
         # 验证笔记ID
-        note_id = self._get_column_value(row, ['笔记id', 'note_id'])
+        note_id = self.field_value(row, 'note_id')
         if not note_id:
             return False, "笔记ID为空"
 
@@ -158,27 +159,72 @@ class XhsNotesContentDailyProcessor(DataProcessor):
         """
         return {
             # 核心ID
-            'data_date': self._safe_parse_date(self._get_column_value(row, ['数据日期', 'data_date'])),
-            'note_id': self.safe_str(self._get_column_value(row, ['笔记id', 'note_id'])),
+            'data_date': self._safe_parse_date(self.field_value(row, 'data_date')),
+            'note_id': self.safe_str(self.field_value(row, 'note_id')),
 
             # 笔记基础信息（v3.1 恢复）
-            'note_title': self.safe_str(self._get_column_value(row, ['笔记名称', 'note_title'])),
-            'note_url': self.safe_str(self._get_column_value(row, ['笔记链接', 'note_url'])),
-            'note_publish_time': self._safe_parse_datetime(self._get_column_value(row, ['笔记发布时间', 'note_publish_time'])),
-            'note_source': self.safe_str(self._get_column_value(row, ['笔记来源', 'note_source'])),
-            'note_type': self.safe_str(self._get_column_value(row, ['笔记类型', 'note_type'])),
+            'note_title': self.safe_str(self.field_value(row, 'note_title')),
+            'note_url': self.safe_str(self.field_value(row, 'note_url')),
+            'note_publish_time': self._safe_parse_datetime(self.field_value(row, 'note_publish_time')),
+            'note_source': self.safe_str(self.field_value(row, 'note_source')),
+            'note_type': self.safe_str(self.field_value(row, 'note_type')),
 
             # 创作者信息
-            'creator_name': self.safe_str(self._get_column_value(row, ['笔记创作者名称', 'creator_name'])),
-            'creator_id': self.safe_str(self._get_column_value(row, ['笔记创作者ID', 'creator_id'])),
-            'creator_followers': self._safe_parse_int_comma(self._get_column_value(row, ['作者粉丝量', 'creator_followers'])),
+            'creator_name': self.safe_str(self.field_value(row, 'creator_name')),
+            'creator_id': self.safe_str(self.field_value(row, 'creator_id')),
+            'creator_followers': self._safe_parse_int_comma(self.field_value(row, 'creator_followers')),
 
             # 运营指标
-            'total_impressions': self._safe_parse_int_comma(self._get_column_value(row, ['全部曝光量', 'total_impressions'])),
-            'total_reads': self._safe_parse_int_comma(self._get_column_value(row, ['全部阅读量', 'total_reads'])),
-            'total_interactions': self._safe_parse_int_comma(self._get_column_value(row, ['全部互动量', 'total_interactions'])),
+            'total_impressions': self._safe_parse_int_comma(self.field_value(row, 'total_impressions')),
+            'total_reads': self._safe_parse_int_comma(self.field_value(row, 'total_reads')),
+            'total_interactions': self._safe_parse_int_comma(self.field_value(row, 'total_interactions')),
         }
 
+    def validate_frame(self, df: pd.DataFrame) -> Tuple[pd.Series, pd.Series]:
+        """整表验证（数据日期无法解析的行同样视为失败）"""
+        messages = self.frame_errors(df)
+
+        # 验证数据日期
+        date_values = self.field_column(df, 'data_date')
+        self.frame_add_error(messages, self.frame_blank(date_values), "数据日期为空")
+        self.frame_add_error(
+            messages,
+            self.frame_datetime(date_values).isna(),
+            "数据日期格式错误: " + date_values.astype(str)
+        )
+
+        # 验证笔记ID
+        note_ids = self.field_column(df, 'note_id')
+        self.frame_add_error(messages, self.frame_blank(note_ids), "笔记ID为空")
+
+        return messages.isna(), messages
+
+    def transform_frame(self, df: pd.DataFrame) -> pd.DataFrame:
+        """整表转换为模型字段（与 process_row 一致）"""
+        col = lambda field: self.field_column(df, field)
+        return pd.DataFrame({
+            # 核心ID
+            'data_date': self.frame_date(col('data_date')),
+            'note_id': self.frame_str(col('note_id')),
+
+            # 笔记基础信息
+            'note_title': self.frame_str(col('note_title')),
+            'note_url': self.frame_str(col('note_url')),
+            'note_publish_time': self._frame_parse_datetime(col('note_publish_time')),
+            'note_source': self.frame_str(col('note_source')),
+            'note_type': self.frame_str(col('note_type')),
+
+            # 创作者信息
+            'creator_name': self.frame_str(col('creator_name')),
+            'creator_id': self.frame_str(col('creator_id')),
+            'creator_followers': self._frame_parse_int_comma(col('creator_followers')),
+
+            # 运营指标
+            'total_impressions': self._frame_parse_int_comma(col('total_impressions')),
+            'total_reads': self._frame_parse_int_comma(col('total_reads')),
+            'total_interactions': self._frame_parse_int_comma(col('total_interactions')),
+        }, index=df.index)
+
     def get_model_class(self):
         """获取模型类"""
         return XhsNotesContentDaily
@@ -187,13 +233,6 @@ class XhsNotesContentDailyProcessor(DataProcessor):
         """获取唯一性字段"""
         return ['data_date', 'note_id']
 
-    def _get_column_value(self, row: pd.Series, column_names: List[str]) -> Any:
-        """获取列值（支持多个候选列名）"""
-        for col_name in column_names:
-            if col_name in row.index:
-                return row[col_name]
-        return None
-
     def _safe_parse_date(self, value) -> Optional[datetime]:
         """安全解析日期（YYYYMMDD格式）"""
         if pd.isna(value) or not value:
@@ -233,6 +272,18 @@ class XhsNotesContentDailyProcessor(DataProcessor):
         except:
             return None
 
+    def _frame_parse_datetime(self, series: pd.Series) -> pd.Series:
+        """整列解析日期时间（YYYY/MM/DD HH:MM格式）"""
+        if pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series):
+            series = series.map(
+                lambda v: v.replace('/', '-').replace('\\', '-') if isinstance(v, str) else v
+            )
+        return self.frame_datetime(series)
+
+    def _frame_parse_int_comma(self, series: pd.Series) -> pd.Series:
+        """整列解析整数（去除逗号和空格）"""
+        return coercion.to_int(series, strip_chars=coercion.THOUSANDS_SEPARATORS + ' ').values
+
     def _safe_parse_int_comma(self, value) -> Optional[int]:
         """安全解析整数（去除逗号和空格）"""
         if pd.isna(value) or value == '':
@@ -3,23 +3,39 @@
 小红书内容笔记日级数据处理器 - 高性能版
 
 优化策略：
-1. 预处理：只加载现有数据的 (data_date, note_id) 唯一键到内存
+1. 预处理：只加载文件日期范围内现有数据的 (data_date, note_id) 唯一键到内存
 2. 增量过滤：快速过滤掉已存在的记录
 3. 批量插入：只插入新增的记录
+4. 集合式替换：每批唯一键写入临时表，一条 DELETE 删除旧记录，再一次 Core INSERT 批量插入
+5. 同一事务内维护笔记最新维度表 note_latest_dimensions（聚合补充维度用）
 
 性能提升：
 - 旧方案：82,000 次数据库查询（每条记录查询一次是否存在）
-- 新方案：1 次数据库查询 + 内存去重（O(1)查询）
+- 新方案：1 次数据库查询（按文件日期范围）+ 内存去重（O(1)查询）
+- 写入：每批 1 条 DELETE + 1 次 executemany（原来每条记录一条 DELETE + 一个 ORM 对象）
 """
-from backend.processors.base_processor import DataProcessor
+from backend.processors import coercion
+from backend.processors.base_processor import DataProcessor, ImportCancelled
 from backend.models import XhsNotesContentDaily, XhsNoteInfo
 from typing import Dict, List, Tuple, Any, Optional
 import pandas as pd
 from datetime import datetime
+from sqlalchemy import Column, Date, MetaData, String, Table, delete, insert, select, tuple_
+from backend.utils.existing_keys import ExistingKeyIndex
+from backend.utils.note_dimensions import upsert_latest_dimensions
 import logging
 
 logger = logging.getLogger(__name__)
 
+# 批次唯一键临时表（连接级 TEMP 表，每批写入前清空）
+REPLACE_KEYS_TABLE = Table(
+    'tmp_xhs_notes_content_daily_keys',
+    MetaData(),
+    Column('data_date', Date),
+    Column('note_id', String(100)),
+    prefixes=['TEMPORARY']
+)
+
 
 class XhsNotesContentDailyProcessorFast(DataProcessor):
     """小红书内容笔记日级数据处理器 - 高性能版"""
@@ -51,8 +67,8 @@ class XhsNotesContentDailyProcessorFast(DataProcessor):
     def __init__(self, db_session):
         super().__init__(db_session)
 
-        # 实例变量：每次导入时重新初始化缓存
-        self._existing_records_cache = set()
+        # 实例变量：每次导入时按文件日期范围重新加载
+        self._existing_keys = ExistingKeyIndex()
         self._cache_initialized = False
 
         self.stats = {
@@ -65,7 +81,7 @@ class XhsNotesContentDailyProcessorFast(DataProcessor):
         }
 
     def import_data(self, filepath: str, overwrite: bool = False, batch_size: int = 1000,
-                    progress_callback=None) -> Dict[str, Any]:
+                    progress_callback=None, replace_range: bool = False) -> Dict[str, Any]:
         """
         导入数据（高性能版）
 
@@ -74,6 +90,7 @@ class XhsNotesContentDailyProcessorFast(DataProcessor):
             overwrite: 是否覆盖模式（暂不支持，始终为增量模式）
             batch_size: 批次大小
             progress_callback: 进度回调函数
+            replace_range: 不支持（始终为增量模式）
 
         Returns:
             导入结果字典
@@ -84,16 +101,17 @@ class XhsNotesContentDailyProcessorFast(DataProcessor):
                 progress_callback(5, '正在读取文件...')
 
             # 使用基类的文件读取方法
-            if filepath.endswith('.csv'):
-                df, self.detected_encoding = self.read_csv_safe(filepath)
-            elif filepath.endswith(('.xlsx', '.xls')):
-                df, self.detected_encoding = self.read_excel_safe(filepath)
-            else:
+            if not filepath.endswith(('.csv', '.xlsx', '.xls')):
                 return {
                     'success': False,
                     'error': '不支持的文件格式',
                     'message': '不支持的文件格式，仅支持 .csv, .xlsx, .xls'
                 }
+            with self.metrics.stage('read'):
+                if filepath.endswith('.csv'):
+                    df, self.detected_encoding = self.read_csv_safe(filepath)
+                else:
+                    df, self.detected_encoding = self.read_excel_safe(filepath)
 
             if df is None or df.empty:
                 return {
@@ -102,21 +120,24 @@ class XhsNotesContentDailyProcessorFast(DataProcessor):
                     'message': '文件为空或读取失败'
                 }
 
+            # 验证必需列（同时按表头生成列名解析计划，后续过滤和转换复用）
+            with self.metrics.stage('columns'):
+                columns_valid = self.validate_columns(df)
+            if not columns_valid:
+                return {
+                    'success': False,
+                    'error': f"列验证失败: {self.errors}",
+                    'message': f"列验证失败: {self.errors}"
+                }
+
             self.stats['total_rows'] = len(df)
 
-            # 步骤 2: 初始化缓存（只执行一次）
+            # 步骤 2-3: 加载文件日期范围内的现有数据索引，过滤增量数据
             if progress_callback:
                 progress_callback(10, '正在加载现有数据索引...')
 
-            self._initialize_existing_cache()
-
-            logger.info(f"现有记录索引加载完成，共 {len(self._existing_records_cache):,} 条")
-
-            # 步骤 3: 预处理 - 过滤增量数据
-            if progress_callback:
-                progress_callback(20, '正在分析增量数据...')
-
-            df_new = self._filter_incremental_data(df)
+            with self.metrics.stage('dedup'):
+                df_new = self._filter_incremental_data(df)
 
             self.stats['existing_rows'] = self.stats['total_rows'] - len(df_new)
             self.stats['new_rows'] = len(df_new)
@@ -166,6 +187,9 @@ class XhsNotesContentDailyProcessorFast(DataProcessor):
                 'encoding': self.detected_encoding
             }
 
+        except ImportCancelled:
+            self.db_session.rollback()
+            raise
         except Exception as e:
             logger.error(f"导入失败: {str(e)}")
             import traceback
@@ -176,36 +200,32 @@ class XhsNotesContentDailyProcessorFast(DataProcessor):
                 'message': f'导入失败: {str(e)}'
             }
 
-    def _initialize_existing_cache(self):
+    def _initialize_existing_cache(self, min_date=None, max_date=None):
         """
         初始化现有数据索引（每次导入时重新加载）
 
-        只加载 (data_date, note_id) 唯一键到内存集合，用于快速去重
+        只加载 [min_date, max_date] 内的 (data_date, note_id) 唯一键，用于快速去重
 
         注意：每次导入时重新加载，确保获取最新的数据库状态
         """
-        logger.info("正在加载现有数据索引...")
+        logger.info(f"正在加载现有数据索引: {min_date} ~ {max_date}")
 
-        # 批量加载所有唯一键
-        existing_records = self.db_session.query(
+        self._existing_keys = ExistingKeyIndex.load(
+            self.db_session,
             XhsNotesContentDaily.data_date,
-            XhsNotesContentDaily.note_id
-        ).all()
-
-        # 转换为字符串格式的唯一键（与_filter_incremental_data中的格式一致）
-        self._existing_records_cache = set(
-            f'{rec[0].strftime("%Y-%m-%d") if isinstance(rec[0], datetime) else str(rec[0])}|{rec[1]}'
-            for rec in existing_records
+            XhsNotesContentDaily.note_id,
+            min_date,
+            max_date
         )
 
         self._cache_initialized = True
-        logger.info(f"索引加载完成：{len(self._existing_records_cache):,} 条记录")
+        logger.info(f"索引加载完成：{len(self._existing_keys):,} 条记录")
 
     def _filter_incremental_data(self, df: pd.DataFrame) -> pd.DataFrame:
         """
         过滤增量数据（只返回不存在的记录）
 
-        使用内存集合快速过滤，避免逐条查询数据库
+        按文件中的日期范围加载现有唯一键，使用内存索引快速过滤，避免逐条查询数据库
 
         Args:
             df: 原始数据框
@@ -213,19 +233,14 @@ class XhsNotesContentDailyProcessorFast(DataProcessor):
         Returns:
             只包含新数据的 DataFrame
         """
-        # 构造唯一键列
-        # 注意：需要将 Excel 中的 YYYYMMDD 格式转换为 YYYY-MM-DD 格式
-        # 以匹配数据库中的格式（第197行：strftime('%Y-%m-%d')）
-        df['_temp_date'] = pd.to_datetime(df['数据日期'].astype(str), format='%Y%m%d', errors='coerce')
-        df['_unique_key'] = df['_temp_date'].dt.strftime('%Y-%m-%d') + '|' + df['笔记id'].astype(str)
+        # 注意：需要将 Excel 中的 YYYYMMDD 格式转换为日期，以匹配数据库中的 data_date
+        data_dates = pd.to_datetime(self.field_column(df, 'data_date').astype(str), format='%Y%m%d', errors='coerce')
 
-        # 找出不存在的记录
-        df_new = df[~df['_unique_key'].isin(self._existing_records_cache)]
-
-        # 删除临时列
-        df_new = df_new.drop(['_unique_key', '_temp_date'], axis=1)
+        self._initialize_existing_cache(*ExistingKeyIndex.date_bounds(data_dates.dropna()))
 
-        return df_new
+        # 找出不存在的记录
+        exists = self._existing_keys.mask(data_dates, self.field_column(df, 'note_id').astype(str))
+        return df[~exists]
 
     def _batch_import(self, df: pd.DataFrame, batch_size: int, progress_callback=None) -> Tuple[int, int, int]:
         """
@@ -242,94 +257,184 @@ class XhsNotesContentDailyProcessorFast(DataProcessor):
         Returns:
             (插入数量, 更新数量, 失败数量)
         """
-        total_rows = len(df)
+        # 整表验证 + 转换（一次完成，不再逐行 iterrows）
+        with self.metrics.stage('transform'):
+            records, prepare_failed = self.prepare_records(df)
+        with self.metrics.stage('write'):
+            inserted, updated, failed = self._write_records(records, batch_size, progress_callback)
+        return inserted, updated, failed + prepare_failed
+
+    def write_parsed(self, parsed: Dict[str, Any], overwrite: bool = False, batch_size: int = 1000,
+                     replace_range: bool = False) -> Dict[str, Any]:
+        """
+        写入解析结果（与 import_data 相同：只导入数据库中不存在的 data_date + note_id）
+
+        Args:
+            parsed: parse_file() 返回的字典
+            overwrite: 是否覆盖模式（暂不支持，始终为增量模式）
+            batch_size: 批次大小
+            replace_range: 不支持（始终为增量模式）
+
+        Returns:
+            导入结果字典
+        """
+        self.metrics.merge_stages(parsed.get('stages'))
+        with self.metrics.stage('dedup'):
+            self._initialize_existing_cache(
+                *ExistingKeyIndex.date_bounds(data.get('data_date') for _, data in parsed['records'])
+            )
+
+            records = [
+                (idx, data) for idx, data in parsed['records']
+                if not self._existing_keys.contains(data.get('data_date'), data.get('note_id'))
+            ]
+        existing_rows = len(parsed['records']) - len(records)
+
+        try:
+            with self.metrics.stage('write'):
+                inserted, updated, failed = self._write_records(records, batch_size)
+        except ImportCancelled:
+            raise
+        except Exception as e:
+            self.db_session.rollback()
+            return {
+                'success': False,
+                'error': str(e),
+                'message': f'导入失败: {str(e)}'
+            }
+
+        failed += parsed['failed_rows']
+        return {
+            'success': True,
+            'message': f'成功导入 {inserted:,} 条新数据',
+            'total_rows': parsed['total_rows'],
+            'processed_rows': parsed['total_rows'],
+            'inserted_rows': inserted,
+            'updated_rows': updated,
+            'failed_rows': failed,
+            'existing_rows': existing_rows,
+            'new_rows': len(records),
+            'encoding': parsed.get('encoding')
+        }
+
+    def _write_records(
+        self,
+        records: List[Tuple[Any, Dict[str, Any]]],
+        batch_size: int,
+        progress_callback=None
+    ) -> Tuple[int, int, int]:
+        """
+        分批写入记录（集合式替换：删除相同 data_date + note_id 的旧记录，再批量插入）
+
+        每批：
+        1. 批次唯一键写入临时表
+        2. DELETE … WHERE (data_date, note_id) IN (SELECT … FROM 临时表)（走唯一索引）
+        3. Core INSERT executemany 插入整批记录
+        4. UPSERT 本批笔记的最新维度（note_latest_dimensions）
+
+        Returns:
+            (插入数量, 更新数量, 失败数量)
+        """
         inserted = 0
         updated = 0
         failed = 0
 
+        table = XhsNotesContentDaily.__table__
+
         # 分批处理
-        for i in range(0, total_rows, batch_size):
-            batch_end = min(i + batch_size, total_rows)
-            df_batch = df.iloc[i:batch_end]
+        for i in range(0, len(records), batch_size):
+            batch_end = min(i + batch_size, len(records))
+            batch_records = records[i:batch_end]
 
-            batch_inserted = 0
-            batch_updated = 0
             batch_failed = 0
 
-            # 准备本批次的数据
-            records_to_insert = []
-            unique_keys = []
-
-            for _, row in df_batch.iterrows():
-                try:
-                    # 验证数据
-                    is_valid, error_msg = self.validate_row(row)
-                    if not is_valid:
-                        batch_failed += 1
-                        continue
-
-                    # 处理数据
-                    data = self.process_row(row)
-
-                    # 额外验证：检查解析后的必需字段
-                    if data['data_date'] is None:
-                        logger.warning(f"日期解析失败，跳过该行: note_id={data['note_id']}, 原始值={row.get('数据日期', 'N/A')}")
-                        batch_failed += 1
-                        continue
-
-                    if not data['note_id']:
-                        logger.warning(f"笔记ID为空，跳过该行")
-                        batch_failed += 1
-                        continue
-
-                    records_to_insert.append(data)
-                    unique_keys.append((data['data_date'], data['note_id']))
-
-                except Exception as e:
-                    logger.warning(f"处理行失败: {str(e)}")
+            # 准备本批次的数据（同一批次内相同唯一键保留最后一条）
+            rows_by_key = {}
+
+            for _, data in batch_records:
+                # 额外验证：检查解析后的必需字段
+                if data['data_date'] is None:
+                    logger.warning(f"日期解析失败，跳过该行: note_id={data['note_id']}")
+                    batch_failed += 1
+                    continue
+
+                if not data['note_id']:
+                    logger.warning(f"笔记ID为空，跳过该行")
                     batch_failed += 1
+                    continue
+
+                rows_by_key[(data['data_date'], data['note_id'])] = {
+                    key: value for key, value in data.items() if key in table.c
+                }
 
-            # 第一步：删除已存在的记录（实现UPDATE效果）
             try:
-                if unique_keys:
-                    # 批量删除已存在的记录
-                    # 使用更简单的SQL：逐个删除（SQLite限制）
-                    deleted_count = 0
-                    for data_date, note_id in unique_keys:
-                        deleted = self.db_session.query(XhsNotesContentDaily).filter(
-                            XhsNotesContentDaily.data_date == data_date,
-                            XhsNotesContentDaily.note_id == note_id
-                        ).delete(synchronize_session=False)
-                        deleted_count += 1
-
-                    batch_updated = deleted_count  # 记录"更新"的数量
-
-                # 第二步：批量插入所有记录
-                for data in records_to_insert:
-                    record = XhsNotesContentDaily(**data)
-                    self.db_session.add(record)
-                    batch_inserted += 1
-
-                # 提交批次
-                self.db_session.commit()
+                with self.write_lane():
+                    batch_updated = 0
+                    if rows_by_key:
+                        # 第一步：删除已存在的记录（实现UPDATE效果）
+                        batch_updated = self._delete_existing_keys(list(rows_by_key.keys()))
+
+                        # 第二步：批量插入所有记录
+                        self.db_session.execute(insert(table), list(rows_by_key.values()))
+
+                        # 第三步：更新笔记最新维度（只有 data_date 不早于已记录日期时才更新）
+                        upsert_latest_dimensions(self.db_session, rows_by_key.values())
+
+                    # 提交批次（已请求取消时回滚本批次，之前提交的批次保留）
+                    self._check_cancelled()
+                    self.db_session.commit()
+                    self.committed_rows += len(batch_records)
+
+                batch_inserted = len(rows_by_key) - batch_updated
                 inserted += batch_inserted
                 updated += batch_updated
                 failed += batch_failed
 
                 # 更新进度
                 if progress_callback:
-                    progress = 30 + int(70 * (batch_end / total_rows))
-                    progress_callback(progress, f'进度: {batch_end}/{total_rows} ({inserted} 插入, {updated} 更新, {failed} 失败)')
+                    progress = 30 + int(70 * (batch_end / len(records)))
+                    progress_callback(progress, f'进度: {batch_end}/{len(records)} ({inserted} 插入, {updated} 更新, {failed} 失败)')
 
-                logger.info(f"批次提交成功: {batch_end}/{total_rows} ({batch_inserted} 插入, {batch_updated} 更新, {batch_failed} 失败)")
+                logger.info(f"批次提交成功: {batch_end}/{len(records)} ({batch_inserted} 插入, {batch_updated} 更新, {batch_failed} 失败)")
 
+            except ImportCancelled:
+                self.db_session.rollback()
+                raise
             except Exception as e:
                 self.db_session.rollback()
                 logger.error(f"批次提交失败: {str(e)}")
-                failed += batch_size
+                failed += len(batch_records)
 
         return inserted, updated, failed
 
+    def _delete_existing_keys(self, keys: List[Tuple[Any, str]]) -> int:
+        """
+        删除 (data_date, note_id) 在 keys 中的记录（一条 DELETE，在当前事务内执行）
+
+        唯一键先写入临时表再用子查询删除，不受 SQLite 参数个数限制
+
+        Returns:
+            删除的记录数
+        """
+        table = XhsNotesContentDaily.__table__
+        connection = self.db_session.connection()
+
+        REPLACE_KEYS_TABLE.create(connection, checkfirst=True)
+        connection.execute(delete(REPLACE_KEYS_TABLE))
+        connection.execute(
+            insert(REPLACE_KEYS_TABLE),
+            [{'data_date': data_date, 'note_id': note_id} for data_date, note_id in keys]
+        )
+
+        result = connection.execute(
+            delete(table).where(
+                tuple_(table.c.data_date, table.c.note_id).in_(
+                    select(REPLACE_KEYS_TABLE.c.data_date, REPLACE_KEYS_TABLE.c.note_id)
+                )
+            )
+        )
+        return result.rowcount
+
     def get_required_columns(self) -> List[List[str]]:
         """获取必需列"""
         return [
@@ -340,12 +445,12 @@ class XhsNotesContentDailyProcessorFast(DataProcessor):
     def validate_row(self, row: pd.Series) -> Tuple[bool, Optional[str]]:
         """验证单行数据"""
         # 验证数据日期
-        data_date_value = self._get_column_value(row, ['数据日期', 'data_date'])
+        data_date_value = self.field_value(row, 'data_date')
         if not data_date_value:
             return False, "数据日期为空"
 
         # 验证笔记ID
-        note_id = self._get_column_value(row, ['笔记id', 'note_id'])
+        note_id = self.field_value(row, 'note_id')
         if not note_id:
             return False, "笔记ID为空"
 
@@ -355,27 +460,72 @@ class XhsNotesContentDailyProcessorFast(DataProcessor):
         """处理单行数据"""
         return {
             # 核心ID
-            'data_date': self._safe_parse_date(self._get_column_value(row, ['数据日期', 'data_date'])),
-            'note_id': self.safe_str(self._get_column_value(row, ['笔记id', 'note_id'])),
+            'data_date': self._safe_parse_date(self.field_value(row, 'data_date')),
+            'note_id': self.safe_str(self.field_value(row, 'note_id')),
 
             # 笔记基础信息
-            'note_title': self.safe_str(self._get_column_value(row, ['笔记名称', 'note_title'])),
-            'note_url': self.safe_str(self._get_column_value(row, ['笔记链接', 'note_url'])),
-            'note_publish_time': self._safe_parse_datetime(self._get_column_value(row, ['笔记发布时间', 'note_publish_time'])),
-            'note_source': self.safe_str(self._get_column_value(row, ['笔记来源', 'note_source'])),
-            'note_type': self.safe_str(self._get_column_value(row, ['笔记类型', 'note_type'])),
+            'note_title': self.safe_str(self.field_value(row, 'note_title')),
+            'note_url': self.safe_str(self.field_value(row, 'note_url')),
+            'note_publish_time': self._safe_parse_datetime(self.field_value(row, 'note_publish_time')),
+            'note_source': self.safe_str(self.field_value(row, 'note_source')),
+            'note_type': self.safe_str(self.field_value(row, 'note_type')),
 
             # 创作者信息
-            'creator_name': self.safe_str(self._get_column_value(row, ['笔记创作者名称', 'creator_name'])),
-            'creator_id': self.safe_str(self._get_column_value(row, ['笔记创作者ID', 'creator_id'])),
-            'creator_followers': self._safe_parse_int_comma(self._get_column_value(row, ['作者粉丝量', 'creator_followers'])),
+            'creator_name': self.safe_str(self.field_value(row, 'creator_name')),
+            'creator_id': self.safe_str(self.field_value(row, 'creator_id')),
+            'creator_followers': self._safe_parse_int_comma(self.field_value(row, 'creator_followers')),
 
             # 运营指标
-            'total_impressions': self._safe_parse_int_comma(self._get_column_value(row, ['全部曝光量', 'total_impressions'])),
-            'total_reads': self._safe_parse_int_comma(self._get_column_value(row, ['全部阅读量', 'total_reads'])),
-            'total_interactions': self._safe_parse_int_comma(self._get_column_value(row, ['全部互动量', 'total_interactions'])),
+            'total_impressions': self._safe_parse_int_comma(self.field_value(row, 'total_impressions')),
+            'total_reads': self._safe_parse_int_comma(self.field_value(row, 'total_reads')),
+            'total_interactions': self._safe_parse_int_comma(self.field_value(row, 'total_interactions')),
         }
 
+    def validate_frame(self, df: pd.DataFrame) -> Tuple[pd.Series, pd.Series]:
+        """整表验证（数据日期无法解析的行同样视为失败）"""
+        messages = self.frame_errors(df)
+
+        # 验证数据日期
+        date_values = self.field_column(df, 'data_date')
+        self.frame_add_error(messages, self.frame_blank(date_values), "数据日期为空")
+        self.frame_add_error(
+            messages,
+            self.frame_datetime(date_values).isna(),
+            "数据日期格式错误: " + date_values.astype(str)
+        )
+
+        # 验证笔记ID
+        note_ids = self.field_column(df, 'note_id')
+        self.frame_add_error(messages, self.frame_blank(note_ids), "笔记ID为空")
+
+        return messages.isna(), messages
+
+    def transform_frame(self, df: pd.DataFrame) -> pd.DataFrame:
+        """整表转换为模型字段（与 process_row 一致）"""
+        col = lambda field: self.field_column(df, field)
+        return pd.DataFrame({
+            # 核心ID
+            'data_date': self.frame_date(col('data_date')),
+            'note_id': self.frame_str(col('note_id')),
+
+            # 笔记基础信息
+            'note_title': self.frame_str(col('note_title')),
+            'note_url': self.frame_str(col('note_url')),
+            'note_publish_time': self._frame_parse_datetime(col('note_publish_time')),
+            'note_source': self.frame_str(col('note_source')),
+            'note_type': self.frame_str(col('note_type')),
+
+            # 创作者信息
+            'creator_name': self.frame_str(col('creator_name')),
+            'creator_id': self.frame_str(col('creator_id')),
+            'creator_followers': self._frame_parse_int_comma(col('creator_followers')),
+
+            # 运营指标
+            'total_impressions': self._frame_parse_int_comma(col('total_impressions')),
+            'total_reads': self._frame_parse_int_comma(col('total_reads')),
+            'total_interactions': self._frame_parse_int_comma(col('total_interactions')),
+        }, index=df.index)
+
     def get_model_class(self):
         """获取模型类"""
         return XhsNotesContentDaily
@@ -384,13 +534,6 @@ class XhsNotesContentDailyProcessorFast(DataProcessor):
         """获取唯一性字段"""
         return ['data_date', 'note_id']
 
-    def _get_column_value(self, row: pd.Series, column_names: List[str]) -> Any:
-        """获取列值（支持多个候选列名）"""
-        for col_name in column_names:
-            if col_name in row.index:
-                return row[col_name]
-        return None
-
     @staticmethod
     def safe_str(value) -> Optional[str]:
         """安全转换为字符串"""
@@ -424,6 +567,18 @@ class XhsNotesContentDailyProcessorFast(DataProcessor):
         except:
             return None
 
+    def _frame_parse_datetime(self, series: pd.Series) -> pd.Series:
+        """整列解析日期时间（YYYY/MM/DD HH:MM格式）"""
+        if pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series):
+            series = series.map(
+                lambda v: v.replace('/', '-').replace('\\', '-') if isinstance(v, str) else v
+            )
+        return self.frame_datetime(series)
+
+    def _frame_parse_int_comma(self, series: pd.Series) -> pd.Series:
+        """整列解析整数（去除逗号和空格）"""
+        return coercion.to_int(series, strip_chars=coercion.THOUSANDS_SEPARATORS + ' ').values
+
     @staticmethod
     def _safe_parse_int_comma(value) -> Optional[int]:
         """安全解析整数（支持千分位）"""
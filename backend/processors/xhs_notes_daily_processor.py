@@ -66,6 +66,9 @@ class XhsNotesDailyProcessor(DataProcessor):
         '私信留资人数': 'private_message_leads',
     }
 
+    # 私信进线数列名无法匹配时，使用位置14（第15列）作为回退
+    COLUMN_POSITIONS = {'private_message_leads': 14}
+
     def get_required_columns(self) -> List[str]:
         """获取必需列"""
         return [
@@ -73,25 +76,28 @@ class XhsNotesDailyProcessor(DataProcessor):
             ['笔记ID', '笔记/素材ID', 'note_id']  # 支持'笔记/素材ID'
         ]
 
+    def get_read_columns(self) -> Optional[set]:
+        """私信进线数有按位置（第15列）回退的取值，不做列裁剪"""
+        return None
+
     def validate_row(self, row: pd.Series) -> Tuple[bool, Optional[str]]:
         """验证单行数据"""
         # 验证日期
-        date_value = self._get_column_value(row, ['时间', '日期', 'date'])
+        date_value = self.field_value(row, 'date')
         if pd.isna(date_value) or not date_value:
             return False, "日期为空"
 
-        try:
-            self.safe_date(date_value)
-        except:
+        # safe_date 解析失败时返回 None（不抛异常）
+        if self.safe_date(date_value) is None:
             return False, f"日期格式错误: {date_value}"
 
         # 验证笔记ID（必须不为空）
-        note_id = self._get_column_value(row, ['笔记ID', '笔记/素材ID', 'note_id'])
+        note_id = self.field_value(row, 'note_id')
         if pd.isna(note_id) or not note_id:
             return False, "笔记ID为空"
 
         # 验证花费（必须为非负数）
-        cost_value = self._get_column_value(row, ['花费', '消费', '消耗流水', '广告流水', 'cost'])
+        cost_value = self.field_value(row, 'cost')
         if not pd.isna(cost_value) and cost_value is not None:
             cost = self.safe_float(cost_value)
             if cost < 0:
@@ -113,41 +119,93 @@ class XhsNotesDailyProcessor(DataProcessor):
         """
         return {
             # 核心ID
-            'date': self.safe_date(self._get_column_value(row, ['时间', '日期', 'date'])),
-            'note_id': self.safe_str(self._get_column_value(row, ['笔记ID', '笔记/素材ID', 'note_id'])),
+            'date': self.safe_date(self.field_value(row, 'date')),
+            'note_id': self.safe_str(self.field_value(row, 'note_id')),
 
             # 基础属性字段（v3.2 新增：提高可读性）
-            'note_title': self.safe_str(self._get_column_value(row, ['笔记标题', '笔记名称', 'note_title'])),
-            'note_url': self.safe_str(self._get_column_value(row, ['笔记链接', '链接', '笔记/素材链接', 'note_url'])),
+            'note_title': self.safe_str(self.field_value(row, 'note_title')),
+            'note_url': self.safe_str(self.field_value(row, 'note_url')),
 
             # 账户ID字段（v3.1 新增，用于代理商分析）
-            'advertiser_account_id': self.safe_str(self._get_column_value(row, ['广告主账户ID', '主账户ID', 'advertiser_account_id'])),
-            'sub_account_id': self.safe_str(self._get_column_value(row, ['子账户ID', '代理商子账户ID', 'sub_account_id'])),
+            'advertiser_account_id': self.safe_str(self.field_value(row, 'advertiser_account_id')),
+            'sub_account_id': self.safe_str(self.field_value(row, 'sub_account_id')),
 
             # 花费相关（支持多种列名）
-            'cost': self.safe_float(self._get_column_value(row, ['花费', '消费', '消耗流水', '广告流水', 'cost'])),
+            'cost': self.safe_float(self.field_value(row, 'cost')),
 
             # 曝光相关（支持多种列名）
-            'impressions': self.safe_int(self._get_column_value(row, ['曝光量', '展现量', 'impressions'])),
-            'clicks': self.safe_int(self._get_column_value(row, ['点击量', 'clicks'])),
+            'impressions': self.safe_int(self.field_value(row, 'impressions')),
+            'clicks': self.safe_int(self.field_value(row, 'clicks')),
 
             # 互动指标（支持多种列名）
-            'likes': self.safe_int(self._get_column_value(row, ['点赞数', '点赞', 'likes'])),
-            'comments': self.safe_int(self._get_column_value(row, ['评论数', '评论', 'comments'])),
-            'favorites': self.safe_int(self._get_column_value(row, ['收藏数', '收藏', 'favorites'])),
-            'follows': self.safe_int(self._get_column_value(row, ['关注数', '关注', 'follows'])),
-            'shares': self.safe_int(self._get_column_value(row, ['分享数', '分享', 'shares'])),
-            'total_interactions': self.safe_int(self._get_column_value(row, ['总互动量', '互动量', '互动', 'total_interactions'])),
+            'likes': self.safe_int(self.field_value(row, 'likes')),
+            'comments': self.safe_int(self.field_value(row, 'comments')),
+            'favorites': self.safe_int(self.field_value(row, 'favorites')),
+            'follows': self.safe_int(self.field_value(row, 'follows')),
+            'shares': self.safe_int(self.field_value(row, 'shares')),
+            'total_interactions': self.safe_int(self.field_value(row, 'total_interactions')),
 
             # 私信转化（只保留进线数）
-            # 注意：当列名无法匹配时，使用位置14（第15列）作为回退
-            'private_message_leads': self.safe_int(self._get_column_value(
-                row,
-                ['私信进线数', '私信进线量', '私信线索量', '私信留资人数', 'private_message_leads'],
-                position=14  # 位置回退：第15列（索引14）
-            )),
+            # 注意：当列名无法匹配时，按 COLUMN_POSITIONS 使用第15列作为回退
+            'private_message_leads': self.safe_int(self.field_value(row, 'private_message_leads')),
         }
 
+    def validate_frame(self, df: pd.DataFrame) -> Tuple[pd.Series, pd.Series]:
+        """整表验证（规则与 validate_row 一致）"""
+        messages = self.frame_errors(df)
+
+        # 验证日期
+        date_values = self.field_column(df, 'date')
+        self.frame_add_error(messages, self.frame_blank(date_values), "日期为空")
+        self.frame_add_error(
+            messages,
+            self.frame_datetime(date_values).isna(),
+            "日期格式错误: " + date_values.astype(str)
+        )
+
+        # 验证笔记ID（必须不为空）
+        note_ids = self.field_column(df, 'note_id')
+        self.frame_add_error(messages, self.frame_blank(note_ids), "笔记ID为空")
+
+        # 验证花费（必须为非负数）
+        cost = self.frame_float(self.field_column(df, 'cost'))
+        self.frame_add_error(messages, cost < 0, "花费不能为负数: " + cost.astype(str))
+
+        return messages.isna(), messages
+
+    def transform_frame(self, df: pd.DataFrame) -> pd.DataFrame:
+        """整表转换为模型字段（与 process_row 一致）"""
+        col = lambda field: self.field_column(df, field)
+        return pd.DataFrame({
+            # 核心ID
+            'date': self.frame_date(col('date')),
+            'note_id': self.frame_str(col('note_id')),
+
+            # 基础属性字段
+            'note_title': self.frame_str(col('note_title')),
+            'note_url': self.frame_str(col('note_url')),
+
+            # 账户ID字段
+            'advertiser_account_id': self.frame_str(col('advertiser_account_id')),
+            'sub_account_id': self.frame_str(col('sub_account_id')),
+
+            # 广告指标
+            'cost': self.frame_float(col('cost')),
+            'impressions': self.frame_int(col('impressions')),
+            'clicks': self.frame_int(col('clicks')),
+
+            # 互动指标
+            'likes': self.frame_int(col('likes')),
+            'comments': self.frame_int(col('comments')),
+            'favorites': self.frame_int(col('favorites')),
+            'follows': self.frame_int(col('follows')),
+            'shares': self.frame_int(col('shares')),
+            'total_interactions': self.frame_int(col('total_interactions')),
+
+            # 私信转化（列名无法匹配时按 COLUMN_POSITIONS 使用第15列）
+            'private_message_leads': self.frame_int(col('private_message_leads')),
+        }, index=df.index)
+
     def get_model_class(self):
         """获取模型类"""
         return XhsNotesDaily
@@ -156,27 +214,9 @@ class XhsNotesDailyProcessor(DataProcessor):
         """获取唯一性字段"""
         return ['date', 'note_id']
 
-    def _get_column_value(self, row: pd.Series, column_names: List[str], position: int = None) -> Any:
-        """获取列值（支持多个候选列名，支持位置回退）
-
-        Args:
-            row: 数据行
-            column_names: 候选列名列表
-            position: 可选的位置索引（当列名无法匹配时使用）
-
-        Returns:
-            列值，如果找不到则返回 None
-        """
-        # 首先尝试通过列名匹配
-        for col_name in column_names:
-            if col_name in row.index:
-                return row[col_name]
-
-        # 如果指定了位置索引且列名匹配失败，使用位置回退
-        if position is not None and position < len(row):
-            return row.iloc[position]
-
-        return None
+    def get_existing_key_fields(self) -> Optional[Tuple[str, str]]:
+        """非覆盖模式按文件日期范围预加载已有 (date, note_id)"""
+        return ('date', 'note_id')
 
     def update_mapping_table(self, notes_data: List[Dict[str, Any]]) -> Dict[str, int]:
         """
@@ -188,56 +228,23 @@ class XhsNotesDailyProcessor(DataProcessor):
         - 如果 note_id 不在 mapping 表中，创建新记录
         - 如果 note_id 已存在但字段为空，更新字段
 
+        按文件批量同步（分块 IN 查询已有笔记 + 一次 INSERT … ON CONFLICT 写入），
+        不再逐条查询 mapping 表
+
         Args:
             notes_data: 导入的笔记数据列表
 
         Returns:
             统计结果字典
         """
-        from backend.models import XhsNoteInfo
-
-        new_count = 0
-        updated_count = 0
-
-        for data in notes_data:
-            note_id = data.get('note_id')
-            if not note_id:
-                continue
-
-            # 检查 mapping 表中是否已存在
-            mapping = self.db_session.query(XhsNoteInfo).filter(
-                XhsNoteInfo.note_id == note_id
-            ).first()
-
-            if mapping:
-                # 已存在，更新空字段
-                updated = False
-                if not mapping.note_title and data.get('note_title'):
-                    mapping.note_title = data['note_title']
-                    updated = True
-                if not mapping.note_url and data.get('note_url'):
-                    mapping.note_url = data['note_url']
-                    updated = True
-
-                if updated:
-                    updated_count += 1
-            else:
-                # 不存在，创建新记录
-                new_mapping = XhsNoteInfo(
-                    note_id=note_id,
-                    note_title=data.get('note_title'),
-                    note_url=data.get('note_url')
-                )
-                self.db_session.add(new_mapping)
-                new_count += 1
+        from backend.utils.note_info_sync import sync_note_info
+
+        stats = sync_note_info(self.db_session, notes_data)
 
         # 提交
         self.db_session.commit()
 
-        return {
-            'new_count': new_count,
-            'updated_count': updated_count
-        }
+        return stats
 
     def calculate_engagement_rate(self, row: pd.Series) -> float:
         """
@@ -249,8 +256,8 @@ class XhsNotesDailyProcessor(DataProcessor):
         Returns:
             互动率（百分比）
         """
-        impressions = self.safe_int(self._get_column_value(row, ['曝光量', 'impressions']))
-        total_interactions = self.safe_int(self._get_column_value(row, ['总互动量', 'total_interactions']))
+        impressions = self.safe_int(self.field_value(row, 'impressions'))
+        total_interactions = self.safe_int(self.field_value(row, 'total_interactions'))
 
         if impressions > 0:
             return round((total_interactions / impressions) * 100, 2)
@@ -40,7 +40,7 @@ class XhsNotesListProcessor(DataProcessor):
     def validate_row(self, row: pd.Series) -> Tuple[bool, Optional[str]]:
         """验证单行数据"""
         # 验证笔记ID（支持多种列名）
-        note_id = self._get_column_value(row, ['笔记ID', '笔记id', 'note_id'])
+        note_id = self.field_value(row, 'note_id')
         if not note_id:
             return False, "笔记ID为空"
 
@@ -49,14 +49,34 @@ class XhsNotesListProcessor(DataProcessor):
     def process_row(self, row: pd.Series) -> Dict[str, Any]:
         """处理单行数据"""
         return {
-            'note_id': self.safe_str(self._get_column_value(row, ['笔记ID', '笔记id', 'note_id'])),
-            'note_title': self.safe_str(self._get_column_value(row, ['笔记标题', '笔记名称', 'note_title'])),
-            'publish_account': self.safe_str(self._get_column_value(row, ['发布账号', 'publish_account'])),
-            'publish_time': self.safe_date(self._get_column_value(row, ['发布时间', '笔记发布时间', 'publish_time'])),
-            'producer': self.safe_str(self._get_column_value(row, ['生产者', 'producer'])),
-            'ad_strategy': self.safe_str(self._get_column_value(row, ['广告策略', 'ad_strategy']))
+            'note_id': self.safe_str(self.field_value(row, 'note_id')),
+            'note_title': self.safe_str(self.field_value(row, 'note_title')),
+            'publish_account': self.safe_str(self.field_value(row, 'publish_account')),
+            'publish_time': self.safe_date(self.field_value(row, 'publish_time')),
+            'producer': self.safe_str(self.field_value(row, 'producer')),
+            'ad_strategy': self.safe_str(self.field_value(row, 'ad_strategy'))
         }
 
+    def validate_frame(self, df: pd.DataFrame) -> Tuple[pd.Series, pd.Series]:
+        """整表验证（笔记ID为 NaN 时同样视为空，避免写入空主键）"""
+        messages = self.frame_errors(df)
+
+        note_ids = self.field_column(df, 'note_id')
+        self.frame_add_error(messages, self.frame_blank(note_ids), "笔记ID为空")
+
+        return messages.isna(), messages
+
+    def transform_frame(self, df: pd.DataFrame) -> pd.DataFrame:
+        """整表转换为模型字段（与 process_row 一致）"""
+        return pd.DataFrame({
+            'note_id': self.frame_str(self.field_column(df, 'note_id')),
+            'note_title': self.frame_str(self.field_column(df, 'note_title')),
+            'publish_account': self.frame_str(self.field_column(df, 'publish_account')),
+            'publish_time': self.frame_date(self.field_column(df, 'publish_time')),
+            'producer': self.frame_str(self.field_column(df, 'producer')),
+            'ad_strategy': self.frame_str(self.field_column(df, 'ad_strategy'))
+        }, index=df.index)
+
     def get_model_class(self):
         """获取模型类"""
         return XhsNoteInfo
@@ -65,9 +85,55 @@ class XhsNotesListProcessor(DataProcessor):
         """获取唯一性字段"""
         return ['note_id']
 
-    def _get_column_value(self, row: pd.Series, column_names: List[str]) -> Any:
-        """获取列值（支持多个候选列名）"""
-        for col_name in column_names:
-            if col_name in row.index:
-                return row[col_name]
-        return None
+    def _write_records_orm(
+        self,
+        ModelClass,
+        unique_fields: List[str],
+        records: List[Tuple[Any, Dict[str, Any]]],
+        overwrite: bool,
+        batch_size: int
+    ) -> Tuple[int, int, int]:
+        """
+        非覆盖模式批量写入笔记列表
+
+        分块 IN 查询已有 note_id，已有笔记按重复记录跳过，新笔记用一次
+        INSERT … ON CONFLICT DO NOTHING 写入（代替逐条查询）。文件内同一 note_id
+        只写入第一行，之后的行同样按重复记录跳过（不跨行合并字段）。覆盖模式沿用基类逻辑
+
+        Returns:
+            (插入数量, 更新数量, 失败数量)
+        """
+        if overwrite or not records:
+            return super()._write_records_orm(ModelClass, unique_fields, records, overwrite, batch_size)
+
+        import logging
+        from backend.utils.note_info_sync import load_note_info, sync_note_info
+        logger = logging.getLogger(__name__)
+
+        note_ids = {data.get('note_id') for _, data in records if data.get('note_id')}
+        existing = load_note_info(self.db_session, note_ids, fields=())
+        logger.info(f"  预加载 {len(existing)} 个已有笔记")
+
+        failed_count = 0
+        new_rows = {}
+        for idx, data in records:
+            note_id = data.get('note_id')
+            if note_id in existing or note_id in new_rows:
+                failed_count += 1
+                self.warnings.append(f"第 {idx + 2} 行: 重复记录")
+            else:
+                new_rows[note_id] = data
+
+        insert_fields = [key for key in records[0][1].keys() if key != 'note_id']
+        try:
+            stats = sync_note_info(
+                self.db_session, new_rows.values(), fill_fields=(), insert_fields=insert_fields, existing=existing
+            )
+            self.db_session.commit()
+        except Exception as e:
+            self.db_session.rollback()
+            logger.error(f"  批量写入失败: {e}")
+            self.errors.append(f"批量写入失败: {e}")
+            return 0, 0, failed_count + len(new_rows)
+
+        return stats['new_count'], 0, failed_count
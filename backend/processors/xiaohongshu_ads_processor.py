@@ -47,24 +47,23 @@ class XiaohongshuAdsProcessor(DataProcessor):
     def validate_row(self, row: pd.Series) -> Tuple[bool, Optional[str]]:
         """验证单行数据"""
         # 验证日期
-        date_value = self._get_column_value(row, ['周期', '日期', 'date'])
+        date_value = self.field_value(row, 'date')
         if pd.isna(date_value) or not date_value:
             return False, "日期为空"
 
-        try:
-            self.safe_date(date_value)
-        except:
+        # safe_date 解析失败时返回 None（不抛异常）
+        if self.safe_date(date_value) is None:
             return False, f"日期格式错误: {date_value}"
 
         # 验证主账户ID（必填）
-        advertiser_account_id = self._get_column_value(row, ['广告主账户ID', '主账户ID', 'advertiser_account_id'])
+        advertiser_account_id = self.field_value(row, 'advertiser_account_id')
         if pd.isna(advertiser_account_id) or not advertiser_account_id:
             return False, "主账户ID为空"
 
         # 子账户ID允许为空（申万宏源直投情况）
 
         # 验证花费
-        cost_value = self._get_column_value(row, ['总消耗', '花费', 'cost'])
+        cost_value = self.field_value(row, 'cost')
         if cost_value is not None and not pd.isna(cost_value):
             cost = self.safe_float(cost_value)
             if cost < 0:
@@ -83,19 +82,58 @@ class XiaohongshuAdsProcessor(DataProcessor):
             字段字典
         """
         return {
-            'date': self.safe_date(self._get_column_value(row, ['周期', '日期', 'date'])),
-            'advertiser_account_id': self.safe_str(self._get_column_value(row, ['广告主账户ID', '主账户ID', 'advertiser_account_id'])),
-            'sub_account_id': self.safe_str(self._get_column_value(row, ['代理商子账户ID', '子账户ID', 'sub_account_id'])),  # 允许为None
-            'cost': self.safe_float(self._get_column_value(row, ['总消耗', '花费', 'cost'])),
-            'impressions': self.safe_int(self._get_column_value(row, ['总展现', '曝光量', 'impressions'])),
-            'clicks': self.safe_int(self._get_column_value(row, ['总点击', '点击量', 'clicks'])),
-            'private_messages': self.safe_int(self._get_column_value(row, ['私信进线数', '私信量', 'private_messages']))
+            'date': self.safe_date(self.field_value(row, 'date')),
+            'advertiser_account_id': self.safe_str(self.field_value(row, 'advertiser_account_id')),
+            'sub_account_id': self.safe_str(self.field_value(row, 'sub_account_id')),  # 允许为None
+            'cost': self.safe_float(self.field_value(row, 'cost')),
+            'impressions': self.safe_int(self.field_value(row, 'impressions')),
+            'clicks': self.safe_int(self.field_value(row, 'clicks')),
+            'private_messages': self.safe_int(self.field_value(row, 'private_messages'))
         }
 
+    def validate_frame(self, df: pd.DataFrame) -> Tuple[pd.Series, pd.Series]:
+        """整表验证（规则与 validate_row 一致）"""
+        messages = self.frame_errors(df)
+
+        # 验证日期
+        date_values = self.field_column(df, 'date')
+        self.frame_add_error(messages, self.frame_blank(date_values), "日期为空")
+        self.frame_add_error(
+            messages,
+            self.frame_datetime(date_values).isna(),
+            "日期格式错误: " + date_values.astype(str)
+        )
+
+        # 验证主账户ID（必填，子账户ID允许为空）
+        advertiser_ids = self.field_column(df, 'advertiser_account_id')
+        self.frame_add_error(messages, self.frame_blank(advertiser_ids), "主账户ID为空")
+
+        # 验证花费
+        cost = self.frame_float(self.field_column(df, 'cost'))
+        self.frame_add_error(messages, cost < 0, "花费不能为负数: " + cost.astype(str))
+
+        return messages.isna(), messages
+
+    def transform_frame(self, df: pd.DataFrame) -> pd.DataFrame:
+        """整表转换为模型字段（与 process_row 一致）"""
+        return pd.DataFrame({
+            'date': self.frame_date(self.field_column(df, 'date')),
+            'advertiser_account_id': self.frame_str(self.field_column(df, 'advertiser_account_id')),
+            'sub_account_id': self.frame_str(self.field_column(df, 'sub_account_id')),  # 允许为None
+            'cost': self.frame_float(self.field_column(df, 'cost')),
+            'impressions': self.frame_int(self.field_column(df, 'impressions')),
+            'clicks': self.frame_int(self.field_column(df, 'clicks')),
+            'private_messages': self.frame_int(self.field_column(df, 'private_messages'))
+        }, index=df.index)
+
     def get_model_class(self):
         """获取模型类"""
         return RawAdDataXiaohongshu
 
+    def get_date_field(self) -> str:
+        """平台导出为日期窗口快照，支持按日期范围替换导入"""
+        return 'date'
+
     def get_platform_name(self) -> str:
         """获取平台名称"""
         return '小红书'
@@ -104,77 +142,37 @@ class XiaohongshuAdsProcessor(DataProcessor):
         """获取唯一性字段（小红书使用 date + advertiser_account_id + sub_account_id）"""
         return ['date', 'advertiser_account_id', 'sub_account_id']
 
+    def get_conflict_target(self, ModelClass) -> List[Any]:
+        """
+        UPSERT 冲突目标
+
+        sub_account_id 可为 NULL（直投），而 NULL 在唯一索引中互不相等，
+        因此使用 COALESCE(sub_account_id, '') 表达式索引 idx_xiaohongshu_upsert
+        """
+        from sqlalchemy import func, literal_column
+
+        table = ModelClass.__table__
+        return [
+            table.c.date,
+            table.c.advertiser_account_id,
+            func.coalesce(table.c.sub_account_id, literal_column("''"))
+        ]
+
     def _auto_create_account_mapping(self, data: Dict[str, Any]) -> None:
         """
         小红书特殊处理：自动创建账号映射
         小红书有主账号和子账号两种情况
-        """
-        from backend.models import AccountAgencyMapping
 
+        - 有子账号ID（代理商子账户）：按子账户ID登记，记录主账户
+        - 无子账号ID（品牌主账户/直投）：按主账户ID登记，account_id 为 NULL
+        """
         advertiser_account_id = data.get('advertiser_account_id')
-        sub_account_id = data.get('sub_account_id')
-
         if not advertiser_account_id:
             return
 
-        # 场景1：有子账号ID（代理商子账户）
-        if sub_account_id:
-            # 检查是否已存在映射
-            existing = self.db_session.query(AccountAgencyMapping).filter_by(
-                platform='小红书',
-                account_id=str(sub_account_id)
-            ).first()
-
-            if not existing:
-                # 创建代理商子账户映射（使用默认值）
-                new_mapping = AccountAgencyMapping(
-                    platform='小红书',
-                    account_id=str(sub_account_id),
-                    main_account_id=str(advertiser_account_id),
-                    account_name=None,       # 用户需要补充
-                    sub_account_name=None,   # 用户需要补充
-                    agency='未分配',          # 使用默认值
-                    business_model='信息流'   # 使用默认值
-                )
-                self.db_session.add(new_mapping)
-
-                self.warnings.append(
-                    f"发现新小红书账号（代理商子账户）- 主账户:{advertiser_account_id}, 子账户:{sub_account_id}。"
-                    f"默认设置：代理商='未分配'，业务模式='信息流'。"
-                    f"请在账号管理中补充完整信息"
-                )
-
-        # 场景2：无子账号ID（品牌主账户/直投）
-        else:
-            # 检查是否已存在映射（通过main_account_id查找）
-            existing = self.db_session.query(AccountAgencyMapping).filter_by(
-                platform='小红书',
-                main_account_id=str(advertiser_account_id),
-                account_id=None  # 品牌主账户account_id为NULL
-            ).first()
-
-            if not existing:
-                # 创建品牌主账户映射（使用默认值）
-                new_mapping = AccountAgencyMapping(
-                    platform='小红书',
-                    account_id=None,  # 品牌主账户没有子账号ID
-                    main_account_id=str(advertiser_account_id),
-                    account_name=None,       # 用户需要补充
-                    sub_account_name=None,
-                    agency='未分配',          # 使用默认值
-                    business_model='信息流'   # 使用默认值
-                )
-                self.db_session.add(new_mapping)
-
-                self.warnings.append(
-                    f"发现新小红书账号（品牌主账户/直投）- 主账户:{advertiser_account_id}。"
-                    f"默认设置：代理商='未分配'，业务模式='信息流'。"
-                    f"请在账号管理中补充完整信息"
-                )
-
-    def _get_column_value(self, row: pd.Series, column_names: List[str]) -> Any:
-        """获取列值（支持多个候选列名）"""
-        for col_name in column_names:
-            if col_name in row.index:
-                return row[col_name]
-        return None
+        registry = self.get_account_registry()
+        registry.register(
+            account_id=data.get('sub_account_id'),
+            main_account_id=advertiser_account_id
+        )
+
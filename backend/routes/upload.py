@@ -16,15 +16,16 @@
 from flask import Blueprint, request, jsonify, current_app
 from werkzeug.utils import secure_filename
 import os
+import json
 import uuid
 from datetime import datetime
 import traceback
-import threading
 from sqlalchemy import text
 
 from backend.database import db
 from backend.models import DataImportLog
 from backend.processors import (
+    ImportCancelled,
     TencentAdsProcessor,
     DouyinAdsProcessor,
     XiaohongshuAdsProcessor,
@@ -35,6 +36,17 @@ from backend.processors import (
     XhsNotesContentDailyProcessor
 )
 from backend.processors.xhs_notes_content_daily_processor_fast import XhsNotesContentDailyProcessorFast
+from backend.services.import_queue import import_queue
+from backend.utils.aggregation_scope import merge_touched_ranges
+from backend.utils.file_hash import save_stream_with_hash
+from backend.services.batch_import import (
+    BatchUploadError,
+    extract_zip,
+    generate_upload_filename,
+    parse_files,
+    resolve_parse_processes,
+    supports_parallel_parse
+)
 
 bp = Blueprint('upload', __name__)
 
@@ -65,6 +77,9 @@ PROCESSORS = {
 # 允许的文件扩展名
 ALLOWED_EXTENSIONS = {'csv', 'xlsx', 'xls'}
 
+# 全量替换的数据类型：之后只要有其他文件导入成功，表内容就已变化，相同文件不能视为重复
+FULL_REPLACE_TYPES = {'backend_conversion'}
+
 
 def allowed_file(filename):
     """检查文件类型是否允许"""
@@ -81,10 +96,16 @@ def upload_file():
         file: 上传的文件
         data_type: 数据类型 (必填)
         overwrite: 是否覆盖模式 (可选，默认false)
+        replace_range: 是否按日期范围替换 (可选，默认false；仅平台广告数据，删除文件日期范围内的旧数据后整批插入)
+        priority: 队列优先级 (可选，默认0，越大越先处理)
+        force: 是否强制重新导入 (可选，默认false；相同文件已导入成功时默认跳过)
+        dry_run: 是否只检查不导入 (可选，默认false；同步返回列统计、问题行样例、新账号/未知笔记，不写入数据)
 
     返回:
-        task_id: 任务ID
-        status: 状态 (processing)
+        task_id: 任务ID（重复文件时为之前成功导入的任务ID）
+        status: 状态 (queued；重复文件时为之前任务的状态 completed)
+        duplicate: 是否为已导入成功的重复文件
+        queue_position: 排队位置
         message: 提示消息
     """
     if 'file' not in request.files:
@@ -121,6 +142,31 @@ def upload_file():
     # 获取是否覆盖模式
     overwrite = request.form.get('overwrite', 'false').lower() == 'true'
 
+    # 获取是否按日期范围替换
+    replace_range = request.form.get('replace_range', 'false').lower() == 'true'
+    if replace_range and not supports_replace_range(data_type):
+        return jsonify({
+            'success': False,
+            'error': 'REPLACE_RANGE_NOT_SUPPORTED',
+            'message': f'{DATA_TYPES[data_type]} 不支持按日期范围替换导入'
+        }), 400
+
+    # 获取队列优先级
+    try:
+        priority = int(request.form.get('priority', 0))
+    except ValueError:
+        return jsonify({
+            'success': False,
+            'error': 'INVALID_PRIORITY',
+            'message': 'priority 必须是整数'
+        }), 400
+
+    # 是否强制重新导入（跳过重复文件检查）
+    force = request.form.get('force', 'false').lower() == 'true'
+
+    # 是否只检查不导入
+    dry_run = request.form.get('dry_run', 'false').lower() == 'true'
+
     # 生成唯一的任务ID
     task_id = str(uuid.uuid4())
 
@@ -144,10 +190,56 @@ def upload_file():
     # 确保上传目录存在
     os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 
-    file.save(filepath)
+    # 写入磁盘的同时计算 SHA-256（不额外读取一遍文件）
+    file_size, file_hash = save_stream_with_hash(file.stream, filepath)
+
+    # 试导入：同步检查后删除文件，不创建导入任务
+    if dry_run:
+        try:
+            result = PROCESSORS[data_type](db.session).dry_run(filepath)
+        finally:
+            os.remove(filepath)
+
+        result.update({
+            'import_type': data_type,
+            'import_type_name': DATA_TYPES[data_type],
+            'file_name': original_filename,
+            'file_size': file_size
+        })
+        if not result['success']:
+            return jsonify({
+                'success': False,
+                'error': 'DRY_RUN_FAILED',
+                'message': result['error'],
+                'data': result
+            }), 400
+        return jsonify({'success': True, 'data': result})
+
+    # 相同文件已导入成功：直接返回之前的任务，不重复解析、写入和聚合
+    if not force:
+        previous_log = find_duplicate_import(data_type, file_hash)
+        if previous_log:
+            os.remove(filepath)
+            completed_at = previous_log.completed_at.strftime('%Y-%m-%d %H:%M:%S') if previous_log.completed_at else ''
+            return jsonify({
+                'success': True,
+                'data': {
+                    'task_id': previous_log.task_id,
+                    'import_type': data_type,
+                    'import_type_name': DATA_TYPES[data_type],
+                    'file_name': original_filename,
+                    'file_size': file_size,
+                    'status': previous_log.status,
+                    'duplicate': True,
+                    'duplicate_file_name': previous_log.file_name,
+                    'duplicate_completed_at': previous_log.completed_at.isoformat() if previous_log.completed_at else None,
+                    'message': f'相同文件已于 {completed_at} 导入成功（{previous_log.file_name}），已跳过；如需重新导入请使用强制导入'
+                }
+            })
 
-    # 获取文件大小
-    file_size = os.path.getsize(filepath)
+    # 相同文件之前导入中断（失败/取消）：从断点继续，跳过已提交的记录
+    interrupted_log = None if force else find_interrupted_import(data_type, file_hash, overwrite, replace_range)
+    resume_offset = interrupted_log.checkpoint_offset if interrupted_log else 0
 
     # 创建导入日志记录
     import_log = DataImportLog(
@@ -156,20 +248,23 @@ def upload_file():
         file_name=original_filename,  # 保存原始文件名（包括中文）
         file_path=save_filename,      # 保存处理后的文件路径
         file_size=file_size,
-        status='uploaded',
+        file_hash=file_hash,
+        status='queued',
         overwrite=overwrite,
+        replace_range=replace_range,
+        priority=priority,
+        checkpoint_offset=resume_offset,
+        checkpoint_hash=file_hash if resume_offset else None,
+        message=f'排队中（从断点继续，已提交 {resume_offset} 条）...' if resume_offset else '排队中...',
         created_at=datetime.now()
     )
 
     db.session.add(import_log)
     db.session.commit()
 
-    # 异步处理文件
-    thread = threading.Thread(
-        target=process_file_async,
-        args=(task_id, filepath, data_type, overwrite, import_log.id)
-    )
-    thread.start()
+    # 加入导入队列（由队列工作线程按优先级和提交顺序处理）
+    import_queue.enqueue(import_log)
+    queue_position = import_queue.queue_position(import_log)
 
     return jsonify({
         'success': True,
@@ -179,13 +274,320 @@ def upload_file():
             'import_type_name': DATA_TYPES[data_type],
             'file_name': original_filename,
             'file_size': file_size,
-            'status': 'processing',
-            'message': '文件上传成功，正在处理中...'
+            'status': import_log.status,
+            'duplicate': False,
+            'queue_position': queue_position,
+            'resume_offset': resume_offset,
+            'message': '文件上传成功，已加入导入队列' + (f'（从断点继续，跳过已提交的 {resume_offset} 条记录）' if resume_offset else '')
         }
     })
 
 
-def process_file_async(task_id, filepath, data_type, overwrite, log_id):
+def supports_replace_range(data_type):
+    """数据类型是否支持按日期范围替换导入（处理器声明了日期字段）"""
+    ProcessorClass = PROCESSORS.get(data_type)
+    return ProcessorClass is not None and ProcessorClass(None).get_date_field() is not None
+
+
+def find_duplicate_import(data_type, file_hash):
+    """
+    查找相同数据类型、相同文件内容且已导入成功的任务
+
+    全量替换的数据类型（FULL_REPLACE_TYPES）只有在之后没有其他导入成功时才算重复
+
+    Args:
+        data_type: 数据类型
+        file_hash: 文件内容 SHA-256
+
+    Returns:
+        之前成功导入的 DataImportLog；没有时返回 None
+    """
+    previous_log = db.session.query(DataImportLog).filter(
+        DataImportLog.import_type == data_type,
+        DataImportLog.file_hash == file_hash,
+        DataImportLog.status == 'completed'
+    ).order_by(DataImportLog.id.desc()).first()
+
+    if previous_log and data_type in FULL_REPLACE_TYPES:
+        later_import = db.session.query(DataImportLog.id).filter(
+            DataImportLog.import_type == data_type,
+            DataImportLog.status == 'completed',
+            DataImportLog.id > previous_log.id
+        ).first()
+        if later_import:
+            return None
+
+    return previous_log
+
+
+def find_interrupted_import(data_type, file_hash, overwrite, replace_range):
+    """
+    查找相同文件最近一次中断（失败/取消）且有断点的任务
+
+    只有该文件最近一次导入是中断的、导入模式相同时才从断点继续
+
+    Args:
+        data_type: 数据类型
+        file_hash: 文件内容 SHA-256
+        overwrite: 是否覆盖模式
+        replace_range: 是否按日期范围替换
+
+    Returns:
+        中断的 DataImportLog；没有时返回 None
+    """
+    last_log = db.session.query(DataImportLog).filter(
+        DataImportLog.import_type == data_type,
+        DataImportLog.file_hash == file_hash
+    ).order_by(DataImportLog.id.desc()).first()
+
+    if (
+        last_log
+        and last_log.status in ('failed', 'cancelled')
+        and last_log.checkpoint_offset
+        and last_log.checkpoint_hash == file_hash
+        and bool(last_log.overwrite) == overwrite
+        and bool(last_log.replace_range) == replace_range
+    ):
+        return last_log
+    return None
+
+
+@bp.route('/upload/batch', methods=['POST'])
+def upload_batch():
+    """
+    批量上传数据文件（多个文件或一个 ZIP 包，同一数据类型）
+
+    同一批次的文件由导入队列一起处理：并行解析 → 按上传顺序串行写入 → 聚合表只更新一次
+
+    参数:
+        files: 上传的文件（可多个；也可以是一个 .zip 包）
+        data_type: 数据类型 (必填)
+        overwrite: 是否覆盖模式 (可选，默认false)
+        replace_range: 是否按日期范围替换 (可选，默认false；每个文件按各自的日期范围替换)
+        priority: 队列优先级 (可选，默认0，越大越先处理)
+        force: 是否强制重新导入 (可选，默认false；相同文件已导入成功时默认跳过该文件)
+
+    返回:
+        batch_id: 批次ID（所有文件都是重复文件时为空）
+        tasks: 每个文件的任务（task_id, file_name, file_size, resume_offset）
+        duplicates: 已导入成功而跳过的文件（file_name, file_size, task_id, duplicate_file_name, duplicate_completed_at）
+        queue_position: 排队位置
+    """
+    files = [f for f in request.files.getlist('files') if f.filename]
+    if not files:
+        return jsonify({
+            'success': False,
+            'error': 'INVALID_FILE',
+            'message': '没有上传文件'
+        }), 400
+
+    data_type = request.form.get('data_type', '')
+    if data_type not in DATA_TYPES:
+        return jsonify({
+            'success': False,
+            'error': 'INVALID_DATA_TYPE',
+            'message': f'无效的数据类型，支持的类型: {", ".join(DATA_TYPES.keys())}'
+        }), 400
+
+    overwrite = request.form.get('overwrite', 'false').lower() == 'true'
+
+    replace_range = request.form.get('replace_range', 'false').lower() == 'true'
+    if replace_range and not supports_replace_range(data_type):
+        return jsonify({
+            'success': False,
+            'error': 'REPLACE_RANGE_NOT_SUPPORTED',
+            'message': f'{DATA_TYPES[data_type]} 不支持按日期范围替换导入'
+        }), 400
+
+    try:
+        priority = int(request.form.get('priority', 0))
+    except ValueError:
+        return jsonify({
+            'success': False,
+            'error': 'INVALID_PRIORITY',
+            'message': 'priority 必须是整数'
+        }), 400
+
+    # 是否强制重新导入（跳过重复文件检查）
+    force = request.form.get('force', 'false').lower() == 'true'
+
+    from config import UPLOAD_FOLDER, BATCH_MAX_FILES, ZIP_MAX_UNCOMPRESSED_SIZE
+    os.makedirs(UPLOAD_FOLDER, exist_ok=True)
+
+    is_zip = len(files) == 1 and files[0].filename.lower().endswith('.zip')
+
+    if not is_zip:
+        invalid = [f.filename for f in files if not allowed_file(f.filename)]
+        if invalid:
+            return jsonify({
+                'success': False,
+                'error': 'INVALID_FILE_TYPE',
+                'message': f'不支持的文件类型: {", ".join(invalid)}（仅支持: {", ".join(ALLOWED_EXTENSIONS)}，或单个 zip 包）'
+            }), 400
+        if len(files) > BATCH_MAX_FILES:
+            return jsonify({
+                'success': False,
+                'error': 'TOO_MANY_FILES',
+                'message': f'文件数量 {len(files)} 超过上限 {BATCH_MAX_FILES}'
+            }), 400
+
+    # 保存文件（写入磁盘的同时计算 SHA-256）：[(原始文件名, 保存文件名, 文件哈希)]
+    saved = []
+    if is_zip:
+        zip_path = os.path.join(UPLOAD_FOLDER, f"{uuid.uuid4()}.zip")
+        files[0].save(zip_path)
+        try:
+            saved = extract_zip(zip_path, UPLOAD_FOLDER, data_type, BATCH_MAX_FILES, ZIP_MAX_UNCOMPRESSED_SIZE)
+        except BatchUploadError as e:
+            return jsonify({
+                'success': False,
+                'error': 'INVALID_ZIP',
+                'message': str(e)
+            }), 400
+        finally:
+            os.remove(zip_path)
+    else:
+        for file in files:
+            save_filename = generate_upload_filename(data_type, os.path.splitext(file.filename)[1])
+            _, file_hash = save_stream_with_hash(file.stream, os.path.join(UPLOAD_FOLDER, save_filename))
+            saved.append((file.filename, save_filename, file_hash))
+
+    # 每个文件一条导入日志，共享 batch_id；已导入成功的相同文件跳过（与单文件上传相同）
+    batch_id = str(uuid.uuid4())
+    import_logs = []
+    duplicates = []
+    for original_filename, save_filename, file_hash in saved:
+        save_path = os.path.join(UPLOAD_FOLDER, save_filename)
+        file_size = os.path.getsize(save_path)
+
+        previous_log = None if force else find_duplicate_import(data_type, file_hash)
+        if previous_log:
+            os.remove(save_path)
+            duplicates.append({
+                'file_name': original_filename,
+                'file_size': file_size,
+                'task_id': previous_log.task_id,
+                'duplicate_file_name': previous_log.file_name,
+                'duplicate_completed_at': previous_log.completed_at.isoformat() if previous_log.completed_at else None
+            })
+            continue
+
+        # 相同文件之前导入中断（失败/取消）：从断点继续
+        interrupted_log = None if force else find_interrupted_import(data_type, file_hash, overwrite, replace_range)
+        resume_offset = interrupted_log.checkpoint_offset if interrupted_log else 0
+
+        import_log = DataImportLog(
+            task_id=str(uuid.uuid4()),
+            batch_id=batch_id,
+            import_type=data_type,
+            file_name=original_filename,
+            file_path=save_filename,
+            file_size=file_size,
+            file_hash=file_hash,
+            status='queued',
+            overwrite=overwrite,
+            replace_range=replace_range,
+            priority=priority,
+            checkpoint_offset=resume_offset,
+            checkpoint_hash=file_hash if resume_offset else None,
+            message=f'排队中（从断点继续，已提交 {resume_offset} 条）...' if resume_offset else '排队中...',
+            created_at=datetime.now()
+        )
+        db.session.add(import_log)
+        import_logs.append(import_log)
+
+    duplicate_message = f'，{len(duplicates)} 个文件已导入成功，已跳过（如需重新导入请使用强制导入）' if duplicates else ''
+
+    # 所有文件都已导入成功：不创建批次
+    if not import_logs:
+        return jsonify({
+            'success': True,
+            'data': {
+                'batch_id': None,
+                'import_type': data_type,
+                'import_type_name': DATA_TYPES[data_type],
+                'file_count': 0,
+                'tasks': [],
+                'duplicates': duplicates,
+                'status': 'completed',
+                'message': f'{len(duplicates)} 个文件均已导入成功，已跳过；如需重新导入请使用强制导入'
+            }
+        })
+
+    db.session.commit()
+
+    import_queue.enqueue(import_logs[0])
+    queue_position = import_queue.queue_position(import_logs[0])
+
+    return jsonify({
+        'success': True,
+        'data': {
+            'batch_id': batch_id,
+            'import_type': data_type,
+            'import_type_name': DATA_TYPES[data_type],
+            'file_count': len(import_logs),
+            'tasks': [
+                {
+                    'task_id': log.task_id,
+                    'file_name': log.file_name,
+                    'file_size': log.file_size,
+                    'resume_offset': log.checkpoint_offset or 0
+                }
+                for log in import_logs
+            ],
+            'duplicates': duplicates,
+            'status': 'queued',
+            'queue_position': queue_position,
+            'message': f'{len(import_logs)} 个文件上传成功，已加入导入队列{duplicate_message}'
+        }
+    })
+
+
+def run_import_job(job):
+    """
+    导入队列任务处理函数
+
+    Args:
+        job: 队列领取的任务（id, task_id, import_type, file_path, overwrite, replace_range,
+             resume_offset）；批量任务含 batch_id 和 jobs 列表
+    """
+    if job.get('batch_id'):
+        process_batch_async(job)
+        return
+
+    from config import UPLOAD_FOLDER
+    filepath = os.path.join(UPLOAD_FOLDER, job['file_path'])
+    process_file_async(
+        job['task_id'], filepath, job['import_type'], job['overwrite'], job['id'],
+        replace_range=job.get('replace_range', False),
+        resume_offset=job.get('resume_offset', 0)
+    )
+
+
+def attach_checkpoint(processor, import_log, resume_offset=0):
+    """
+    设置处理器的断点续传和取消：从 resume_offset 继续写入，每次批量提交后记录断点；
+    每次批量提交前检查取消请求（最后一个批次提交后不再响应取消）
+
+    Args:
+        processor: 处理器实例
+        import_log: 导入日志记录（记录断点位置和文件哈希）
+        resume_offset: 之前已提交的记录数
+    """
+    processor.resume_offset = resume_offset or 0
+    processor.cancel_callback = lambda: import_queue.check_cancelled(import_log.task_id)
+
+    def save_checkpoint(offset):
+        """批量提交后记录断点（已提交的记录位置）"""
+        import_log.checkpoint_offset = offset
+        import_log.checkpoint_hash = import_log.file_hash
+        import_log.checkpoint_at = datetime.now()
+        db.session.commit()
+
+    processor.checkpoint_callback = save_checkpoint
+
+
+def process_file_async(task_id, filepath, data_type, overwrite, log_id, replace_range=False, resume_offset=0):
     """
     异步处理文件
 
@@ -195,6 +597,8 @@ def process_file_async(task_id, filepath, data_type, overwrite, log_id):
         data_type: 数据类型
         overwrite: 是否覆盖模式
         log_id: 导入日志ID
+        replace_range: 是否按日期范围替换
+        resume_offset: 断点位置（之前已提交的记录数，从该位置继续写入）
     """
     try:
         # 获取应用上下文
@@ -216,168 +620,50 @@ def process_file_async(task_id, filepath, data_type, overwrite, log_id):
             if not ProcessorClass:
                 raise Exception(f"不支持的数据类型: {data_type}")
 
-            # 创建处理器实例
+            # 创建处理器实例（写入阶段与其他导入任务串行）
             processor = ProcessorClass(db.session)
+            processor.write_lock = import_queue.write_lock
+            attach_checkpoint(processor, import_log, resume_offset)
 
-            # 处理数据导入
-            result = processor.import_data(
-                filepath,
-                overwrite=overwrite,
-                batch_size=1000
-            )
-
-            # 更新导入日志
-            if result['success']:
-                import_log.status = 'completed'
-                import_log.completed_at = datetime.now()
-                import_log.progress = 100
-                import_log.total_rows = result.get('total_rows', 0)
-                import_log.processed_rows = result.get('processed_rows', 0)
-                import_log.inserted_rows = result.get('inserted_rows', 0)
-                import_log.updated_rows = result.get('updated_rows', 0)
-                import_log.failed_rows = result.get('failed_rows', 0)
-                import_log.encoding = result.get('encoding')
-                import_log.processing_time = result.get('processing_time')
-                import_log.quality_score = result.get('quality_score')
-
-                # 构建消息（包含warnings信息）
-                message = result.get('message', '处理完成')
-                if result.get('warnings'):
-                    warning_msg = '\n\n' + '\n'.join(result['warnings'])
-                    message += warning_msg
+            def update_progress(progress, message):
+                """导入进度回调（流式导入每块调用一次）"""
+                import_log.progress = progress
                 import_log.message = message
+                db.session.commit()
+
+            # 处理数据导入（统计分阶段耗时、数据库语句数、内存峰值）
+            try:
+                with processor.metrics.track(db.session):
+                    result = processor.import_data(
+                        filepath,
+                        overwrite=overwrite,
+                        batch_size=1000,
+                        progress_callback=update_progress,
+                        replace_range=replace_range
+                    )
+            except ImportCancelled:
+                # 取消：当前批次已回滚，之前提交的批次保留（并刷新其涉及的映射和聚合表）
+                db.session.rollback()
+                mark_cancelled(import_log)
+                refresh_after_cancel(data_type, import_log, processor)
+                db.session.commit()
+                current_app.logger.info(f"导入任务已取消: {task_id}")
+                return
+            result['metrics'] = processor.metrics.summary(result.get('total_rows'))
 
-                if result.get('errors'):
-                    import_log.error_message = '\n'.join(result['errors'][:10])
+            # 更新导入日志
+            apply_import_result(import_log, result)
 
+            if result['success']:
                 # 自动补充小红书笔记映射表（仅针对xhs_notes_content_daily 和 xhs_notes_daily）
                 # ⚠️ 重要：必须在聚合表更新之前执行，否则聚合会读取到不完整的映射数据
-                if data_type in ['xhs_notes_content_daily', 'xhs_notes_daily'] and result.get('success'):
-                    try:
-                        import_log.message += '\n\n正在补充笔记映射表...'
-                        db.session.commit()
+                supplement_note_mappings(data_type, import_log)
 
-                        if data_type == 'xhs_notes_content_daily':
-                            # 从内容表补充mapping
-                            from backend.scripts.update_missing_mappings import update_missing_mappings_sql
-                            mapping_stats = update_missing_mappings_sql()
-                            import_log.message += f'\n笔记映射补充完成！处理 {mapping_stats} 条记录（新增+更新空字段）。'
-                        elif data_type == 'xhs_notes_daily':
-                            # 从广告表补充mapping（v3.2 新增）
-                            from backend.models import XhsNotesDaily, XhsNoteInfo
-
-                            # 获取所有唯一笔记的基础属性
-                            notes_data = db.session.query(
-                                XhsNotesDaily.note_id,
-                                XhsNotesDaily.note_title,
-                                XhsNotesDaily.note_url
-                            ).distinct(
-                                XhsNotesDaily.note_id
-                            ).all()
-
-                            new_count = 0
-                            updated_count = 0
-
-                            for note in notes_data:
-                                if not note.note_id:
-                                    continue
-
-                                # 检查是否已存在
-                                mapping = db.session.query(XhsNoteInfo).filter(
-                                    XhsNoteInfo.note_id == note.note_id
-                                ).first()
-
-                                if mapping:
-                                    # 更新空字段
-                                    updated = False
-                                    if not mapping.note_title and note.note_title:
-                                        mapping.note_title = note.note_title
-                                        updated = True
-                                    if not mapping.note_url and note.note_url:
-                                        mapping.note_url = note.note_url
-                                        updated = True
-
-                                    if updated:
-                                        updated_count += 1
-                                else:
-                                    # 创建新记录
-                                    new_mapping = XhsNoteInfo(
-                                        note_id=note.note_id,
-                                        note_title=note.note_title,
-                                        note_url=note.note_url
-                                    )
-                                    db.session.add(new_mapping)
-                                    new_count += 1
-
-                            db.session.commit()
-                            import_log.message += f'\n笔记映射补充完成！新增 {new_count} 条，更新 {updated_count} 条。'
-                    except Exception as mapping_error:
-                        # mapping补充失败不影响导入结果
-                        import_log.message += f'\n笔记映射补充失败（可手动运行）: {str(mapping_error)}'
-                        current_app.logger.warning(f"笔记映射补充失败: {str(mapping_error)}")
-
-                # 自动触发聚合表更新
-                #
-                # daily_metrics_unified（代理商维度聚合表）：
-                #   - 只聚合广告数据：tencent_ads, douyin_ads, xiaohongshu_ads
-                #   - 只聚合转化数据：backend_conversion
-                #   - 不聚合小红书笔记数据（xhs_notes_daily, xhs_notes_content_daily）
-                #
-                # daily_notes_metrics_unified（小红书笔记维度聚合表）：
-                #   - 聚合小红书笔记数据：xhs_notes_daily, xhs_notes_content_daily
-                #   - 聚合转化数据：backend_conversion（通过 note_id 关联）
-                #   - 不聚合小红书广告数据（xiaohongshu_ads）
-                if data_type in ['tencent_ads', 'douyin_ads', 'xiaohongshu_ads', 'backend_conversion']:
-                    try:
-                        import_log.message += '\n\n正在更新聚合表...'
-                        db.session.commit()
-
-                        # 导入聚合脚本（通用）
-                        from backend.scripts.aggregations.update_daily_metrics_unified import update_daily_metrics
-                        update_daily_metrics()
-
-                        # 如果是小红书笔记数据或后端转化数据，额外更新笔记聚合表
-                        #
-                        # daily_notes_metrics_unified（笔记维度聚合表）：
-                        #   - 通过 note_id 维度聚合笔记数据
-                        #   - 支持从 backend_conversions 关联转化数据
-                        #   - 维度字段优先从 xhs_note_info 获取（note_title, publish_account, publish_time, producer, ad_strategy）
-                        #
-                        # 适用的数据类型：
-                        #   - xhs_notes_content_daily（小红书笔记运营数据）
-                        #   - xhs_notes_daily（小红书笔记投放数据）
-                        #   - xhs_notes_list（小红书笔记列表数据，直接更新 xhs_note_info 表）
-                        #   - backend_conversion（后端转化数据，包含 note_id 字段）
-                        if data_type in ['xhs_notes_content_daily', 'xhs_notes_daily', 'xhs_notes_list', 'backend_conversion']:
-                            import_log.message += '\n\n正在更新笔记聚合表...'
-                            db.session.commit()
-
-                            from backend.scripts.aggregations.update_daily_notes_metrics import update_daily_notes_metrics
-                            update_daily_notes_metrics()
-
-                            import_log.message += '\n笔记聚合表更新完成！'
-
-                        import_log.message += '\n聚合表更新完成！'
-                    except Exception as agg_error:
-                        # 聚合失败不影响导入结果
-                        import_log.message += f'\n聚合表更新失败（可手动运行）: {str(agg_error)}'
-                        current_app.logger.warning(f"聚合表更新失败: {str(agg_error)}")
+                # 自动触发聚合表更新（只刷新本次导入涉及的平台和日期）
+                refresh_aggregations([data_type], import_log, merge_touched_ranges([result.get('touched_ranges')]))
 
                 # 自动删除已处理的上传文件（仅在成功时）
-                if result.get('success') and os.path.exists(filepath):
-                    try:
-                        os.remove(filepath)
-                        import_log.message += f'\n\n上传文件已自动删除'
-                        current_app.logger.info(f"已删除上传文件: {filepath}")
-                    except Exception as delete_error:
-                        # 删除失败不影响导入结果
-                        import_log.message += f'\n\n上传文件删除失败: {str(delete_error)}'
-                        current_app.logger.warning(f"删除上传文件失败: {filepath}, 错误: {str(delete_error)}")
-            else:
-                import_log.status = 'failed'
-                import_log.completed_at = datetime.now()
-                import_log.error_code = 'PROCESSING_ERROR'
-                import_log.error_message = result.get('error', '处理失败')
+                remove_uploaded_file(filepath, import_log)
 
             db.session.commit()
 
@@ -394,11 +680,7 @@ def process_file_async(task_id, filepath, data_type, overwrite, log_id):
             try:
                 import_log = db.session.query(DataImportLog).get(log_id)
                 if import_log:
-                    import_log.status = 'failed'
-                    import_log.completed_at = datetime.now()
-                    import_log.error_code = 'SYSTEM_ERROR'
-                    import_log.error_message = str(e)
-                    import_log.message = f'处理失败: {str(e)}'
+                    mark_system_error(import_log, e)
                     db.session.commit()
             except:
                 # 如果更新日志也失败，至少记录错误
@@ -407,7 +689,369 @@ def process_file_async(task_id, filepath, data_type, overwrite, log_id):
                 except:
                     pass
 
-        current_app.logger.error(f"处理文件失败: {str(e)}\n{traceback.format_exc()}")
+            current_app.logger.error(f"处理文件失败: {str(e)}\n{traceback.format_exc()}")
+
+
+def process_batch_async(job):
+    """
+    处理批量上传的一个批次
+
+    1. 解析阶段：进程池并行解析所有文件（不访问数据库）
+    2. 写入阶段：在写入锁内按上传顺序逐个文件写入，每个文件单独记录结果
+    3. 所有文件写入完成后，补充笔记映射表、更新聚合表各一次
+
+    Args:
+        job: 队列领取的批量任务（batch_id, import_type, overwrite, replace_range, jobs）
+    """
+    from app import app
+    from config import UPLOAD_FOLDER, IMPORT_PARSE_PROCESSES
+
+    data_type = job['import_type']
+    overwrite = job['overwrite']
+    replace_range = job.get('replace_range', False)
+    children = job['jobs']
+    filepaths = [os.path.join(UPLOAD_FOLDER, child['file_path']) for child in children]
+
+    with app.app_context():
+        try:
+            import_logs = [db.session.query(DataImportLog).get(child['id']) for child in children]
+
+            ProcessorClass = PROCESSORS.get(data_type)
+            if not ProcessorClass:
+                raise Exception(f"不支持的数据类型: {data_type}")
+
+            two_phase = supports_parallel_parse(ProcessorClass)
+
+            # 1. 解析阶段
+            if two_phase:
+                for import_log in import_logs:
+                    import_log.progress = 10
+                    import_log.message = f'正在解析文件（批次共 {len(children)} 个文件）...'
+                db.session.commit()
+
+                processes = resolve_parse_processes(IMPORT_PARSE_PROCESSES, len(filepaths))
+                parsed_results = parse_files(ProcessorClass, filepaths, processes)
+
+                for import_log, parsed in zip(import_logs, parsed_results):
+                    if parsed['success']:
+                        import_log.progress = 50
+                        import_log.message = '解析完成，等待写入...'
+                    else:
+                        apply_import_result(import_log, parsed)
+                db.session.commit()
+            else:
+                parsed_results = [None] * len(children)
+
+            # 2. 写入阶段（整个批次占用写入锁，其他任务的写入排在批次之后）
+            succeeded = []
+            partially_cancelled = []
+            touched = []
+            with import_queue.write_lock:
+                batch_writer = None
+                if two_phase and any(parsed and parsed['success'] for parsed in parsed_results):
+                    batch_writer = ProcessorClass(db.session)
+                    batch_writer.write_lock = import_queue.write_lock
+                    batch_writer.prepare_batch_write(overwrite)
+
+                for child, import_log, parsed, filepath in zip(children, import_logs, parsed_results, filepaths):
+                    if import_log.status == 'failed':
+                        continue
+
+                    processor = None
+                    try:
+                        import_queue.check_cancelled(child['task_id'])
+                        import_log.progress = 60
+                        import_log.message = '正在写入数据库...'
+                        db.session.commit()
+
+                        processor = ProcessorClass(db.session)
+                        processor.write_lock = import_queue.write_lock
+                        attach_checkpoint(processor, import_log, child.get('resume_offset', 0))
+
+                        if parsed is None:
+                            def update_progress(progress, message, log=import_log):
+                                """导入进度回调"""
+                                log.progress = progress
+                                log.message = message
+                                db.session.commit()
+
+                            with processor.metrics.track(db.session):
+                                result = processor.import_data(
+                                    filepath,
+                                    overwrite=overwrite,
+                                    batch_size=1000,
+                                    progress_callback=update_progress,
+                                    replace_range=replace_range
+                                )
+                        else:
+                            with processor.metrics.track(db.session):
+                                result = processor.write_parsed(
+                                    parsed, overwrite=overwrite, batch_size=1000, replace_range=replace_range
+                                )
+                        result['metrics'] = processor.metrics.summary(result.get('total_rows'))
+
+                        apply_import_result(import_log, result)
+                        if result['success']:
+                            succeeded.append(import_log)
+                            touched.append(result.get('touched_ranges'))
+                            remove_uploaded_file(filepath, import_log)
+                    except ImportCancelled:
+                        db.session.rollback()
+                        mark_cancelled(import_log)
+                        if processor is not None and processor.committed_rows:
+                            partially_cancelled.append(import_log)
+                            touched.append(processor.get_touched_ranges())
+                    except Exception as e:
+                        db.session.rollback()
+                        mark_system_error(import_log, e)
+                        current_app.logger.error(f"批量导入文件失败: {import_log.file_name}, 错误: {str(e)}")
+
+                    db.session.commit()
+
+                if batch_writer is not None:
+                    try:
+                        batch_writer.finish_batch_write(overwrite, committed=bool(succeeded))
+                    except Exception as e:
+                        # 例如影子表替换失败：已写入的文件实际没有生效
+                        db.session.rollback()
+                        for import_log in succeeded:
+                            mark_system_error(import_log, e)
+                        succeeded = []
+                        touched = []
+                        db.session.commit()
+
+            # 3. 整个批次只补充一次映射、更新一次聚合表（提示消息记录在最后一个成功的文件上；
+            #    取消的文件已提交的批次同样需要刷新）
+            refreshed = succeeded or partially_cancelled
+            if refreshed:
+                supplement_note_mappings(data_type, refreshed[-1])
+                refresh_aggregations([data_type], refreshed[-1], merge_touched_ranges(touched))
+                db.session.commit()
+
+        except Exception as e:
+            db.session.rollback()
+            for child in children:
+                import_log = db.session.query(DataImportLog).get(child['id'])
+                if import_log and import_log.status == 'processing':
+                    mark_system_error(import_log, e)
+            db.session.commit()
+            current_app.logger.error(f"批量导入失败: {job['batch_id']}, 错误: {str(e)}\n{traceback.format_exc()}")
+
+
+def apply_import_result(import_log, result):
+    """
+    将处理器的导入结果写入导入日志（不提交）
+
+    Args:
+        import_log: 导入日志记录
+        result: 处理器 import_data / write_parsed 的返回值
+    """
+    if result['success']:
+        import_log.status = 'completed'
+        import_log.completed_at = datetime.now()
+        import_log.progress = 100
+        import_log.total_rows = result.get('total_rows', 0)
+        import_log.processed_rows = result.get('processed_rows', 0)
+        import_log.inserted_rows = result.get('inserted_rows', 0)
+        import_log.updated_rows = result.get('updated_rows', 0)
+        import_log.failed_rows = result.get('failed_rows', 0)
+        import_log.encoding = result.get('encoding')
+        import_log.processing_time = result.get('processing_time')
+        import_log.quality_score = result.get('quality_score')
+        if result.get('quality_details'):
+            import_log.quality_details = json.dumps(result['quality_details'], ensure_ascii=False)
+
+        # 构建消息（包含warnings信息）
+        message = result.get('message', '处理完成')
+        if result.get('warnings'):
+            warning_msg = '\n\n' + '\n'.join(result['warnings'])
+            message += warning_msg
+        import_log.message = message
+
+        if result.get('errors'):
+            import_log.error_message = '\n'.join(result['errors'][:10])
+    else:
+        import_log.status = 'failed'
+        import_log.completed_at = datetime.now()
+        import_log.error_code = 'PROCESSING_ERROR'
+        import_log.error_message = result.get('error', '处理失败')
+
+    # 性能指标（失败的导入同样记录，便于事后诊断）
+    metrics = result.get('metrics')
+    if metrics:
+        import_log.stage_timings = json.dumps(metrics['stages'], ensure_ascii=False)
+        import_log.rows_per_second = metrics['rows_per_second']
+        import_log.peak_memory_mb = metrics['peak_memory_mb']
+        import_log.db_statements = metrics['db_statements']
+
+
+def mark_cancelled(import_log):
+    """标记任务已取消（不提交）"""
+    import_log.status = 'cancelled'
+    import_log.completed_at = datetime.now()
+    import_log.message = '任务已取消（取消前已提交的批次保留）'
+
+
+def refresh_after_cancel(data_type, import_log, processor):
+    """
+    取消时已有批次提交：补充笔记映射表并刷新这些批次涉及的聚合表（不提交）
+
+    Args:
+        data_type: 数据类型
+        import_log: 导入日志记录（追加提示消息）
+        processor: 被取消的处理器（committed_rows / get_touched_ranges() 为已提交批次的统计）
+    """
+    if not processor.committed_rows:
+        return
+
+    supplement_note_mappings(data_type, import_log)
+    refresh_aggregations([data_type], import_log, merge_touched_ranges([processor.get_touched_ranges()]))
+
+
+def mark_system_error(import_log, error):
+    """标记任务因系统异常失败（不提交）"""
+    import_log.status = 'failed'
+    import_log.completed_at = datetime.now()
+    import_log.error_code = 'SYSTEM_ERROR'
+    import_log.error_message = str(error)
+    import_log.message = f'处理失败: {str(error)}'
+
+
+def supplement_note_mappings(data_type, import_log):
+    """
+    自动补充小红书笔记映射表（仅针对 xhs_notes_content_daily 和 xhs_notes_daily）
+
+    必须在聚合表更新之前执行，否则聚合会读取到不完整的映射数据；
+    补充失败不影响导入结果，只记录在 import_log.message 中
+
+    Args:
+        data_type: 数据类型
+        import_log: 导入日志记录（追加提示消息）
+    """
+    if data_type not in ['xhs_notes_content_daily', 'xhs_notes_daily']:
+        return
+
+    try:
+        import_log.message += '\n\n正在补充笔记映射表...'
+        db.session.commit()
+
+        if data_type == 'xhs_notes_content_daily':
+            # 从内容表补充mapping
+            from backend.scripts.update_missing_mappings import update_missing_mappings_sql
+            mapping_stats = update_missing_mappings_sql()
+            import_log.message += f'\n笔记映射补充完成！处理 {mapping_stats} 条记录（新增+更新空字段）。'
+        elif data_type == 'xhs_notes_daily':
+            # 从广告表补充mapping（v3.2 新增）：分块 IN 查询已有笔记 + 一次 INSERT … ON CONFLICT 写入
+            from backend.models import XhsNotesDaily
+            from backend.utils.note_info_sync import sync_note_info
+
+            # 获取所有唯一笔记的基础属性
+            notes_data = db.session.query(
+                XhsNotesDaily.note_id,
+                XhsNotesDaily.note_title,
+                XhsNotesDaily.note_url
+            ).distinct().all()
+
+            stats = sync_note_info(db.session, [note._asdict() for note in notes_data])
+            db.session.commit()
+            import_log.message += f'\n笔记映射补充完成！新增 {stats["new_count"]} 条，更新 {stats["updated_count"]} 条。'
+    except Exception as mapping_error:
+        # mapping补充失败不影响导入结果
+        import_log.message += f'\n笔记映射补充失败（可手动运行）: {str(mapping_error)}'
+        current_app.logger.warning(f"笔记映射补充失败: {str(mapping_error)}")
+
+
+def refresh_aggregations(data_types, import_log, ranges=None):
+    """
+    自动触发聚合表更新（批量上传时所有文件写入完成后只执行一次）
+
+    daily_metrics_unified 只刷新导入涉及的平台和日期（ranges）；范围未知时
+    （如后端转化全量覆盖）全量刷新。全量重建使用 /api/v1/aggregation/update
+
+    daily_metrics_unified（代理商维度聚合表）：
+      - 只聚合广告数据：tencent_ads, douyin_ads, xiaohongshu_ads
+      - 只聚合转化数据：backend_conversion
+      - 不聚合小红书笔记数据（xhs_notes_daily, xhs_notes_content_daily）
+
+    daily_notes_metrics_unified（小红书笔记维度聚合表）：
+      - 聚合小红书笔记数据：xhs_notes_daily, xhs_notes_content_daily
+      - 聚合转化数据：backend_conversion（通过 note_id 关联）
+      - 不聚合小红书广告数据（xiaohongshu_ads）
+
+    聚合失败不影响导入结果，只记录在 import_log.message 中
+
+    Args:
+        data_types: 本次导入的数据类型列表
+        import_log: 导入日志记录（追加提示消息）
+        ranges: {平台: (最早日期, 最晚日期)}（merge_touched_ranges 的返回值），
+                None 表示范围未知（全量刷新），空字典表示没有写入数据
+    """
+    data_types = set(data_types)
+    if not data_types & {'tencent_ads', 'douyin_ads', 'xiaohongshu_ads', 'backend_conversion'}:
+        return
+
+    try:
+        import_log.message += '\n\n正在更新聚合表...'
+        db.session.commit()
+
+        # 导入聚合脚本（通用）
+        from backend.scripts.aggregations.update_daily_metrics_unified import (
+            update_daily_metrics, update_daily_metrics_for_ranges
+        )
+        with import_queue.write_lock:
+            if ranges is None:
+                update_daily_metrics()
+            elif ranges:
+                update_daily_metrics_for_ranges(ranges)
+        if ranges:
+            import_log.message += '\n聚合范围: ' + '，'.join(
+                f"{platform} {start} ~ {end}" for platform, (start, end) in sorted(ranges.items())
+            )
+        elif ranges is not None:
+            import_log.message += '\n没有数据变化，跳过代理商维度聚合'
+
+        # 如果是小红书笔记数据或后端转化数据，额外更新笔记聚合表
+        #
+        # daily_notes_metrics_unified（笔记维度聚合表）：
+        #   - 通过 note_id 维度聚合笔记数据
+        #   - 支持从 backend_conversions 关联转化数据
+        #   - 维度字段优先从 xhs_note_info 获取（note_title, publish_account, publish_time, producer, ad_strategy）
+        #
+        # 适用的数据类型：
+        #   - xhs_notes_content_daily（小红书笔记运营数据）
+        #   - xhs_notes_daily（小红书笔记投放数据）
+        #   - xhs_notes_list（小红书笔记列表数据，直接更新 xhs_note_info 表）
+        #   - backend_conversion（后端转化数据，包含 note_id 字段）
+        if data_types & {'xhs_notes_content_daily', 'xhs_notes_daily', 'xhs_notes_list', 'backend_conversion'}:
+            import_log.message += '\n\n正在更新笔记聚合表...'
+            db.session.commit()
+
+            from backend.scripts.aggregations.update_daily_notes_metrics import update_daily_notes_metrics
+            with import_queue.write_lock:
+                update_daily_notes_metrics()
+
+            import_log.message += '\n笔记聚合表更新完成！'
+
+        import_log.message += '\n聚合表更新完成！'
+    except Exception as agg_error:
+        # 聚合失败不影响导入结果
+        import_log.message += f'\n聚合表更新失败（可手动运行）: {str(agg_error)}'
+        current_app.logger.warning(f"聚合表更新失败: {str(agg_error)}")
+
+
+def remove_uploaded_file(filepath, import_log):
+    """自动删除已处理的上传文件（删除失败不影响导入结果）"""
+    if not os.path.exists(filepath):
+        return
+
+    try:
+        os.remove(filepath)
+        import_log.message += f'\n\n上传文件已自动删除'
+        current_app.logger.info(f"已删除上传文件: {filepath}")
+    except Exception as delete_error:
+        # 删除失败不影响导入结果
+        import_log.message += f'\n\n上传文件删除失败: {str(delete_error)}'
+        current_app.logger.warning(f"删除上传文件失败: {filepath}, 错误: {str(delete_error)}")
 
 
 @bp.route('/status/<task_id>', methods=['GET'])
@@ -423,6 +1067,7 @@ def get_task_status(task_id):
         import_type: 数据类型
         file_name: 文件名
         status: 状态
+        queue_position: 排队位置（仅排队中）
         progress: 进度（0-100）
         message: 提示消息
         total_rows: 总行数
@@ -467,6 +1112,9 @@ def get_task_status(task_id):
         }
     }
 
+    if import_log.status == 'queued':
+        response['data']['queue_position'] = import_queue.queue_position(import_log)
+
     if import_log.status == 'failed':
         response['data']['error_code'] = import_log.error_code
         response['data']['error_message'] = import_log.error_message
@@ -474,6 +1122,118 @@ def get_task_status(task_id):
     return jsonify(response)
 
 
+@bp.route('/batch-status/<batch_id>', methods=['GET'])
+def get_batch_status(batch_id):
+    """
+    获取批量上传批次状态
+
+    参数:
+        batch_id: 批次ID
+
+    返回:
+        batch_id: 批次ID
+        status: 批次状态（queued / processing / completed / failed / partial）
+        counts: 各状态的文件数
+        tasks: 每个文件的任务状态
+    """
+    import_logs = db.session.query(DataImportLog).filter_by(
+        batch_id=batch_id
+    ).order_by(DataImportLog.id.asc()).all()
+
+    if not import_logs:
+        return jsonify({
+            'success': False,
+            'error': 'BATCH_NOT_FOUND',
+            'message': '批次不存在'
+        }), 404
+
+    counts = {}
+    for log in import_logs:
+        counts[log.status] = counts.get(log.status, 0) + 1
+
+    if counts.get('queued') == len(import_logs):
+        status = 'queued'
+    elif counts.get('queued') or counts.get('processing'):
+        status = 'processing'
+    elif counts.get('completed') == len(import_logs):
+        status = 'completed'
+    elif not counts.get('completed'):
+        status = 'failed'
+    else:
+        status = 'partial'
+
+    data = {
+        'batch_id': batch_id,
+        'import_type': import_logs[0].import_type,
+        'import_type_name': DATA_TYPES.get(import_logs[0].import_type, import_logs[0].import_type),
+        'status': status,
+        'file_count': len(import_logs),
+        'counts': counts,
+        'inserted_rows': sum(log.inserted_rows or 0 for log in import_logs),
+        'updated_rows': sum(log.updated_rows or 0 for log in import_logs),
+        'failed_rows': sum(log.failed_rows or 0 for log in import_logs),
+        'tasks': [
+            {
+                'task_id': log.task_id,
+                'file_name': log.file_name,
+                'status': log.status,
+                'progress': log.progress,
+                'message': log.message,
+                'inserted_rows': log.inserted_rows,
+                'updated_rows': log.updated_rows,
+                'failed_rows': log.failed_rows,
+                'error_message': log.error_message if log.status == 'failed' else None
+            }
+            for log in import_logs
+        ]
+    }
+
+    if status == 'queued':
+        data['queue_position'] = import_queue.queue_position(import_logs[0])
+
+    return jsonify({
+        'success': True,
+        'data': data
+    })
+
+
+@bp.route('/cancel/<task_id>', methods=['POST'])
+def cancel_task(task_id):
+    """
+    取消导入任务
+
+    排队中的任务直接取消；处理中的任务在下一个进度点停止（当前批次回滚，已提交的批次保留）
+
+    参数:
+        task_id: 任务ID
+    """
+    import_log = db.session.query(DataImportLog).filter_by(task_id=task_id).first()
+
+    if not import_log:
+        return jsonify({
+            'success': False,
+            'error': 'TASK_NOT_FOUND',
+            'message': '任务不存在'
+        }), 404
+
+    accepted, message = import_queue.cancel(import_log)
+    if not accepted:
+        return jsonify({
+            'success': False,
+            'error': 'TASK_NOT_CANCELLABLE',
+            'message': message
+        }), 409
+
+    return jsonify({
+        'success': True,
+        'data': {
+            'task_id': task_id,
+            'status': import_log.status,
+            'message': message
+        }
+    })
+
+
 @bp.route('/history', methods=['GET'])
 def get_import_history():
     """
@@ -529,9 +1289,19 @@ def get_import_history():
             'updated_rows': record.updated_rows,
             'failed_rows': record.failed_rows,
             'quality_score': float(record.quality_score) if record.quality_score else None,
+            'quality_details': json.loads(record.quality_details) if record.quality_details else None,
             'encoding': record.encoding,
             'processing_time': record.processing_time,
+            'stage_timings': json.loads(record.stage_timings) if record.stage_timings else None,
+            'rows_per_second': float(record.rows_per_second) if record.rows_per_second is not None else None,
+            'peak_memory_mb': float(record.peak_memory_mb) if record.peak_memory_mb is not None else None,
+            'db_statements': record.db_statements,
             'overwrite': record.overwrite,
+            'replace_range': record.replace_range,
+            'priority': record.priority,
+            'batch_id': record.batch_id,
+            'file_hash': record.file_hash,
+            'checkpoint_offset': record.checkpoint_offset,
             'started_at': record.started_at.isoformat() if record.started_at else None,
             'completed_at': record.completed_at.isoformat() if record.completed_at else None,
             'created_at': record.created_at.isoformat() if record.created_at else None
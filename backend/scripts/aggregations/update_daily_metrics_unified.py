@@ -14,6 +14,9 @@
 
     # 更新指定日期范围
     python backend/scripts/aggregations/update_daily_metrics_unified.py 2025-01-01 2025-01-15
+
+导入完成后只刷新导入涉及的平台和日期（update_daily_metrics_for_ranges），
+全量重建使用 /api/v1/aggregation/update
 """
 
 import sys
@@ -34,7 +37,10 @@ from backend.models import (
     AccountAgencyMapping,
     AgencyAbbreviationMapping
 )
-from sqlalchemy import func, and_, or_, distinct, case, text
+from backend.utils.aggregation_scope import group_refresh_scopes
+from sqlalchemy import func, and_, or_, distinct, case, text, select, literal, literal_column
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
 
 
 # 业务模式映射规则（代理商 → 业务模式）
@@ -43,70 +49,76 @@ BUSINESS_MODEL_MAPPING = {
     '直播': ['信则', '优品', '高德']
 }
 
+# 广告数据平台
+AD_PLATFORMS = ('腾讯', '抖音', '小红书')
+
+# 抖音/小红书/yj/高德 转化数据的平台来源 → 聚合表平台（yj→云极，高德作为独立平台）
+CONVERSION_PLATFORM_MAPPING = {
+    '抖音': '抖音',
+    '小红书': '小红书',
+    'yj': '云极',
+    '高德': '高德'
+}
+
+# 聚合表指标字段（广告数据 / 转化数据）
+AD_METRIC_FIELDS = ('cost', 'impressions', 'click_users')
+CONVERSION_METRIC_FIELDS = (
+    'lead_users', 'potential_customers', 'customer_mouth_users',
+    'valid_lead_users', 'opened_account_users', 'valid_customer_users'
+)
+
+# 聚合维度唯一索引（agency/business_model 可为空，使用 COALESCE 表达式）
+UNIQUE_INDEX_SQL = """
+    CREATE UNIQUE INDEX IF NOT EXISTS idx_unique_metrics_v3
+    ON daily_metrics_unified(date, platform, COALESCE(agency, ''), COALESCE(business_model, ''))
+"""
+
 
-def get_business_model_for_agency(agency):
+def _platform_selector(platforms=None):
     """
-    根据代理商名称获取业务模式
+    平台过滤函数
 
     Args:
-        agency: 代理商名称
+        platforms: 要聚合的聚合表平台（None 表示全部平台）
 
     Returns:
-        业务模式（'信息流' 或 '直播'），如果未找到返回 None
+        selected(platform) -> bool
     """
-    if not agency:
-        return None
-
-    for business_model, agencies in BUSINESS_MODEL_MAPPING.items():
-        if agency in agencies:
-            return business_model
+    platforms = set(platforms) if platforms is not None else None
+    return lambda platform: platforms is None or platform in platforms
 
-    return None
 
-
-def apply_business_model_mapping(agency, business_model, platform=None):
+def business_model_case(agency, business_model, platform):
     """
-    应用业务模式映射规则
+    业务模式映射规则（SQL CASE 表达式，随聚合查询在数据库中计算）
 
     优先级：
     1. 如果已有业务模式且不为空，保持不变
     2. 腾讯申万宏源直投，未归因业务模式的，默认为直播
     3. 小红书平台，未归因业务模式的，默认为信息流（转化链路特殊）
     4. 腾讯众联，未归因业务模式的，默认为信息流
-    5. 否则根据代理商名称映射
+    5. 否则根据代理商名称映射（BUSINESS_MODEL_MAPPING）
     6. 如果代理商也不在映射表中，返回空字符串
 
     Args:
-        agency: 代理商名称
-        business_model: 当前业务模式
-        platform: 平台（腾讯/抖音/小红书）
+        agency: 代理商（SQL 表达式，空值已转为空字符串）
+        business_model: 当前业务模式（SQL 表达式，空值已转为空字符串）
+        platform: 平台（腾讯/抖音/小红书，字符串或 SQL 表达式）
 
     Returns:
-        业务模式
+        SQLAlchemy case 表达式
     """
-    # 如果已有业务模式，保持不变
-    if business_model:
-        return business_model
-
-    # 特殊规则：腾讯申万宏源直投，默认为直播模式
-    if platform == '腾讯' and agency == '申万宏源直投':
-        return '直播'
-
-    # 特殊规则：小红书平台，默认为信息流（转化链路特殊）
-    if platform == '小红书':
-        return '信息流'
-
-    # 特殊规则：腾讯众联，默认为信息流
-    if platform == '腾讯' and agency == '众联':
-        return '信息流'
-
-    # 根据代理商名称映射
-    mapped_model = get_business_model_for_agency(agency)
-    if mapped_model:
-        return mapped_model
-
-    # 无法映射，返回空字符串
-    return ''
+    if isinstance(platform, str):
+        platform = literal(platform)
+
+    whens = [
+        (business_model != '', business_model),
+        (and_(platform == '腾讯', agency == '申万宏源直投'), '直播'),
+        (platform == '小红书', '信息流'),
+        (and_(platform == '腾讯', agency == '众联'), '信息流'),
+    ]
+    whens += [(agency.in_(agencies), model) for model, agencies in BUSINESS_MODEL_MAPPING.items()]
+    return case(*whens, else_='')
 
 
 def build_abbreviation_mapping_case():
@@ -143,14 +155,16 @@ def build_abbreviation_mapping_case():
         return BackendConversions.agency
 
 
-def update_daily_metrics(start_date=None, end_date=None):
+def update_daily_metrics(start_date=None, end_date=None, platforms=None):
     """
     更新日级指标聚合表 v3.0
 
     参数:
         start_date: 开始日期（YYYY-MM-DD 或 datetime.date），默认为所有数据的最早日期
         end_date: 结束日期（YYYY-MM-DD 或 datetime.date），默认为今天
+        platforms: 只聚合这些平台的广告和转化数据（腾讯/抖音/小红书/云极/高德），默认全部平台
     """
+    selected = _platform_selector(platforms)
 
     with app.app_context():
         # 默认日期范围：全量数据（从最早的数据到今天）
@@ -207,147 +221,32 @@ def update_daily_metrics(start_date=None, end_date=None):
         if isinstance(start_date, str):
             start_date = datetime.strptime(start_date, '%Y-%m-%d').date()
 
-        print(f"开始更新 daily_metrics_unified v3.0: {start_date} 到 {end_date}")
+        print(f"开始更新 daily_metrics_unified v3.0: {start_date} 到 {end_date}"
+              + (f"（平台: {', '.join(sorted(platforms))}）" if platforms is not None else ''))
         print(f"[INFO] 将聚合 {(end_date - start_date).days + 1} 天的数据")
 
+        _ensure_unique_index()
+
         # ===== 1. 聚合广告数据 =====
+        # 每个平台一条 INSERT … SELECT … ON CONFLICT DO UPDATE（只更新广告指标，保留转化指标）
         print("\n1. 聚合广告数据...")
 
-        # 1.1 腾讯广告数据
-        print("   1.1 聚合腾讯广告数据...")
-        tencent_ads = db.session.query(
-            RawAdDataTencent.date,
-            func.coalesce(AccountAgencyMapping.agency, '').label('agency'),
-            func.coalesce(AccountAgencyMapping.business_model, '').label('business_model'),
-            func.sum(RawAdDataTencent.cost).label('cost'),
-            func.sum(RawAdDataTencent.impressions).label('impressions'),
-            func.sum(RawAdDataTencent.click_users).label('click_users')
-        ).outerjoin(
-            AccountAgencyMapping,
-            and_(
-                AccountAgencyMapping.account_id == RawAdDataTencent.account_id,
-                AccountAgencyMapping.platform == '腾讯'
-            )
-        ).filter(
-            and_(
-                RawAdDataTencent.date >= start_date,
-                RawAdDataTencent.date <= end_date
-            )
-        ).group_by(
-            RawAdDataTencent.date,
-            AccountAgencyMapping.agency,
-            AccountAgencyMapping.business_model
-        ).all()
-
-        print(f"      找到 {len(tencent_ads)} 条腾讯广告数据")
-
-        # 保存腾讯广告数据
-        for ad in tencent_ads:
-            _save_ad_metric(ad, '腾讯')
-
-        # 1.2 抖音广告数据
-        # 注意：抖音没有 click_users 字段，使用 clicks 作为替代
-        print("   1.2 聚合抖音广告数据...")
-        douyin_ads = db.session.query(
-            RawAdDataDouyin.date,
-            func.coalesce(AccountAgencyMapping.agency, '').label('agency'),
-            func.coalesce(AccountAgencyMapping.business_model, '').label('business_model'),
-            func.sum(RawAdDataDouyin.cost).label('cost'),
-            func.sum(RawAdDataDouyin.impressions).label('impressions'),
-            func.sum(RawAdDataDouyin.clicks).label('click_users')
-        ).outerjoin(
-            AccountAgencyMapping,
-            and_(
-                AccountAgencyMapping.account_id == RawAdDataDouyin.account_id,
-                AccountAgencyMapping.platform == '抖音'
-            )
-        ).filter(
-            and_(
-                RawAdDataDouyin.date >= start_date,
-                RawAdDataDouyin.date <= end_date
-            )
-        ).group_by(
-            RawAdDataDouyin.date,
-            AccountAgencyMapping.agency,
-            AccountAgencyMapping.business_model
-        ).all()
-
-        print(f"      找到 {len(douyin_ads)} 条抖音广告数据")
-
-        # 保存抖音广告数据
-        for ad in douyin_ads:
-            _save_ad_metric(ad, '抖音')
-
-        # 1.3 小红书广告数据
-        # 注意：小红书使用 advertiser_account_id（主账户）和 sub_account_id（子账户）
-        # 小红书没有 click_users 字段，使用 clicks（总点击）作为替代
-        print("   1.3 聚合小红书广告数据...")
-
-        # 使用 CASE 表达式选择 account_id（优先使用子账户ID，用于JOIN映射表）
-        account_id_case = case(
-            (RawAdDataXiaohongshu.sub_account_id != None, RawAdDataXiaohongshu.sub_account_id),
-            else_=RawAdDataXiaohongshu.advertiser_account_id
-        )
-
-        xhs_ads = db.session.query(
-            RawAdDataXiaohongshu.date,
-            func.coalesce(AccountAgencyMapping.agency, '').label('agency'),
-            func.coalesce(AccountAgencyMapping.business_model, '').label('business_model'),
-            func.sum(RawAdDataXiaohongshu.cost).label('cost'),
-            func.sum(RawAdDataXiaohongshu.impressions).label('impressions'),
-            func.sum(RawAdDataXiaohongshu.clicks).label('click_users')
-        ).outerjoin(
-            AccountAgencyMapping,
-            and_(
-                AccountAgencyMapping.platform == '小红书',
-                # 优先匹配子账户（代理商投放）
-                or_(
-                    and_(
-                        AccountAgencyMapping.account_id == account_id_case,
-                        AccountAgencyMapping.account_id != None
-                    ),
-                    # 如果子账户不匹配，才匹配主账户（直投）
-                    and_(
-                        AccountAgencyMapping.main_account_id == RawAdDataXiaohongshu.advertiser_account_id,
-                        AccountAgencyMapping.account_id == None,
-                        # 关键修复：确保只在sub_account_id为NULL时才匹配直投映射
-                        RawAdDataXiaohongshu.sub_account_id == None
-                    )
-                )
-            )
-        ).filter(
-            and_(
-                RawAdDataXiaohongshu.date >= start_date,
-                RawAdDataXiaohongshu.date <= end_date
-            )
-        ).group_by(
-            RawAdDataXiaohongshu.date,
-            AccountAgencyMapping.agency,
-            AccountAgencyMapping.business_model
-        ).all()
-
-        print(f"      找到 {len(xhs_ads)} 条小红书广告数据")
-
-        # 保存小红书广告数据
-        for ad in xhs_ads:
-            _save_ad_metric(ad, '小红书')
+        for platform in AD_PLATFORMS:
+            if not selected(platform):
+                continue
+            written = _upsert_metrics(_ad_metrics_query(platform, start_date, end_date), AD_METRIC_FIELDS)
+            print(f"   {platform}广告数据: 写入 {written} 个分组")
 
         db.session.commit()
         print("   [OK] 广告数据聚合完成")
 
         # ===== 2. 聚合转化数据 =====
+        # 只更新转化指标，保留广告指标；没有广告数据的分组新建（广告指标为 0）
         print("\n2. 聚合转化数据...")
 
-        # 2.1 首先需要为 backend_conversions 关联代理商和业务模式
-        print("   2.1 计算转化数据的代理商和业务模式...")
-
-        conversion_data = _calculate_conversion_aggregation(start_date, end_date)
-
-        print(f"      找到 {len(conversion_data)} 条转化聚合数据")
-
-        # 保存转化数据
-        for conv in conversion_data:
-            _save_conversion_metric(conv)
+        for label, query in _conversion_metrics_queries(start_date, end_date, selected):
+            written = _upsert_metrics(query, CONVERSION_METRIC_FIELDS)
+            print(f"   {label}转化数据: 写入 {written} 个分组")
 
         db.session.commit()
         print("   [OK] 转化数据聚合完成")
@@ -369,320 +268,281 @@ def update_daily_metrics(start_date=None, end_date=None):
         print(f"\n[SUCCESS] 完成！")
 
 
-def _save_ad_metric(ad_data, platform):
-    """保存广告数据到聚合表
+def update_daily_metrics_for_ranges(ranges):
+    """
+    只刷新导入涉及的平台和日期（导入完成后调用）
+
+    参数:
+        ranges: {平台: (最早日期, 最晚日期)}（merge_touched_ranges 的返回值），
+                平台可以是转化数据的平台来源（yj 按云极聚合）
 
-    注意：不使用 account_id 维度，只按 date + platform + agency + business_model 聚合
-    这样可以确保广告数据和转化数据能够正确合并
+    返回:
+        实际执行的聚合范围 [(开始日期, 结束日期, [平台...])]
     """
-    # 应用业务模式映射规则
-    agency = ad_data.agency or ''
-    business_model = apply_business_model_mapping(agency, ad_data.business_model or '', platform)
-
-    # 查找或创建记录（不包含 account_id）
-    metric = DailyMetricsUnified.query.filter_by(
-        date=ad_data.date,
-        platform=platform,
-        agency=agency,
-        business_model=business_model
-    ).first()
-
-    if not metric:
-        metric = DailyMetricsUnified(
-            date=ad_data.date,
-            platform=platform,
-            account_id='',  # 不再细分到账号
-            account_name='',
-            agency=agency,
-            business_model=business_model
-        )
+    normalized = {}
+    for platform, (start, end) in ranges.items():
+        platform = CONVERSION_PLATFORM_MAPPING.get(platform, platform)
+        if platform in normalized:
+            start, end = min(start, normalized[platform][0]), max(end, normalized[platform][1])
+        normalized[platform] = (start, end)
+
+    scopes = group_refresh_scopes(normalized)
+    for start, end, platforms in scopes:
+        update_daily_metrics(start, end, platforms=platforms)
+    return scopes
+
 
-    # 更新广告指标
-    metric.cost = float(ad_data.cost or 0)
-    metric.impressions = int(ad_data.impressions or 0)
+def _ensure_unique_index():
+    """
+    确保聚合表上存在维度唯一索引（UPSERT 的冲突目标）
 
-    # 更新点击人数（从广告数据获取）
-    if hasattr(ad_data, 'click_users'):
-        metric.click_users = int(ad_data.click_users or 0)
+    新数据库由模型定义创建；旧数据库首次聚合时在这里补建，已有重复维度
+    记录时需要先运行迁移脚本去重
+    """
+    try:
+        db.session.execute(text(UNIQUE_INDEX_SQL))
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        raise RuntimeError(
+            'daily_metrics_unified 存在重复的维度记录，'
+            '请先运行 backend/migrations/add_daily_metrics_unique_index.py'
+        )
 
-    db.session.add(metric)
 
+def _upsert_metrics(query, metric_fields):
+    """
+    一条语句写入一个聚合查询的全部分组
 
-def _calculate_conversion_aggregation(start_date, end_date):
+    Returns:
+        写入（插入 + 更新）的分组数
     """
-    计算转化数据的代理商和业务模式聚合
+    return db.session.execute(build_upsert_statement(query, metric_fields)).rowcount
 
-    返回: List of dict，每个元素包含：
-        - date, platform, agency, business_model
-        - lead_users, potential_customers, customer_mouth_users,
-          valid_lead_users, opened_account_users, valid_customer_users
 
-    重要说明：
-        - backend_conversions 表本身已天然去重（外部导入时已去重）
-        - 直接使用 id 字段计数，不再使用 user_identifier 去重
-        - wechat_nickname 相同不代表同一个人，不应作为去重依据
+def build_upsert_statement(query, metric_fields):
     """
-    # 从 AgencyAbbreviationMapping 表动态构建简称映射（仅用于抖音）
-    agency_name_mapping = build_abbreviation_mapping_case()
+    构建 INSERT … SELECT … ON CONFLICT DO UPDATE 语句
 
-    # 业务模式推断逻辑
-    # customer_source 包含"引流" → 直播
-    # customer_source 有值但不包含"引流" → 信息流
-    # 其他 → 空字符串
-    business_model_mapping = case(
-        (BackendConversions.customer_source.like('%引流%'), '直播'),
-        (and_(
-            BackendConversions.customer_source.isnot(None),
-            BackendConversions.customer_source != ''
-        ), '信息流'),
-        else_=''
+    Args:
+        query: 聚合查询，列依次为 date, platform, agency, business_model, *metric_fields
+        metric_fields: 查询提供的指标字段（冲突时只更新这些字段，其他指标保留原值）
+    """
+    table = DailyMetricsUnified.__table__
+    other_fields = [field for field in AD_METRIC_FIELDS + CONVERSION_METRIC_FIELDS if field not in metric_fields]
+    now = datetime.now()
+
+    # 新建记录：不再细分到账号，其他来源的指标为 0
+    query = query.add_columns(
+        literal(''), literal(''),
+        *[literal(0) for _ in other_fields],
+        literal(now), literal(now)
+    )
+    names = (
+        ['date', 'platform', 'agency', 'business_model', *metric_fields, 'account_id', 'account_name']
+        + other_fields + ['created_at', 'updated_at']
     )
 
-    # ===== 1. 查询腾讯转化数据（需要通过广告账号表关联） =====
-    print("   2.1 计算腾讯转化数据（通过广告账号关联）...")
-    tencent_conversions = db.session.query(
-        BackendConversions.lead_date.label('date'),
-        func.coalesce(AccountAgencyMapping.agency, '').label('agency'),
-        func.coalesce(business_model_mapping, '').label('business_model'),
-        # 直接使用 id 计数（每条记录代表一个独立的线索）
-        func.count(BackendConversions.id).label('lead_users'),
-        # 带条件的计数（使用 CASE WHEN + id）
-        func.count(
-            case(
-                (BackendConversions.is_existing_customer == False, BackendConversions.id),
-                else_=None
-            )
-        ).label('potential_customers'),
-        func.count(
-            case(
-                (BackendConversions.is_customer_mouth == True, BackendConversions.id),
-                else_=None
-            )
-        ).label('customer_mouth_users'),
-        func.count(
-            case(
-                (BackendConversions.is_valid_lead == True, BackendConversions.id),
-                else_=None
-            )
-        ).label('valid_lead_users'),
-        func.count(
-            case(
-                (BackendConversions.is_opened_account == True, BackendConversions.id),
-                else_=None
-            )
-        ).label('opened_account_users'),
-        func.count(
-            case(
-                (BackendConversions.is_valid_customer == True, BackendConversions.id),
-                else_=None
-            )
-        ).label('valid_customer_users')
-    ).outerjoin(
-        RawAdDataTencent,
-        and_(
-            RawAdDataTencent.account_id == BackendConversions.ad_account,
-            RawAdDataTencent.date == BackendConversions.lead_date
+    stmt = sqlite_insert(table).from_select(names, query)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[
+            table.c.date,
+            table.c.platform,
+            func.coalesce(table.c.agency, literal_column("''")),
+            func.coalesce(table.c.business_model, literal_column("''"))
+        ],
+        set_={field: stmt.excluded[field] for field in (*metric_fields, 'updated_at')}
+    )
+    return stmt
+
+
+def _ad_source(platform):
+    """
+    平台的广告数据表、点击人数列和账号映射关联条件
+
+    注意：抖音/小红书没有 click_users 字段，使用 clicks 作为替代
+    """
+    if platform == '腾讯':
+        return RawAdDataTencent, RawAdDataTencent.click_users, and_(
+            AccountAgencyMapping.account_id == RawAdDataTencent.account_id,
+            AccountAgencyMapping.platform == '腾讯'
         )
-    ).outerjoin(
-        AccountAgencyMapping,
-        and_(
-            AccountAgencyMapping.platform == '腾讯',
-            AccountAgencyMapping.account_id == RawAdDataTencent.account_id
+
+    if platform == '抖音':
+        return RawAdDataDouyin, RawAdDataDouyin.clicks, and_(
+            AccountAgencyMapping.account_id == RawAdDataDouyin.account_id,
+            AccountAgencyMapping.platform == '抖音'
         )
-    ).filter(
-        and_(
-            BackendConversions.platform_source == '腾讯',
-            BackendConversions.lead_date >= start_date,
-            BackendConversions.lead_date <= end_date
+
+    # 小红书使用 advertiser_account_id（主账户）和 sub_account_id（子账户）
+    # 优先使用子账户ID关联映射表（代理商投放），子账户为空时匹配主账户（直投）
+    account_id_case = case(
+        (RawAdDataXiaohongshu.sub_account_id != None, RawAdDataXiaohongshu.sub_account_id),
+        else_=RawAdDataXiaohongshu.advertiser_account_id
+    )
+    return RawAdDataXiaohongshu, RawAdDataXiaohongshu.clicks, and_(
+        AccountAgencyMapping.platform == '小红书',
+        or_(
+            and_(
+                AccountAgencyMapping.account_id == account_id_case,
+                AccountAgencyMapping.account_id != None
+            ),
+            and_(
+                AccountAgencyMapping.main_account_id == RawAdDataXiaohongshu.advertiser_account_id,
+                AccountAgencyMapping.account_id == None,
+                # 确保只在 sub_account_id 为 NULL 时才匹配直投映射
+                RawAdDataXiaohongshu.sub_account_id == None
+            )
         )
-    ).group_by(
-        BackendConversions.lead_date,
-        AccountAgencyMapping.agency,
-        business_model_mapping
-    ).all()
+    )
 
-    print(f"      找到 {len(tencent_conversions)} 条腾讯转化聚合记录")
 
-    # ===== 2. 查询抖音和小红书转化数据（使用简称映射或直接JOIN） =====
-    print("   2.2 计算抖音和小红书转化数据...")
+def _ad_metrics_query(platform, start_date, end_date):
+    """
+    按 date + platform + agency + business_model 聚合一个平台的广告数据
 
-    # 代理商映射CASE表达式（抖音、小红书、yj、高德）
-    # 抖音：使用简称映射
-    # 小红书：优先从 JOIN 获取，如果为空则使用简称映射（备用）
-    # yj（云极）：独立平台，代理商为空
-    # 高德：独立平台，代理商为空
-    agency_mapping = case(
-        (BackendConversions.platform_source == '抖音', agency_name_mapping),
-        (BackendConversions.platform_source == '小红书', func.coalesce(AccountAgencyMapping.agency, agency_name_mapping)),
-        (BackendConversions.platform_source == 'yj', ''),
-        (BackendConversions.platform_source == '高德', ''),
-        else_=''
+    不使用 account_id 维度，这样可以确保广告数据和转化数据能够正确合并；
+    业务模式映射后再分组，映射到同一业务模式的多组数据合并求和
+    """
+    RawModel, clicks, join_condition = _ad_source(platform)
+    agency = func.coalesce(AccountAgencyMapping.agency, '')
+    business_model = business_model_case(
+        agency, func.coalesce(AccountAgencyMapping.business_model, ''), platform
     )
 
-    other_conversions = db.session.query(
-        BackendConversions.lead_date.label('date'),
-        BackendConversions.platform_source.label('platform'),
-        func.coalesce(agency_mapping, '').label('agency'),
-        func.coalesce(business_model_mapping, '').label('business_model'),
-        # 直接使用 id 计数（每条记录代表一个独立的线索）
-        func.count(BackendConversions.id).label('lead_users'),
-        # 带条件的计数（使用 CASE WHEN + id）
-        func.count(
-            case(
-                (BackendConversions.is_existing_customer == False, BackendConversions.id),
-                else_=None
-            )
-        ).label('potential_customers'),
-        func.count(
-            case(
-                (BackendConversions.is_customer_mouth == True, BackendConversions.id),
-                else_=None
-            )
-        ).label('customer_mouth_users'),
-        func.count(
-            case(
-                (BackendConversions.is_valid_lead == True, BackendConversions.id),
-                else_=None
-            )
-        ).label('valid_lead_users'),
-        func.count(
-            case(
-                (BackendConversions.is_opened_account == True, BackendConversions.id),
-                else_=None
-            )
-        ).label('opened_account_users'),
-        func.count(
-            case(
-                (BackendConversions.is_valid_customer == True, BackendConversions.id),
-                else_=None
-            )
-        ).label('valid_customer_users')
-    ).outerjoin(
-        AccountAgencyMapping,
-        and_(
-            AccountAgencyMapping.platform == BackendConversions.platform_source,
-            # 小红书：通过 ad_account 关联 account_name
-            # 抖音：不使用 JOIN（通过 agency 字段映射）
-            or_(
-                and_(
-                    BackendConversions.platform_source == '小红书',
-                    AccountAgencyMapping.account_name == BackendConversions.ad_account
-                ),
-                and_(
-                    BackendConversions.platform_source == '抖音',
-                    # 抖音不关联，agency_mapping CASE 会处理
-                    text('1=0')
-                )
-            )
-        )
-    ).filter(
-        and_(
-            BackendConversions.platform_source.in_(['抖音', '小红书', 'yj', '高德']),
-            BackendConversions.lead_date >= start_date,
-            BackendConversions.lead_date <= end_date
-        )
+    return select(
+        RawModel.date,
+        literal(platform),
+        agency,
+        business_model,
+        func.coalesce(func.sum(RawModel.cost), 0),
+        func.coalesce(func.sum(RawModel.impressions), 0),
+        func.coalesce(func.sum(clicks), 0)
+    ).select_from(RawModel).outerjoin(
+        AccountAgencyMapping, join_condition
+    ).where(
+        RawModel.date.between(start_date, end_date)
     ).group_by(
-        BackendConversions.lead_date,
-        BackendConversions.platform_source,
-        agency_mapping,
-        business_model_mapping
-    ).all()
+        RawModel.date, agency, business_model
+    )
 
-    print(f"      找到 {len(other_conversions)} 条抖音/小红书转化聚合记录")
 
-    # ===== 3. 合并结果 =====
-    results = []
+def _conversion_counts():
+    """
+    转化指标计数列（依次对应 CONVERSION_METRIC_FIELDS）
 
-    # 处理腾讯数据
-    print(f"      处理腾讯转化数据: {len(tencent_conversions)} 条")
-    for row in tencent_conversions:
-        results.append({
-            'date': row.date,
-            'platform': '腾讯',
-            'agency': row.agency or '',
-            'business_model': row.business_model or '',
-            'lead_users': int(row.lead_users) if row.lead_users else 0,
-            'potential_customers': int(row.potential_customers) if row.potential_customers else 0,
-            'customer_mouth_users': int(row.customer_mouth_users) if row.customer_mouth_users else 0,
-            'valid_lead_users': int(row.valid_lead_users) if row.valid_lead_users else 0,
-            'opened_account_users': int(row.opened_account_users) if row.opened_account_users else 0,
-            'valid_customer_users': int(row.valid_customer_users) if row.valid_customer_users else 0
-        })
+    backend_conversions 表本身已天然去重（外部导入时已去重），直接使用 id 计数，
+    不使用 user_identifier 去重（wechat_nickname 相同不代表同一个人）
+    """
+    def count_if(condition):
+        return func.count(case((condition, BackendConversions.id), else_=None))
+
+    return [
+        func.count(BackendConversions.id),
+        count_if(BackendConversions.is_existing_customer == False),
+        count_if(BackendConversions.is_customer_mouth == True),
+        count_if(BackendConversions.is_valid_lead == True),
+        count_if(BackendConversions.is_opened_account == True),
+        count_if(BackendConversions.is_valid_customer == True),
+    ]
 
-    # 处理抖音、小红书、yj、高德数据
-    print(f"      处理其他平台转化数据: {len(other_conversions)} 条")
-    platform_sample_count = {}
-    for row in other_conversions:
-        # 平台映射：yj→云极，高德→高德（作为独立平台）
-        platform_mapping = {
-            '抖音': '抖音',
-            '小红书': '小红书',
-            'yj': '云极',
-            '高德': '高德'
-        }
-        platform = platform_mapping.get(row.platform, row.platform)
 
-        # 统计各平台记录数（用于调试）
-        platform_sample_count[row.platform] = platform_sample_count.get(row.platform, 0) + 1
-
-        results.append({
-            'date': row.date,
-            'platform': platform,
-            'agency': row.agency or '',
-            'business_model': row.business_model or '',
-            'lead_users': int(row.lead_users) if row.lead_users else 0,
-            'potential_customers': int(row.potential_customers) if row.potential_customers else 0,
-            'customer_mouth_users': int(row.customer_mouth_users) if row.customer_mouth_users else 0,
-            'valid_lead_users': int(row.valid_lead_users) if row.valid_lead_users else 0,
-            'opened_account_users': int(row.opened_account_users) if row.opened_account_users else 0,
-            'valid_customer_users': int(row.valid_customer_users) if row.valid_customer_users else 0
-        })
-
-    print(f"      其他平台源数据分布: {platform_sample_count}")
-
-    print(f"      转化数据聚合完成，共 {len(results)} 条记录")
-
-    return results
-
-
-def _save_conversion_metric(conv_data):
-    """保存转化数据到聚合表"""
-    # 应用业务模式映射规则
-    agency = conv_data['agency']
-    platform = conv_data['platform']
-    business_model = apply_business_model_mapping(agency, conv_data['business_model'], platform)
-
-    # 查找或创建记录（可能已由广告数据创建）
-    metric = DailyMetricsUnified.query.filter_by(
-        date=conv_data['date'],
-        platform=conv_data['platform'],
-        agency=agency,
-        business_model=business_model
-    ).first()
-
-    if not metric:
-        # 如果没有找到，创建新记录（纯转化数据，无广告数据）
-        metric = DailyMetricsUnified(
-            date=conv_data['date'],
-            platform=conv_data['platform'],
-            agency=agency,
-            business_model=business_model,
-            account_id='',
-            account_name='',
-            cost=0,
-            impressions=0,
-            click_users=0  # 无广告数据时，点击人数为0
-        )
+def _conversion_metrics_queries(start_date, end_date, selected):
+    """
+    转化数据的代理商和业务模式聚合查询
+
+    Args:
+        start_date: 开始日期
+        end_date: 结束日期
+        selected: 平台过滤函数（_platform_selector 的返回值）
+
+    Returns:
+        [(名称, 聚合查询)]，查询列依次为 date, platform, agency, business_model, *CONVERSION_METRIC_FIELDS
+    """
+    queries = []
+
+    # 业务模式推断逻辑
+    # customer_source 包含"引流" → 直播
+    # customer_source 有值但不包含"引流" → 信息流
+    # 其他 → 空字符串
+    inferred_business_model = case(
+        (BackendConversions.customer_source.like('%引流%'), '直播'),
+        (and_(
+            BackendConversions.customer_source.isnot(None),
+            BackendConversions.customer_source != ''
+        ), '信息流'),
+        else_=''
+    )
 
-    # 更新转化指标
-    metric.lead_users = conv_data['lead_users']
-    metric.potential_customers = conv_data['potential_customers']
-    metric.customer_mouth_users = conv_data['customer_mouth_users']
-    metric.valid_lead_users = conv_data['valid_lead_users']
-    metric.opened_account_users = conv_data['opened_account_users']
-    metric.valid_customer_users = conv_data['valid_customer_users']
+    # ===== 1. 腾讯转化数据（通过广告账号表关联代理商） =====
+    if selected('腾讯'):
+        agency = func.coalesce(AccountAgencyMapping.agency, '')
+        business_model = business_model_case(agency, inferred_business_model, '腾讯')
+        queries.append(('腾讯', select(
+            BackendConversions.lead_date,
+            literal('腾讯'),
+            agency,
+            business_model,
+            *_conversion_counts()
+        ).select_from(BackendConversions).outerjoin(
+            RawAdDataTencent,
+            and_(
+                RawAdDataTencent.account_id == BackendConversions.ad_account,
+                RawAdDataTencent.date == BackendConversions.lead_date
+            )
+        ).outerjoin(
+            AccountAgencyMapping,
+            and_(
+                AccountAgencyMapping.platform == '腾讯',
+                AccountAgencyMapping.account_id == RawAdDataTencent.account_id
+            )
+        ).where(
+            BackendConversions.platform_source == '腾讯',
+            BackendConversions.lead_date.between(start_date, end_date)
+        ).group_by(
+            BackendConversions.lead_date, agency, business_model
+        )))
+
+    # ===== 2. 抖音、小红书、yj、高德转化数据 =====
+    sources = [source for source, platform in CONVERSION_PLATFORM_MAPPING.items() if selected(platform)]
+    if sources:
+        # 从 AgencyAbbreviationMapping 表动态构建简称映射
+        agency_name_mapping = build_abbreviation_mapping_case()
+
+        # 代理商映射：
+        # 抖音：使用简称映射
+        # 小红书：优先从 JOIN 获取，如果为空则使用简称映射（备用）
+        # yj（云极）、高德：独立平台，代理商为空
+        agency = func.coalesce(case(
+            (BackendConversions.platform_source == '抖音', agency_name_mapping),
+            (BackendConversions.platform_source == '小红书', func.coalesce(AccountAgencyMapping.agency, agency_name_mapping)),
+            else_=''
+        ), '')
+        platform = case(CONVERSION_PLATFORM_MAPPING, value=BackendConversions.platform_source)
+        business_model = business_model_case(agency, inferred_business_model, platform)
+
+        queries.append(('其他平台', select(
+            BackendConversions.lead_date,
+            platform,
+            agency,
+            business_model,
+            *_conversion_counts()
+        ).select_from(BackendConversions).outerjoin(
+            AccountAgencyMapping,
+            and_(
+                # 小红书：通过 ad_account 关联 account_name；抖音不关联（通过 agency 字段映射）
+                AccountAgencyMapping.platform == '小红书',
+                BackendConversions.platform_source == '小红书',
+                AccountAgencyMapping.account_name == BackendConversions.ad_account
+            )
+        ).where(
+            BackendConversions.platform_source.in_(sources),
+            BackendConversions.lead_date.between(start_date, end_date)
+        ).group_by(
+            BackendConversions.lead_date, platform, agency, business_model
+        )))
 
-    db.session.add(metric)
+    return queries
 
 
 def _calculate_click_users(start_date, end_date):
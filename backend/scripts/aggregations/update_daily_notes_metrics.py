@@ -2,7 +2,7 @@
 更新小红书笔记日级指标聚合表 v2.0
 
 数据来源：
-1. 维度字段：xhs_note_info (优先) + xhs_notes_content_daily (补充)
+1. 维度字段：xhs_note_info (优先) + xhs_notes_content_daily / note_latest_dimensions (补充)
 2. 广告投放指标：xhs_notes_daily（投放量）
 3. 总业务指标：xhs_notes_content_daily（投放+自然流量）
 4. 自然流量：计算得出（总量 - 投放量）
@@ -31,6 +31,9 @@ import sys
 import os
 from datetime import datetime, timedelta
 
+import numpy as np
+import pandas as pd
+
 # 添加项目根目录到 Python 路径
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
 
@@ -41,10 +44,14 @@ from backend.models import (
     XhsNoteInfo,
     XhsNotesDaily,
     XhsNotesContentDaily,
+    NoteLatestDimensions,
     BackendConversions,
     AccountAgencyMapping
 )
-from sqlalchemy import func, and_, or_, distinct, case, literal
+from backend.utils.note_dimensions import rebuild_latest_dimensions
+from sqlalchemy import func, and_, or_, distinct, case, literal, text
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
 
 
 def update_daily_notes_metrics(start_date=None, end_date=None):
@@ -96,13 +103,13 @@ def update_daily_notes_metrics(start_date=None, end_date=None):
 
         print(f"   找到 {len(notes_content_data)} 条笔记运营数据")
 
-        # ===== 步骤3.5: 获取所有内容数据的维度信息（用于填充缺失的维度字段）=====
-        print("\n步骤3.5: 获取所有内容数据的维度信息...")
+        # ===== 步骤3.5: 获取每个笔记最新的维度信息（用于填充缺失的维度字段）=====
+        print("\n步骤3.5: 获取笔记最新维度信息...")
 
-        # 不限制日期范围，获取所有内容数据用于维度填充
-        all_content_data = _aggregate_notes_content_data_all()
+        # 读取 note_latest_dimensions（每个笔记一条，导入时维护），不再全表扫描内容数据
+        latest_content_dict = _load_latest_note_dimensions()
 
-        print(f"   找到 {len(all_content_data)} 条笔记内容数据（全量，用于维度填充）")
+        print(f"   找到 {len(latest_content_dict)} 个笔记的最新维度（用于维度填充）")
 
         # ===== 步骤4: 聚合转化指标 =====
         print("\n步骤4: 聚合转化指标...")
@@ -120,52 +127,22 @@ def update_daily_notes_metrics(start_date=None, end_date=None):
         all_note_ids.update([d['note_id'] for d in notes_content_data])
         all_note_ids.update([d['note_id'] for d in notes_mapping_data])  # 修复：添加映射数据的 note_id
 
-        # 创建数据字典，便于快速查找
-        ad_dict = {f"{d['date']}_{d['note_id']}": d for d in notes_ad_data}
-        content_dict = {f"{d['date']}_{d['note_id']}": d for d in notes_content_data}
-        conversion_dict = {f"{d['date']}_{d['note_id']}": d for d in notes_conversion_data}
-
-        # 新增：为每个笔记创建最新维度数据字典（用于填充缺失的维度字段）
-        # 当内容数据没有对应日期的记录时，使用该笔记最新的内容数据
-        # 使用 all_content_data（全量数据）而不是 notes_content_data（日期范围过滤后的数据）
-        latest_content_dict = {}
-        for d in all_content_data:
-            note_id = d['note_id']
-            # 如果该笔记还没有记录，或者当前记录日期更新，则保存
-            if note_id not in latest_content_dict or d['date'] > latest_content_dict[note_id]['date']:
-                latest_content_dict[note_id] = d
-
-        # 合并数据
-        merged_count = 0
-        for note_id in all_note_ids:
-            # 遍历日期范围
-            current_date = start_date
-            while current_date <= end_date:
-                key = f"{current_date}_{note_id}"
-
-                # 获取各部分数据
-                ad_data = ad_dict.get(key)
-                content_data = content_dict.get(key)
-                conversion_data = conversion_dict.get(key)
-                mapping_data = mapping_dict.get(note_id)  # 映射数据（不依赖日期）
-
-                # 新增：如果没有精确日期的内容数据，使用最新的内容数据填充维度
-                content_for_dimensions = content_data
-                if not content_data and note_id in latest_content_dict:
-                    content_for_dimensions = latest_content_dict[note_id]
-
-                # 至少有一个数据源才写入
-                if ad_data or content_data or conversion_data:
-                    _save_merged_metric(
-                        current_date, note_id,
-                        ad_data, content_data, conversion_data, mapping_data,
-                        content_for_dimensions  # 新增：用于填充维度的内容数据
-                    )
-                    merged_count += 1
-
-                current_date += timedelta(days=1)
+        # 只合并实际有数据的 (date, note_id)：广告、运营、转化三个来源的键的并集
+        # （转化数据只保留上述笔记的记录）
+        merged = _merge_note_sources(
+            notes_ad_data,
+            notes_content_data,
+            [d for d in notes_conversion_data if d['note_id'] in all_note_ids]
+        )
+        metrics = _split_note_metrics(merged)
+        print(f"   合并得到 {len(merged)} 个 (日期, 笔记) 组合")
+
+        # 维度字段按列补充（mapping → ad → content → 默认值）
+        dimensions = _fill_note_dimensions(merged, notes_mapping_data, latest_content_dict)
 
-        db.session.commit()
+        # 批量 UPSERT
+        _ensure_unique_index()
+        merged_count = _write_note_metrics(pd.concat([dimensions, metrics], axis=1))
 
         print(f"   [OK] 数据合并完成，共写入/更新 {merged_count} 条记录")
 
@@ -406,36 +383,40 @@ def _aggregate_notes_content_data(start_date, end_date):
     return results
 
 
-def _aggregate_notes_content_data_all():
+def _load_latest_note_dimensions():
     """
-    聚合所有笔记内容数据的维度信息（不限制日期范围）
+    读取每个笔记最新的内容维度（不限制日期范围）
 
-    数据来源：xhs_notes_content_daily（全部数据，用于维度填充）
+    数据来源：note_latest_dimensions（内容笔记日级数据导入时维护，每个笔记一条）
 
-    返回: List of dict
+    返回: {note_id: dict}
 
     说明：
-    - 获取所有内容数据，不限制日期范围
-    - 用于填充维度字段（note_type 等）
+    - 用于填充维度字段（note_url 等）
     - 当某日期没有内容数据时，使用该笔记最新的内容数据填充
+    - 表为空但已有内容数据时（迁移前的旧数据库），先从 xhs_notes_content_daily 回填
     """
+    if not db.session.query(NoteLatestDimensions.id).first() and db.session.query(XhsNotesContentDaily.id).first():
+        print("   [INFO] note_latest_dimensions 为空，从 xhs_notes_content_daily 回填...")
+        rebuild_latest_dimensions(db.session)
+        db.session.commit()
+
     query = db.session.query(
-        XhsNotesContentDaily.data_date.label('date'),
-        XhsNotesContentDaily.note_id,
-        XhsNotesContentDaily.note_url,
-        XhsNotesContentDaily.note_type
+        NoteLatestDimensions.data_date.label('date'),
+        NoteLatestDimensions.note_id,
+        NoteLatestDimensions.note_url,
+        NoteLatestDimensions.note_type
     ).all()
 
-    results = []
-    for row in query:
-        results.append({
+    return {
+        row.note_id: {
             'date': row.date,
             'note_id': row.note_id,
             'note_url': row.note_url,
             'note_type': row.note_type
-        })
-
-    return results
+        }
+        for row in query
+    }
 
 
 def _aggregate_notes_conversion_data(start_date, end_date):
@@ -528,200 +509,287 @@ def _aggregate_notes_conversion_data(start_date, end_date):
     return results
 
 
-def _save_merged_metric(date, note_id, ad_data, content_data, conversion_data, mapping_data=None, content_for_dimensions=None):
+# 合并使用的指标字段（各来源记录中的键名）
+AD_METRIC_FIELDS = [
+    'cost', 'impressions', 'clicks', 'likes', 'comments', 'favorites', 'shares',
+    'total_interactions', 'private_messages'
+]
+CONTENT_METRIC_FIELDS = ['total_impressions', 'likes', 'comments', 'favorites', 'shares', 'total_interactions']
+CONVERSION_METRIC_FIELDS = [
+    'lead_users', 'customer_mouth_users', 'valid_lead_users', 'opened_account_users',
+    'valid_customer_users', 'customer_assets_users', 'customer_assets_amount'
+]
+
+# 维度字段（广告记录、运营记录中的键名）
+AD_DIMENSION_FIELDS = [
+    'note_title', 'note_publish_time', 'publish_account', 'producer', 'ad_strategy', 'agency', 'delivery_mode'
+]
+CONTENT_DIMENSION_FIELDS = ['note_url', 'note_type']
+
+# 基础属性默认值
+DEFAULT_NOTE_TITLE = '未知笔记'
+DEFAULT_PUBLISH_ACCOUNT = '申万宏源证券财富管理'
+DEFAULT_AD_STRATEGY = '未知'
+
+# 每批写入/提交的记录数
+WRITE_CHUNK_SIZE = 5000
+
+# 互动指标：总量为运营数据估算值，自然量 = 总量 - 投放量
+INTERACTION_FIELDS = ['likes', 'comments', 'favorites', 'shares']
+
+
+def _keyed_frame(rows, fields, prefix):
     """
-    合并数据并写入聚合表（v3.0 - 基础属性统一从 mapping 表获取）
-
-    指标拆分规则：
-    - 总量（total_*）：来自 content_data（投放+自然流量总和）
-    - 投放量（ad_*）：来自 ad_data（投放带来的数据）
-    - 自然量（organic_*）：计算得出（总量 - 投放量）
-
-    优先级规则（v3.0 更新）：
-    1. **基础属性字段**（note_title, note_url, publish_account, publish_time, producer, ad_strategy）：
-       - **统一从 mapping_data 获取**（xhs_note_info 作为基础属性主表）
-    2. 其他维度字段（note_type 等）：从 content_data 获取
-    3. 广告投放指标：从 ad_data 获取
-    4. 总业务指标：从 content_data 获取
-    5. 自然流量：计算得出
-    6. 转化指标：从 conversion_data 获取
-
-    参数说明：
-        mapping_data: 笔记映射数据（基础属性主表，优先级最高）
-        content_for_dimensions: 用于填充维度的内容数据（备用）
-        ad_data: 广告投放数据
-        content_data: 内容运营数据
-        conversion_data: 转化数据
+    记录列表转为以 (date, note_id) 为索引的 DataFrame
+
+    同一 (date, note_id) 有多条记录时保留最后一条（与原逐日查字典的覆盖行为一致）
     """
-    # 查找或创建记录
-    metric = DailyNotesMetricsUnified.query.filter_by(
-        date=date,
-        note_id=note_id
-    ).first()
-
-    if not metric:
-        metric = DailyNotesMetricsUnified(
-            date=date,
-            note_id=note_id
-        )
+    frame = pd.DataFrame(rows, columns=['date', 'note_id'] + fields)
+    frame = frame.drop_duplicates(['date', 'note_id'], keep='last').set_index(['date', 'note_id'])
+    return frame.add_prefix(prefix)
+
+
+def _merge_note_sources(ad_rows, content_rows, conversion_rows):
+    """
+    按 (date, note_id) 外连接广告、运营、转化三个来源
 
-    # ===== 基础属性字段（v3.1：mapping 表优先，NULL 值使用备用数据源）=====
-    # xhs_note_info 是基础属性主表，但如果字段为 NULL，则尝试从备用数据源获取
-    # 备用数据源优先级：ad_data > content_for_dimensions > content_data
+    原先对每个笔记遍历日期范围内的每一天，再逐个查三个字典：笔记数 × 天数次
+    查找，绝大多数组合没有任何数据。现在只合并实际存在的键，缺失来源的列为 NaN
 
-    # 如果 mapping 表中没有数据，使用备用数据源
-    if not mapping_data:
-        dimension_source = content_for_dimensions or content_data
+    Returns:
+        DataFrame（索引 (date, note_id)，列名带 ad_/content_/conv_ 前缀，按索引排序）
+    """
+    merged = pd.concat([
+        _keyed_frame(ad_rows, AD_METRIC_FIELDS + AD_DIMENSION_FIELDS, 'ad_'),
+        _keyed_frame(content_rows, CONTENT_METRIC_FIELDS + CONTENT_DIMENSION_FIELDS, 'content_'),
+        _keyed_frame(conversion_rows, CONVERSION_METRIC_FIELDS, 'conv_'),
+    ], axis=1, join='outer')
+    return merged.sort_index()
 
-        metric.note_title = (ad_data or {}).get('note_title') or (dimension_source or {}).get('note_title') or '未知笔记'
-        metric.note_url = (dimension_source or {}).get('note_url') if dimension_source else None
-        metric.note_publish_time = (ad_data or {}).get('note_publish_time') or (dimension_source or {}).get('note_publish_time')
 
-        # 修复：publish_account 应该使用默认值，而不是 None
-        metric.publish_account = (ad_data or {}).get('publish_account') or '申万宏源证券财富管理'
+def _split_note_metrics(merged):
+    """
+    向量化计算 total / ad / organic 指标（规则同逐条计算）
 
-        # 修复：producer 和 ad_strategy 也应该使用默认值
-        metric.producer = (ad_data or {}).get('producer') or '申万宏源证券财富管理'
-        metric.ad_strategy = (ad_data or {}).get('ad_strategy') or '未知'
-    else:
-        # mapping_data 存在，但字段可能为 NULL，使用备用数据源填充 NULL 值
-        dimension_source = content_for_dimensions or content_data
+    - 展现量、总互动量：总量 = max(运营总量, 投放量)，自然量 = 总量 - 投放量
+    - 点击量：自然点击 = 自然展现 × 投放点击率（截断取整），总量 = 投放 + 自然
+    - 点赞/评论/收藏/分享：总量为运营估算值，自然量 = max(0, 总量 - 投放量)
+    - 私信：只有投放数据，总量 = 投放量，自然量 = 0
+    - 转化指标：没有转化数据时为 0
 
-        metric.note_title = mapping_data.get('note_title') or '未知笔记'
-        metric.note_url = mapping_data.get('note_url') or (dimension_source or {}).get('note_url') if dimension_source else None
+    Returns:
+        DataFrame（与 merged 同索引，列名为聚合表字段名）
+    """
+    data = merged.drop(columns=[f'ad_{field}' for field in AD_DIMENSION_FIELDS]
+                       + [f'content_{field}' for field in CONTENT_DIMENSION_FIELDS]).fillna(0)
 
-        # 修复：publish_time 为 None 时，尝试从备用数据源获取
-        publish_time = mapping_data.get('publish_time')
-        if not publish_time:
-            publish_time = (ad_data or {}).get('note_publish_time') or (dimension_source or {}).get('note_publish_time')
-        metric.note_publish_time = publish_time
+    def ints(column):
+        return data[column].astype('int64')
 
-        # 修复：正确处理 publish_account，优先使用 mapping 数据，如果为空则使用默认值
-        publish_account = mapping_data.get('publish_account')
-        if not publish_account or publish_account.strip() == '':
-            publish_account = ((ad_data or {}).get('publish_account') if ad_data else None)
-        if not publish_account or publish_account.strip() == '':
-            publish_account = '申万宏源证券财富管理'
-        metric.publish_account = publish_account
+    metrics = pd.DataFrame(index=merged.index)
+    metrics['cost'] = data['ad_cost'].astype(float)
 
-        metric.producer = mapping_data.get('producer') or ((ad_data or {}).get('producer') if ad_data else None)
-        metric.ad_strategy = mapping_data.get('ad_strategy') or ((ad_data or {}).get('ad_strategy') if ad_data else None)
+    for field, ad_column in (('impressions', 'ad_impressions'), ('interactions', 'ad_total_interactions')):
+        ad_values = ints(ad_column)
+        total = np.maximum(ints(f'content_total_{field}'), ad_values)
+        metrics[f'total_{field}'] = total
+        metrics[f'ad_{field}'] = ad_values
+        metrics[f'organic_{field}'] = (total - ad_values).clip(lower=0)
 
-    # ===== 其他维度字段（从 content_data 获取）=====
-    metric.note_type = (content_data or {}).get('note_type')
+    # 估算：假设自然点击率与投放点击率相同
+    ad_clicks = ints('ad_clicks')
+    click_rate = (ad_clicks / metrics['ad_impressions'].where(metrics['ad_impressions'] > 0)).fillna(0)
+    organic_clicks = np.floor(metrics['organic_impressions'] * click_rate).astype('int64')
+    metrics['total_clicks'] = ad_clicks + organic_clicks
+    metrics['ad_clicks'] = ad_clicks
+    metrics['organic_clicks'] = organic_clicks
 
-    # ===== 广告相关维度（从 ad_data 获取）=====
-    if ad_data:
-        metric.agency = ad_data.get('agency')
-        metric.delivery_mode = ad_data.get('delivery_mode')
+    for field in INTERACTION_FIELDS:
+        total, ad_values = ints(f'content_{field}'), ints(f'ad_{field}')
+        metrics[f'total_{field}'] = total
+        metrics[f'ad_{field}'] = ad_values
+        metrics[f'organic_{field}'] = (total - ad_values).clip(lower=0)
 
-    # ===== 广告投放指标（只有投放量）=====
-    metric.cost = (ad_data or {}).get('cost', 0)
+    # content_daily 没有私信数据，自然流量私信为 0
+    metrics['total_private_messages'] = ints('ad_private_messages')
+    metrics['ad_private_messages'] = ints('ad_private_messages')
+    metrics['organic_private_messages'] = 0
 
-    # ===== 展现量拆分（total / ad / organic）=====
-    total_impressions = (content_data or {}).get('total_impressions', 0)
-    ad_impressions = (ad_data or {}).get('impressions', 0)
+    for field in CONVERSION_METRIC_FIELDS:
+        column = f'conv_{field}'
+        metrics[field] = data[column].astype(float) if field == 'customer_assets_amount' else ints(column)
 
-    # 修复：total_impressions 至少等于 ad_impressions（防止 content_data 缺失导致 total=0 但 ad>0）
-    total_impressions = max(total_impressions, ad_impressions)
+    return metrics
 
-    organic_impressions = max(0, total_impressions - ad_impressions)
 
-    metric.total_impressions = total_impressions
-    metric.ad_impressions = ad_impressions
-    metric.organic_impressions = organic_impressions
+def _present(column):
+    """Python 真值判断：None / NaN / 空字符串为假"""
+    return column.notna() & (column != '')
 
-    # ===== 点击量拆分（total / ad / organic）=====
-    # 注意：content_daily 没有 total_clicks，使用 ad_clicks + 估算 organic
-    ad_clicks = (ad_data or {}).get('clicks', 0)
-    # 估算：假设自然点击率与投放点击率相同
-    ad_click_rate = ad_clicks / ad_impressions if ad_impressions > 0 else 0
-    organic_clicks = int(organic_impressions * ad_click_rate) if organic_impressions > 0 else 0
-    total_clicks = ad_clicks + organic_clicks
-
-    metric.total_clicks = total_clicks
-    metric.ad_clicks = ad_clicks
-    metric.organic_clicks = organic_clicks
-
-    # ===== 互动指标拆分：点赞（total / ad / organic）=====
-    total_likes = (content_data or {}).get('likes', 0)  # 估算值
-    ad_likes = (ad_data or {}).get('likes', 0)
-    organic_likes = max(0, total_likes - ad_likes)
-
-    metric.total_likes = total_likes
-    metric.ad_likes = ad_likes
-    metric.organic_likes = organic_likes
-
-    # ===== 互动指标拆分：评论（total / ad / organic）=====
-    total_comments = (content_data or {}).get('comments', 0)  # 估算值
-    ad_comments = (ad_data or {}).get('comments', 0)
-    organic_comments = max(0, total_comments - ad_comments)
-
-    metric.total_comments = total_comments
-    metric.ad_comments = ad_comments
-    metric.organic_comments = organic_comments
-
-    # ===== 互动指标拆分：收藏（total / ad / organic）=====
-    total_favorites = (content_data or {}).get('favorites', 0)  # 估算值
-    ad_favorites = (ad_data or {}).get('favorites', 0)
-    organic_favorites = max(0, total_favorites - ad_favorites)
-
-    metric.total_favorites = total_favorites
-    metric.ad_favorites = ad_favorites
-    metric.organic_favorites = organic_favorites
-
-    # ===== 互动指标拆分：分享（total / ad / organic）=====
-    total_shares = (content_data or {}).get('shares', 0)  # 估算值
-    ad_shares = (ad_data or {}).get('shares', 0)
-    organic_shares = max(0, total_shares - ad_shares)
-
-    metric.total_shares = total_shares
-    metric.ad_shares = ad_shares
-    metric.organic_shares = organic_shares
-
-    # ===== 总互动量拆分（total / ad / organic）=====
-    total_interactions = (content_data or {}).get('total_interactions', 0)
-    ad_interactions = (ad_data or {}).get('total_interactions', 0)
-
-    # 修复：total_interactions 至少等于 ad_interactions（防止 content_data 缺失导致 total=0 但 ad>0）
-    total_interactions = max(total_interactions, ad_interactions)
-
-    organic_interactions = max(0, total_interactions - ad_interactions)
-
-    metric.total_interactions = total_interactions
-    metric.ad_interactions = ad_interactions
-    metric.organic_interactions = organic_interactions
-
-    # ===== 私信指标拆分（total / ad / organic）=====
-    # 注意：content_daily 没有私信数据，只有投放私信数据
-    ad_private_messages = (ad_data or {}).get('private_messages', 0)
-    # 假设自然流量私信为0（因为没有数据源）
-    total_private_messages = ad_private_messages
-    organic_private_messages = 0
-
-    metric.total_private_messages = total_private_messages
-    metric.ad_private_messages = ad_private_messages
-    metric.organic_private_messages = organic_private_messages
-
-    # ===== 转化指标（来自 conversion_data）=====
-    if conversion_data:
-        metric.lead_users = conversion_data.get('lead_users', 0)
-        metric.customer_mouth_users = conversion_data.get('customer_mouth_users', 0)
-        metric.valid_lead_users = conversion_data.get('valid_lead_users', 0)
-        metric.opened_account_users = conversion_data.get('opened_account_users', 0)
-        metric.valid_customer_users = conversion_data.get('valid_customer_users', 0)
-        metric.customer_assets_users = conversion_data.get('customer_assets_users', 0)
-        metric.customer_assets_amount = conversion_data.get('customer_assets_amount', 0)
-    else:
-        metric.lead_users = 0
-        metric.customer_mouth_users = 0
-        metric.valid_lead_users = 0
-        metric.opened_account_users = 0
-        metric.valid_customer_users = 0
-        metric.customer_assets_users = 0
-        metric.customer_assets_amount = 0
-
-    db.session.add(metric)
+
+def _first_present(*columns, default=None):
+    """按顺序取第一个有值的列（等价于逐条的 a or b or default）"""
+    result = pd.Series(default, index=columns[0].index, dtype=object)
+    for column in reversed(columns):
+        result = column.where(_present(column), result)
+    return result
+
+
+def _fill_note_dimensions(merged, mapping_rows, latest_content_dict):
+    """
+    按列补充维度字段（v3.1 规则：基础属性统一从 mapping 表获取，NULL 值使用备用数据源）
+
+    原先在逐条写入时对每条记录判断，现在对整个合并结果做列运算：
+
+    1. **基础属性字段**（有 mapping 即 xhs_note_info 中有该笔记时 / 没有 mapping 时）：
+       - note_title：mapping → 默认值（不使用 ad）/ ad → 默认值
+       - note_url：mapping → 运营数据 / 运营数据（当日没有运营数据时使用该笔记最新的运营数据；
+         该笔记没有任何运营数据时为空，即使 mapping 有值）
+       - publish_time：mapping → ad / ad（没有默认值）
+       - publish_account：mapping → ad → 默认值（空白字符串视为空）/ ad → 默认值
+       - producer：mapping → ad（没有默认值）/ ad → 默认值
+       - ad_strategy：mapping → ad（没有默认值）/ ad → 默认值
+    2. note_type：当日运营数据
+    3. agency, delivery_mode：当日广告数据（has_ad 为假时写入保留原值）
+
+    Args:
+        merged: _merge_note_sources 的结果
+        mapping_rows: 笔记映射数据（不依赖日期）
+        latest_content_dict: {note_id: 该笔记最新的运营数据}
+
+    Returns:
+        DataFrame（与 merged 同索引，列为聚合表维度字段 + has_ad）
+    """
+    index = merged.index
+    note_ids = index.get_level_values('note_id')
+
+    def by_note(values):
+        """按 note_id 取值并对齐到合并结果"""
+        series = pd.Series(values, dtype=object)
+        series = series[~series.index.duplicated(keep='last')]
+        return pd.Series(series.reindex(note_ids).to_numpy(), index=index, dtype=object)
+
+    mapping = {
+        field: by_note({d['note_id']: d[field] for d in mapping_rows})
+        for field in ('note_title', 'note_url', 'publish_account', 'publish_time', 'producer', 'ad_strategy')
+    }
+    has_mapping = pd.Series(note_ids.isin([d['note_id'] for d in mapping_rows]), index=index)
+    ad = {field: merged[f'ad_{field}'].astype(object) for field in AD_DIMENSION_FIELDS}
+    # 广告/运营记录的指标总是有值，可用于判断当日是否有该来源的记录
+    has_ad = merged['ad_cost'].notna()
+    has_content = merged['content_total_impressions'].notna()
+
+    # 维度数据源：当日运营数据，没有时使用该笔记最新的运营数据
+    latest_url = by_note({note_id: d['note_url'] for note_id, d in latest_content_dict.items()})
+    has_latest = pd.Series(note_ids.isin(list(latest_content_dict)), index=index)
+    source_url = merged['content_note_url'].astype(object).where(has_content, latest_url)
+    has_source = has_content | has_latest
+
+    dimensions = pd.DataFrame(index=index)
+
+    dimensions['note_title'] = _first_present(mapping['note_title'], default=DEFAULT_NOTE_TITLE).where(
+        has_mapping, _first_present(ad['note_title'], default=DEFAULT_NOTE_TITLE))
+    dimensions['note_url'] = _first_present(mapping['note_url'], source_url).where(
+        has_mapping, source_url).where(has_source, None)
+    dimensions['note_publish_time'] = _first_present(mapping['publish_time'], ad['note_publish_time']).where(
+        has_mapping, _first_present(ad['note_publish_time']))
+
+    # publish_account：空白字符串视为空
+    mapping_account = mapping['publish_account']
+    mapping_account = mapping_account.where(mapping_account.fillna('').astype(str).str.strip() != '')
+    ad_account = ad['publish_account'].where(ad['publish_account'].fillna('').astype(str).str.strip() != '')
+    dimensions['publish_account'] = _first_present(mapping_account, ad_account, default=DEFAULT_PUBLISH_ACCOUNT).where(
+        has_mapping, _first_present(ad['publish_account'], default=DEFAULT_PUBLISH_ACCOUNT))
+
+    dimensions['producer'] = _first_present(mapping['producer'], ad['producer']).where(
+        has_mapping, _first_present(ad['producer'], default=DEFAULT_PUBLISH_ACCOUNT))
+    dimensions['ad_strategy'] = _first_present(mapping['ad_strategy'], ad['ad_strategy']).where(
+        has_mapping, _first_present(ad['ad_strategy'], default=DEFAULT_AD_STRATEGY))
+
+    dimensions['note_type'] = merged['content_note_type'].astype(object)
+    dimensions['agency'] = ad['agency']
+    dimensions['delivery_mode'] = ad['delivery_mode']
+    dimensions['has_ad'] = has_ad
+
+    # NaN → None（写入 NULL）
+    return dimensions.astype(object).where(dimensions.notna(), None)
+
+
+def _ensure_unique_index():
+    """
+    确保 (date, note_id) 上存在唯一索引（ON CONFLICT 的冲突目标）
+
+    新建的表由模型的 UniqueConstraint 创建；旧数据库缺失时在这里补建，
+    存在重复记录时提示先运行迁移脚本去重
+    """
+    for index in db.session.execute(text("PRAGMA index_list(daily_notes_metrics_unified)")):
+        if not index.unique:
+            continue
+        columns = [row.name for row in db.session.execute(text(f"PRAGMA index_info('{index.name}')"))]
+        if columns == ['date', 'note_id']:
+            return
+
+    try:
+        db.session.execute(text(
+            "CREATE UNIQUE INDEX IF NOT EXISTS idx_notes_daily_unique ON daily_notes_metrics_unified(date, note_id)"
+        ))
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        raise RuntimeError(
+            'daily_notes_metrics_unified 存在重复的 (date, note_id) 记录，'
+            '请先运行 backend/migrations/add_notes_daily_unique_index.py'
+        )
+
+
+def _upsert_statement(fields):
+    """INSERT … ON CONFLICT(date, note_id) DO UPDATE：冲突时更新 fields（created_at 保留原值）"""
+    stmt = sqlite_insert(DailyNotesMetricsUnified.__table__)
+    return stmt.on_conflict_do_update(
+        index_elements=['date', 'note_id'],
+        set_={field: stmt.excluded[field] for field in fields if field not in ('date', 'note_id', 'created_at')}
+    )
+
+
+def _write_note_metrics(frame, chunk_size=WRITE_CHUNK_SIZE):
+    """
+    批量 UPSERT 合并结果（executemany，每 chunk_size 条提交一次）
+
+    原先每条记录先按 (date, note_id) 查询一次再逐个属性赋值。没有当日广告数据的
+    记录不更新 agency / delivery_mode（保留原值），与有广告数据的记录分两条语句写入
+
+    Args:
+        frame: 维度 + 指标（索引 (date, note_id)，has_ad 列标记是否有当日广告数据）
+
+    Returns:
+        写入/更新的记录数
+    """
+    now = datetime.now()
+    frame = frame.reset_index()
+    frame['created_at'] = now
+    frame['updated_at'] = now
+
+    with_ad_fields = [column for column in frame.columns if column != 'has_ad']
+    without_ad_fields = [field for field in with_ad_fields if field not in ('agency', 'delivery_mode')]
+    with_ad_stmt = _upsert_statement(with_ad_fields)
+    without_ad_stmt = _upsert_statement(without_ad_fields)
+
+    total = len(frame)
+    for start in range(0, total, chunk_size):
+        chunk = frame.iloc[start:start + chunk_size]
+        has_ad = chunk['has_ad'].astype(bool)
+
+        with_ad = chunk.loc[has_ad, with_ad_fields].to_dict('records')
+        without_ad = chunk.loc[~has_ad, without_ad_fields].to_dict('records')
+        if with_ad:
+            db.session.execute(with_ad_stmt, with_ad)
+        if without_ad:
+            db.session.execute(without_ad_stmt, without_ad)
+        db.session.commit()
+
+        print(f"   已写入 {min(start + chunk_size, total)}/{total} 条")
+
+    return total
 
 
 if __name__ == '__main__':
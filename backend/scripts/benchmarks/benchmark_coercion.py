@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+"""
+整列类型转换（backend/processors/coercion.py）性能基准
+
+对每种转换，分别用逐值 safe_* 工具（Series.map）和整列转换处理同一列，
+对比耗时，并校验两者结果一致
+
+用法:
+    python backend/scripts/benchmarks/benchmark_coercion.py [行数]
+"""
+
+import sys
+import os
+import gc
+import math
+import time
+from datetime import date, timedelta
+
+# 设置标准输出为UTF-8编码（Windows兼容）
+if sys.platform == 'win32':
+    import io
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+    sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
+
+# 添加项目根目录到Python路径
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(current_dir, '../../..'))
+sys.path.insert(0, project_root)
+
+import pandas as pd
+
+from backend.processors import BackendConversionProcessor, DataProcessor, XhsNotesContentDailyProcessor
+from backend.processors import coercion
+
+
+def make_columns(rows):
+    """生成各类型的测试列（每 50 行一个空值）"""
+    def column(make):
+        return pd.Series([None if i % 50 == 0 else make(i) for i in range(rows)], dtype=object)
+
+    start = date(2025, 1, 1)
+    return {
+        'datetime': column(lambda i: f'{start + timedelta(days=i % 365)} {i % 24:02d}:{i % 60:02d}:00'),
+        'date': column(lambda i: (start + timedelta(days=i % 365)).strftime('%Y/%m/%d')),
+        'bool': column(lambda i: ['是', '否', 'Y', 'N', '1', '0'][i % 6]),
+        'int_comma': column(lambda i: f'{i * 37:,}'),
+        'float': column(lambda i: f'{i * 1.25:,.2f}'),
+        'percent': column(lambda i: f'{i % 10000 / 100:.2f}%'),
+    }
+
+
+def _normalize(value):
+    """NaN/NaT 统一为 None，Timestamp 统一为 datetime"""
+    if value is None or value is pd.NaT or (isinstance(value, float) and math.isnan(value)):
+        return None
+    if isinstance(value, pd.Timestamp):
+        return value.to_pydatetime()
+    return value
+
+
+def run(label, series, scalar, coerce):
+    """计时逐值转换和整列转换，校验结果一致"""
+    gc.collect()
+    start = time.perf_counter()
+    expected = series.map(scalar)
+    scalar_elapsed = time.perf_counter() - start
+
+    gc.collect()
+    start = time.perf_counter()
+    actual = coerce(series).values
+    frame_elapsed = time.perf_counter() - start
+
+    assert list(map(_normalize, actual)) == list(map(_normalize, expected)), f'{label}: 结果不一致'
+    print(f"  {label:<14} 逐值 {scalar_elapsed:>7.3f}s   整列 {frame_elapsed:>7.3f}s   {scalar_elapsed / frame_elapsed:>6.1f}x")
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    columns = make_columns(rows)
+
+    conversion = BackendConversionProcessor(None)
+    notes = XhsNotesContentDailyProcessor(None)
+    comma = coercion.THOUSANDS_SEPARATORS + ' '
+
+    print(f"每列 {rows} 行\n")
+    run('datetime', columns['datetime'], conversion.safe_datetime, coercion.to_datetime)
+    run('date', columns['date'], DataProcessor.safe_date, coercion.to_date)
+    run('bool', columns['bool'], conversion.safe_bool, coercion.to_bool)
+    run('int_comma', columns['int_comma'], notes._safe_parse_int_comma, lambda s: coercion.to_int(s, strip_chars=comma))
+    run('float', columns['float'], DataProcessor.safe_float, coercion.to_float)
+    run('percent', columns['percent'], notes._safe_parse_percent, coercion.to_percent)
+
+
+if __name__ == '__main__':
+    main()
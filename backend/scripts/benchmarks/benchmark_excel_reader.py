@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""
+Excel 读取性能基准
+
+生成一个与小红书内容笔记日级导出格式相同的工作簿（13 个映射列 + 25 个无关指标列），
+对比：
+1. pd.read_excel（原读取方式，openpyxl 引擎）
+2. read_xlsx_stream（流式 XML 解析，读取全部列）
+3. 处理器 read_excel_safe（快速引擎 + 列裁剪 + 文本列类型）
+
+用法:
+    python backend/scripts/benchmarks/benchmark_excel_reader.py [行数]
+"""
+
+import sys
+import os
+import time
+import random
+import tempfile
+
+# 设置标准输出为UTF-8编码（Windows兼容）
+if sys.platform == 'win32':
+    import io
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+    sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
+
+# 添加项目根目录到Python路径
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(current_dir, '../../..'))
+sys.path.insert(0, project_root)
+
+import openpyxl
+import pandas as pd
+
+from backend.utils.excel_reader import read_xlsx_stream, CALAMINE_AVAILABLE
+from backend.processors.xhs_notes_content_daily_processor_fast import XhsNotesContentDailyProcessorFast
+
+
+def generate_workbook(path, rows):
+    """生成测试工作簿"""
+    mapped = list(XhsNotesContentDailyProcessorFast.COLUMN_MAPPING.keys())
+    extra = [f'指标{i}' for i in range(25)]
+
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet()
+    ws.append(mapped + extra)
+    for i in range(rows):
+        ws.append(
+            [20260105, f'note{i}', f'笔记标题{i % 500}', f'https://www.xiaohongshu.com/{i}',
+             '2026/01/01 10:00', '专业号', '图文', f'创作者{i % 50}', 100000 + i % 50,
+             '1,234', i, i * 2, i * 3]
+            + [random.random() for _ in extra]
+        )
+    wb.save(path)
+
+
+def timed(label, func):
+    """运行并计时"""
+    start = time.perf_counter()
+    df = func()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<36} {elapsed:>7.2f}s  {df.shape[0]} 行 x {df.shape[1]} 列")
+    return elapsed
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 30000
+
+    fd, path = tempfile.mkstemp(suffix='.xlsx')
+    os.close(fd)
+
+    try:
+        print(f"生成测试文件: {rows} 行 x 38 列")
+        generate_workbook(path, rows)
+        print(f"文件大小: {os.path.getsize(path) / 1024 / 1024:.1f} MB")
+        print(f"calamine 引擎: {'已安装' if CALAMINE_AVAILABLE else '未安装（使用流式 XML 解析）'}\n")
+
+        processor = XhsNotesContentDailyProcessorFast(None)
+        baseline = timed('pd.read_excel', lambda: pd.read_excel(path))
+        stream = timed('read_xlsx_stream（全部列）', lambda: read_xlsx_stream(path))
+        pruned = timed('read_excel_safe（列裁剪）', lambda: processor.read_excel_safe(path)[0])
+
+        print(f"\n加速比: 流式 {baseline / stream:.1f}x, 列裁剪 {baseline / pruned:.1f}x")
+    finally:
+        os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+"""
+小红书内容笔记（高性能版）写入性能基准
+
+在临时 SQLite 文件中预置已有数据，然后写入一半已存在、一半新增的记录，对比：
+1. 逐键替换（原实现：每条记录一条 DELETE + 逐个 ORM 对象插入）
+2. 集合式替换（XhsNotesContentDailyProcessorFast._write_records：
+   临时表 + 每批一条 DELETE + Core INSERT executemany）
+
+两种方式写入后的表内容必须一致
+
+用法:
+    python backend/scripts/benchmarks/benchmark_fast_notes_replace.py [行数]
+"""
+
+import sys
+import os
+import time
+import tempfile
+from datetime import date, datetime, timedelta
+
+# 设置标准输出为UTF-8编码（Windows兼容）
+if sys.platform == 'win32':
+    import io
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+    sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
+
+# 添加项目根目录到Python路径
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(current_dir, '../../..'))
+sys.path.insert(0, project_root)
+
+import logging
+
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import Session
+
+from backend.database import db
+from backend.models import NoteLatestDimensions, XhsNotesContentDaily
+from backend.processors.xhs_notes_content_daily_processor_fast import XhsNotesContentDailyProcessorFast
+
+BATCH_SIZE = 1000
+
+
+def make_records(rows, offset, impressions):
+    """生成记录（每 500 条一个日期）"""
+    return [
+        (i, {
+            'data_date': date(2026, 1, 1) + timedelta(days=(offset + i) // 500),
+            'note_id': f'note{(offset + i) % 500}',
+            'note_title': f'笔记标题{offset + i}',
+            'note_url': f'https://www.xiaohongshu.com/{offset + i}',
+            'note_publish_time': datetime(2026, 1, 1, 10, 0),
+            'note_source': '专业号',
+            'note_type': '图文',
+            'creator_name': '创作者',
+            'creator_id': 'c1',
+            'creator_followers': 1000,
+            'total_impressions': impressions,
+            'total_reads': i,
+            'total_interactions': i * 2,
+        })
+        for i in range(rows)
+    ]
+
+
+def legacy_write_records(session, records, batch_size):
+    """原实现：每个唯一键一条 DELETE，逐个添加 ORM 对象"""
+    for i in range(0, len(records), batch_size):
+        batch = records[i:i + batch_size]
+        for _, data in batch:
+            session.query(XhsNotesContentDaily).filter(
+                XhsNotesContentDaily.data_date == data['data_date'],
+                XhsNotesContentDaily.note_id == data['note_id']
+            ).delete(synchronize_session=False)
+        for _, data in batch:
+            session.add(XhsNotesContentDaily(**data))
+        session.commit()
+
+
+def run(label, rows, write):
+    """在新的临时数据库中预置数据，计时写入，返回表内容"""
+    fd, path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+
+    engine = create_engine(f'sqlite:///{path}')
+    db.metadata.create_all(engine, tables=[XhsNotesContentDaily.__table__, NoteLatestDimensions.__table__])
+
+    table = XhsNotesContentDaily.__table__
+    with engine.begin() as conn:
+        conn.execute(insert(table), [data for _, data in make_records(rows, 0, impressions=1)])
+
+    # 一半覆盖已有记录，一半新增
+    records = make_records(rows, rows // 2, impressions=2)
+
+    try:
+        with Session(engine) as session:
+            start = time.perf_counter()
+            write(session, records)
+            elapsed = time.perf_counter() - start
+
+            contents = session.execute(
+                select(table.c.data_date, table.c.note_id, table.c.total_impressions, table.c.note_title)
+                .order_by(table.c.data_date, table.c.note_id)
+            ).all()
+
+        print(f"  {label:<28} {elapsed:>7.2f}s  {len(records) / elapsed:>10,.0f} 行/秒")
+        return elapsed, contents
+    finally:
+        engine.dispose()
+        os.remove(path)
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    logging.disable(logging.INFO)
+
+    print(f"已有 {rows} 行，写入 {rows} 行（{rows // 2} 行覆盖 + {rows - rows // 2} 行新增），batch_size={BATCH_SIZE}\n")
+
+    legacy, legacy_contents = run(
+        '逐键替换（原实现）', rows,
+        lambda session, records: legacy_write_records(session, records, BATCH_SIZE)
+    )
+    set_based, set_contents = run(
+        '集合式替换', rows,
+        lambda session, records: XhsNotesContentDailyProcessorFast(session)._write_records(records, BATCH_SIZE)
+    )
+
+    assert legacy_contents == set_contents, '两种写入方式结果不一致'
+    print(f"\n结果一致，加速比: {legacy / set_based:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""
+测试导入时自动创建账号映射（预加载登记表 + 批量插入）
+"""
+
+import sys
+import os
+import tempfile
+
+# 设置标准输出为UTF-8编码（Windows兼容）
+if sys.platform == 'win32':
+    import io
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+    sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
+
+# 添加项目根目录到Python路径
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(current_dir, '../../..'))
+sys.path.insert(0, project_root)
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
+
+from backend.database import db
+from backend.models import AccountAgencyMapping, RawAdDataTencent, RawAdDataXiaohongshu
+from backend.processors import TencentAdsProcessor, XiaohongshuAdsProcessor
+
+
+def _write_csv(header, rows):
+    """写入临时 CSV 文件"""
+    f = tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False, encoding='utf-8')
+    f.write(header + '\n')
+    for row in rows:
+        f.write(','.join(str(v) for v in row) + '\n')
+    f.close()
+    return f.name
+
+
+def _mappings(session, platform):
+    return sorted(
+        ((m.account_id, m.main_account_id, m.agency)
+         for m in session.query(AccountAgencyMapping).filter_by(platform=platform)),
+        key=lambda item: tuple(v or '' for v in item)
+    )
+
+
+def test_tencent_new_accounts_created_once():
+    """新账号只查询一次映射表并批量创建，提示按新账号汇总"""
+    engine = create_engine('sqlite://')
+    db.metadata.create_all(engine, tables=[RawAdDataTencent.__table__, AccountAgencyMapping.__table__])
+
+    mapping_selects = []
+    event.listen(engine, 'before_cursor_execute', lambda conn, cursor, statement, *args: (
+        mapping_selects.append(statement)
+        if statement.lstrip().startswith('SELECT') and 'account_agency_mapping' in statement else None
+    ))
+
+    with Session(engine) as session:
+        session.add(AccountAgencyMapping(platform='腾讯', account_id='A1', agency='代理商甲'))
+        session.commit()
+
+        rows = [(f'2026-01-{day:02d}', account, 10, 100, 5) for day in range(1, 21) for account in ('A1', 'A2', 'A3')]
+        path = _write_csv('日期,账户ID,花费,曝光量,点击量', rows)
+        processor = TencentAdsProcessor(session)
+        result = processor.import_data(path)
+        os.remove(path)
+
+        assert result['success'] and result['inserted_rows'] == 60
+        assert len(mapping_selects) == 1
+        assert _mappings(session, '腾讯') == [('A1', None, '代理商甲'), ('A2', None, '未分配'), ('A3', None, '未分配')]
+        new_account_warnings = [w for w in processor.warnings if '新腾讯账号' in w]
+        assert len(new_account_warnings) == 1 and 'A2, A3' in new_account_warnings[0]
+
+    print("✓ 账号映射: 每次导入只预加载一次，新账号批量创建并汇总提示")
+
+
+def test_xiaohongshu_sub_and_direct_accounts():
+    """小红书：代理商子账户按子账户ID判断，直投按主账户ID判断"""
+    engine = create_engine('sqlite://')
+    db.metadata.create_all(engine, tables=[RawAdDataXiaohongshu.__table__, AccountAgencyMapping.__table__])
+
+    with Session(engine) as session:
+        session.add(AccountAgencyMapping(platform='小红书', account_id=None, main_account_id='M1', agency='直投'))
+        session.commit()
+
+        path = _write_csv('周期,广告主账户ID,代理商子账户ID,总消耗,总展现', [
+            (20260105, 'M1', '', 1, 10),
+            (20260105, 'M1', 'S1', 2, 20),
+            (20260105, 'M2', '', 3, 30),
+            (20260106, 'M1', 'S1', 4, 40),
+        ])
+        result = XiaohongshuAdsProcessor(session).import_data(path)
+        os.remove(path)
+
+        assert result['success'] and result['inserted_rows'] == 4
+        assert _mappings(session, '小红书') == [(None, 'M1', '直投'), (None, 'M2', '未分配'), ('S1', 'M1', '未分配')]
+
+    print("✓ 账号映射: 小红书子账户与直投账户分别判断")
+
+
+if __name__ == '__main__':
+    test_tencent_new_accounts_created_once()
+    test_xiaohongshu_sub_and_direct_accounts()
+    print("\n全部测试通过")
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""
+测试导入涉及的 (平台, 日期范围) 报告与合并（聚合表增量刷新）
+"""
+
+import sys
+import os
+import tempfile
+from datetime import date
+
+# 设置标准输出为UTF-8编码（Windows兼容）
+if sys.platform == 'win32':
+    import io
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+    sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
+
+# 添加项目根目录到Python路径
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(current_dir, '../../..'))
+sys.path.insert(0, project_root)
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from backend.database import db
+from backend.models import AccountAgencyMapping, BackendConversions, RawAdDataTencent
+from backend.processors import BackendConversionProcessor, TencentAdsProcessor
+from backend.utils.aggregation_scope import group_refresh_scopes, merge_touched_ranges
+
+
+def _write_csv(header, rows):
+    """写入临时 CSV 文件"""
+    f = tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False, encoding='utf-8')
+    f.write(header + '\n')
+    for row in rows:
+        f.write(row + '\n')
+    f.close()
+    return f.name
+
+
+def test_imports_report_touched_ranges():
+    """广告导入报告平台 + 写入日期范围（流式各块合并）；转化增量导入按平台来源报告变化的线索日期"""
+    engine = create_engine('sqlite://')
+    db.metadata.create_all(engine, tables=[
+        RawAdDataTencent.__table__, AccountAgencyMapping.__table__, BackendConversions.__table__
+    ])
+
+    ads = _write_csv('日期,账户ID,花费,曝光量,点击量', [
+        '2026-01-07,A1,10,100,5', '2026-01-03,A1,10,100,5', '2026-01-05,A2,10,100,5'
+    ])
+    conversions = _write_csv('线索日期,平台来源,资金账号,平台用户ID,是否开户', [
+        '2026-01-05,腾讯,C1,,否', '2026-01-06,抖音,C2,,否', '2026-01-08,yj,C3,,否'
+    ])
+    changed = _write_csv('线索日期,平台来源,资金账号,平台用户ID,是否开户', [
+        '2026-01-05,腾讯,C1,,否', '2026-01-06,抖音,C2,,是', '2026-01-08,yj,C3,,否'
+    ])
+    try:
+        with Session(engine) as session:
+            result = TencentAdsProcessor(session).import_data(ads, chunksize=2)
+            assert result['touched_ranges'] == [{'platform': '腾讯', 'start': '2026-01-03', 'end': '2026-01-07'}]
+
+            # 全量覆盖：范围未知
+            result = BackendConversionProcessor(session).import_data(conversions, overwrite=True)
+            assert result['touched_ranges'] is None
+
+            # 增量：只有抖音 C2 变化
+            result = BackendConversionProcessor(session).import_data(changed, overwrite=False)
+            assert result['touched_ranges'] == [{'platform': '抖音', 'start': '2026-01-06', 'end': '2026-01-06'}]
+
+            # 未变化：空列表（不需要刷新）
+            result = BackendConversionProcessor(session).import_data(changed, overwrite=False)
+            assert result['touched_ranges'] == []
+    finally:
+        for path in (ads, conversions, changed):
+            os.remove(path)
+
+    print("✓ 聚合范围: 广告导入与转化增量导入报告涉及的平台和日期")
+
+
+def test_merge_and_group_ranges():
+    """批量上传按平台合并日期范围；任一文件范围未知时退回全量；相同范围的平台合并为一次聚合"""
+    merged = merge_touched_ranges([
+        [{'platform': '腾讯', 'start': '2026-01-05', 'end': '2026-01-06'}],
+        [],
+        [{'platform': '腾讯', 'start': '2026-01-01', 'end': '2026-01-03'},
+         {'platform': '抖音', 'start': '2026-01-01', 'end': '2026-01-06'}],
+    ])
+    assert merged == {'腾讯': (date(2026, 1, 1), date(2026, 1, 6)), '抖音': (date(2026, 1, 1), date(2026, 1, 6))}
+    assert merge_touched_ranges([[], None]) is None
+    assert merge_touched_ranges([[], []]) == {}
+
+    merged['小红书'] = (date(2026, 1, 2), date(2026, 1, 2))
+    assert group_refresh_scopes(merged) == [
+        (date(2026, 1, 1), date(2026, 1, 6), ['腾讯', '抖音']),
+        (date(2026, 1, 2), date(2026, 1, 2), ['小红书']),
+    ]
+
+    print("✓ 聚合范围: 按平台合并，相同日期范围合并为一次聚合")
+
+
+if __name__ == '__main__':
+    test_imports_report_touched_ranges()
+    test_merge_and_group_ranges()
+    print("\n全部测试通过")
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+"""
+测试批量导入（并行解析 + 串行写入、ZIP 安全解压）
+"""
+
+import sys
+import hashlib
+import os
+import tempfile
+import zipfile
+
+# 设置标准输出为UTF-8编码（Windows兼容）
+if sys.platform == 'win32':
+    import io
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+    sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
+
+# 添加项目根目录到Python路径
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(current_dir, '../../..'))
+sys.path.insert(0, project_root)
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from backend.database import db
+from backend.models import RawAdDataTencent
+from backend.processors import TencentAdsProcessor, AccountMappingProcessor
+from backend.services.batch_import import (
+    BatchUploadError,
+    extract_zip,
+    parse_files,
+    supports_parallel_parse
+)
+
+
+def _write_csv(rows):
+    """写入临时腾讯广告 CSV"""
+    f = tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False, encoding='utf-8')
+    f.write('日期,账户ID,花费,曝光次数\n')
+    for row in rows:
+        f.write(row + '\n')
+    f.close()
+    return f.name
+
+
+def test_parallel_parse_then_serial_write():
+    """进程池解析 + 顺序写入：结果与逐个文件 import_data 一致，解析失败的文件单独报错"""
+    paths = [
+        _write_csv(['2026-01-05,1001,1.5,10', '2026-01-05,1002,2,20']),
+        _write_csv(['2026-01-05,1001,9,90', ',1003,3,30']),
+    ]
+    bad = tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False, encoding='utf-8')
+    bad.write('无关列\n1\n')
+    bad.close()
+
+    assert supports_parallel_parse(TencentAdsProcessor)
+    assert not supports_parallel_parse(AccountMappingProcessor)
+
+    parsed_results = parse_files(TencentAdsProcessor, paths + [bad.name], max_workers=2)
+    assert [parsed['success'] for parsed in parsed_results] == [True, True, False]
+    assert '列验证失败' in parsed_results[2]['error']
+
+    engine = create_engine('sqlite://')
+    db.metadata.create_all(engine, tables=[RawAdDataTencent.__table__])
+
+    with Session(engine) as session:
+        results = [
+            TencentAdsProcessor(session).write_parsed(parsed, overwrite=True)
+            for parsed in parsed_results[:2]
+        ]
+        assert results[0]['inserted_rows'] == 2
+        assert results[1]['updated_rows'] == 1 and results[1]['failed_rows'] == 1
+        assert results[1]['errors'] == ['第 3 行: 日期为空']
+
+        record = session.query(RawAdDataTencent).filter_by(account_id='1001').one()
+        assert float(record.cost) == 9 and record.impressions == 90
+
+    for path in paths + [bad.name]:
+        os.remove(path)
+
+    print("✓ 批量导入: 并行解析、顺序写入、单文件失败隔离正确")
+
+
+def test_extract_zip():
+    """ZIP 解压：跳过目录和系统文件，生成文件名，超出大小限制时清理"""
+    target_dir = tempfile.mkdtemp()
+    zip_path = os.path.join(target_dir, 'upload.zip')
+
+    with zipfile.ZipFile(zip_path, 'w') as archive:
+        archive.writestr('数据/b.csv', '日期,账户ID\n2026-01-05,1\n')
+        archive.writestr('../a.xlsx', b'x' * 10)
+        archive.writestr('__MACOSX/._b.csv', 'junk')
+        archive.writestr('readme.txt', 'ignored')
+
+    extracted = extract_zip(zip_path, target_dir, 'tencent_ads', max_files=10, max_size=1024)
+    assert [name for name, _, _ in extracted] == ['a.xlsx', 'b.csv']
+    for _, save_name, file_hash in extracted:
+        assert save_name.startswith(tuple('0123456789')) and '_tencent_ads_' in save_name
+        assert os.path.exists(os.path.join(target_dir, save_name))
+        # 解压时计算的哈希与文件内容一致
+        with open(os.path.join(target_dir, save_name), 'rb') as f:
+            assert file_hash == hashlib.sha256(f.read()).hexdigest()
+
+    for limits in ({'max_files': 1, 'max_size': 1024}, {'max_files': 10, 'max_size': 20}):
+        try:
+            extract_zip(zip_path, target_dir, 'tencent_ads', **limits)
+            assert False, '应抛出 BatchUploadError'
+        except BatchUploadError:
+            pass
+
+    # 超出限制时不残留解压文件
+    assert len(os.listdir(target_dir)) == 3
+
+    print("✓ 批量导入: ZIP 安全解压和限制正确")
+
+
+if __name__ == '__main__':
+    test_parallel_parse_then_serial_write()
+    test_extract_zip()
+    print("\n全部测试通过")
@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+"""
+测试整列类型转换（coercion）与逐值 safe_* 工具结果一致
+"""
+
+import sys
+import os
+import math
+from datetime import date, datetime
+
+# 设置标准输出为UTF-8编码（Windows兼容）
+if sys.platform == 'win32':
+    import io
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+    sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
+
+# 添加项目根目录到Python路径
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(current_dir, '../../..'))
+sys.path.insert(0, project_root)
+
+import pandas as pd
+
+from backend.processors import BackendConversionProcessor, DataProcessor, XhsNotesContentDailyProcessor
+from backend.processors import coercion
+from backend.processors.xhs_notes_content_daily_processor_fast import XhsNotesContentDailyProcessorFast
+
+
+def _normalize(value):
+    """NaN/NaT 统一为 None，Timestamp 统一为 datetime"""
+    if value is None or (isinstance(value, float) and math.isnan(value)) or value is pd.NaT:
+        return None
+    if isinstance(value, pd.Timestamp):
+        return value.to_pydatetime()
+    return value
+
+
+def _assert_parity(name, values, scalar, coerce):
+    """整列转换结果与逐值工具逐个比较"""
+    series = pd.Series(values, dtype=object)
+    expected = [_normalize(scalar(v)) for v in values]
+    actual = [_normalize(v) for v in coerce(series).values]
+    assert actual == expected, f"{name}: {actual} != {expected}"
+    print(f"✓ {name}: {len(values)} 个取值与逐值工具一致")
+
+
+def test_datetime_parity():
+    """日期时间：六种格式、Excel 序列号、混合格式、空值"""
+    processor = BackendConversionProcessor(None)
+    values = [
+        '2026-01-05 10:30:00', '2026-01-05 10:30:00.250', '2026/01/05 10:30:00',
+        ' 2026-01-05 ', '2026/01/05', '2026-01-05T08:00:00', 'bad', '', None,
+        45000, 45000.5, datetime(2026, 1, 5, 9, 0),
+    ]
+    _assert_parity('to_datetime ↔ safe_datetime', values, processor.safe_datetime, coercion.to_datetime)
+
+    # 整列统一格式时只推断一次
+    assert coercion.infer_date_format(pd.Series(['2026/01/05', '2026/01/06'])) == '%Y/%m/%d'
+
+
+def test_date_parity():
+    """日期：YYYYMMDD 整数/字符串、常见字符串格式、空值"""
+    values = [20260105, '20260106', '2026-01-07', '2026/01/08 10:00', datetime(2026, 1, 9, 10), date(2026, 1, 10), None, 'x']
+    _assert_parity('to_date ↔ safe_date', values, DataProcessor.safe_date, coercion.to_date)
+
+    fast_values = [20260105, '20260106', '2026-01-07', None, '']
+    _assert_parity(
+        'to_datetime ↔ _safe_parse_date', fast_values,
+        XhsNotesContentDailyProcessorFast._safe_parse_date, coercion.to_datetime
+    )
+
+
+def test_bool_parity():
+    """布尔：是/否/Y/N/1/0、数值、原生布尔、空值、未识别取值"""
+    processor = BackendConversionProcessor(None)
+    values = ['是', '否', 'Y', ' y ', 'YES', 'no', '1', '0', 'true', '', 'abc', 1, 0, 2.5, True, False, None]
+    _assert_parity('to_bool ↔ safe_bool', values, processor.safe_bool, coercion.to_bool)
+
+    nulls = coercion.to_bool(pd.Series(['是', 'abc', None, 0], dtype=object)).nulls
+    assert nulls.tolist() == [False, True, True, False]
+
+
+def test_number_parity():
+    """数值：千分位、空格、百分比、小数截断、无法解析"""
+    values = ['1,234', '1，234.5', ' 12 ', 3.7, -3.7, 'x', None, '']
+    _assert_parity('to_float ↔ safe_float', values, DataProcessor.safe_float, coercion.to_float)
+    _assert_parity('to_int ↔ safe_int', values, DataProcessor.safe_int, coercion.to_int)
+
+    processor = XhsNotesContentDailyProcessor(None)
+    comma_values = ['1,234', '1 234', ' 12 ', 7.9, None, '', 'x']
+    _assert_parity(
+        'to_int ↔ _safe_parse_int_comma', comma_values, processor._safe_parse_int_comma,
+        lambda s: coercion.to_int(s, strip_chars=coercion.THOUSANDS_SEPARATORS + ' ')
+    )
+    percent_values = ['12.34%', '0.5', '1,250%', 80, 0.25, None, '', 'x']
+    _assert_parity(
+        'to_number ↔ _safe_parse_decimal_comma', percent_values, processor._safe_parse_decimal_comma,
+        lambda s: coercion.to_number(s, strip_chars=coercion.THOUSANDS_SEPARATORS + ' %')
+    )
+    _assert_parity('to_percent ↔ _safe_parse_percent', percent_values, processor._safe_parse_percent, coercion.to_percent)
+
+    result = coercion.to_int(pd.Series(['1,234', None, 'x'], dtype=object))
+    assert result.values.tolist() == [1234, 0, 0]
+    assert result.nulls.tolist() == [False, True, True]
+
+
+if __name__ == '__main__':
+    test_datetime_parity()
+    test_date_parity()
+    test_bool_parity()
+    test_number_parity()
+    print("\n全部测试通过")
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""
+测试列名解析计划（ColumnPlan）
+"""
+
+import sys
+import os
+
+# 设置标准输出为UTF-8编码（Windows兼容）
+if sys.platform == 'win32':
+    import io
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+    sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
+
+# 添加项目根目录到Python路径
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(current_dir, '../../..'))
+sys.path.insert(0, project_root)
+
+import pandas as pd
+
+from backend.processors import DouyinAdsProcessor, XhsNotesDailyProcessor
+from backend.processors.column_plan import ColumnPlan, aliases_from_mapping
+
+
+def test_compile_plan():
+    """候选列名按优先级解析；位置回退；缺少的必需列和可选字段"""
+    aliases = aliases_from_mapping({'时间': 'date', '日期': 'date', '花费': 'cost', '点击': 'clicks', '私信': 'leads'})
+    assert aliases['date'] == ['时间', '日期', 'date']
+
+    plan = ColumnPlan.compile(
+        ['日期', '时间', 'x', 'y'], aliases,
+        required=[['时间', '日期', 'date'], ['花费', 'cost']],
+        positions={'leads': 3}
+    )
+    assert plan.sources == {'date': '时间', 'leads': 'y'}
+    assert plan.missing_required == ['花费']
+    assert plan.missing_optional == ['clicks']
+
+    df = pd.DataFrame({'日期': ['a'], '时间': ['b'], 'x': [1], 'y': [2]})
+    assert plan.column(df, 'date').tolist() == ['b']
+    assert plan.column(df, 'clicks').isna().all()
+    assert plan.value(df.iloc[0], 'leads') == 2 and plan.value(df.iloc[0], 'clicks') is None
+
+    print("✓ 列名解析计划: 候选列名优先级、位置回退、缺失列正确")
+
+
+def test_processors_share_plan():
+    """同一表头只解析一次；逐行与整表路径按同一计划取值；表头变化时重新解析"""
+    processor = XhsNotesDailyProcessor(None)
+    columns = ['日期', '笔记/素材ID', '广告流水'] + [f'c{i}' for i in range(11)] + ['第15列']
+    df = pd.DataFrame([['2026-01-05', 'n1', '1,000'] + [0] * 11 + [7]], columns=columns)
+
+    assert processor.validate_columns(df)
+    plan = processor._column_plan
+    assert plan.source('private_message_leads') == '第15列'
+
+    row_records, _ = processor._prepare_records_rows(df)
+    frame_records, _ = processor._prepare_records_frame(df, processor.validate_frame(df))
+    assert processor._column_plan is plan
+    assert row_records[0][1]['private_message_leads'] == frame_records[0][1]['private_message_leads'] == 7
+    assert row_records[0][1]['cost'] == frame_records[0][1]['cost'] == 1000.0
+
+    # 抖音列名损坏时按位置重命名，计划随表头重新生成
+    douyin = DouyinAdsProcessor(None)
+    broken = pd.DataFrame([['2026-01-05', 'A1', '名称', 5, 100, 3]], columns=['?1', '?2', '?3', '?4', '?5', '?6'])
+    assert douyin.validate_columns(broken)
+    assert douyin._column_plan.source('cost') == 'cost'
+    assert douyin._column_plan.missing_optional == ['conversions']
+
+    print("✓ 列名解析计划: 验证列、逐行、整表复用同一计划")
+
+
+if __name__ == '__main__':
+    test_compile_plan()
+    test_processors_share_plan()
+    print("\n全部测试通过")
@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+"""
+测试后端转化增量导入（自然键 + 内容哈希比对）
+"""
+
+import sys
+import os
+import tempfile
+from datetime import date
+
+# 设置标准输出为UTF-8编码（Windows兼容）
+if sys.platform == 'win32':
+    import io
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+    sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
+
+# 添加项目根目录到Python路径
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(current_dir, '../../..'))
+sys.path.insert(0, project_root)
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from backend.database import db
+from backend.models import BackendConversions
+from backend.processors import BackendConversionProcessor
+
+
+def _import(session, rows, **kwargs):
+    """写入临时后端转化 CSV 并导入"""
+    f = tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False, encoding='utf-8')
+    f.write('线索日期,平台来源,资金账号,平台用户ID,是否开户,资产\n')
+    for row in rows:
+        f.write(row + '\n')
+    f.close()
+    try:
+        return BackendConversionProcessor(session).import_data(f.name, **kwargs)
+    finally:
+        os.remove(f.name)
+
+
+def _stored(session):
+    return sorted(
+        (r.lead_date.isoformat(), r.capital_account or r.platform_user_id, r.is_opened_account)
+        for r in session.query(BackendConversions)
+    )
+
+
+def test_incremental_diff():
+    """新线索插入、内容变化的更新、未变化的不动；replace_range 删除窗口内消失的线索"""
+    engine = create_engine('sqlite://')
+    db.metadata.create_all(engine, tables=[BackendConversions.__table__])
+
+    with Session(engine) as session:
+        base = [
+            '2026-01-05,腾讯,C1,,否,100.5',
+            '2026-01-05,腾讯,,U9,否,',
+            '2026-01-05,腾讯,,U9,否,',
+            '2026-01-06,抖音,C2,,是,2000',
+        ]
+        result = _import(session, base, overwrite=True)
+        assert result['inserted_rows'] == 4
+
+        # 同一文件重新增量导入：全部未变化
+        result = _import(session, base, overwrite=False)
+        assert (result['inserted_rows'], result['updated_rows'], result['unchanged_rows']) == (0, 0, 4)
+        assert result['date_range'] is None
+
+        # C1 开户（内容变化），新增 C3，U9 的第二条消失
+        result = _import(session, [
+            '2026-01-05,腾讯,C1,,是,100.5',
+            '2026-01-05,腾讯,,U9,否,',
+            '2026-01-06,抖音,C2,,是,2000',
+            '2026-01-07,小红书,C3,,否,',
+        ], overwrite=False)
+        assert (result['inserted_rows'], result['updated_rows'], result['unchanged_rows'], result['deleted_rows']) == (1, 1, 2, 0)
+        assert result['changed_dates'] == ['2026-01-05', '2026-01-07']
+        assert len(_stored(session)) == 5
+
+        # 按日期范围替换：窗口 [01-05, 01-06] 内文件中没有的线索被删除，窗口外保留
+        result = _import(session, [
+            '2026-01-05,腾讯,C1,,是,100.5',
+            '2026-01-06,抖音,C2,,是,2000',
+        ], replace_range=True)
+        assert (result['inserted_rows'], result['updated_rows'], result['unchanged_rows'], result['deleted_rows']) == (0, 0, 2, 2)
+        assert result['date_range'] == {'start': '2026-01-05', 'end': '2026-01-05'}
+        assert _stored(session) == [('2026-01-05', 'C1', True), ('2026-01-06', 'C2', True), ('2026-01-07', 'C3', False)]
+
+    print("✓ 后端转化增量导入: 插入/更新/未变化/删除数量正确")
+
+
+def test_backfill_legacy_rows():
+    """没有 row_key 的旧数据先补充 row_key，再参与比对"""
+    engine = create_engine('sqlite://')
+    db.metadata.create_all(engine, tables=[BackendConversions.__table__])
+
+    with Session(engine) as session:
+        session.add(BackendConversions(lead_date=date(2026, 1, 5), platform_source='腾讯', capital_account='C1'))
+        session.commit()
+
+        result = _import(session, ['2026-01-05,腾讯,C1,,,'], overwrite=False)
+        assert (result['inserted_rows'], result['unchanged_rows']) == (0, 1)
+        assert session.query(BackendConversions).filter(BackendConversions.row_key.is_(None)).count() == 0
+
+    print("✓ 后端转化增量导入: 旧数据补充 row_key 后参与比对")
+
+
+if __name__ == '__main__':
+    test_incremental_diff()
+    test_backfill_legacy_rows()
+    print("\n全部测试通过")
@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+"""
+测试 daily_metrics_unified 集合式聚合（INSERT … SELECT … ON CONFLICT）
+"""
+
+import sys
+import os
+from datetime import date
+
+# 设置标准输出为UTF-8编码（Windows兼容）
+if sys.platform == 'win32':
+    import io
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+    sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
+
+# 添加项目根目录到Python路径
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(current_dir, '../../..'))
+sys.path.insert(0, project_root)
+
+from sqlalchemy import create_engine, literal, select, union_all
+from sqlalchemy.orm import Session
+
+from backend.database import db
+from backend.models import AccountAgencyMapping, DailyMetricsUnified, RawAdDataTencent
+from backend.scripts.aggregations.update_daily_metrics_unified import (
+    AD_METRIC_FIELDS,
+    CONVERSION_METRIC_FIELDS,
+    _ad_metrics_query,
+    build_upsert_statement,
+    business_model_case,
+)
+
+
+def _metrics(session):
+    return sorted(
+        (r.date.isoformat(), r.platform, r.agency, r.business_model, float(r.cost), r.click_users, r.lead_users)
+        for r in session.query(DailyMetricsUnified)
+    )
+
+
+def test_business_model_case():
+    """业务模式映射规则在 SQL 中计算：已有值保留 → 特殊规则 → 代理商映射 → 空字符串"""
+    engine = create_engine('sqlite://')
+    cases = [
+        # (代理商, 业务模式, 平台, 期望)
+        ('绩牛', '直播', '腾讯', '直播'),
+        ('申万宏源直投', '', '腾讯', '直播'),
+        ('未分配', '', '小红书', '信息流'),
+        ('众联', '', '腾讯', '信息流'),
+        ('众联', '', '抖音', ''),
+        ('信则', '', '抖音', '直播'),
+        ('量子', '', '云极', '信息流'),
+        ('', '', '高德', ''),
+    ]
+    rows = union_all(*[
+        select(literal(agency).label('agency'), literal(model).label('business_model'), literal(platform).label('platform'))
+        for agency, model, platform, _ in cases
+    ]).subquery()
+
+    with engine.connect() as conn:
+        mapped = conn.execute(select(business_model_case(rows.c.agency, rows.c.business_model, rows.c.platform))).scalars().all()
+        # 平台为字符串常量（广告聚合）时同样生效
+        tencent = conn.execute(select(business_model_case(literal('申万宏源直投'), literal(''), '腾讯'))).scalar()
+
+    assert mapped == [expected for *_, expected in cases]
+    assert tencent == '直播'
+
+    print("✓ 业务模式映射: SQL CASE 与原映射规则一致")
+
+
+def test_ad_upsert_merges_and_preserves_conversions():
+    """广告聚合按映射后的维度分组求和；UPSERT 只更新广告指标，保留已有转化指标；重复执行结果不变"""
+    engine = create_engine('sqlite://')
+    db.metadata.create_all(engine, tables=[
+        RawAdDataTencent.__table__, AccountAgencyMapping.__table__, DailyMetricsUnified.__table__
+    ])
+
+    with Session(engine) as session:
+        session.add_all([
+            # A1 未设置业务模式（按代理商映射为信息流），A2 已设置为信息流：映射后同一分组
+            AccountAgencyMapping(platform='腾讯', account_id='A1', agency='绩牛', business_model=None),
+            AccountAgencyMapping(platform='腾讯', account_id='A2', agency='绩牛', business_model='信息流'),
+            RawAdDataTencent(date=date(2026, 1, 5), account_id='A1', cost=10, impressions=100, click_users=1),
+            RawAdDataTencent(date=date(2026, 1, 5), account_id='A2', cost=20, impressions=100, click_users=2),
+            RawAdDataTencent(date=date(2026, 1, 5), account_id='X', cost=5, impressions=10, click_users=1),
+            # 已有的转化指标
+            DailyMetricsUnified(date=date(2026, 1, 5), platform='腾讯', agency='绩牛', business_model='信息流',
+                                cost=0, impressions=0, click_users=0, lead_users=7),
+        ])
+        session.commit()
+
+        query = _ad_metrics_query('腾讯', date(2026, 1, 1), date(2026, 1, 31))
+        for _ in range(2):
+            session.execute(build_upsert_statement(query, AD_METRIC_FIELDS))
+            session.commit()
+
+        assert _metrics(session) == [
+            ('2026-01-05', '腾讯', '', '', 5.0, 1, 0),
+            ('2026-01-05', '腾讯', '绩牛', '信息流', 30.0, 3, 7),
+        ]
+
+        # 转化指标 UPSERT：保留广告指标
+        conversions = select(
+            literal(date(2026, 1, 5)), literal('腾讯'), literal('绩牛'), literal('信息流'),
+            *[literal(9) for _ in CONVERSION_METRIC_FIELDS]
+        )
+        session.execute(build_upsert_statement(conversions, CONVERSION_METRIC_FIELDS))
+        session.commit()
+        assert _metrics(session)[1] == ('2026-01-05', '腾讯', '绩牛', '信息流', 30.0, 3, 9)
+
+    print("✓ 集合式聚合: 映射后分组求和，UPSERT 只更新本来源指标")
+
+
+if __name__ == '__main__':
+    test_business_model_case()
+    test_ad_upsert_merges_and_preserves_conversions()
+    print("\n全部测试通过")
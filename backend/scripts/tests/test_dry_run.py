@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+"""
+测试试导入（dry_run：只检查不写入）
+"""
+
+import sys
+import os
+import tempfile
+from unittest import mock
+
+# 设置标准输出为UTF-8编码（Windows兼容）
+if sys.platform == 'win32':
+    import io
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+    sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
+
+# 添加项目根目录到Python路径
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(current_dir, '../../..'))
+sys.path.insert(0, project_root)
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from backend.database import db
+from backend.models import AccountAgencyMapping, RawAdDataTencent, XhsNoteInfo, XhsNotesDaily
+from backend.processors import TencentAdsProcessor, XhsNotesDailyProcessor
+
+
+def _dry_run(processor, header, rows):
+    """写入临时 CSV 文件并试导入"""
+    f = tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False, encoding='utf-8')
+    f.write(header + '\n')
+    for row in rows:
+        f.write(','.join(str(v) for v in row) + '\n')
+    f.close()
+    try:
+        return processor.dry_run(f.name)
+    finally:
+        os.remove(f.name)
+
+
+def test_dry_run_reports_problems_without_writing():
+    """列统计、问题行样例、新账号；数据库不发生任何写入"""
+    engine = create_engine('sqlite://')
+    db.metadata.create_all(engine, tables=[RawAdDataTencent.__table__, AccountAgencyMapping.__table__])
+
+    with Session(engine) as session:
+        session.add(AccountAgencyMapping(platform='腾讯', account_id='A1', agency='量子'))
+        session.commit()
+
+        result = _dry_run(TencentAdsProcessor(session), '日期,账户ID,花费,曝光量,点击量', [
+            ('2026-01-01', 'A1', 10, 100, 5),
+            ('2026-01-02', 'A2', '"1,000"', 100, 5),
+            ('不是日期', 'A3', 'abc', '', 5),
+            ('2026-01-03', '', 10, 100, 5),
+        ])
+
+        assert result['success'] and result['dry_run']
+        assert (result['total_rows'], result['valid_rows'], result['invalid_rows']) == (4, 2, 2)
+        assert result['columns']['date'] == {'column': '日期', 'nulls': 0, 'invalid': 1}
+        assert result['columns']['cost'] == {'column': '花费', 'nulls': 0, 'invalid': 1}
+        assert result['columns']['impressions']['nulls'] == 1
+        assert [row['row'] for row in result['bad_rows']] == [4, 5]
+        assert result['bad_rows'][0]['error'] and result['bad_rows'][0]['values']['花费'] == 'abc'
+        assert result['unknown_accounts'] == {'count': 1, 'samples': [{'account_id': 'A2', 'main_account_id': None}]}
+        assert result['date_range'] == {'start': '2026-01-01', 'end': '2026-01-02'}
+
+        assert session.query(RawAdDataTencent).count() == 0
+        assert session.query(AccountAgencyMapping).count() == 1
+
+    print("✓ 试导入: 返回列统计、问题行和新账号，不写入数据")
+
+
+def test_dry_run_unknown_notes_and_missing_columns():
+    """笔记数据报告维度表中没有的笔记；缺少必需列时返回缺少的列"""
+    engine = create_engine('sqlite://')
+    db.metadata.create_all(engine, tables=[XhsNotesDaily.__table__, XhsNoteInfo.__table__])
+
+    with Session(engine) as session:
+        session.add(XhsNoteInfo(note_id='n1', note_title='已有'))
+        session.commit()
+
+        result = _dry_run(XhsNotesDailyProcessor(session), '日期,笔记ID,花费', [
+            ('2026-01-01', 'n1', 10), ('2026-01-01', 'n2', 10), ('2026-01-02', 'n2', 10),
+        ])
+        assert result['success']
+        assert result['unknown_notes'] == {'count': 1, 'samples': ['n2']}
+        assert session.query(XhsNotesDaily).count() == 0
+
+        result = _dry_run(XhsNotesDailyProcessor(session), '笔记ID,花费', [('n1', 10)])
+        assert not result['success'] and result['missing_columns']
+
+    print("✓ 试导入: 报告未知笔记，缺少必需列时返回缺少的列")
+
+
+def test_dry_run_falls_back_to_rows():
+    """整表转换异常时与正式导入相同地回退逐行处理，问题行保留逐行验证的错误信息"""
+    engine = create_engine('sqlite://')
+    db.metadata.create_all(engine, tables=[RawAdDataTencent.__table__, AccountAgencyMapping.__table__])
+
+    rows = [
+        ('2026-01-01', 'A1', 10, 100, 5),
+        ('不是日期', 'A2', 10, 100, 5),
+        ('2026-01-03', '', 10, 100, 5),
+    ]
+    with Session(engine) as session, \
+            mock.patch.object(TencentAdsProcessor, 'transform_frame', side_effect=ValueError('整表转换失败')):
+        result = _dry_run(TencentAdsProcessor(session), '日期,账户ID,花费,曝光量,点击量', rows)
+
+    assert result['success']
+    assert (result['valid_rows'], result['invalid_rows']) == (1, 2)
+    assert [(row['row'], row['error']) for row in result['bad_rows']] == [
+        (3, '日期格式错误: 不是日期'),
+        (4, '账户ID为空'),
+    ]
+    assert result['errors'] == ['第 3 行: 日期格式错误: 不是日期', '第 4 行: 账户ID为空']
+
+    print("✓ 试导入: 整表转换失败时回退逐行处理，保留每行错误信息")
+
+
+if __name__ == '__main__':
+    test_dry_run_reports_problems_without_writing()
+    test_dry_run_unknown_notes_and_missing_columns()
+    test_dry_run_falls_back_to_rows()
+    print("\n全部测试通过")
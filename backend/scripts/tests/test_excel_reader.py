@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""
+测试 Excel 快速读取（流式 XML 解析、列裁剪、文本列类型）
+"""
+
+import sys
+import os
+import tempfile
+from datetime import date, datetime
+
+# 设置标准输出为UTF-8编码（Windows兼容）
+if sys.platform == 'win32':
+    import io
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+    sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
+
+# 添加项目根目录到Python路径
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(current_dir, '../../..'))
+sys.path.insert(0, project_root)
+
+import openpyxl
+import pandas as pd
+
+from backend.utils.excel_reader import read_xlsx_stream
+from backend.processors import TencentAdsProcessor, DouyinAdsProcessor
+
+
+def _write_xlsx(rows):
+    """写入临时 xlsx 文件"""
+    f = tempfile.NamedTemporaryFile(suffix='.xlsx', delete=False)
+    f.close()
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    for row in rows:
+        ws.append(row)
+    wb.save(f.name)
+    return f.name
+
+
+def test_stream_reader_matches_pandas():
+    """流式读取结果与 pd.read_excel 一致：空表头、重复表头、空行、日期、布尔、公式错误"""
+    path = _write_xlsx([
+        ['日期', '账户ID', None, '花费', '花费', '时间'],
+        [date(2026, 1, 5), '1001', 'x', 1.5, 2, datetime(2026, 1, 5, 12, 30)],
+        [],
+        [date(2026, 1, 6), 1002, None, '=1/0', 3, None],
+        [20260107, 'abc', 'y', 3, True, None],
+        [None, None, None, None, None, None],
+    ])
+
+    expected = pd.read_excel(path)
+    pd.testing.assert_frame_equal(read_xlsx_stream(path), expected)
+
+    pruned = read_xlsx_stream(path, usecols=lambda name: name in ('日期', '花费.1'))
+    pd.testing.assert_frame_equal(pruned, expected[['日期', '花费.1']])
+
+    os.remove(path)
+    print("✓ 流式读取: 与 pd.read_excel 结果一致")
+
+
+def test_processor_column_pruning():
+    """只读取映射列；ID 列含空值时仍按文本读取；列名无法识别时读取全部列"""
+    path = _write_xlsx([
+        ['日期', '账户ID', '账户名称', '花费', '曝光次数', '备注'],
+        [date(2026, 1, 5), 1001, 'A', 1.5, 10, 'x'],
+        [date(2026, 1, 5), None, 'B', 2, 20, 'y'],
+    ])
+    df, _ = TencentAdsProcessor(None).read_excel_safe(path)
+    os.remove(path)
+
+    assert list(df.columns) == ['日期', '账户ID', '花费', '曝光次数']
+    assert df['账户ID'].iloc[0] == '1001' and pd.isna(df['账户ID'].iloc[1])
+
+    path = _write_xlsx([
+        ['a', 'b', 'c', 'd', 'e', 'f'],
+        [date(2026, 1, 5), 1001, 'A', 1.5, 10, 3],
+    ])
+    df, _ = DouyinAdsProcessor(None).read_excel_safe(path)
+    os.remove(path)
+    assert list(df.columns) == ['a', 'b', 'c', 'd', 'e', 'f']
+
+    print("✓ 列裁剪: 只读取映射列，文本列类型正确，无法识别时回退全部列")
+
+
+if __name__ == '__main__':
+    test_stream_reader_matches_pandas()
+    test_processor_column_pruning()
+    print("\n全部测试通过")
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+"""
+测试按日期范围加载的已有唯一键索引（笔记类增量导入）
+"""
+
+import sys
+import os
+from datetime import date
+
+# 设置标准输出为UTF-8编码（Windows兼容）
+if sys.platform == 'win32':
+    import io
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+    sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
+
+# 添加项目根目录到Python路径
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(current_dir, '../../..'))
+sys.path.insert(0, project_root)
+
+import pandas as pd
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from backend.database import db
+from backend.models import NoteLatestDimensions, XhsNotesContentDaily, XhsNotesDaily
+from backend.processors import XhsNotesDailyProcessor
+from backend.processors.xhs_notes_content_daily_processor_fast import XhsNotesContentDailyProcessorFast
+from backend.utils.existing_keys import ExistingKeyIndex
+
+
+def test_scoped_load_and_mask():
+    """只加载日期范围内的键；contains 与整列 mask 结果一致"""
+    engine = create_engine('sqlite://')
+    db.metadata.create_all(engine, tables=[XhsNotesContentDaily.__table__, NoteLatestDimensions.__table__])
+
+    with Session(engine) as session:
+        for day, note_id in [(1, 'a'), (5, 'a'), (5, 'b'), (9, 'c')]:
+            session.add(XhsNotesContentDaily(data_date=date(2026, 1, day), note_id=note_id))
+        session.commit()
+
+        processor = XhsNotesContentDailyProcessorFast(session)
+        df = pd.DataFrame({
+            '数据日期': ['20260105', '20260105', '20260106', 'bad'],
+            '笔记id': ['a', 'x', 'b', 'a'],
+        })
+        df_new = processor._filter_incremental_data(df)
+
+        # 文件日期范围 2026-01-05 ~ 2026-01-06：1 日和 9 日的键不加载
+        assert len(processor._existing_keys) == 2
+        assert df_new['笔记id'].tolist() == ['x', 'b', 'a']
+        assert processor._existing_keys.contains(date(2026, 1, 5), 'b')
+        assert not processor._existing_keys.contains(date(2026, 1, 1), 'a')
+
+    assert ExistingKeyIndex.date_bounds([None, date(2026, 1, 3), '2026-01-01']) == (date(2026, 1, 1), date(2026, 1, 3))
+
+    print("✓ 已有键索引: 按日期范围加载、整列过滤正确")
+
+
+def test_notes_daily_incremental_import():
+    """笔记日级数据非覆盖导入：已有键和文件内重复键都跳过"""
+    engine = create_engine('sqlite://')
+    db.metadata.create_all(engine, tables=[XhsNotesDaily.__table__])
+
+    with Session(engine) as session:
+        session.add(XhsNotesDaily(date=date(2026, 1, 5), note_id='a'))
+        session.commit()
+
+        records = [
+            (0, {'date': date(2026, 1, 5), 'note_id': 'a'}),
+            (1, {'date': date(2026, 1, 5), 'note_id': 'b'}),
+            (2, {'date': date(2026, 1, 6), 'note_id': 'b'}),
+            (3, {'date': date(2026, 1, 6), 'note_id': 'b'}),
+        ]
+        processor = XhsNotesDailyProcessor(session)
+        result = processor._write_records_orm(XhsNotesDaily, ['date', 'note_id'], records, False, 1000)
+
+        assert result == (2, 0, 2)
+        assert processor.warnings == ['第 2 行: 重复记录', '第 5 行: 重复记录']
+        assert session.query(XhsNotesDaily).count() == 3
+
+    print("✓ 已有键索引: 笔记日级增量导入跳过重复记录")
+
+
+if __name__ == '__main__':
+    test_scoped_load_and_mask()
+    test_notes_daily_incremental_import()
+    print("\n全部测试通过")
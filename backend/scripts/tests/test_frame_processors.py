@@ -0,0 +1,212 @@
+# -*- coding: utf-8 -*-
+"""
+测试处理器整表契约（validate_frame / transform_frame）
+
+与逐行路径（validate_row / process_row）对比，确保转换结果一致
+"""
+
+import sys
+import os
+from datetime import date, datetime
+
+# 设置标准输出为UTF-8编码（Windows兼容）
+if sys.platform == 'win32':
+    import io
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+    sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
+
+# 添加项目根目录到Python路径
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(current_dir, '../../..'))
+sys.path.insert(0, project_root)
+
+import pandas as pd
+
+from backend.processors import (
+    TencentAdsProcessor,
+    DouyinAdsProcessor,
+    XiaohongshuAdsProcessor,
+    XhsNotesDailyProcessor,
+    XhsNotesListProcessor,
+    AccountMappingProcessor,
+    BackendConversionProcessor,
+)
+from backend.processors.xhs_notes_content_daily_processor_fast import XhsNotesContentDailyProcessorFast
+
+
+def _normalize(value):
+    """统一 date/datetime 表示后再比较（逐行路径对 Date 字段有时返回 datetime）"""
+    if isinstance(value, pd.Timestamp):
+        value = value.to_pydatetime()
+    if isinstance(value, datetime) and value.time() == datetime.min.time():
+        return value.date()
+    return value
+
+
+def _compare(processor_class, df):
+    """对比整表路径与逐行路径"""
+    frame_processor = processor_class(None)
+    row_processor = processor_class(None)
+
+    frame_records, frame_failed = frame_processor._prepare_records_frame(
+        df, frame_processor.validate_frame(df)
+    )
+    row_records, row_failed = row_processor._prepare_records_rows(df)
+
+    assert frame_failed == row_failed, f"{processor_class.__name__}: 失败行数不一致"
+    assert [idx for idx, _ in frame_records] == [idx for idx, _ in row_records]
+
+    for (idx, frame_data), (_, row_data) in zip(frame_records, row_records):
+        assert frame_data.keys() == row_data.keys()
+        for key in row_data:
+            assert _normalize(frame_data[key]) == _normalize(row_data[key]), \
+                f"{processor_class.__name__} 第 {idx} 行 {key}: {frame_data[key]!r} != {row_data[key]!r}"
+
+    assert frame_processor.errors == row_processor.errors
+    print(f"✓ {processor_class.__name__}: {len(frame_records)} 行有效, {frame_failed} 行失败")
+
+
+def test_tencent_ads():
+    df = pd.DataFrame({
+        '日期': ['2026-01-05', '2026/01/06', None, '2026-01-07'],
+        '账户ID': [1001, 1002, 1003, None],
+        '花费': ['1,234.5', 20, 5, -1],
+        '曝光次数': [100, '2,000', None, 3],
+        '点击次数': [1.9, 2, 3, 4],
+    })
+    _compare(TencentAdsProcessor, df)
+
+
+def test_douyin_ads_negative_cost():
+    df = pd.DataFrame({
+        '时间-天': ['2026-01-05', '2026-01-06'],
+        '账户ID': ['A1', 'A2'],
+        '消耗': [10.5, -3],
+        '展示数': [100, 200],
+        '点击数': [1, 2],
+        '转化数': [0, None],
+    })
+    _compare(DouyinAdsProcessor, df)
+
+
+def test_xiaohongshu_ads_yyyymmdd():
+    df = pd.DataFrame({
+        '周期': [20260105, 20260106, 20260107],
+        '广告主账户ID': ['M1', 'M1', ''],
+        '代理商子账户ID': ['S1', None, 'S2'],
+        '总消耗': [1.0, 2.0, 3.0],
+        '总展现': [10, 20, 30],
+        '私信进线数': [1, 0, 2],
+    })
+    _compare(XiaohongshuAdsProcessor, df)
+
+
+def test_xhs_notes_daily():
+    df = pd.DataFrame({
+        '时间': ['2026-01-05', '2026-01-05'],
+        '笔记ID': ['n1', 'n2'],
+        '笔记标题': [' 标题 ', None],
+        '广告流水': [1.5, 2],
+        '点赞': [1, 2],
+        '私信进线数': [3, 4],
+    })
+    _compare(XhsNotesDailyProcessor, df)
+
+
+def test_xhs_notes_list():
+    df = pd.DataFrame({
+        '笔记ID': ['n1', 'n2'],
+        '笔记标题': ['a', 'b'],
+        '发布时间': ['2026-01-01 10:00', '2026/01/02'],
+    })
+    _compare(XhsNotesListProcessor, df)
+
+
+def test_account_mapping():
+    df = pd.DataFrame({
+        '平台': ['腾讯广告', ' XHS ', '微博', '抖音'],
+        '账号ID': ['1', '2', '3', ''],
+        '代理商': ['代理A', None, None, None],
+        '业务模式': ['Live', None, '搜索', 'feed'],
+    })
+    _compare(AccountMappingProcessor, df)
+
+
+def test_notes_content_daily_fast():
+    df = pd.DataFrame({
+        '数据日期': [20260105, 20260106],
+        '笔记id': ['n1', 'n2'],
+        '笔记发布时间': ['2026/01/01 10:30', None],
+        '全部曝光量': ['1,234', 5],
+        '全部阅读量': [10, None],
+    })
+    _compare(XhsNotesContentDailyProcessorFast, df)
+
+
+def test_bad_date_rejected_by_both_paths():
+    """无法解析的日期在整表路径和逐行路径都判为无效（safe_date 返回 None 而不是抛异常）"""
+    cases = [
+        (TencentAdsProcessor, {'日期': ['2026-01-05', '不是日期'], '账户ID': [1001, 1002], '花费': [1, 2]}),
+        (DouyinAdsProcessor, {'时间-天': ['2026-01-05', '2026-13-45'], '账户ID': ['A1', 'A2'], '消耗': [1, 2]}),
+        (XiaohongshuAdsProcessor, {'周期': ['2026-01-05', 'abc'], '广告主账户ID': ['M1', 'M2'], '总消耗': [1, 2]}),
+        (XhsNotesDailyProcessor, {'时间': ['2026-01-05', 'abc'], '笔记ID': ['n1', 'n2'], '广告流水': [1, 2]}),
+    ]
+    for processor_class, data in cases:
+        df = pd.DataFrame(data)
+        row_processor = processor_class(None)
+        _, row_failed = row_processor._prepare_records_rows(df)
+        assert row_failed == 1, f"{processor_class.__name__}: 逐行路径未拒绝错误日期"
+        assert row_processor.errors[0].startswith("第 3 行: 日期格式错误")
+        _compare(processor_class, df)
+
+    df = pd.DataFrame({'线索日期': ['2026-01-05', 'abc'], '是否开户': ['是', '否']})
+    row_processor = BackendConversionProcessor(None)
+    _, row_failed = row_processor._prepare_records_rows(df)
+    assert row_failed == 1
+    assert row_processor.errors == ["第 3 行: 线索日期格式错误: abc"]
+
+
+def test_backend_conversion():
+    df = pd.DataFrame({
+        '线索日期': ['2026-01-05', None, '2026-01-06'],
+        '是否开户': ['是', '否', 1],
+        '是否有效线索': [True, False, None],
+        '首次触达时间': ['2026-01-05 10:00:00', None, '2026/01/06 11:00:00'],
+        '互动次数': [3, None, 2.0],
+        '资产': [1000.456, None, 2],
+        '资金账号': [123, None, 'abc'],
+    })
+
+    frame_processor = BackendConversionProcessor(None)
+    records, failed = frame_processor._prepare_records_frame(df, frame_processor.validate_frame(df))
+
+    assert failed == 1
+    assert frame_processor.errors == ["第 3 行: 线索日期为空"]
+
+    first = records[0][1]
+    assert first['lead_date'] == date(2026, 1, 5)
+    assert first['is_opened_account'] is True
+    assert first['is_valid_lead'] is True
+    assert first['first_contact_time'] == datetime(2026, 1, 5, 10, 0)
+    assert first['interaction_count'] == 3
+    assert first['assets'] == 1000.46
+    assert first['capital_account'] == '123'
+
+    last = records[1][1]
+    assert last['is_opened_account'] is True
+    assert last['is_valid_lead'] is False
+    assert last['interaction_count'] == 2
+    print("✓ BackendConversionProcessor: 整表转换结果正确")
+
+
+if __name__ == '__main__':
+    test_tencent_ads()
+    test_douyin_ads_negative_cost()
+    test_xiaohongshu_ads_yyyymmdd()
+    test_xhs_notes_daily()
+    test_xhs_notes_list()
+    test_account_mapping()
+    test_notes_content_daily_fast()
+    test_bad_date_rejected_by_both_paths()
+    test_backend_conversion()
+    print("\n全部测试通过")
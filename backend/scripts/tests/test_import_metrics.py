@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+"""
+测试导入性能指标（分阶段耗时、数据库语句数、内存峰值）
+"""
+
+import sys
+import os
+import json
+import tempfile
+
+# 设置标准输出为UTF-8编码（Windows兼容）
+if sys.platform == 'win32':
+    import io
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+    sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
+
+# 添加项目根目录到Python路径
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(current_dir, '../../..'))
+sys.path.insert(0, project_root)
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from backend.database import db
+from backend.models import AccountAgencyMapping, DataImportLog, RawAdDataTencent
+from backend.processors import TencentAdsProcessor
+from backend.routes.upload import apply_import_result
+
+
+def _write_csv(rows):
+    """写入临时 CSV 文件"""
+    f = tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False, encoding='utf-8')
+    f.write('日期,账户ID,花费,曝光量,点击量\n')
+    for row in rows:
+        f.write(','.join(str(v) for v in row) + '\n')
+    f.close()
+    return f.name
+
+
+def test_track_import():
+    """整个导入调用的分阶段耗时、语句数、内存峰值写入导入日志"""
+    engine = create_engine('sqlite://')
+    db.metadata.create_all(engine, tables=[RawAdDataTencent.__table__, AccountAgencyMapping.__table__])
+    path = _write_csv([(f'2026-01-0{day}', 'A1', 10, 100, 5) for day in range(1, 6)])
+
+    try:
+        with Session(engine) as session:
+            processor = TencentAdsProcessor(session)
+            with processor.metrics.track(session):
+                result = processor.import_data(path, batch_size=2)
+            result['metrics'] = processor.metrics.summary(result['total_rows'])
+    finally:
+        os.remove(path)
+
+    metrics = result['metrics']
+    assert {'read', 'columns', 'clean', 'dedup', 'quality', 'transform', 'write', 'accounts'} <= set(metrics['stages'])
+    assert metrics['db_statements'] > 3 and metrics['rows_per_second'] > 0
+    if sys.platform.startswith('linux'):
+        assert metrics['peak_memory_mb'] > 0
+
+    import_log = DataImportLog()
+    apply_import_result(import_log, result)
+    assert json.loads(import_log.stage_timings) == metrics['stages']
+    assert import_log.db_statements == metrics['db_statements']
+
+    print("✓ 导入指标: 分阶段耗时、语句数、内存峰值写入导入日志")
+
+
+def test_merge_parse_stages():
+    """批量上传：子进程解析的阶段耗时合并到写入阶段，并计入总耗时"""
+    engine = create_engine('sqlite://')
+    db.metadata.create_all(engine, tables=[RawAdDataTencent.__table__, AccountAgencyMapping.__table__])
+    path = _write_csv([('2026-01-01', 'A1', 10, 100, 5)])
+
+    try:
+        parsed = TencentAdsProcessor(None).parse_file(path)
+    finally:
+        os.remove(path)
+    assert 'transform' in parsed['stages'] and 'write' not in parsed['stages']
+
+    with Session(engine) as session:
+        processor = TencentAdsProcessor(session)
+        with processor.metrics.track(session):
+            processor.write_parsed(parsed)
+        summary = processor.metrics.summary(1)
+
+    assert summary['stages']['transform'] == round(parsed['stages']['transform'], 3)
+    assert summary['total_seconds'] >= round(sum(parsed['stages'].values()), 3)
+
+    print("✓ 导入指标: 解析阶段耗时合并到写入结果")
+
+
+if __name__ == '__main__':
+    test_track_import()
+    test_merge_parse_stages()
+    print("\n全部测试通过")
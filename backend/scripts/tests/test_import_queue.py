@@ -0,0 +1,225 @@
+# -*- coding: utf-8 -*-
+"""
+测试导入任务队列（优先级排序、排队位置、取消、单写入通道）
+"""
+
+import sys
+import os
+import tempfile
+import threading
+import types
+from unittest import mock
+
+# 设置标准输出为UTF-8编码（Windows兼容）
+if sys.platform == 'win32':
+    import io
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+    sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
+
+# 添加项目根目录到Python路径
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(current_dir, '../../..'))
+sys.path.insert(0, project_root)
+
+from flask import Flask
+
+from backend.database import db
+from backend.models import AccountAgencyMapping, DataImportLog, RawAdDataTencent
+from backend.services.import_queue import ImportQueue
+from backend.processors import ImportCancelled
+from backend.routes import upload
+
+
+def _create_app():
+    """使用临时 SQLite 文件创建测试应用"""
+    fd, path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{path}'
+    app.config['IMPORT_WORKERS'] = 1
+    app.config['IMPORT_QUEUE_POLL_INTERVAL'] = 1
+    db.init_app(app)
+    with app.app_context():
+        db.metadata.create_all(db.engine, tables=[DataImportLog.__table__])
+    return app, path
+
+
+def _add_job(task_id, priority=0):
+    """写入一个排队中的任务"""
+    log = DataImportLog(
+        task_id=task_id, import_type='tencent_ads', file_name=f'{task_id}.csv',
+        file_path=f'{task_id}.csv', status='queued', priority=priority
+    )
+    db.session.add(log)
+    db.session.commit()
+    return log
+
+
+def test_queue_order_position_and_cancel():
+    """按优先级 + 提交顺序处理；排队位置正确；排队中的任务可以取消"""
+    app, path = _create_app()
+    processed = []
+    done = threading.Event()
+
+    def handler(job):
+        processed.append(job['task_id'])
+        if len(processed) == 3:
+            done.set()
+
+    queue = ImportQueue()
+    queue.init_app(app, handler)
+
+    with app.app_context():
+        a = _add_job('a')
+        b = _add_job('b')
+        c = _add_job('c', priority=5)
+        d = _add_job('d')
+
+        assert [queue.queue_position(log) for log in (a, b, c, d)] == [2, 3, 1, 4]
+
+        accepted, _ = queue.cancel(b)
+        assert accepted and b.status == 'cancelled'
+        assert queue.queue_position(d) == 3
+
+        queue.enqueue(a)
+        assert done.wait(10)
+
+        assert processed == ['c', 'a', 'd']
+        statuses = {log.task_id: log.status for log in db.session.query(DataImportLog).all()}
+        assert statuses['b'] == 'cancelled' and statuses['a'] == 'processing'
+
+        # 删除数据库前停止工作线程，避免继续轮询
+        queue.stop(timeout=10)
+        assert queue._threads == []
+
+        db.session.remove()
+        db.engine.dispose()
+    os.remove(path)
+
+    print("✓ 导入队列: 优先级排序、排队位置、取消正确")
+
+
+def test_cancel_processing_job():
+    """处理中的任务请求取消后，check_cancelled 抛出 ImportCancelled"""
+    queue = ImportQueue()
+    queue._cancel_requested.add('t1')
+
+    queue.check_cancelled('t2')
+    try:
+        queue.check_cancelled('t1')
+        assert False, '应抛出 ImportCancelled'
+    except ImportCancelled:
+        pass
+
+    print("✓ 导入队列: 处理中任务取消")
+
+
+def _write_tencent_csv(dates):
+    """写入临时腾讯广告 CSV（每行一个账号）"""
+    f = tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False, encoding='utf-8')
+    f.write('日期,账户ID,花费,曝光量,点击量\n')
+    for i, day in enumerate(dates):
+        f.write(f'{day},A{i},10,100,5\n')
+    f.close()
+    return f.name
+
+
+def _process_in_worker(task_id, dates, cancel_after_commits):
+    """
+    在队列工作线程（没有应用上下文）中运行 process_file_async
+
+    cancel_after_commits: 第 N 次批量提交后请求取消（0 表示开始前已请求取消）
+
+    Returns:
+        (任务状态, 写入行数, refresh_aggregations 的调用参数列表)
+    """
+    app, path = _create_app()
+    with app.app_context():
+        db.metadata.create_all(db.engine, tables=[RawAdDataTencent.__table__, AccountAgencyMapping.__table__])
+        log_id = _add_job(task_id).id
+
+    file_path = _write_tencent_csv(dates)
+    errors = []
+    commits = []
+    attach_checkpoint = upload.attach_checkpoint
+
+    def attach(processor, import_log, resume_offset=0):
+        """批量提交后（记录断点时）按次数请求取消"""
+        attach_checkpoint(processor, import_log, resume_offset)
+        save_checkpoint = processor.checkpoint_callback
+
+        def checkpoint(offset):
+            save_checkpoint(offset)
+            commits.append(offset)
+            if len(commits) == cancel_after_commits:
+                upload.import_queue._cancel_requested.add(task_id)
+
+        processor.checkpoint_callback = checkpoint
+
+    def run():
+        try:
+            upload.process_file_async(task_id, file_path, 'tencent_ads', False, log_id)
+        except Exception as e:
+            errors.append(e)
+
+    if cancel_after_commits == 0:
+        upload.import_queue._cancel_requested.add(task_id)
+    try:
+        # process_file_async 内部 from app import app：替换为测试应用
+        with mock.patch.dict(sys.modules, {'app': types.SimpleNamespace(app=app)}), \
+                mock.patch.object(upload, 'attach_checkpoint', attach), \
+                mock.patch.object(upload, 'refresh_aggregations') as refresh:
+            worker = threading.Thread(target=run)
+            worker.start()
+            worker.join(timeout=30)
+    finally:
+        upload.import_queue._cancel_requested.discard(task_id)
+        if os.path.exists(file_path):
+            os.remove(file_path)
+
+    assert not worker.is_alive() and errors == []
+    with app.app_context():
+        status = db.session.get(DataImportLog, log_id).status
+        rows = db.session.query(RawAdDataTencent).count()
+        db.session.remove()
+        db.engine.dispose()
+    os.remove(path)
+    return status, rows, refresh.call_args_list
+
+
+def test_process_file_cancelled_before_commit():
+    """开始前请求取消：第一个批次提交前停止，不写入任何数据，也不刷新聚合表"""
+    status, rows, refresh_calls = _process_in_worker('t-cancel', ['2026-01-05'], cancel_after_commits=0)
+
+    assert (status, rows, refresh_calls) == ('cancelled', 0, [])
+    print("✓ 导入队列: 批次提交前取消，不写入数据")
+
+
+def test_process_file_cancelled_between_batches():
+    """第一个批次提交后取消：保留已提交的批次，只按已提交批次的日期范围刷新聚合表"""
+    dates = ['2026-01-05'] * 1000 + ['2026-01-06']
+    status, rows, refresh_calls = _process_in_worker('t-partial', dates, cancel_after_commits=1)
+
+    assert (status, rows) == ('cancelled', 1000)
+    assert len(refresh_calls) == 1
+    ranges = refresh_calls[0].args[2]
+    assert [(start.isoformat(), end.isoformat()) for start, end in ranges.values()] == [('2026-01-05', '2026-01-05')]
+    print("✓ 导入队列: 批次之间取消，已提交批次保留并刷新聚合表")
+
+
+def test_process_file_cancelled_after_last_commit():
+    """最后一个批次提交后才请求取消：不再响应取消，任务正常完成"""
+    status, rows, refresh_calls = _process_in_worker('t-late', ['2026-01-05'], cancel_after_commits=1)
+
+    assert (status, rows, len(refresh_calls)) == ('completed', 1, 1)
+    print("✓ 导入队列: 最后批次提交后取消，任务正常完成")
+
+
+if __name__ == '__main__':
+    test_queue_order_position_and_cancel()
+    test_cancel_processing_job()
+    test_process_file_cancelled_before_commit()
+    test_process_file_cancelled_between_batches()
+    test_process_file_cancelled_after_last_commit()
+    print("\n全部测试通过")
@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+"""
+测试导入断点续传（批量提交后记录断点、从断点继续、重启恢复中断任务）
+"""
+
+import sys
+import os
+import tempfile
+
+# 设置标准输出为UTF-8编码（Windows兼容）
+if sys.platform == 'win32':
+    import io
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+    sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
+
+# 添加项目根目录到Python路径
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(current_dir, '../../..'))
+sys.path.insert(0, project_root)
+
+from flask import Flask
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from backend.database import db
+from backend.models import AccountAgencyMapping, DataImportLog, RawAdDataTencent
+from backend.processors import TencentAdsProcessor
+from backend.services.import_queue import ImportQueue
+
+
+def _import(processor, rows, **kwargs):
+    """写入临时 CSV 文件并导入"""
+    f = tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False, encoding='utf-8')
+    f.write('日期,账户ID,花费,曝光量,点击量\n')
+    for row in rows:
+        f.write(','.join(str(v) for v in row) + '\n')
+    f.close()
+    try:
+        return processor.import_data(f.name, **kwargs)
+    finally:
+        os.remove(f.name)
+
+
+def test_resume_from_checkpoint():
+    """每批提交后记录断点；从断点继续时跳过已提交的记录"""
+    engine = create_engine('sqlite://')
+    db.metadata.create_all(engine, tables=[RawAdDataTencent.__table__, AccountAgencyMapping.__table__])
+    rows = [(f'2026-01-0{day}', 'A1', 10, 100, 5) for day in range(1, 6)]
+
+    with Session(engine) as session:
+        checkpoints = []
+        processor = TencentAdsProcessor(session)
+        processor.checkpoint_callback = checkpoints.append
+        result = _import(processor, rows[:4], batch_size=2)
+        assert result['success'] and checkpoints == [2, 4]
+
+        # 中断后重新导入完整文件：前 4 条已提交，只写入最后 1 条
+        checkpoints = []
+        processor = TencentAdsProcessor(session)
+        processor.resume_offset = 4
+        processor.checkpoint_callback = checkpoints.append
+        result = _import(processor, rows, batch_size=2)
+
+        assert result['success'] and result['inserted_rows'] == 1 and result['failed_rows'] == 0
+        assert result['resumed_rows'] == 4 and result['message'].startswith('从断点继续')
+        assert checkpoints == [5]
+        assert session.query(RawAdDataTencent).count() == 5
+
+    print("✓ 断点续传: 批量提交后记录断点，从断点继续只写入剩余记录")
+
+
+def test_recover_stale_jobs():
+    """服务重启：处理中的任务重新排队，断点与文件哈希一致时按断点继续"""
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    db.init_app(app)
+
+    with app.app_context():
+        db.metadata.create_all(db.engine, tables=[DataImportLog.__table__])
+        db.session.add_all([
+            DataImportLog(task_id='t1', import_type='tencent_ads', file_name='a.csv', file_path='a.csv',
+                          file_hash='h1', status='processing', checkpoint_offset=3000, checkpoint_hash='h1'),
+            DataImportLog(task_id='t2', import_type='tencent_ads', file_name='b.csv', file_path='b.csv',
+                          file_hash='h2', status='queued', checkpoint_offset=1000, checkpoint_hash='old'),
+            DataImportLog(task_id='t3', import_type='tencent_ads', file_name='c.csv', file_path='c.csv',
+                          file_hash='h3', status='completed'),
+        ])
+        db.session.commit()
+
+    queue = ImportQueue()
+    queue.app = app
+    assert queue.recover_stale_jobs() == 1
+
+    first = queue._claim_next()
+    second = queue._claim_next()
+    assert (first['task_id'], first['resume_offset']) == ('t1', 3000)
+    assert (second['task_id'], second['resume_offset']) == ('t2', 0)
+    assert queue._claim_next() is None
+
+    print("✓ 断点续传: 重启后恢复中断任务，断点与文件不一致时从头导入")
+
+
+if __name__ == '__main__':
+    test_resume_from_checkpoint()
+    test_recover_stale_jobs()
+    print("\n全部测试通过")
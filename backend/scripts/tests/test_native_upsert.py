@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+"""
+测试覆盖模式导入的 SQLite 原生 UPSERT 写入
+"""
+
+import sys
+import os
+import tempfile
+from datetime import date
+
+# 设置标准输出为UTF-8编码（Windows兼容）
+if sys.platform == 'win32':
+    import io
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+    sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
+
+# 添加项目根目录到Python路径
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(current_dir, '../../..'))
+sys.path.insert(0, project_root)
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from backend.database import db
+from backend.models import NoteLatestDimensions, RawAdDataXiaohongshu, XhsNotesContentDaily
+from backend.processors import XiaohongshuAdsProcessor
+from backend.processors.xhs_notes_content_daily_processor_fast import XhsNotesContentDailyProcessorFast
+
+
+def _write_csv(rows):
+    """写入临时 CSV 文件"""
+    f = tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False, encoding='utf-8')
+    f.write('周期,广告主账户ID,代理商子账户ID,总消耗,总展现\n')
+    for row in rows:
+        f.write(','.join(str(v) for v in row) + '\n')
+    f.close()
+    return f.name
+
+
+def test_xiaohongshu_upsert_with_null_sub_account():
+    """直投（子账户为空）与代理商数据都应按唯一键更新而不是重复插入"""
+    engine = create_engine('sqlite://')
+    db.metadata.create_all(engine, tables=[RawAdDataXiaohongshu.__table__])
+
+    with Session(engine) as session:
+        processor = XiaohongshuAdsProcessor(session)
+        assert processor._supports_native_upsert(RawAdDataXiaohongshu)
+
+        path = _write_csv([(20260105, 'M1', '', 1, 10), (20260105, 'M1', 'S1', 2, 20)])
+        result = processor.import_data(path, overwrite=True)
+        os.remove(path)
+        assert result['inserted_rows'] == 2 and result['updated_rows'] == 0
+
+        path = _write_csv([(20260105, 'M1', '', 5, 50), (20260106, 'M1', 'S1', 3, 30)])
+        result = XiaohongshuAdsProcessor(session).import_data(path, overwrite=True)
+        os.remove(path)
+        assert result['inserted_rows'] == 1 and result['updated_rows'] == 1
+
+        rows = session.query(RawAdDataXiaohongshu).order_by(RawAdDataXiaohongshu.id).all()
+        assert len(rows) == 3
+        assert rows[0].sub_account_id is None and float(rows[0].cost) == 5
+        assert rows[0].impressions == 50
+
+    print("✓ 原生 UPSERT: 插入/更新数量正确，空子账户按唯一键更新")
+
+
+def test_fast_notes_set_based_replace():
+    """高性能版笔记处理器：集合式替换跨批次更新，同批次重复键保留最后一条"""
+    engine = create_engine('sqlite://')
+    db.metadata.create_all(engine, tables=[XhsNotesContentDaily.__table__, NoteLatestDimensions.__table__])
+
+    def record(day, note_id, impressions):
+        return (0, {'data_date': date(2026, 1, day), 'note_id': note_id, 'total_impressions': impressions})
+
+    with Session(engine) as session:
+        processor = XhsNotesContentDailyProcessorFast(session)
+        assert processor._write_records([record(5, 'a', 1), record(5, 'b', 1)], batch_size=10) == (2, 0, 0)
+
+        result = processor._write_records(
+            [record(5, 'a', 2), record(6, 'a', 2), record(5, 'b', 2), record(5, 'b', 3), (0, {'data_date': None, 'note_id': 'c'})],
+            batch_size=2
+        )
+        assert result == (1, 2, 1)
+
+        rows = {
+            (row.data_date.day, row.note_id): row.total_impressions
+            for row in session.query(XhsNotesContentDaily).all()
+        }
+        assert rows == {(5, 'a'): 2, (6, 'a'): 2, (5, 'b'): 3}
+
+    print("✓ 集合式替换: 插入/更新数量正确，批内重复键保留最后一条")
+
+
+if __name__ == '__main__':
+    test_xiaohongshu_upsert_with_null_sub_account()
+    test_fast_notes_set_based_replace()
+    print("\n全部测试通过")
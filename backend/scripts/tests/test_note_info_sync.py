@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+"""
+测试笔记维度表（xhs_note_info）批量同步
+"""
+
+import sys
+import os
+import tempfile
+from datetime import date
+
+# 设置标准输出为UTF-8编码（Windows兼容）
+if sys.platform == 'win32':
+    import io
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+    sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
+
+# 添加项目根目录到Python路径
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(current_dir, '../../..'))
+sys.path.insert(0, project_root)
+
+from flask import Flask
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from backend.database import db
+from backend.models import DataImportLog, XhsNoteInfo, XhsNotesDaily
+from backend.processors import XhsNotesDailyProcessor, XhsNotesListProcessor
+from backend.routes.upload import supplement_note_mappings
+
+
+def _notes(session):
+    return {
+        n.note_id: (n.note_title, n.note_url, n.producer)
+        for n in session.query(XhsNoteInfo).all()
+    }
+
+
+def test_update_mapping_table_fills_empty_fields():
+    """新笔记插入；已有笔记只补空标题/链接，不覆盖已有值；文件内同一笔记取首个非空值"""
+    engine = create_engine('sqlite://')
+    db.metadata.create_all(engine, tables=[XhsNoteInfo.__table__])
+
+    with Session(engine) as session:
+        session.add_all([
+            XhsNoteInfo(note_id='a', note_title='旧标题', note_url=None, producer='张三'),
+            XhsNoteInfo(note_id='b', note_title='', note_url='u-b'),
+            XhsNoteInfo(note_id='c', note_title='完整', note_url='u-c'),
+        ])
+        session.commit()
+
+        stats = XhsNotesDailyProcessor(session).update_mapping_table([
+            {'note_id': 'a', 'note_title': '新标题', 'note_url': 'u-a'},
+            {'note_id': 'b', 'note_title': None, 'note_url': 'x'},
+            {'note_id': 'b', 'note_title': '标题b', 'note_url': None},
+            {'note_id': 'c', 'note_title': '其他', 'note_url': 'x'},
+            {'note_id': 'd', 'note_title': None, 'note_url': None},
+            {'note_id': 'd', 'note_title': '标题d', 'note_url': 'u-d'},
+            {'note_id': None, 'note_title': '无ID'},
+        ])
+
+        assert stats == {'new_count': 1, 'updated_count': 2}
+        assert _notes(session) == {
+            'a': ('旧标题', 'u-a', '张三'),
+            'b': ('标题b', 'u-b', None),
+            'c': ('完整', 'u-c', None),
+            'd': ('标题d', 'u-d', None),
+        }
+
+    print("✓ 笔记维度同步: 新建与补空字段数量正确，已有值不被覆盖")
+
+
+def test_notes_list_append_skips_existing():
+    """笔记列表非覆盖导入：已有笔记按重复记录跳过，新笔记批量插入"""
+    engine = create_engine('sqlite://')
+    db.metadata.create_all(engine, tables=[XhsNoteInfo.__table__])
+
+    with Session(engine) as session:
+        session.add(XhsNoteInfo(note_id='a', note_title='旧标题'))
+        session.commit()
+
+        processor = XhsNotesListProcessor(session)
+        records = [
+            (0, {'note_id': 'a', 'note_title': '新标题', 'producer': '李四'}),
+            (1, {'note_id': 'b', 'note_title': '标题b', 'producer': '李四'}),
+        ]
+        result = processor._write_records_orm(XhsNoteInfo, ['note_id'], records, overwrite=False, batch_size=1000)
+
+        assert result == (1, 0, 1)
+        assert processor.warnings == ["第 2 行: 重复记录"]
+        assert _notes(session) == {'a': ('旧标题', None, None), 'b': ('标题b', None, '李四')}
+
+        # 文件内重复的笔记：只写入第一行（不与后面的行合并字段），后面的行计为重复记录
+        processor = XhsNotesListProcessor(session)
+        records = [
+            (0, {'note_id': 'c', 'note_title': None, 'producer': '王五'}),
+            (1, {'note_id': 'c', 'note_title': '标题c', 'producer': None}),
+            (2, {'note_id': 'd', 'note_title': '标题d', 'producer': None}),
+        ]
+        result = processor._write_records_orm(XhsNoteInfo, ['note_id'], records, overwrite=False, batch_size=1000)
+
+        assert result == (2, 0, 1)
+        assert processor.warnings == ["第 3 行: 重复记录"]
+        assert _notes(session)['c'] == (None, None, '王五')
+
+    print("✓ 笔记列表: 非覆盖导入跳过已有笔记和文件内重复笔记，新笔记批量写入")
+
+
+def test_supplement_note_mappings_from_notes_daily():
+    """导入笔记投放数据后按整张 xhs_notes_daily 批量补充笔记维度表"""
+    fd, path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{path}'
+    db.init_app(app)
+
+    with app.app_context():
+        db.metadata.create_all(db.engine, tables=[
+            XhsNoteInfo.__table__, XhsNotesDaily.__table__, DataImportLog.__table__
+        ])
+        db.session.add_all([
+            XhsNoteInfo(note_id='a', note_title='', note_url='u-a'),
+            XhsNotesDaily(date=date(2026, 1, 1), note_id='a', note_title='标题a', note_url='x'),
+            XhsNotesDaily(date=date(2026, 1, 1), note_id='b', note_title=None, note_url='u-b'),
+            XhsNotesDaily(date=date(2026, 1, 2), note_id='b', note_title='标题b', note_url='u-b'),
+        ])
+        import_log = DataImportLog(task_id='t', import_type='xhs_notes_daily', file_name='t.csv', message='导入完成')
+        db.session.add(import_log)
+        db.session.commit()
+
+        supplement_note_mappings('xhs_notes_daily', import_log)
+
+        assert _notes(db.session) == {'a': ('标题a', 'u-a', None), 'b': ('标题b', 'u-b', None)}
+        assert import_log.message.endswith('新增 1 条，更新 1 条。')
+
+        db.session.remove()
+        db.engine.dispose()
+    os.remove(path)
+
+    print("✓ 笔记维度同步: 笔记投放数据导入后批量补充映射表")
+
+
+if __name__ == '__main__':
+    test_update_mapping_table_fills_empty_fields()
+    test_notes_list_append_skips_existing()
+    test_supplement_note_mappings_from_notes_daily()
+    print("\n全部测试通过")
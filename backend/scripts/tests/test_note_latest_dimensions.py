@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+"""
+测试笔记最新维度表 note_latest_dimensions（导入时增量维护 + 从事实表重建）
+"""
+
+import sys
+import os
+import tempfile
+from datetime import date
+
+# 设置标准输出为UTF-8编码（Windows兼容）
+if sys.platform == 'win32':
+    import io
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+    sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
+
+# 添加项目根目录到Python路径
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(current_dir, '../../..'))
+sys.path.insert(0, project_root)
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from backend.database import db
+from backend.models import NoteLatestDimensions, XhsNotesContentDaily
+from backend.processors.xhs_notes_content_daily_processor_fast import XhsNotesContentDailyProcessorFast
+from backend.utils.note_dimensions import latest_dimension_rows, rebuild_latest_dimensions
+
+
+def _write_csv(rows):
+    """写入临时内容笔记日级 CSV 文件"""
+    f = tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False, encoding='utf-8')
+    f.write('数据日期,笔记id,笔记链接,笔记类型,全部曝光量\n')
+    for row in rows:
+        f.write(row + '\n')
+    f.close()
+    return f.name
+
+
+def _dimensions(session):
+    return sorted(
+        (r.note_id, r.data_date.isoformat(), r.note_url, r.note_type)
+        for r in session.query(NoteLatestDimensions)
+    )
+
+
+def test_import_keeps_latest_dimensions():
+    """导入时按笔记 UPSERT 最新维度：较早日期的数据不覆盖，较新日期的数据覆盖"""
+    engine = create_engine('sqlite://')
+    db.metadata.create_all(engine, tables=[XhsNotesContentDaily.__table__, NoteLatestDimensions.__table__])
+
+    files = [
+        _write_csv(['20260105,N1,u1,视频笔记,10', '20260103,N1,u0,图文笔记,10', '20260104,N2,v1,图文笔记,5']),
+        _write_csv(['20260101,N1,old,图文笔记,10']),
+        _write_csv(['20260106,N1,u2,视频笔记,10', '20260106,N3,w1,视频笔记,1']),
+    ]
+    try:
+        with Session(engine) as session:
+            XhsNotesContentDailyProcessorFast(session).import_data(files[0])
+            assert _dimensions(session) == [
+                ('N1', '2026-01-05', 'u1', '视频笔记'),
+                ('N2', '2026-01-04', 'v1', '图文笔记'),
+            ]
+
+            # 较早日期：事实表新增记录，最新维度不变
+            XhsNotesContentDailyProcessorFast(session).import_data(files[1])
+            assert _dimensions(session)[0] == ('N1', '2026-01-05', 'u1', '视频笔记')
+
+            XhsNotesContentDailyProcessorFast(session).import_data(files[2])
+            assert _dimensions(session) == [
+                ('N1', '2026-01-06', 'u2', '视频笔记'),
+                ('N2', '2026-01-04', 'v1', '图文笔记'),
+                ('N3', '2026-01-06', 'w1', '视频笔记'),
+            ]
+            incremental = _dimensions(session)
+
+            # 从事实表重建结果与增量维护一致
+            assert rebuild_latest_dimensions(session) == 3
+            session.commit()
+            assert _dimensions(session) == incremental
+    finally:
+        for path in files:
+            os.remove(path)
+
+    print("✓ 笔记最新维度: 导入时只在日期不早于已记录日期时更新，与全量重建一致")
+
+
+def test_latest_dimension_rows():
+    """批内按笔记取最大日期；日期相同时后面的记录优先；缺少笔记ID或日期的记录忽略"""
+    rows = latest_dimension_rows([
+        {'note_id': 'N1', 'data_date': date(2026, 1, 2), 'note_url': 'a', 'note_type': None},
+        {'note_id': 'N1', 'data_date': date(2026, 1, 1), 'note_url': 'b', 'note_type': None},
+        {'note_id': 'N1', 'data_date': date(2026, 1, 2), 'note_url': 'c', 'note_type': '视频笔记'},
+        {'note_id': None, 'data_date': date(2026, 1, 3), 'note_url': 'd'},
+        {'note_id': 'N2', 'data_date': None, 'note_url': 'e'},
+    ])
+    assert rows == [{'note_id': 'N1', 'data_date': date(2026, 1, 2), 'note_url': 'c', 'note_type': '视频笔记'}]
+
+    print("✓ 笔记最新维度: 批内按笔记取最新记录")
+
+
+if __name__ == '__main__':
+    test_import_keeps_latest_dimensions()
+    test_latest_dimension_rows()
+    print("\n全部测试通过")
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""
+测试小红书笔记日级聚合的批量写入（维度按列补充 + ON CONFLICT(date, note_id) UPSERT）
+"""
+
+import sys
+import os
+from datetime import date, datetime
+
+# 设置标准输出为UTF-8编码（Windows兼容）
+if sys.platform == 'win32':
+    import io
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+    sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
+
+# 添加项目根目录到Python路径
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(current_dir, '../../..'))
+sys.path.insert(0, project_root)
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from backend.database import db
+from backend.models import DailyNotesMetricsUnified
+from backend.scripts.aggregations.update_daily_notes_metrics import (
+    _fill_note_dimensions,
+    _merge_note_sources,
+    _upsert_statement,
+)
+
+D1 = date(2026, 1, 1)
+
+
+def test_fill_dimensions_by_columns():
+    """维度按列补充：有 mapping 时 note_title 为空直接取默认值，其余字段回退 ad；note_url 当日没有运营数据时取最新运营数据"""
+    merged = _merge_note_sources(
+        [{'date': D1, 'note_id': 'N1', 'cost': 1.0, 'note_title': '投放标题', 'publish_account': '投放账号',
+          'producer': 'P', 'ad_strategy': None, 'agency': '代理A'},
+         {'date': D1, 'note_id': 'N2', 'cost': 1.0, 'note_title': '投放标题', 'publish_account': '投放账号'}],
+        [{'date': D1, 'note_id': 'N1', 'total_impressions': 5, 'note_url': None, 'note_type': '视频'}],
+        [{'date': D1, 'note_id': 'N3', 'lead_users': 1}],
+    )
+    mapping = [{'note_id': 'N1', 'note_title': None, 'note_url': 'm1', 'publish_account': '  ',
+                'publish_time': None, 'producer': None, 'ad_strategy': '种草'},
+               {'note_id': 'N3', 'note_title': '映射标题', 'note_url': 'm3', 'publish_account': '映射账号',
+                'publish_time': datetime(2025, 5, 1), 'producer': 'Q', 'ad_strategy': None}]
+    latest = {'N3': {'note_url': 'c3'}}
+
+    rows = _fill_note_dimensions(merged, mapping, latest).to_dict('index')
+
+    n1 = rows[(D1, 'N1')]
+    assert (n1['note_title'], n1['note_url'], n1['publish_account']) == ('未知笔记', 'm1', '投放账号')
+    assert (n1['producer'], n1['ad_strategy'], n1['note_type'], n1['agency'], n1['has_ad']) == ('P', '种草', '视频', '代理A', True)
+
+    # 没有 mapping：ad → 默认值；没有任何运营数据时 note_url 为空
+    n2 = rows[(D1, 'N2')]
+    assert (n2['note_title'], n2['note_url'], n2['producer'], n2['ad_strategy']) == ('投放标题', None, '申万宏源证券财富管理', '未知')
+
+    # 只有转化数据：mapping 属性 + 最新运营数据，没有广告数据
+    n3 = rows[(D1, 'N3')]
+    assert (n3['note_title'], n3['note_url'], n3['note_publish_time'], n3['ad_strategy']) == ('映射标题', 'm3', datetime(2025, 5, 1), None)
+    assert (n3['note_type'], n3['agency'], n3['has_ad']) == (None, None, False)
+
+    print("✓ 维度补充: 列运算与逐字段补充规则一致")
+
+
+def test_upsert_preserves_agency_without_ad():
+    """UPSERT 按 (date, note_id) 更新已有记录；没有当日广告数据的写入保留 agency / delivery_mode"""
+    engine = create_engine('sqlite://')
+    db.metadata.create_all(engine, tables=[DailyNotesMetricsUnified.__table__])
+
+    fields = ['date', 'note_id', 'agency', 'delivery_mode', 'total_impressions', 'created_at', 'updated_at']
+    without_ad = [field for field in fields if field not in ('agency', 'delivery_mode')]
+    now = datetime.now()
+
+    with Session(engine) as session:
+        session.execute(_upsert_statement(fields), [
+            {'date': D1, 'note_id': 'N1', 'agency': '代理A', 'delivery_mode': '手动投放',
+             'total_impressions': 10, 'created_at': now, 'updated_at': now},
+        ])
+        session.execute(_upsert_statement(without_ad), [
+            {'date': D1, 'note_id': 'N1', 'total_impressions': 20, 'created_at': now, 'updated_at': now},
+            {'date': D1, 'note_id': 'N2', 'total_impressions': 5, 'created_at': now, 'updated_at': now},
+        ])
+        session.commit()
+
+        rows = sorted(
+            (r.note_id, r.agency, r.delivery_mode, r.total_impressions)
+            for r in session.query(DailyNotesMetricsUnified)
+        )
+        assert rows == [('N1', '代理A', '手动投放', 20), ('N2', None, None, 5)]
+
+    print("✓ 批量 UPSERT: 冲突时更新指标，无广告数据时保留代理商")
+
+
+if __name__ == '__main__':
+    test_fill_dimensions_by_columns()
+    test_upsert_preserves_agency_without_ad()
+    print("\n全部测试通过")
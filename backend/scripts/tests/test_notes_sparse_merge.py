@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""
+测试小红书笔记日级聚合的稀疏合并（按实际存在的 (date, note_id) 外连接 + 向量化拆分）
+"""
+
+import sys
+import os
+from datetime import date
+
+# 设置标准输出为UTF-8编码（Windows兼容）
+if sys.platform == 'win32':
+    import io
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+    sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
+
+# 添加项目根目录到Python路径
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(current_dir, '../../..'))
+sys.path.insert(0, project_root)
+
+from backend.scripts.aggregations.update_daily_notes_metrics import (
+    _merge_note_sources,
+    _split_note_metrics,
+)
+
+D1, D2, D3 = date(2026, 1, 1), date(2026, 1, 2), date(2026, 1, 3)
+
+
+def _ad(day, note_id, **values):
+    row = {'date': day, 'note_id': note_id, 'cost': 0.0, 'impressions': 0, 'clicks': 0, 'likes': 0,
+           'comments': 0, 'favorites': 0, 'shares': 0, 'total_interactions': 0, 'private_messages': 0}
+    row.update(values)
+    return row
+
+
+def _content(day, note_id, **values):
+    row = {'date': day, 'note_id': note_id, 'total_impressions': 0, 'likes': 0, 'comments': 0,
+           'favorites': 0, 'shares': 0, 'total_interactions': 0}
+    row.update(values)
+    return row
+
+
+def test_merge_only_existing_keys():
+    """只合并三个来源实际存在的键；重复键保留最后一条；缺失来源的列为空"""
+    merged = _merge_note_sources(
+        [_ad(D1, 'N1', cost=1.0), _ad(D1, 'N1', cost=2.0), _ad(D2, 'N2')],
+        [_content(D2, 'N2', total_impressions=10), _content(D3, 'N3')],
+        [{'date': D3, 'note_id': 'N1', 'lead_users': 2, 'customer_mouth_users': 0, 'valid_lead_users': 0,
+          'opened_account_users': 1, 'valid_customer_users': 0, 'customer_assets_users': 0,
+          'customer_assets_amount': 0}],
+    )
+
+    assert list(merged.index) == [(D1, 'N1'), (D2, 'N2'), (D3, 'N1'), (D3, 'N3')]
+    assert merged.loc[(D1, 'N1'), 'ad_cost'] == 2.0
+    assert merged.loc[(D2, 'N2'), 'content_total_impressions'] == 10
+    assert merged[['ad_cost', 'content_total_impressions']].loc[[(D3, 'N1')]].isna().all(axis=None)
+
+    print("✓ 稀疏合并: 只包含实际存在的 (日期, 笔记)，重复记录后者覆盖")
+
+
+def test_split_matches_rules():
+    """向量化拆分与逐条规则一致：总量取较大值、自然量不为负、自然点击按投放点击率截断取整"""
+    merged = _merge_note_sources(
+        [_ad(D1, 'N1', cost=5.5, impressions=100, clicks=7, likes=3, total_interactions=20, private_messages=2),
+         _ad(D1, 'N2', impressions=50, clicks=5, likes=9, total_interactions=30)],
+        [_content(D1, 'N1', total_impressions=250, likes=5, total_interactions=10),
+         _content(D1, 'N3', total_impressions=40, likes=4, total_interactions=8)],
+        [],
+    )
+    metrics = _split_note_metrics(merged).to_dict('index')
+
+    n1 = metrics[(D1, 'N1')]
+    assert (n1['cost'], n1['total_impressions'], n1['organic_impressions']) == (5.5, 250, 150)
+    # 150 × 7/100 = 10.5 → 10
+    assert (n1['ad_clicks'], n1['organic_clicks'], n1['total_clicks']) == (7, 10, 17)
+    assert (n1['total_likes'], n1['organic_likes']) == (5, 2)
+    assert (n1['total_interactions'], n1['organic_interactions']) == (20, 0)
+    assert (n1['total_private_messages'], n1['organic_private_messages']) == (2, 0)
+    assert n1['lead_users'] == 0 and n1['customer_assets_amount'] == 0
+
+    # 没有运营数据：总量至少等于投放量；估算点赞总量为 0，自然量不为负
+    n2 = metrics[(D1, 'N2')]
+    assert (n2['total_impressions'], n2['organic_impressions'], n2['organic_clicks']) == (50, 0, 0)
+    assert (n2['total_likes'], n2['ad_likes'], n2['organic_likes']) == (0, 9, 0)
+
+    # 没有投放数据：全部为自然量，点击率为 0
+    n3 = metrics[(D1, 'N3')]
+    assert (n3['cost'], n3['organic_impressions'], n3['total_clicks'], n3['organic_likes']) == (0.0, 40, 0, 4)
+
+    print("✓ 向量化拆分: total / ad / organic 与逐条计算规则一致")
+
+
+if __name__ == '__main__':
+    test_merge_only_existing_keys()
+    test_split_matches_rules()
+    print("\n全部测试通过")
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""
+测试数据质量评分（整列计算、抽样、分块合并）
+"""
+
+import sys
+import os
+
+# 设置标准输出为UTF-8编码（Windows兼容）
+if sys.platform == 'win32':
+    import io
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+    sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
+
+# 添加项目根目录到Python路径
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(current_dir, '../../..'))
+sys.path.insert(0, project_root)
+
+import pandas as pd
+
+from backend.processors import BackendConversionProcessor, TencentAdsProcessor
+from backend.processors.base_processor import DataProcessor
+
+
+def test_quality_score_by_column():
+    """按列完整性、负花费一致性；分块评分按行数加权合并"""
+    processor = TencentAdsProcessor(None)
+    df = pd.DataFrame({
+        '日期': ['2026-01-01', '2026-01-02', None, '2026-01-04'],
+        '账户ID': ['A1', 'A2', 'A3', 'A4'],
+        '花费': ['10', '-5', '1,000', None],
+    })
+
+    score = processor.calculate_quality_score(df)
+    assert score['details']['completeness_by_column'] == {'日期': 75.0, '账户ID': 100.0, '花费': 75.0}
+    assert score['completeness'] == 83.33 and score['consistency'] == 75.0
+    assert (score['rows'], score['sampled_rows']) == (4, 4)
+
+    merged = DataProcessor._merge_quality_scores([(4, score), (12, processor.calculate_quality_score(df.iloc[[1]]))])
+    assert (merged['rows'], merged['sampled_rows']) == (5, 5)
+    assert merged['details']['completeness_by_column']['日期'] == round((4 * 75 + 12 * 100) / 16, 2)
+
+    # 后端转化：日期整列解析，无法解析的日期不计入有效性
+    conversions = pd.DataFrame({'线索日期': ['2026-01-01', '不是日期', None, '2026-01-02'],
+                                '平台来源': ['腾讯', '抖音', ' 小红书', '其他']})
+    score = BackendConversionProcessor(None).calculate_quality_score(conversions)
+    assert (score['completeness'], score['validity'], score['consistency']) == (75.0, 50.0, 75.0)
+
+    print("✓ 质量评分: 按列完整性、一致性正确，分块合并按行数加权")
+
+
+def test_quality_score_sampling():
+    """超过抽样行数时只对抽样行评分，结果记录原始行数和抽样行数"""
+    processor = TencentAdsProcessor(None)
+    processor.QUALITY_SAMPLE_ROWS = 1000
+    df = pd.DataFrame({
+        '日期': ['2026-01-01'] * 10000,
+        '账户ID': [f'A{i}' if i % 2 else None for i in range(10000)],
+        '花费': ['10'] * 10000,
+    })
+
+    score = processor.calculate_quality_score(df)
+    assert (score['rows'], score['sampled_rows']) == (10000, 1000)
+    assert abs(score['details']['completeness_by_column']['账户ID'] - 50.0) < 5
+    assert processor.calculate_quality_score(df) == score
+
+    print("✓ 质量评分: 大文件抽样评分，抽样结果稳定")
+
+
+if __name__ == '__main__':
+    test_quality_score_by_column()
+    test_quality_score_sampling()
+    print("\n全部测试通过")
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""
+测试按日期范围替换导入（replace_range）
+"""
+
+import sys
+import os
+import tempfile
+from datetime import date
+
+# 设置标准输出为UTF-8编码（Windows兼容）
+if sys.platform == 'win32':
+    import io
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+    sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
+
+# 添加项目根目录到Python路径
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(current_dir, '../../..'))
+sys.path.insert(0, project_root)
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from backend.database import db
+from backend.models import AccountAgencyMapping, RawAdDataTencent, XhsNoteInfo
+from backend.processors import TencentAdsProcessor, XhsNotesListProcessor
+
+
+def _write_csv(header, rows):
+    """写入临时 CSV 文件"""
+    f = tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False, encoding='utf-8')
+    f.write(header + '\n')
+    for row in rows:
+        f.write(','.join(str(v) for v in row) + '\n')
+    f.close()
+    return f.name
+
+
+def _import(processor, rows, **kwargs):
+    path = _write_csv('日期,账户ID,花费,曝光量,点击量', rows)
+    try:
+        return processor.import_data(path, **kwargs)
+    finally:
+        os.remove(path)
+
+
+def test_replace_range_restates_window():
+    """只替换文件日期范围内的数据：窗口内重述的花费生效、消失的账号被删除，窗口外保留"""
+    engine = create_engine('sqlite://')
+    db.metadata.create_all(engine, tables=[RawAdDataTencent.__table__, AccountAgencyMapping.__table__])
+
+    with Session(engine) as session:
+        rows = [(f'2026-01-{day:02d}', account, 10, 100, 5) for day in range(1, 8) for account in ('A1', 'A2')]
+        assert _import(TencentAdsProcessor(session), rows)['inserted_rows'] == 14
+
+        # 最近 3 天的快照：花费重述，A2 在 1 月 6 日没有数据
+        snapshot = [('2026-01-05', 'A1', 20, 100, 5), ('2026-01-05', 'A2', 20, 100, 5),
+                    ('2026-01-06', 'A1', 20, 100, 5), ('2026-01-07', 'A1', 20, 100, 5), ('2026-01-07', 'A2', 20, 100, 5)]
+        result = _import(TencentAdsProcessor(session), snapshot, replace_range=True)
+
+        assert result['success'] and result['inserted_rows'] == 5 and result['deleted_rows'] == 6
+        assert result['date_range'] == {'start': '2026-01-05', 'end': '2026-01-07'}
+
+        stored = {(r.date, r.account_id): float(r.cost) for r in session.query(RawAdDataTencent)}
+        assert len(stored) == 13
+        assert stored[(date(2026, 1, 4), 'A2')] == 10
+        assert stored[(date(2026, 1, 5), 'A2')] == 20
+        assert (date(2026, 1, 6), 'A2') not in stored
+
+    print("✓ 按日期范围替换: 窗口内整段替换，窗口外数据保留")
+
+
+def test_replace_range_requires_date_field():
+    """未声明日期字段的数据类型不支持按日期范围替换"""
+    engine = create_engine('sqlite://')
+    db.metadata.create_all(engine, tables=[XhsNoteInfo.__table__])
+
+    with Session(engine) as session:
+        path = _write_csv('笔记ID,笔记标题', [('n1', '标题')])
+        result = XhsNotesListProcessor(session).import_data(path, replace_range=True)
+        os.remove(path)
+
+        assert not result['success'] and '不支持' in result['error']
+        assert session.query(XhsNoteInfo).count() == 0
+
+    print("✓ 按日期范围替换: 不支持的数据类型直接返回错误")
+
+
+if __name__ == '__main__':
+    test_replace_range_restates_window()
+    test_replace_range_requires_date_field()
+    print("\n全部测试通过")
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""
+测试后端转化全量覆盖导入的影子表替换
+"""
+
+import sys
+import os
+import tempfile
+from datetime import date
+
+# 设置标准输出为UTF-8编码（Windows兼容）
+if sys.platform == 'win32':
+    import io
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+    sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
+
+# 添加项目根目录到Python路径
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(current_dir, '../../..'))
+sys.path.insert(0, project_root)
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+from backend.database import db
+from backend.models import BackendConversions
+from backend.processors import BackendConversionProcessor, ImportCancelled
+
+
+def _write_csv(rows):
+    """写入临时后端转化 CSV"""
+    f = tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False, encoding='utf-8')
+    f.write('线索日期,平台来源,广告代理商\n')
+    for row in rows:
+        f.write(row + '\n')
+    f.close()
+    return f.name
+
+
+def _schema(session):
+    """backend_conversions 相关的表和索引"""
+    return sorted(
+        row[0] for row in session.execute(text(
+            "SELECT name FROM sqlite_master WHERE tbl_name LIKE 'backend_conversions%'"
+        ))
+    )
+
+
+def test_full_reload_swaps_staging_table():
+    """全量覆盖：影子表替换正式表，索引按原名重建；取消时正式表保持不变"""
+    fd, db_path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    engine = create_engine(f'sqlite:///{db_path}')
+    db.metadata.create_all(engine, tables=[BackendConversions.__table__])
+
+    with Session(engine) as session:
+        session.add(BackendConversions(lead_date=date(2025, 12, 1), platform_source='旧数据'))
+        session.commit()
+        schema = _schema(session)
+
+        # 导入中途取消：旧数据保留，影子表被删除
+        path = _write_csv(['2026-01-05,腾讯,代理商A', '2026-01-06,抖音,代理商B'])
+
+        def cancel(progress, message):
+            raise ImportCancelled('任务已取消')
+
+        try:
+            BackendConversionProcessor(session).import_data(path, overwrite=True, chunksize=1, progress_callback=cancel)
+            assert False, '应抛出 ImportCancelled'
+        except ImportCancelled:
+            pass
+        assert [r.platform_source for r in session.query(BackendConversions).all()] == ['旧数据']
+        assert _schema(session) == schema
+
+        # 正常导入：整表替换，索引与原来一致
+        result = BackendConversionProcessor(session).import_data(path, overwrite=True, chunksize=1)
+        os.remove(path)
+
+        assert result['success'] and result['inserted_rows'] == 2
+        assert sorted(r.platform_source for r in session.query(BackendConversions).all()) == ['抖音', '腾讯']
+        assert _schema(session) == schema
+
+    engine.dispose()
+    os.remove(db_path)
+
+    print("✓ 影子表替换: 全量覆盖整表替换、索引重建、取消时旧数据保留")
+
+
+if __name__ == '__main__':
+    test_full_reload_swaps_staging_table()
+    print("\n全部测试通过")
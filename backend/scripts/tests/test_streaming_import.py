@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+"""
+测试 CSV 流式（分块）导入
+"""
+
+import sys
+import os
+import tempfile
+
+# 设置标准输出为UTF-8编码（Windows兼容）
+if sys.platform == 'win32':
+    import io
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+    sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
+
+# 添加项目根目录到Python路径
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(current_dir, '../../..'))
+sys.path.insert(0, project_root)
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from backend.database import db
+from backend.models import RawAdDataTencent
+from backend.processors import TencentAdsProcessor
+
+
+def test_streaming_import_gbk_csv():
+    """GBK 编码的 CSV 分块导入：编码检测、逐块进度、跨块覆盖"""
+    f = tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False, encoding='gbk')
+    f.write('日期,账户ID,花费,曝光次数\n')
+    f.write('2026-01-05,1001,1.5,10\n')
+    f.write('2026-01-05,1002,2,20\n')
+    f.write(',1003,3,30\n')
+    f.write('2026-01-05,1001,9,90\n')  # 与第一块重复，覆盖模式下更新
+    f.close()
+
+    engine = create_engine('sqlite://')
+    db.metadata.create_all(engine, tables=[RawAdDataTencent.__table__])
+
+    progress = []
+    with Session(engine) as session:
+        processor = TencentAdsProcessor(session)
+        assert processor.detect_encoding(f.name) in ('gb18030', 'gbk', 'gb2312')
+
+        result = processor.import_data(
+            f.name, overwrite=True, chunksize=2,
+            progress_callback=lambda p, m: progress.append(p)
+        )
+        os.remove(f.name)
+
+        assert result['success']
+        assert result['total_rows'] == 4
+        assert result['inserted_rows'] == 2 and result['updated_rows'] == 1 and result['failed_rows'] == 1
+        assert result['errors'] == ['第 4 行: 日期为空']
+        assert len(progress) == 2
+
+        record = session.query(RawAdDataTencent).filter_by(account_id='1001').one()
+        assert float(record.cost) == 9 and record.impressions == 90
+
+    print("✓ 流式导入: 编码检测、分块进度、跨块覆盖正确")
+
+
+if __name__ == '__main__':
+    test_streaming_import_gbk_csv()
+    print("\n全部测试通过")
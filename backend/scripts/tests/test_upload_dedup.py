@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+"""
+测试上传文件内容哈希和重复文件跳过
+"""
+
+import sys
+import os
+import io
+import hashlib
+import shutil
+import tempfile
+import zipfile
+from unittest import mock
+
+# 设置标准输出为UTF-8编码（Windows兼容）
+if sys.platform == 'win32':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+    sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
+
+# 添加项目根目录到Python路径
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(current_dir, '../../..'))
+sys.path.insert(0, project_root)
+
+from flask import Flask
+
+from backend.database import db
+from backend.models import DataImportLog
+from backend.routes import upload
+from backend.services.import_queue import ImportQueue
+from backend.utils.file_hash import save_stream_with_hash
+
+
+def test_save_stream_with_hash():
+    """写入文件的同时计算 SHA-256，结果与整体计算一致"""
+    content = os.urandom(3000)
+    fd, path = tempfile.mkstemp()
+    os.close(fd)
+
+    size, file_hash = save_stream_with_hash(io.BytesIO(content), path, chunk_size=1024)
+    with open(path, 'rb') as f:
+        assert f.read() == content
+    os.remove(path)
+
+    assert size == 3000 and file_hash == hashlib.sha256(content).hexdigest()
+
+    print("✓ 文件哈希: 流式写入与 SHA-256 正确")
+
+
+def test_find_duplicate_import():
+    """相同类型 + 相同内容 + 已成功才算重复；全量替换类型之后有其他导入时不算重复"""
+    fd, path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{path}'
+    db.init_app(app)
+
+    def add_log(task_id, import_type, file_hash, status='completed'):
+        db.session.add(DataImportLog(
+            task_id=task_id, import_type=import_type, file_name=f'{task_id}.csv',
+            file_hash=file_hash, status=status
+        ))
+        db.session.commit()
+
+    with app.app_context():
+        db.metadata.create_all(db.engine, tables=[DataImportLog.__table__])
+
+        add_log('t1', 'tencent_ads', 'aaa')
+        add_log('t2', 'tencent_ads', 'bbb', status='failed')
+        add_log('c1', 'backend_conversion', 'aaa')
+
+        assert upload.find_duplicate_import('tencent_ads', 'aaa').task_id == 't1'
+        assert upload.find_duplicate_import('tencent_ads', 'bbb') is None
+        assert upload.find_duplicate_import('douyin_ads', 'aaa') is None
+        assert upload.find_duplicate_import('backend_conversion', 'aaa').task_id == 'c1'
+
+        # 后端转化全量替换：之后导入了其他文件，相同文件需要重新导入
+        add_log('c2', 'backend_conversion', 'ccc')
+        assert upload.find_duplicate_import('backend_conversion', 'aaa') is None
+
+        db.session.remove()
+        db.engine.dispose()
+    os.remove(path)
+
+    print("✓ 文件哈希: 重复文件识别正确")
+
+
+def test_batch_upload_hashes_and_skips_duplicates():
+    """批量上传（多文件 / ZIP）每个文件记录哈希；已导入成功的相同文件跳过，force 时重新导入"""
+    import config
+
+    fd, path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    upload_dir = tempfile.mkdtemp()
+
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{path}'
+    db.init_app(app)
+    app.register_blueprint(upload.bp)
+
+    old_content = '日期,账户ID,花费\n2026-01-05,A1,10\n'.encode('utf-8')
+    new_content = '日期,账户ID,花费\n2026-01-06,A1,20\n'.encode('utf-8')
+
+    def post(files, **form):
+        data = {'data_type': 'tencent_ads', **form, 'files': [(io.BytesIO(content), name) for name, content in files]}
+        return client.post('/upload/batch', data=data, content_type='multipart/form-data').get_json()['data']
+
+    # 不启动工作线程：只检查上传时创建的导入日志
+    with mock.patch.object(upload, 'import_queue', ImportQueue()), \
+            mock.patch.object(config, 'UPLOAD_FOLDER', upload_dir), app.app_context():
+        db.metadata.create_all(db.engine, tables=[DataImportLog.__table__])
+        db.session.add(DataImportLog(task_id='t1', import_type='tencent_ads', file_name='old.csv',
+                                     file_hash=hashlib.sha256(old_content).hexdigest(), status='completed'))
+        db.session.commit()
+        client = app.test_client()
+
+        data = post([('old.csv', old_content), ('new.csv', new_content)])
+        assert data['file_count'] == 1 and [d['task_id'] for d in data['duplicates']] == ['t1']
+        new_log = db.session.query(DataImportLog).filter_by(task_id=data['tasks'][0]['task_id']).one()
+        assert new_log.file_hash == hashlib.sha256(new_content).hexdigest()
+        # 跳过的文件已删除
+        assert os.listdir(upload_dir) == [new_log.file_path]
+
+        # ZIP 内的文件同样计算哈希并跳过重复文件
+        archive = io.BytesIO()
+        with zipfile.ZipFile(archive, 'w') as zf:
+            zf.writestr('a.csv', old_content)
+            zf.writestr('b.csv', new_content)
+        data = post([('export.zip', archive.getvalue())])
+        assert data['file_count'] == 1 and data['duplicates'][0]['file_name'] == 'a.csv'
+        zip_log = db.session.query(DataImportLog).filter_by(task_id=data['tasks'][0]['task_id']).one()
+        assert zip_log.file_hash == new_log.file_hash
+
+        # 全部重复：不创建批次；force 时重新导入
+        data = post([('old.csv', old_content)])
+        assert data['batch_id'] is None and data['file_count'] == 0
+        data = post([('old.csv', old_content)], force='true')
+        assert data['file_count'] == 1 and data['duplicates'] == []
+
+        # 没有文件哈希的任务不能按断点继续
+        legacy = DataImportLog(task_id='t9', import_type='tencent_ads', file_name='x.csv', checkpoint_offset=5)
+        assert ImportQueue.resume_offset(legacy) == 0
+
+        db.session.remove()
+        db.engine.dispose()
+    os.remove(path)
+    shutil.rmtree(upload_dir)
+
+    print("✓ 文件哈希: 批量上传逐个文件记录哈希并跳过重复文件")
+
+
+if __name__ == '__main__':
+    test_save_stream_with_hash()
+    test_find_duplicate_import()
+    test_batch_upload_hashes_and_skips_duplicates()
+    print("\n全部测试通过")
@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+"""
+省心投 BI - 批量导入（多文件 / ZIP）
+
+批量上传的文件分两个阶段处理：
+1. 解析阶段：读取 → 验证列 → 清洗 → 去重 → 验证转换，不访问数据库，
+   在进程池中并行执行（pandas 解析受 GIL 限制，线程无法利用多核）
+2. 写入阶段：在导入队列的写入锁内按上传顺序串行写入，聚合表只更新一次
+
+进程池不可用时（例如受限环境无法创建子进程）退回到当前线程顺序解析
+"""
+
+import hashlib
+import os
+import uuid
+import zipfile
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, List, Tuple
+
+from backend.processors.base_processor import DataProcessor
+
+logger = logging.getLogger(__name__)
+
+# 批量上传允许的文件扩展名（ZIP 包内同样只处理这些文件）
+BATCH_FILE_EXTENSIONS = ('.csv', '.xlsx', '.xls')
+
+
+class BatchUploadError(ValueError):
+    """批量上传文件不合法（文件数量、ZIP 大小等）"""
+
+
+def supports_parallel_parse(ProcessorClass) -> bool:
+    """
+    处理器是否支持 parse_file / write_parsed 两阶段导入
+
+    重写了 import_data 但没有重写 write_parsed 的处理器（如账号映射）
+    有自己的导入流程，批量上传时逐个文件调用 import_data
+    """
+    overrides_import = ProcessorClass.import_data is not DataProcessor.import_data
+    overrides_write = ProcessorClass.write_parsed is not DataProcessor.write_parsed
+    return not overrides_import or overrides_write
+
+
+def parse_file_worker(ProcessorClass, file_path: str) -> Dict[str, Any]:
+    """
+    子进程入口：解析单个文件（不访问数据库，db_session 为 None）
+
+    必须是模块级函数，才能被进程池序列化
+    """
+    try:
+        return ProcessorClass(None).parse_file(file_path)
+    except Exception as e:
+        return {'success': False, 'error': f"解析失败: {str(e)}"}
+
+
+def resolve_parse_processes(configured: int, file_count: int) -> int:
+    """计算解析进程数（configured 为 0 时按 CPU 核数，最多 4 个）"""
+    if configured <= 0:
+        configured = min(4, os.cpu_count() or 1)
+    return max(1, min(configured, file_count))
+
+
+def parse_files(ProcessorClass, file_paths: List[str], max_workers: int) -> List[Dict[str, Any]]:
+    """
+    并行解析多个文件
+
+    Args:
+        ProcessorClass: 处理器类
+        file_paths: 文件路径列表
+        max_workers: 进程数（1 表示在当前线程顺序解析）
+
+    Returns:
+        与 file_paths 顺序一致的解析结果列表
+    """
+    if max_workers > 1 and len(file_paths) > 1:
+        try:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                return list(executor.map(
+                    parse_file_worker, [ProcessorClass] * len(file_paths), file_paths
+                ))
+        except Exception as e:
+            logger.warning(f"进程池解析失败，改为顺序解析: {str(e)}")
+
+    return [parse_file_worker(ProcessorClass, path) for path in file_paths]
+
+
+def extract_zip(zip_path: str, target_dir: str, data_type: str, max_files: int, max_size: int) -> List[Tuple[str, str, str]]:
+    """
+    安全解压 ZIP 包中的数据文件
+
+    - 只解压 .csv / .xlsx / .xls 文件，跳过目录和 __MACOSX 等系统文件
+    - 解压后的文件使用生成的文件名，不使用包内路径（防止路径穿越）
+    - 按包内声明的大小检查总量，写入时再按实际字节数检查（防止压缩炸弹）
+    - 写入的同时计算每个文件的 SHA-256（用于识别重复导入和断点续传）
+
+    Args:
+        zip_path: ZIP 文件路径
+        target_dir: 解压目录
+        data_type: 数据类型（用于生成文件名）
+        max_files: 最多文件数
+        max_size: 解压后总大小上限（字节）
+
+    Returns:
+        [(原始文件名, 解压后的文件名, SHA-256)]，按包内文件名排序
+
+    Raises:
+        BatchUploadError: ZIP 不合法或超出限制
+    """
+    try:
+        archive = zipfile.ZipFile(zip_path)
+    except zipfile.BadZipFile:
+        raise BatchUploadError('ZIP 文件已损坏或格式不正确')
+
+    extracted = []
+    try:
+        with archive:
+            members = [
+                info for info in archive.infolist()
+                if not info.is_dir()
+                and not info.filename.startswith('__MACOSX/')
+                and not os.path.basename(info.filename).startswith('.')
+                and info.filename.lower().endswith(BATCH_FILE_EXTENSIONS)
+            ]
+            members.sort(key=lambda info: info.filename)
+
+            if not members:
+                raise BatchUploadError(f'ZIP 中没有可导入的文件（支持: {", ".join(BATCH_FILE_EXTENSIONS)}）')
+            if len(members) > max_files:
+                raise BatchUploadError(f'ZIP 中文件数量 {len(members)} 超过上限 {max_files}')
+            if sum(info.file_size for info in members) > max_size:
+                raise BatchUploadError(f'ZIP 解压后大小超过上限 {max_size // 1024 // 1024} MB')
+
+            written = 0
+            for info in members:
+                original_name = _decode_zip_name(info)
+                save_name = generate_upload_filename(data_type, os.path.splitext(original_name)[1])
+                save_path = os.path.join(target_dir, save_name)
+
+                sha256 = hashlib.sha256()
+                with archive.open(info) as src, open(save_path, 'wb') as dst:
+                    extracted.append((original_name, save_name))
+                    while True:
+                        chunk = src.read(1024 * 1024)
+                        if not chunk:
+                            break
+                        written += len(chunk)
+                        if written > max_size:
+                            raise BatchUploadError(f'ZIP 解压后大小超过上限 {max_size // 1024 // 1024} MB')
+                        sha256.update(chunk)
+                        dst.write(chunk)
+                extracted[-1] += (sha256.hexdigest(),)
+    except Exception:
+        # 解压失败：清理已解压的文件
+        for _, save_name, *_ in extracted:
+            path = os.path.join(target_dir, save_name)
+            if os.path.exists(path):
+                os.remove(path)
+        raise
+
+    return extracted
+
+
+def generate_upload_filename(data_type: str, file_ext: str) -> str:
+    """生成上传文件的保存文件名（时间戳 + 数据类型 + 随机ID，保留扩展名）"""
+    file_ext = (file_ext or '').lower()
+    if file_ext not in BATCH_FILE_EXTENSIONS:
+        file_ext = '.csv'
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    random_id = str(uuid.uuid4())[:8]
+    return f"{timestamp}_{data_type}_{random_id}{file_ext}"
+
+
+def _decode_zip_name(info: zipfile.ZipInfo) -> str:
+    """
+    还原 ZIP 内的中文文件名
+
+    Windows 压缩工具通常用 GBK 编码文件名且不设置 UTF-8 标志，
+    zipfile 会按 cp437 解码导致乱码
+    """
+    name = info.filename
+    if not info.flag_bits & 0x800:
+        try:
+            name = name.encode('cp437').decode('gbk')
+        except (UnicodeEncodeError, UnicodeDecodeError):
+            pass
+    return os.path.basename(name)
@@ -0,0 +1,296 @@
+# -*- coding: utf-8 -*-
+"""
+省心投 BI - 导入任务队列
+
+上传接口只负责保存文件并写入 data_import_log（status='queued'），
+由固定数量的工作线程按顺序领取任务处理：
+
+1. 持久化：队列就是 data_import_log 表，服务重启后排队中的任务会继续处理；
+   重启前处理中断的任务重新排队，从断点（checkpoint_offset，最后一次批量提交的
+   记录位置）继续写入
+2. 排序：priority 越大越先处理，相同优先级按提交顺序（id）处理
+3. 并行度：IMPORT_WORKERS 个工作线程；文件读取、清洗、验证可以并行，
+   数据库写入通过 write_lock 串行执行（SQLite 同一时刻只允许一个写事务）
+4. 取消：排队中的任务直接标记为 cancelled；处理中的任务在下一次批量提交前抛出
+   ImportCancelled，回滚当前批次后停止（已提交的批次保留，并刷新其涉及的聚合表）；
+   最后一个批次提交后不再响应取消，任务正常完成
+5. 批量上传：同一 batch_id 的任务一起领取，作为一个任务交给处理函数
+"""
+
+import threading
+import logging
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from sqlalchemy import and_, func, or_
+
+from backend.database import db
+from backend.models import DataImportLog
+from backend.processors.base_processor import ImportCancelled
+
+logger = logging.getLogger(__name__)
+
+
+class ImportQueue:
+    """基于 data_import_log 的导入任务队列"""
+
+    STATUS_QUEUED = 'queued'
+    STATUS_PROCESSING = 'processing'
+    STATUS_CANCELLED = 'cancelled'
+
+    def __init__(self):
+        self.app = None
+        self.handler = None
+        self.workers = 1
+        self.poll_interval = 5
+
+        # 数据库写入锁（处理器写入阶段、聚合表更新共用）
+        self.write_lock = threading.RLock()
+
+        self._wakeup = threading.Condition()
+        self._claim_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._cancel_requested = set()
+        self._stopping = threading.Event()
+        self._threads = []
+
+    def init_app(self, app, handler: Callable[[Dict[str, Any]], None]) -> None:
+        """
+        绑定 Flask 应用和任务处理函数（不启动工作线程）
+
+        Args:
+            app: Flask 应用
+            handler: 任务处理函数 handler(job)，job 为 _claim_next() 返回的字典
+                     （批量任务的 job 含 batch_id 和 jobs 列表）
+        """
+        self.app = app
+        self.handler = handler
+        self.workers = max(1, int(app.config.get('IMPORT_WORKERS', 2)))
+        self.poll_interval = int(app.config.get('IMPORT_QUEUE_POLL_INTERVAL', 5))
+
+    def start(self) -> None:
+        """启动工作线程（重复调用无副作用）"""
+        with self._start_lock:
+            if self._threads or self.app is None:
+                return
+
+            try:
+                self.recover_stale_jobs()
+            except Exception as e:
+                logger.error(f"恢复中断的导入任务失败: {str(e)}")
+
+            for i in range(self.workers):
+                thread = threading.Thread(
+                    target=self._worker_loop,
+                    name=f'import-worker-{i + 1}',
+                    daemon=True
+                )
+                thread.start()
+                self._threads.append(thread)
+
+        logger.info(f"导入队列已启动: {self.workers} 个工作线程")
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """
+        停止工作线程（正在处理的任务完成后退出，之后可以重新 start）
+
+        Args:
+            timeout: 等待每个工作线程退出的秒数（None 表示一直等待）
+        """
+        with self._start_lock:
+            self._stopping.set()
+            with self._wakeup:
+                self._wakeup.notify_all()
+            for thread in self._threads:
+                thread.join(timeout)
+            self._threads = []
+            self._stopping.clear()
+
+    def recover_stale_jobs(self) -> int:
+        """
+        服务启动时恢复中断的任务：状态仍为 processing 的任务重新排队
+
+        工作线程启动前调用，此时不会有任务正在处理；重新领取时按断点继续
+
+        Returns:
+            恢复的任务数量
+        """
+        with self.app.app_context():
+            logs = db.session.query(DataImportLog).filter(
+                DataImportLog.status == self.STATUS_PROCESSING
+            ).all()
+
+            for log in logs:
+                log.status = self.STATUS_QUEUED
+                log.message = f'服务重启，等待从断点继续（已提交 {log.checkpoint_offset or 0} 条）'
+            db.session.commit()
+
+        if logs:
+            logger.info(f"恢复 {len(logs)} 个中断的导入任务")
+        return len(logs)
+
+    @staticmethod
+    def resume_offset(import_log: DataImportLog) -> int:
+        """任务的断点位置（断点与当前文件内容一致时有效；没有文件哈希时无法确认，从头导入）"""
+        if import_log.checkpoint_offset and import_log.file_hash and import_log.checkpoint_hash == import_log.file_hash:
+            return import_log.checkpoint_offset
+        return 0
+
+    def enqueue(self, import_log: DataImportLog) -> None:
+        """
+        通知工作线程有新任务（调用前 import_log 应已以 queued 状态提交）
+
+        Args:
+            import_log: 导入日志记录
+        """
+        self.start()
+        with self._wakeup:
+            self._wakeup.notify()
+
+    def queue_position(self, import_log: DataImportLog) -> Optional[int]:
+        """
+        计算排队位置（从 1 开始）
+
+        Returns:
+            排队位置；任务不在排队中时返回 None
+        """
+        if import_log.status != self.STATUS_QUEUED:
+            return None
+
+        priority = import_log.priority or 0
+        ahead = db.session.query(func.count(DataImportLog.id)).filter(
+            DataImportLog.status == self.STATUS_QUEUED,
+            or_(
+                func.coalesce(DataImportLog.priority, 0) > priority,
+                and_(
+                    func.coalesce(DataImportLog.priority, 0) == priority,
+                    DataImportLog.id < import_log.id
+                )
+            )
+        ).scalar()
+        return ahead + 1
+
+    def cancel(self, import_log: DataImportLog) -> Tuple[bool, str]:
+        """
+        取消任务
+
+        Returns:
+            (是否已受理, 提示消息)
+        """
+        if import_log.status == self.STATUS_QUEUED:
+            # 条件更新：避免与工作线程领取任务冲突
+            updated = db.session.query(DataImportLog).filter(
+                DataImportLog.id == import_log.id,
+                DataImportLog.status == self.STATUS_QUEUED
+            ).update({
+                'status': self.STATUS_CANCELLED,
+                'completed_at': datetime.now(),
+                'message': '任务已取消'
+            }, synchronize_session=False)
+            db.session.commit()
+            if updated:
+                return True, '任务已取消'
+            db.session.refresh(import_log)
+
+        if import_log.status == self.STATUS_PROCESSING:
+            self._cancel_requested.add(import_log.task_id)
+            return True, '已请求取消，当前批次完成后停止'
+
+        return False, f'任务状态为 {import_log.status}，无法取消'
+
+    def is_cancel_requested(self, task_id: str) -> bool:
+        """处理中的任务是否已请求取消"""
+        return task_id in self._cancel_requested
+
+    def check_cancelled(self, task_id: str) -> None:
+        """
+        检查取消请求（处理器每次批量提交前调用）
+
+        Raises:
+            ImportCancelled: 任务已请求取消
+        """
+        if task_id in self._cancel_requested:
+            raise ImportCancelled('任务已取消')
+
+    def _worker_loop(self) -> None:
+        """工作线程：领取任务 → 处理 → 继续领取；队列为空时等待通知或轮询，stop() 后退出"""
+        while not self._stopping.is_set():
+            try:
+                job = self._claim_next()
+            except Exception as e:
+                logger.error(f"领取导入任务失败: {str(e)}")
+                job = None
+
+            if job is None:
+                with self._wakeup:
+                    if not self._stopping.is_set():
+                        self._wakeup.wait(self.poll_interval)
+                continue
+
+            try:
+                logger.info(f"开始处理导入任务: {job['task_id']} ({job['import_type']})")
+                self.handler(job)
+            except Exception as e:
+                logger.error(f"导入任务异常: {job['task_id']}, 错误: {str(e)}")
+            finally:
+                for child in job.get('jobs', [job]):
+                    self._cancel_requested.discard(child['task_id'])
+
+    def _claim_next(self) -> Optional[Dict[str, Any]]:
+        """
+        领取下一个排队中的任务并标记为 processing
+
+        Returns:
+            任务字典；队列为空时返回 None
+        """
+        with self._claim_lock, self.app.app_context():
+            import_log = db.session.query(DataImportLog).filter(
+                DataImportLog.status == self.STATUS_QUEUED
+            ).order_by(
+                func.coalesce(DataImportLog.priority, 0).desc(),
+                DataImportLog.id.asc()
+            ).first()
+
+            if not import_log:
+                return None
+
+            # 批量上传：同一批次排队中的任务一起领取
+            if import_log.batch_id:
+                logs = db.session.query(DataImportLog).filter(
+                    DataImportLog.batch_id == import_log.batch_id,
+                    DataImportLog.status == self.STATUS_QUEUED
+                ).order_by(DataImportLog.id.asc()).all()
+            else:
+                logs = [import_log]
+
+            for log in logs:
+                log.status = self.STATUS_PROCESSING
+                log.started_at = datetime.now()
+                log.message = '开始处理...'
+            db.session.commit()
+
+            jobs = [{
+                'id': log.id,
+                'task_id': log.task_id,
+                'import_type': log.import_type,
+                'file_path': log.file_path,
+                'overwrite': bool(log.overwrite),
+                'replace_range': bool(log.replace_range),
+                'resume_offset': self.resume_offset(log),
+            } for log in logs]
+
+            if not import_log.batch_id:
+                return jobs[0]
+
+            return {
+                'batch_id': import_log.batch_id,
+                'task_id': import_log.batch_id,
+                'import_type': import_log.import_type,
+                'overwrite': bool(import_log.overwrite),
+                'replace_range': bool(import_log.replace_range),
+                'jobs': jobs,
+            }
+
+
+# 全局队列实例（app.py 中 init_app）
+import_queue = ImportQueue()
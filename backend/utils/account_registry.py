@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+"""
+账号映射登记表（导入时自动创建占位映射用）
+
+导入广告数据时，account_agency_mapping 中没有的账号需要创建一条
+代理商='未分配'、业务模式='信息流' 的占位映射。原先每条记录按
+(platform, account_id) 查询一次映射表。现在每次导入：
+
+1. 预加载该平台的全部已有账号到内存集合（只查询一次）
+2. 逐条登记时只做集合判断，新账号暂存到待创建列表
+3. 导入结束时一次批量插入待创建的映射，并按新账号汇总生成提示
+
+账号键：
+- 有 account_id（腾讯/抖音账号、小红书代理商子账户）：按 account_id 判断
+- 没有 account_id（小红书直投）：按 main_account_id 判断（account_id 为 NULL 的记录）
+"""
+
+import logging
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import insert
+
+from backend.models import AccountAgencyMapping
+
+logger = logging.getLogger(__name__)
+
+# 自动创建的映射默认值（满足 agency NOT NULL 约束，用户在账号管理中补充）
+DEFAULT_AGENCY = '未分配'
+DEFAULT_BUSINESS_MODEL = '信息流'
+
+
+class AccountMappingRegistry:
+    """单个平台的已有账号集合 + 待创建的占位映射"""
+
+    def __init__(self, platform: str):
+        self.platform = platform
+        self._account_ids = set()
+        self._direct_main_ids = set()
+        self._pending: List[Dict[str, Any]] = []
+
+    @classmethod
+    def load(cls, session, platform: str) -> 'AccountMappingRegistry':
+        """预加载平台的全部已有账号"""
+        registry = cls(platform)
+        rows = session.query(
+            AccountAgencyMapping.account_id,
+            AccountAgencyMapping.main_account_id
+        ).filter(AccountAgencyMapping.platform == platform)
+
+        for account_id, main_account_id in rows:
+            if account_id is not None:
+                registry._account_ids.add(str(account_id))
+            elif main_account_id is not None:
+                registry._direct_main_ids.add(str(main_account_id))
+        return registry
+
+    def register(self, account_id: Any = None, main_account_id: Any = None) -> bool:
+        """
+        登记账号，不存在时加入待创建列表
+
+        Args:
+            account_id: 账号ID（小红书为代理商子账户ID，直投时为空）
+            main_account_id: 主账号ID（仅小红书）
+
+        Returns:
+            是否为新账号
+        """
+        account_id = str(account_id) if account_id else None
+        main_account_id = str(main_account_id) if main_account_id else None
+
+        if account_id:
+            if account_id in self._account_ids:
+                return False
+            self._account_ids.add(account_id)
+        elif main_account_id:
+            if main_account_id in self._direct_main_ids:
+                return False
+            self._direct_main_ids.add(main_account_id)
+        else:
+            return False
+
+        self._pending.append({
+            'platform': self.platform,
+            'account_id': account_id,
+            'main_account_id': main_account_id,
+            'account_name': None,
+            'sub_account_name': None,
+            'agency': DEFAULT_AGENCY,
+            'business_model': DEFAULT_BUSINESS_MODEL,
+        })
+        return True
+
+    @property
+    def pending(self) -> List[Dict[str, Any]]:
+        """待创建的映射"""
+        return self._pending
+
+    def flush(self, session) -> List[Dict[str, Any]]:
+        """
+        一次批量插入待创建的映射（不提交事务，由调用方 commit）
+
+        Returns:
+            本次创建的映射列表
+        """
+        created, self._pending = self._pending, []
+        if created:
+            session.execute(insert(AccountAgencyMapping), created)
+            logger.info(f"[{self.platform}] 自动创建 {len(created)} 个账号映射")
+        return created
+
+
+def format_new_account_warnings(created: List[Dict[str, Any]], limit: Optional[int] = 20) -> List[str]:
+    """
+    按新账号汇总生成提示信息
+
+    Args:
+        created: flush() 返回的映射列表
+        limit: 最多列出的账号数量（None 表示全部）
+
+    Returns:
+        提示信息列表（没有新账号时为空）
+    """
+    if not created:
+        return []
+
+    platform = created[0]['platform']
+    labels = [
+        f"{item['main_account_id']}/{item['account_id']}" if item['account_id'] and item['main_account_id']
+        else (item['account_id'] or f"{item['main_account_id']}（直投）")
+        for item in created
+    ]
+    shown = labels if limit is None else labels[:limit]
+    more = f" 等 {len(labels)} 个" if len(labels) > len(shown) else ''
+
+    return [
+        f"发现 {len(created)} 个新{platform}账号（{', '.join(shown)}{more}），已自动创建账号映射记录。"
+        f"默认设置：代理商='{DEFAULT_AGENCY}'，业务模式='{DEFAULT_BUSINESS_MODEL}'。"
+        f"请在账号管理中补充完整信息"
+    ]
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+"""
+导入涉及的 (平台, 日期范围)（聚合表增量刷新用）
+
+原先每次广告/转化导入后都不带参数调用 update_daily_metrics()，从底表最早日期
+重新聚合到今天：导入一天的抖音数据也要重新聚合两年的数据。现在导入结果报告
+touched_ranges：
+
+    [{'platform': 平台, 'start': 'YYYY-MM-DD', 'end': 'YYYY-MM-DD'}, ...]
+
+- 广告数据：处理器平台 + 写入记录的日期范围
+- 后端转化（增量模式）：发生变化的线索按平台来源分组的线索日期范围
+- 无法确定范围时为 None（如后端转化全量覆盖），聚合退回全量刷新
+- 空列表表示没有写入任何数据，不需要刷新
+
+批量上传的多个文件按平台合并为 (最早日期, 最晚日期)，日期范围相同的平台
+合并为一次聚合调用
+"""
+
+from datetime import date
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+DateRange = Tuple[date, date]
+
+
+def _to_date(value: Any) -> date:
+    """ISO 日期字符串 / date / datetime 转为 date"""
+    if isinstance(value, str):
+        return date.fromisoformat(value[:10])
+    if hasattr(value, 'date') and callable(value.date):
+        return value.date()
+    return value
+
+
+def touched_ranges(bounds: Dict[Any, DateRange]) -> List[Dict[str, Any]]:
+    """
+    {平台: (最早日期, 最晚日期)} 转为导入结果中的 touched_ranges
+
+    平台为空的范围（如缺少平台来源的转化线索）不参与聚合，忽略
+    """
+    return [
+        {'platform': platform, 'start': _to_date(start).isoformat(), 'end': _to_date(end).isoformat()}
+        for platform, (start, end) in bounds.items()
+        if platform
+    ]
+
+
+def merge_touched_ranges(range_lists: Iterable[Optional[List[Dict[str, Any]]]]) -> Optional[Dict[str, DateRange]]:
+    """
+    按平台合并多个导入结果的 touched_ranges
+
+    Args:
+        range_lists: 各导入结果的 touched_ranges
+
+    Returns:
+        {平台: (最早日期, 最晚日期)}；任一结果为 None（范围未知）时返回 None
+    """
+    merged: Dict[str, DateRange] = {}
+    for ranges in range_lists:
+        if ranges is None:
+            return None
+        for item in ranges:
+            start, end = _to_date(item['start']), _to_date(item['end'])
+            current = merged.get(item['platform'])
+            if current is not None:
+                start, end = min(start, current[0]), max(end, current[1])
+            merged[item['platform']] = (start, end)
+    return merged
+
+
+def group_refresh_scopes(ranges: Dict[str, DateRange]) -> List[Tuple[date, date, List[str]]]:
+    """
+    日期范围相同的平台合并为一次聚合
+
+    Returns:
+        [(开始日期, 结束日期, [平台...])]（按开始日期排序）
+    """
+    scopes: Dict[DateRange, List[str]] = {}
+    for platform, date_range in ranges.items():
+        scopes.setdefault(date_range, []).append(platform)
+    return [(start, end, platforms) for (start, end), platforms in sorted(scopes.items())]
@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+"""
+已有唯一键索引（增量导入去重用）
+
+笔记类日级表的唯一键是 (日期, note_id)。增量导入时需要知道哪些键已经在库中：
+
+1. 按日期范围加载：只查询上传文件覆盖的 [最早日期, 最晚日期] 内的键，
+   而不是整张表
+2. 紧凑存储：{日期序数: set(note_id)}，note_id 使用 sys.intern 驻留，
+   同一笔记在不同日期只保存一份字符串；不再为每条记录拼接 "YYYY-MM-DD|note_id"
+"""
+
+import sys
+from datetime import date, datetime
+from typing import Any, Iterable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+def date_ordinal(value: Any) -> Optional[int]:
+    """日期转为序数（date.toordinal），无法识别时返回 None"""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.date().toordinal()
+    if isinstance(value, date):
+        return value.toordinal()
+    if isinstance(value, str):
+        try:
+            return date.fromisoformat(value[:10]).toordinal()
+        except ValueError:
+            return None
+    try:
+        if pd.isna(value):
+            return None
+        return pd.Timestamp(value).date().toordinal()
+    except (TypeError, ValueError):
+        return None
+
+
+class ExistingKeyIndex:
+    """按日期分组的 (日期, 键) 集合"""
+
+    def __init__(self):
+        self._keys = {}
+        self._size = 0
+
+    @classmethod
+    def load(cls, session, date_column, key_column, min_date, max_date, chunk_size: int = 50000) -> 'ExistingKeyIndex':
+        """
+        从数据库加载日期范围内的已有键
+
+        Args:
+            session: SQLAlchemy 会话
+            date_column: 日期列（如 XhsNotesContentDaily.data_date）
+            key_column: 键列（如 XhsNotesContentDaily.note_id）
+            min_date: 最早日期（None 时返回空索引）
+            max_date: 最晚日期
+            chunk_size: 每次从游标读取的行数
+
+        Returns:
+            ExistingKeyIndex
+        """
+        index = cls()
+        if min_date is None or max_date is None:
+            return index
+
+        rows = session.query(date_column, key_column).filter(
+            date_column >= min_date,
+            date_column <= max_date
+        ).yield_per(chunk_size)
+
+        for value_date, key in rows:
+            index.add(value_date, key)
+
+        return index
+
+    @staticmethod
+    def date_bounds(values: Iterable[Any]) -> Tuple[Optional[date], Optional[date]]:
+        """
+        计算日期范围（忽略空值）
+
+        Returns:
+            (最早日期, 最晚日期)；没有有效日期时为 (None, None)
+        """
+        ordinals = [ordinal for ordinal in map(date_ordinal, values) if ordinal is not None]
+        if not ordinals:
+            return None, None
+        return date.fromordinal(min(ordinals)), date.fromordinal(max(ordinals))
+
+    def add(self, value_date: Any, key: Any) -> None:
+        """添加一个键（日期无效或键为空时忽略）"""
+        ordinal = date_ordinal(value_date)
+        if ordinal is None or key is None:
+            return
+
+        keys = self._keys.get(ordinal)
+        if keys is None:
+            keys = self._keys[ordinal] = set()
+
+        key = sys.intern(str(key))
+        if key not in keys:
+            keys.add(key)
+            self._size += 1
+
+    def contains(self, value_date: Any, key: Any) -> bool:
+        """键是否已存在"""
+        keys = self._keys.get(date_ordinal(value_date))
+        return keys is not None and key is not None and str(key) in keys
+
+    def mask(self, dates: pd.Series, keys: pd.Series) -> np.ndarray:
+        """
+        整列判断键是否已存在
+
+        Args:
+            dates: 日期列（datetime64 或 date 对象）
+            keys: 键列
+
+        Returns:
+            布尔数组（True 表示已存在）
+        """
+        if not self._keys:
+            return np.zeros(len(dates), dtype=bool)
+
+        if pd.api.types.is_datetime64_any_dtype(dates):
+            # datetime64 → 序数：距 1970-01-01 的天数 + 1970-01-01 的序数
+            days = dates.values.astype('datetime64[D]').astype('int64')
+            epoch = date(1970, 1, 1).toordinal()
+            ordinals = [None if nat else int(day) + epoch for day, nat in zip(days, dates.isna().values)]
+        else:
+            ordinals = [date_ordinal(value) for value in dates]
+
+        result = np.zeros(len(dates), dtype=bool)
+        for i, (ordinal, key) in enumerate(zip(ordinals, keys)):
+            day_keys = self._keys.get(ordinal)
+            if day_keys is not None and str(key) in day_keys:
+                result[i] = True
+        return result
+
+    def __len__(self) -> int:
+        return self._size
@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+"""
+上传文件内容哈希
+
+上传文件写入磁盘的同时计算 SHA-256（不额外读取一遍文件），
+用于识别重复上传的相同文件
+"""
+
+import hashlib
+from typing import BinaryIO, Tuple
+
+# 每次读取的字节数
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def save_stream_with_hash(stream: BinaryIO, file_path: str, chunk_size: int = HASH_CHUNK_SIZE) -> Tuple[int, str]:
+    """
+    将上传流写入文件，同时计算 SHA-256
+
+    Args:
+        stream: 上传文件流（如 werkzeug FileStorage.stream）
+        file_path: 保存路径
+        chunk_size: 每次读取的字节数
+
+    Returns:
+        (文件大小, SHA-256 十六进制摘要)
+    """
+    sha256 = hashlib.sha256()
+    size = 0
+
+    with open(file_path, 'wb') as f:
+        while True:
+            chunk = stream.read(chunk_size)
+            if not chunk:
+                break
+            sha256.update(chunk)
+            f.write(chunk)
+            size += len(chunk)
+
+    return size, sha256.hexdigest()
@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+"""
+笔记最新维度表 note_latest_dimensions 的维护（笔记日级聚合补充维度用）
+
+笔记日级聚合在某天没有运营数据时，用该笔记最新一条运营数据补充 note_url 等
+维度。原先每次聚合都全表扫描 xhs_notes_content_daily 找每个笔记的最新记录，
+刷新一天的数据也要读取全部历史。现在：
+
+1. 内容笔记日级数据导入时，按笔记取本批 data_date 最大的记录 UPSERT，
+   只有 data_date 不早于已记录日期时才更新（同一日期重新导入会替换事实表
+   中的记录，维度跟随更新）
+2. 聚合只读取这张每个笔记一条的小表
+3. 表为空（迁移前的旧数据库）时从事实表一次性回填
+"""
+
+import logging
+from datetime import datetime
+from typing import Any, Dict, Iterable, List
+
+from sqlalchemy import delete, func, insert, literal, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from backend.models import NoteLatestDimensions, XhsNotesContentDaily
+
+logger = logging.getLogger(__name__)
+
+# 维度字段（xhs_notes_content_daily 与 note_latest_dimensions 同名）
+DIMENSION_FIELDS = ['note_url', 'note_type']
+
+
+def _as_date(value: Any) -> Any:
+    """datetime 转为 date（导入记录的 data_date 可能是 datetime）"""
+    return value.date() if isinstance(value, datetime) else value
+
+
+def latest_dimension_rows(records: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    按笔记取 data_date 最大的记录（日期相同时后面的记录优先）
+
+    Args:
+        records: 内容笔记日级记录（包含 note_id, data_date 和维度字段）
+
+    Returns:
+        note_latest_dimensions 的行
+    """
+    latest: Dict[str, Dict[str, Any]] = {}
+    for record in records:
+        note_id, data_date = record.get('note_id'), _as_date(record.get('data_date'))
+        if not note_id or data_date is None:
+            continue
+        current = latest.get(note_id)
+        if current is None or data_date >= current['data_date']:
+            latest[note_id] = {
+                'note_id': note_id,
+                'data_date': data_date,
+                **{field: record.get(field) for field in DIMENSION_FIELDS},
+            }
+    return list(latest.values())
+
+
+def upsert_latest_dimensions(session, records: Iterable[Dict[str, Any]]) -> int:
+    """
+    用导入的记录更新笔记最新维度（不提交事务，由调用方 commit）
+
+    Returns:
+        参与 UPSERT 的笔记数
+    """
+    rows = latest_dimension_rows(records)
+    if not rows:
+        return 0
+
+    now = datetime.now()
+    for row in rows:
+        row['updated_at'] = now
+
+    table = NoteLatestDimensions.__table__
+    stmt = sqlite_insert(table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['note_id'],
+        set_={field: stmt.excluded[field] for field in ['data_date', *DIMENSION_FIELDS, 'updated_at']},
+        # 只有更新（或相同）日期的记录才覆盖
+        where=stmt.excluded.data_date >= table.c.data_date
+    )
+    session.execute(stmt, rows)
+    return len(rows)
+
+
+def rebuild_latest_dimensions(session) -> int:
+    """
+    从 xhs_notes_content_daily 重建笔记最新维度（不提交事务，由调用方 commit）
+
+    每个笔记取 data_date 最大的一条（(data_date, note_id) 唯一）
+
+    Returns:
+        写入的笔记数
+    """
+    content = XhsNotesContentDaily.__table__
+    latest = select(
+        content.c.note_id,
+        func.max(content.c.data_date).label('data_date')
+    ).group_by(content.c.note_id).subquery()
+
+    query = select(
+        content.c.note_id,
+        content.c.data_date,
+        *[content.c[field] for field in DIMENSION_FIELDS],
+        literal(datetime.now())
+    ).join(
+        latest,
+        (content.c.note_id == latest.c.note_id) & (content.c.data_date == latest.c.data_date)
+    )
+
+    table = NoteLatestDimensions.__table__
+    session.execute(delete(table))
+    result = session.execute(
+        insert(table).from_select(['note_id', 'data_date', *DIMENSION_FIELDS, 'updated_at'], query)
+    )
+    logger.info(f"重建笔记最新维度: {result.rowcount} 个笔记")
+    return result.rowcount
@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+"""
+笔记维度表（xhs_note_info）批量同步
+
+导入笔记数据后需要补充 xhs_note_info：不存在的 note_id 新建记录，已存在但
+标题/链接为空的记录用导入数据补齐。原先每条记录执行一次
+query(XhsNoteInfo).filter(note_id == …).first()，一个月的笔记文件要发出
+数万次点查询。现在按文件批量处理：
+
+1. 收集文件中的去重 note_id（同一笔记多行时，每个字段取第一个非空值）
+2. 分块 IN 查询已有记录（每块 chunk_size 个 note_id）
+3. 需要写入的记录（新笔记 + 有空字段可补的已有笔记）用一条 executemany 写入：
+       INSERT INTO xhs_note_info (...) VALUES (...)
+       ON CONFLICT(note_id) DO UPDATE SET col = COALESCE(NULLIF(col, ''), excluded.col)
+   已有的非空字段不会被覆盖
+"""
+
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from sqlalchemy import func
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from backend.models import XhsNoteInfo
+
+logger = logging.getLogger(__name__)
+
+# 只补空值的字段（已有记录中这些字段为空时用导入数据补齐）
+FILL_FIELDS = ('note_title', 'note_url')
+
+# 每次 IN 查询的 note_id 数量（低于 SQLite 变量数上限）
+CHUNK_SIZE = 500
+
+
+def _is_empty(value: Any) -> bool:
+    """空值判断（None 和空字符串）"""
+    return value is None or value == ''
+
+
+def merge_note_rows(rows: Iterable[Dict[str, Any]], fields: Sequence[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    按 note_id 合并记录
+
+    同一 note_id 出现多次时，每个字段取第一个非空值（与逐条处理时
+    "首条新建、后续补空"的结果一致）
+
+    Returns:
+        {note_id: {字段: 值}}（保持 note_id 首次出现的顺序）
+    """
+    merged = {}
+    for row in rows:
+        note_id = row.get('note_id')
+        if _is_empty(note_id):
+            continue
+
+        values = merged.get(note_id)
+        if values is None:
+            merged[note_id] = {field: row.get(field) for field in fields}
+            continue
+        for field in fields:
+            if _is_empty(values[field]) and not _is_empty(row.get(field)):
+                values[field] = row[field]
+    return merged
+
+
+def load_note_info(
+    session,
+    note_ids: Iterable[str],
+    fields: Sequence[str] = FILL_FIELDS,
+    chunk_size: int = CHUNK_SIZE
+) -> Dict[str, Dict[str, Any]]:
+    """
+    分块 IN 查询已有笔记记录
+
+    Args:
+        session: SQLAlchemy 会话
+        note_ids: 要查询的 note_id
+        fields: 需要一并读取的字段
+        chunk_size: 每次 IN 查询的 note_id 数量
+
+    Returns:
+        {note_id: {字段: 值}}（只包含已存在的 note_id）
+    """
+    note_ids = list(note_ids)
+    columns = [getattr(XhsNoteInfo, field) for field in fields]
+
+    existing = {}
+    for start in range(0, len(note_ids), chunk_size):
+        chunk = note_ids[start:start + chunk_size]
+        for row in session.query(XhsNoteInfo.note_id, *columns).filter(XhsNoteInfo.note_id.in_(chunk)):
+            existing[row[0]] = dict(zip(fields, row[1:]))
+    return existing
+
+
+def sync_note_info(
+    session,
+    rows: Iterable[Dict[str, Any]],
+    fill_fields: Sequence[str] = FILL_FIELDS,
+    insert_fields: Sequence[str] = (),
+    existing: Optional[Dict[str, Dict[str, Any]]] = None,
+    chunk_size: int = CHUNK_SIZE
+) -> Dict[str, int]:
+    """
+    批量同步笔记维度表（不提交事务，由调用方 commit）
+
+    Args:
+        session: SQLAlchemy 会话
+        rows: 导入的记录（包含 note_id 及要同步的字段）
+        fill_fields: 新建时写入、已有记录为空时补齐的字段
+        insert_fields: 只在新建时写入的字段（已有记录不修改）
+        existing: 已查询的已有记录（load_note_info 的返回值，需包含 fill_fields），
+                  为 None 时在此查询
+        chunk_size: 每次 IN 查询的 note_id 数量
+
+    Returns:
+        {'new_count': 新建数量, 'updated_count': 补齐空字段的数量}
+    """
+    fields = list(fill_fields) + [field for field in insert_fields if field not in fill_fields]
+    merged = merge_note_rows(rows, fields)
+    if not merged:
+        return {'new_count': 0, 'updated_count': 0}
+
+    if existing is None:
+        existing = load_note_info(session, merged.keys(), fill_fields, chunk_size)
+
+    pending: List[Dict[str, Any]] = []
+    new_count = 0
+    updated_count = 0
+    for note_id, values in merged.items():
+        current = existing.get(note_id)
+        if current is None:
+            new_count += 1
+        elif any(_is_empty(current.get(field)) and not _is_empty(values[field]) for field in fill_fields):
+            updated_count += 1
+        else:
+            continue
+        pending.append({'note_id': note_id, **values})
+
+    if pending:
+        table = XhsNoteInfo.__table__
+        stmt = sqlite_insert(table)
+        update_values = {
+            field: func.coalesce(func.nullif(table.c[field], ''), stmt.excluded[field])
+            for field in fill_fields
+        }
+        if update_values:
+            stmt = stmt.on_conflict_do_update(index_elements=[table.c.note_id], set_=update_values)
+        else:
+            stmt = stmt.on_conflict_do_nothing(index_elements=[table.c.note_id])
+        session.execute(stmt, pending)
+
+    logger.info(f"笔记维度同步: {len(merged)} 个笔记, 新建 {new_count}, 补齐 {updated_count}")
+    return {'new_count': new_count, 'updated_count': updated_count}
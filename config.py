@@ -28,6 +28,14 @@ UPLOAD_FOLDER = os.path.join(BASE_DIR, os.getenv('UPLOAD_FOLDER', 'uploads'))
 MAX_CONTENT_LENGTH = int(os.getenv('MAX_CONTENT_LENGTH', '50')) * 1024 * 1024  # MB -> bytes
 ALLOWED_EXTENSIONS = set(os.getenv('ALLOWED_EXTENSIONS', 'csv,xlsx,xls').split(','))
 
+# 导入队列配置
+IMPORT_WORKERS = int(os.getenv('IMPORT_WORKERS', '2'))  # 并行处理的导入任务数（写入阶段始终串行）
+IMPORT_QUEUE_POLL_INTERVAL = int(os.getenv('IMPORT_QUEUE_POLL_INTERVAL', '5'))  # 空闲时检查队列的间隔（秒）
+IMPORT_PARSE_PROCESSES = int(os.getenv('IMPORT_PARSE_PROCESSES', '0'))  # 批量上传并行解析的进程数（0 表示按 CPU 核数，最多 4 个）
+BATCH_MAX_FILES = int(os.getenv('BATCH_MAX_FILES', '50'))  # 批量上传最多文件数（含 ZIP 内文件）
+ZIP_MAX_UNCOMPRESSED_SIZE = int(os.getenv('ZIP_MAX_UNCOMPRESSED_SIZE', '1024')) * 1024 * 1024  # ZIP 解压后总大小上限（MB -> bytes）
+QUALITY_SAMPLE_ROWS = int(os.getenv('QUALITY_SAMPLE_ROWS', '0'))  # 质量评分抽样行数（数据超过该行数时只对抽样行评分，0 表示不抽样）
+
 # API配置
 API_VERSION = 'v1'
 API_PREFIX = f'/api/{API_VERSION}'
@@ -880,7 +880,15 @@ class DataImport {
             formData.append('overwrite', overwriteMode.toString());
 
             // 上传并处理文件
-            const response = await API.upload(formData);
+            let response = await API.upload(formData);
+
+            // 相同文件已导入成功：询问是否强制重新导入（取消时显示之前的导入结果）
+            if (response.success && response.data && response.data.duplicate) {
+                if (confirm(`${response.data.message}\n\n是否强制重新导入？`)) {
+                    formData.append('force', 'true');
+                    response = await API.upload(formData);
+                }
+            }
 
             if (response.success && response.data && response.data.task_id) {
                 this.currentTaskId = response.data.task_id;
@@ -910,8 +918,14 @@ class DataImport {
 
                 const status = response.data;
 
-                if (status.status === 'processing') {
+                if (status.status === 'queued') {
+                    this.updateProgress(0, `排队中（第 ${status.queue_position || 1} 位）...`);
+                } else if (status.status === 'processing') {
                     this.updateProgress(status.progress || 50, status.message || '处理中...');
+                } else if (status.status === 'cancelled') {
+                    this.stopPolling();
+                    this.hideProgress();
+                    this.showError(status.message || '任务已取消');
                 } else if (status.status === 'completed') {
                     this.stopPolling();
                     this.updateProgress(100, '处理完成');
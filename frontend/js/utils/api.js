@@ -215,6 +215,15 @@ class API {
         return this.get(`/status/${taskId}`);
     }
 
+    /**
+     * 取消导入任务（排队中的任务直接取消，处理中的任务在下一个进度点停止）
+     * @param {string} taskId - 任务ID
+     * @returns {Promise}
+     */
+    static async cancelTask(taskId) {
+        return this.post(`/cancel/${taskId}`, {});
+    }
+
     /**
      * 上传数据文件（带数据类型）
      * @param {FormData} formData - 包含file和data_type的表单数据